@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+工作流图核心基准测试
+
+生成大规模随机 DAG（默认 10k 顶点），测量建图、校验、拓扑排序、子图查找、
+分支过滤以及 DAG 长度计算的耗时，结果以 JSON 输出，便于对比不同版本。
+
+用法：
+    python benchmarks/bench_graph.py --vertices 10000 --fan-in 3 --repeat 3
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.vertex import FunctionVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def _noop(inputs, context=None):
+    return inputs
+
+
+def build_graph(num_vertices: int, fan_in: int, window: int, seed: int, task: Callable = _noop) -> Workflow:
+    """生成一个单源单汇的随机 DAG
+
+    每个中间顶点从其前 window 个顶点中随机选择至多 fan_in 个前驱，
+    没有后继的顶点统一连接到汇顶点，保证图能通过 validate_workflow。
+    需要执行图时应传入不返回输入的 task，否则输出会沿依赖链逐层嵌套。
+    """
+    rng = random.Random(seed)
+    workflow = Workflow(WorkflowContext())
+    source = workflow.add_vertex(SourceVertex(id="source", task=task))
+    vertices = [source]
+    for index in range(1, num_vertices - 1):
+        vertex = workflow.add_vertex(FunctionVertex(id=f"v{index}", task=task))
+        candidates = vertices[max(0, index - window) : index]
+        for dep in rng.sample(candidates, min(fan_in, len(candidates))):
+            dep | vertex
+        vertices.append(vertex)
+
+    sink = workflow.add_vertex(SinkVertex(id="sink", task=task))
+    for vertex in vertices:
+        if vertex.out_degree == 0:
+            vertex | sink
+    return workflow
+
+
+def _timeit(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_once(num_vertices: int, fan_in: int, window: int, seed: int) -> Dict[str, float]:
+    timings = {}
+    holder: List[Workflow] = []
+    timings["build"] = _timeit(lambda: holder.append(build_graph(num_vertices, fan_in, window, seed)))
+    workflow = holder[0]
+    timings["validate"] = _timeit(workflow.validate_workflow)
+    timings["topological_sort"] = _timeit(workflow.topological_sort)
+    timings["find_subgraph"] = _timeit(lambda: workflow.find_subgraph("source"))
+    timings["filter_subgraph"] = _timeit(
+        lambda: [workflow.mayebe_filter_subgraph(vertex) for vertex in workflow.vertices.values()]
+    )
+    timings["dag_length"] = _timeit(workflow._calculate_dag_length)
+    timings["edges"] = len(workflow.edges)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Workflow graph core benchmark")
+    parser.add_argument("--vertices", type=int, default=10000, help="顶点数量")
+    parser.add_argument("--fan-in", type=int, default=3, help="每个顶点的最大前驱数")
+    parser.add_argument("--window", type=int, default=50, help="前驱的候选窗口大小")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最小值")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--verbose", action="store_true", help="保留 INFO 日志（默认只输出 WARNING 以上）")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        LoggerUtil.get_logger().setLevel(logging.WARNING)
+
+    runs = [run_once(args.vertices, args.fan_in, args.window, args.seed) for _ in range(args.repeat)]
+    result = {
+        "benchmark": "graph_core",
+        "vertices": args.vertices,
+        "edges": runs[0]["edges"],
+        "repeat": args.repeat,
+        "seconds": {key: min(run[key] for run in runs) for key in runs[0] if key != "edges"},
+    }
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+子图与循环开销基准测试
+
+- vertex_group: 反复执行一个由 width 个空任务顶点串联的 VertexGroup，测量每次子图执行的耗时
+- while_group: 同样的子图放入 WhileVertexGroup 循环 iterations 次，测量每次迭代的耗时
+
+顶点任务只返回常量，测得的是子图调度、变量筛选与循环控制本身的开销，结果以 JSON 输出。
+
+用法：
+    python benchmarks/bench_loops.py --width 5 --executions 200 --iterations 1000 --repeat 3
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, List
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.constants import ITERATION_INDEX_KEY, LOCAL_VAR, SOURCE_SCOPE, SOURCE_VAR, SUBGRAPH_SOURCE
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.edge import Always, Edge
+from vertex_flow.workflow.vertex import FunctionVertex
+from vertex_flow.workflow.vertex.vertex_group import VertexGroup
+from vertex_flow.workflow.vertex.while_vertex_group import WhileVertexGroup
+
+
+def _task(inputs, context=None):
+    return {"value": 1}
+
+
+def build_chain(width: int):
+    """width 个顶点串联的子图，首个顶点从子图输入中读取 value"""
+    vertices: List[FunctionVertex] = []
+    edges = []
+    for index in range(width):
+        variables = []
+        if index == 0:
+            variables = [{SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: "value", LOCAL_VAR: "value"}]
+        vertex = FunctionVertex(id=f"step{index}", task=_task, variables=variables)
+        if vertices:
+            edges.append(Edge(vertices[-1], vertex, Always()))
+        vertices.append(vertex)
+    return vertices, edges
+
+
+def bench_vertex_group(width: int, executions: int) -> float:
+    vertices, edges = build_chain(width)
+    group = VertexGroup(
+        id="group",
+        subgraph_vertices=vertices,
+        subgraph_edges=edges,
+        variables=[{SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: "value", LOCAL_VAR: "value"}],
+    )
+    context = WorkflowContext()
+    start = time.perf_counter()
+    for _ in range(executions):
+        group.execute(inputs={"value": 0}, context=context)
+    return time.perf_counter() - start
+
+
+def bench_while_group(width: int, iterations: int) -> float:
+    vertices, edges = build_chain(width)
+    group = WhileVertexGroup(
+        id="loop",
+        subgraph_vertices=vertices,
+        subgraph_edges=edges,
+        condition_task=lambda inputs, context=None: inputs.get(ITERATION_INDEX_KEY, 0) < iterations,
+        max_iterations=iterations,
+        variables=[{SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: "value", LOCAL_VAR: "value"}],
+    )
+    start = time.perf_counter()
+    group.execute(inputs={"value": 0}, context=WorkflowContext())
+    elapsed = time.perf_counter() - start
+    assert group.get_iteration_count() == iterations, f"ran {group.get_iteration_count()} of {iterations} iterations"
+    return elapsed
+
+
+def run_once(width: int, executions: int, iterations: int) -> Dict[str, float]:
+    return {
+        "vertex_group": bench_vertex_group(width, executions),
+        "while_group": bench_while_group(width, iterations),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VertexGroup and WhileVertexGroup overhead benchmark")
+    parser.add_argument("--width", type=int, default=5, help="子图中串联的顶点数")
+    parser.add_argument("--executions", type=int, default=200, help="VertexGroup 的执行次数")
+    parser.add_argument("--iterations", type=int, default=1000, help="WhileVertexGroup 的迭代次数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最小值")
+    parser.add_argument("--verbose", action="store_true", help="保留 INFO 日志（默认只输出 WARNING 以上）")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        LoggerUtil.get_logger().setLevel(logging.WARNING)
+        # 子图与循环顶点通过 logging 模块直接输出 INFO 日志
+        logging.getLogger().setLevel(logging.WARNING)
+
+    runs = [run_once(args.width, args.executions, args.iterations) for _ in range(args.repeat)]
+    seconds = {key: min(run[key] for run in runs) for key in runs[0]}
+    result = {
+        "benchmark": "loops",
+        "width": args.width,
+        "executions": args.executions,
+        "iterations": args.iterations,
+        "repeat": args.repeat,
+        "seconds": seconds,
+        "us_per_execution": round(seconds["vertex_group"] / args.executions * 1e6, 3),
+        "us_per_iteration": round(seconds["while_group"] / args.iterations * 1e6, 3),
+    }
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+记忆存储操作基准测试
+
+对 InnerMemory 与 FileMemory 分别测量去重、历史追加/读取、上下文读写、临时数据与限流计数
+各操作的速率（次/秒），多个用户轮流访问，结果以 JSON 输出。Redis/RDS 需要外部服务，不在此测试。
+
+用法：
+    python benchmarks/bench_memory.py --ops 2000 --users 10 --repeat 3
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+from vertex_flow.memory import create_memory
+from vertex_flow.utils.logger import LoggerUtil
+
+
+def _rate(ops: int, func: Callable[[int], object]) -> float:
+    start = time.perf_counter()
+    for index in range(ops):
+        func(index)
+    return ops / (time.perf_counter() - start)
+
+
+def bench_store(memory, ops: int, users: int) -> Dict[str, float]:
+    def user(index: int) -> str:
+        return f"user{index % users}"
+
+    message = {"text": "benchmark message", "tokens": 16}
+    return {
+        "seen": _rate(ops, lambda i: memory.seen(user(i), f"msg{i}")),
+        "append_history": _rate(ops, lambda i: memory.append_history(user(i), "user", "text", message)),
+        "recent_history": _rate(ops, lambda i: memory.recent_history(user(i), n=20)),
+        "ctx_set": _rate(ops, lambda i: memory.ctx_set(user(i), f"key{i % 50}", {"value": i})),
+        "ctx_get": _rate(ops, lambda i: memory.ctx_get(user(i), f"key{i % 50}")),
+        "set_ephemeral": _rate(ops, lambda i: memory.set_ephemeral(user(i), f"tmp{i % 50}", i)),
+        "get_ephemeral": _rate(ops, lambda i: memory.get_ephemeral(user(i), f"tmp{i % 50}")),
+        "incr_rate": _rate(ops, lambda i: memory.incr_rate(user(i), "requests")),
+    }
+
+
+def run_once(ops: int, users: int) -> Dict[str, Dict[str, float]]:
+    results = {"inner": bench_store(create_memory("inner"), ops, users)}
+    with tempfile.TemporaryDirectory() as storage_dir:
+        results["file"] = bench_store(create_memory("file", storage_dir=storage_dir), ops, users)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory store operation benchmark")
+    parser.add_argument("--ops", type=int, default=2000, help="每种操作的次数")
+    parser.add_argument("--users", type=int, default=10, help="轮流访问的用户数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最大速率")
+    parser.add_argument("--verbose", action="store_true", help="保留 INFO 日志（默认只输出 WARNING 以上）")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        LoggerUtil.get_logger().setLevel(logging.WARNING)
+
+    runs = [run_once(args.ops, args.users) for _ in range(args.repeat)]
+    rates = {f"{store}.{op}": max(run[store][op] for run in runs) for store in runs[0] for op in runs[0][store]}
+    result = {
+        "benchmark": "memory",
+        "ops": args.ops,
+        "users": args.users,
+        "repeat": args.repeat,
+        "rates": rates,
+    }
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return result
+
+
+if __name__ == "__main__":
+    main()
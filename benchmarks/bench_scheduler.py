@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+调度器开销基准测试
+
+在 bench_graph 生成的随机 DAG 上执行空任务顶点，比较拓扑序调度、就绪队列调度与异步调度的
+端到端耗时，并折算为每个顶点的调度开销（微秒），结果以 JSON 输出。
+
+用法：
+    python benchmarks/bench_scheduler.py --vertices 2000 --fan-in 3 --repeat 3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Dict
+
+from bench_graph import build_graph
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.constants import SCHEDULER_READY_QUEUE, SCHEDULER_TOPOLOGICAL
+
+
+def _task(inputs, context=None):
+    return None
+
+
+def _execute(workflow, mode: str):
+    if mode == "async":
+        asyncio.run(workflow.execute_workflow_async({}))
+    else:
+        workflow.set_scheduler_mode(mode)
+        workflow.execute_workflow({})
+
+
+def run_once(num_vertices: int, fan_in: int, window: int, seed: int) -> Dict[str, float]:
+    timings = {}
+    for mode in [SCHEDULER_TOPOLOGICAL, SCHEDULER_READY_QUEUE, "async"]:
+        # 每种调度方式使用新建的图，建图时间不计入
+        workflow = build_graph(num_vertices, fan_in, window, seed, task=_task)
+        start = time.perf_counter()
+        _execute(workflow, mode)
+        timings[mode] = time.perf_counter() - start
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Workflow scheduler overhead benchmark")
+    parser.add_argument("--vertices", type=int, default=2000, help="顶点数量")
+    parser.add_argument("--fan-in", type=int, default=3, help="每个顶点的最大前驱数")
+    parser.add_argument("--window", type=int, default=50, help="前驱的候选窗口大小")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最小值")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--verbose", action="store_true", help="保留 INFO 日志（默认只输出 WARNING 以上）")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        LoggerUtil.get_logger().setLevel(logging.WARNING)
+
+    runs = [run_once(args.vertices, args.fan_in, args.window, args.seed) for _ in range(args.repeat)]
+    seconds = {key: min(run[key] for run in runs) for key in runs[0]}
+    result = {
+        "benchmark": "scheduler",
+        "vertices": args.vertices,
+        "repeat": args.repeat,
+        "seconds": seconds,
+        "us_per_vertex": {key: round(value / args.vertices * 1e6, 3) for key, value in seconds.items()},
+    }
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+事件通道与端到端流式基准测试
+
+- channel: 工作线程发送流式分片，事件循环中通过 astream_batches 消费，
+  分别测量开启/关闭分片合并时的发送速率与端到端吞吐（事件/秒）以及消费者被唤醒的批次数
+- e2e: source -> LLM(StubChatModel, 流式) -> sink，在后台运行中消费 MESSAGES/UPDATES，
+  测量首个分片到达时间（ttft）、总耗时以及相对模型本身耗时的额外开销
+
+用法：
+    python benchmarks/bench_streaming.py --events 50000 --runs 5 --tokens 256 --tokens-per-second 2000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from stub_chat_model import StubChatModel
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.constants import (
+    CONTENT_KEY,
+    ENABLE_STREAM,
+    MESSAGE_TYPE_REGULAR,
+    SYSTEM,
+    TYPE_KEY,
+    USER,
+    VERTEX_ID_KEY,
+    WORKFLOW_COMPLETE,
+    WORKFLOW_END_STATES,
+)
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.event_channel import EventChannel, EventType
+from vertex_flow.workflow.vertex import LLMVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def bench_channel(num_events: int, coalesce: bool) -> Dict[str, float]:
+    """单个生产者线程 + 单个 astream_batches 消费者"""
+    channel = EventChannel(coalesce=coalesce)
+    chunk = {VERTEX_ID_KEY: "llm", CONTENT_KEY: "x", TYPE_KEY: MESSAGE_TYPE_REGULAR}
+    timings = {}
+
+    def produce():
+        start = time.perf_counter()
+        for _ in range(num_events):
+            channel.emit_event(EventType.MESSAGES, dict(chunk))
+        timings["emit"] = time.perf_counter() - start
+        channel.emit_event(EventType.UPDATES, {"status": WORKFLOW_COMPLETE})
+
+    async def consume():
+        batches = chars = 0
+        producer = threading.Thread(target=produce)
+        start = time.perf_counter()
+        producer.start()
+        try:
+            async for batch in channel.astream_batches([EventType.MESSAGES, EventType.UPDATES]):
+                batches += 1
+                for event_data in batch:
+                    if event_data.get("status") in WORKFLOW_END_STATES:
+                        return batches, chars, time.perf_counter() - start
+                    chars += len(event_data.get(CONTENT_KEY, ""))
+        finally:
+            producer.join()
+
+    batches, chars, total = asyncio.run(consume())
+    assert chars == num_events, f"lost chunks: {chars} != {num_events}"
+    return {
+        "emit_events_per_second": num_events / timings["emit"],
+        "events_per_second": num_events / total,
+        "seconds": total,
+        "batches": batches,
+    }
+
+
+def build_llm_workflow(model: StubChatModel) -> Workflow:
+    workflow = Workflow(WorkflowContext())
+    source = workflow.add_vertex(SourceVertex(id="source", task=lambda inputs, context=None: inputs))
+    llm = workflow.add_vertex(
+        LLMVertex(id="llm", params={"model": model, SYSTEM: "benchmark", USER: ["stream"], ENABLE_STREAM: True})
+    )
+    sink = workflow.add_vertex(SinkVertex(id="sink", task=lambda inputs, context=None: None))
+    source | llm | sink
+    return workflow
+
+
+def bench_e2e(runs: int, tokens: int, first_token_latency: float, tokens_per_second: float) -> Dict[str, float]:
+    """每次运行在后台线程中执行，事件循环中按批消费，测量客户端看到的延迟"""
+    model = StubChatModel(tokens=tokens, first_token_latency=first_token_latency, tokens_per_second=tokens_per_second)
+    plan = build_llm_workflow(model).compile()
+    model_seconds = first_token_latency + (tokens - 1) / tokens_per_second if tokens_per_second else first_token_latency
+    expected = "".join(model.response_tokens())
+
+    async def consume_run():
+        start = time.perf_counter()
+        run = plan.start_run({})
+        ttft = None
+        frames = 0
+        content = []
+        async for batch in run.astream_batches([EventType.MESSAGES, EventType.UPDATES]):
+            frames += 1
+            for event_data in batch:
+                if event_data.get(CONTENT_KEY):
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    content.append(event_data[CONTENT_KEY])
+        total = time.perf_counter() - start
+        run.wait()
+        assert "".join(content) == expected, "streamed content does not match the model response"
+        return ttft, total, frames
+
+    samples: List[tuple] = [asyncio.run(consume_run()) for _ in range(runs)]
+    ttfts = [sample[0] for sample in samples]
+    totals = [sample[1] for sample in samples]
+    return {
+        "ttft_p50": statistics.median(ttfts),
+        "ttft_max": max(ttfts),
+        "total_p50": statistics.median(totals),
+        "total_max": max(totals),
+        "overhead_p50": statistics.median(totals) - model_seconds,
+        "frames_p50": statistics.median(sample[2] for sample in samples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EventChannel and end-to-end streaming benchmark")
+    parser.add_argument("--events", type=int, default=50000, help="事件通道测试发送的分片数")
+    parser.add_argument("--runs", type=int, default=5, help="端到端测试的运行次数")
+    parser.add_argument("--tokens", type=int, default=256, help="模拟模型每次响应的 token 数")
+    parser.add_argument("--first-token-latency", type=float, default=0.05, help="模拟模型首字延迟（秒）")
+    parser.add_argument("--tokens-per-second", type=float, default=2000, help="模拟模型输出速率，0 表示不限速")
+    parser.add_argument("--verbose", action="store_true", help="保留 INFO 日志（默认只输出 WARNING 以上）")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        LoggerUtil.get_logger().setLevel(logging.WARNING)
+
+    channel = {
+        "coalesce": bench_channel(args.events, coalesce=True),
+        "no_coalesce": bench_channel(args.events, coalesce=False),
+    }
+    e2e = bench_e2e(args.runs, args.tokens, args.first_token_latency, args.tokens_per_second or None)
+    result = {
+        "benchmark": "streaming",
+        "events": args.events,
+        "runs": args.runs,
+        "tokens": args.tokens,
+        "seconds": {
+            "channel_coalesce": channel["coalesce"]["seconds"],
+            "channel_no_coalesce": channel["no_coalesce"]["seconds"],
+            "e2e_ttft_p50": e2e["ttft_p50"],
+            "e2e_total_p50": e2e["total_p50"],
+            "e2e_overhead_p50": e2e["overhead_p50"],
+        },
+        "rates": {
+            "channel_coalesce_events_per_second": channel["coalesce"]["events_per_second"],
+            "channel_no_coalesce_events_per_second": channel["no_coalesce"]["events_per_second"],
+            "emit_events_per_second": channel["no_coalesce"]["emit_events_per_second"],
+        },
+        "channel": channel,
+        "e2e": e2e,
+    }
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+运行全部基准测试并与基线对比
+
+依次运行 graph/scheduler/streaming/loops/memory 基准测试，合并为一个 JSON 文件。
+指定 --baseline 时逐项对比：seconds 下的指标越小越好，rates 下的指标越大越好，
+劣化超过 --tolerance 的指标记为回归，存在回归时以退出码 1 结束，可直接用于发布前检查。
+
+用法：
+    python benchmarks/run_all.py --output bench.json
+    python benchmarks/run_all.py --quick --output bench.json --baseline baseline.json --tolerance 0.3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from typing import Any, Dict, List
+
+import bench_graph
+import bench_loops
+import bench_memory
+import bench_scheduler
+import bench_streaming
+
+import vertex_flow
+
+BENCHMARKS = {
+    "graph": bench_graph,
+    "scheduler": bench_scheduler,
+    "streaming": bench_streaming,
+    "loops": bench_loops,
+    "memory": bench_memory,
+}
+
+# --quick 使用的规模，适合在 CI 中快速运行
+QUICK_ARGS = {
+    "graph": ["--vertices", "2000", "--repeat", "1"],
+    "scheduler": ["--vertices", "300", "--repeat", "1"],
+    "streaming": ["--events", "5000", "--runs", "2", "--tokens", "64", "--first-token-latency", "0.01"],
+    "loops": ["--executions", "50", "--iterations", "100", "--repeat", "1"],
+    "memory": ["--ops", "300", "--repeat", "1"],
+}
+
+
+def run_benchmarks(names: List[str], quick: bool = False) -> Dict[str, Any]:
+    results = {}
+    for name in names:
+        argv = list(QUICK_ARGS[name]) if quick else []
+        # 各基准测试的 main 会把结果写到标准输出，这里只保留返回值
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = BENCHMARKS[name].main(argv)
+        sys.stderr.write(f"{name}: done\n")
+    return {
+        "version": vertex_flow.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """返回劣化超过 tolerance 的指标，ratio 为劣化倍数（大于 1 表示变差）"""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for group, lower_is_better in (("seconds", True), ("rates", False)):
+            for metric, value in result.get(group, {}).items():
+                base_value = base.get(group, {}).get(metric)
+                if not base_value or not value:
+                    continue
+                ratio = value / base_value if lower_is_better else base_value / value
+                if ratio > 1 + tolerance:
+                    regressions.append(
+                        {
+                            "benchmark": name,
+                            "metric": f"{group}.{metric}",
+                            "baseline": base_value,
+                            "current": value,
+                            "ratio": round(ratio, 3),
+                        }
+                    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run all vertex_flow benchmarks")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只运行指定的基准测试")
+    parser.add_argument("--quick", action="store_true", help="使用较小的规模")
+    parser.add_argument("--output", help="结果 JSON 文件路径，默认写到标准输出")
+    parser.add_argument("--baseline", help="基线结果 JSON 文件路径")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的劣化比例，默认 0.25")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only or list(BENCHMARKS), quick=args.quick)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline"] = args.baseline
+        report["tolerance"] = args.tolerance
+        report["regressions"] = compare(report, baseline, args.tolerance)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    for regression in report.get("regressions", []):
+        sys.stderr.write(
+            f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+            f"{regression['baseline']:.6g} -> {regression['current']:.6g} (x{regression['ratio']})\n"
+        )
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
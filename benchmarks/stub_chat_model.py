@@ -0,0 +1,110 @@
+"""
+基准测试用的进程内 ChatModel
+
+不发起网络请求，按固定的首字延迟与 token 速率生成确定的响应，
+走与真实服务商相同的 ChatModel.chat / chat_stream 及 achat / achat_stream 处理路径（用量统计、取消检查、追踪）。
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from vertex_flow.workflow.chat import ChatModel
+
+
+class StubChatModel(ChatModel):
+    """确定性的模拟模型
+
+    Args:
+        tokens: 每次响应的 token 数
+        first_token_latency: 请求到首个 token 的延迟（秒）
+        tokens_per_second: 首个 token 之后的输出速率，None 表示不限速
+        token_text: 单个 token 的文本，第 i 个 token 为 f"{token_text}{i} "
+    """
+
+    def __init__(
+        self,
+        tokens: int = 64,
+        first_token_latency: float = 0.0,
+        tokens_per_second: Optional[float] = None,
+        token_text: str = "tok",
+        name: str = "stub-model",
+    ):
+        super().__init__(name=name, sk="stub", base_url="http://stub.invalid/v1", provider="stub")
+        self.tokens = tokens
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.token_text = token_text
+        self.requests = 0
+
+    def response_tokens(self) -> List[str]:
+        return [f"{self.token_text}{index} " for index in range(self.tokens)]
+
+    def _usage_namespace(self, messages) -> SimpleNamespace:
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=self.tokens, total_tokens=prompt_tokens + self.tokens
+        )
+
+    def _create_completion(self, messages, option: Optional[Dict[str, Any]] = None, stream: bool = False, tools=None):
+        # 与真实服务商一样应用取消与截止时间检查
+        self._apply_deadline({})
+        self.requests += 1
+        if stream:
+            return self._stream(messages)
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+        if self.tokens_per_second:
+            time.sleep(self.tokens / self.tokens_per_second)
+        message = SimpleNamespace(role="assistant", content="".join(self.response_tokens()), tool_calls=None)
+        choice = SimpleNamespace(index=0, message=message, finish_reason="stop")
+        return SimpleNamespace(choices=[choice], usage=self._usage_namespace(messages))
+
+    async def _acreate_completion(
+        self, messages, option: Optional[Dict[str, Any]] = None, stream: bool = False, tools=None
+    ):
+        self._apply_deadline({})
+        self.requests += 1
+        if stream:
+            return self._astream(messages)
+        if self.first_token_latency:
+            await asyncio.sleep(self.first_token_latency)
+        if self.tokens_per_second:
+            await asyncio.sleep(self.tokens / self.tokens_per_second)
+        message = SimpleNamespace(role="assistant", content="".join(self.response_tokens()), tool_calls=None)
+        choice = SimpleNamespace(index=0, message=message, finish_reason="stop")
+        return SimpleNamespace(choices=[choice], usage=self._usage_namespace(messages))
+
+    async def _astream(self, messages):
+        """_stream 的异步版本，等待期间不占用线程"""
+        if self.first_token_latency:
+            await asyncio.sleep(self.first_token_latency)
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        for index, token in enumerate(self.response_tokens()):
+            if interval and index:
+                deadline += interval
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            delta = SimpleNamespace(content=token, tool_calls=None)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+        yield SimpleNamespace(usage=self._usage_namespace(messages), choices=[])
+
+    def _stream(self, messages):
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        deadline = time.perf_counter()
+        for index, token in enumerate(self.response_tokens()):
+            if interval and index:
+                # 按绝对时间计算下一个 token 的发送时刻，避免 sleep 误差累积
+                deadline += interval
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            delta = SimpleNamespace(content=token, tool_calls=None)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+        yield SimpleNamespace(usage=self._usage_namespace(messages), choices=[])
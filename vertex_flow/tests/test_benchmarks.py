@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "benchmarks")
+)
+
+run_all = pytest.importorskip("run_all")
+from stub_chat_model import StubChatModel  # noqa: E402
+
+from vertex_flow.utils.logger import LoggerUtil  # noqa: E402
+
+
+@pytest.fixture
+def restore_log_levels():
+    """基准测试会调低日志级别，测试结束后恢复"""
+    loggers = [LoggerUtil.get_logger(), logging.getLogger()]
+    levels = [logger.level for logger in loggers]
+    yield
+    for logger, level in zip(loggers, levels):
+        logger.setLevel(level)
+
+
+class TestStubChatModel:
+    """测试基准测试用的模拟模型"""
+
+    def test_stream_is_deterministic_and_records_usage(self):
+        model = StubChatModel(tokens=3, token_text="t")
+        messages = [{"role": "user", "content": "hello world!"}]
+
+        assert list(model.chat_stream(messages)) == ["t0 ", "t1 ", "t2 "]
+        assert model.get_usage()["output_tokens"] == 3
+        assert model.chat(messages).message.content == "t0 t1 t2 "
+        assert model.requests == 2
+
+    def test_async_stream_matches_sync(self):
+        model = StubChatModel(tokens=3, token_text="t")
+        messages = [{"role": "user", "content": "hello world!"}]
+
+        async def run():
+            chunks = [chunk async for chunk in model.achat_stream(messages)]
+            choice = await model.achat(messages)
+            return chunks, choice
+
+        chunks, choice = asyncio.run(run())
+        assert chunks == ["t0 ", "t1 ", "t2 "]
+        assert choice.message.content == "t0 t1 t2 "
+        assert model.get_usage()["output_tokens"] == 3
+        assert model.requests == 2
+
+
+class TestBenchmarks:
+    """以最小规模运行全部基准测试，确保脚本与被测接口保持同步"""
+
+    def test_quick_run_and_baseline_comparison(self, monkeypatch, restore_log_levels):
+        monkeypatch.setattr(
+            run_all,
+            "QUICK_ARGS",
+            {
+                "graph": ["--vertices", "50", "--repeat", "1"],
+                "scheduler": ["--vertices", "30", "--repeat", "1"],
+                "streaming": ["--events", "200", "--runs", "1", "--tokens", "8", "--first-token-latency", "0"],
+                "loops": ["--executions", "2", "--iterations", "3", "--repeat", "1"],
+                "memory": ["--ops", "10", "--repeat", "1"],
+            },
+        )
+        report = run_all.run_benchmarks(list(run_all.BENCHMARKS), quick=True)
+
+        results = report["results"]
+        assert set(results) == set(run_all.BENCHMARKS)
+        assert set(results["scheduler"]["seconds"]) == {"topological", "ready_queue", "async"}
+        assert results["streaming"]["e2e"]["ttft_p50"] > 0
+        assert results["memory"]["rates"]["file.incr_rate"] > 0
+
+        assert run_all.compare(report, report, tolerance=0.0) == []
+        slower = {"results": {"loops": {"seconds": {"while_group": results["loops"]["seconds"]["while_group"] * 2}}}}
+        (regression,) = run_all.compare(slower, report, tolerance=0.5)
+        assert regression["metric"] == "seconds.while_group"
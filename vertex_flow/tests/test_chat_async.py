@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from vertex_flow.workflow import chat as chat_module
+from vertex_flow.workflow.chat import DeepSeek, Tongyi
+
+
+def _chunk(content=None, tool_calls=None, usage=None):
+    if content is None and tool_calls is None:
+        return SimpleNamespace(usage=usage, choices=[])
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(usage=usage, choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+
+class FakeCompletions:
+    """记录请求参数并返回预设响应的异步 completions 接口"""
+
+    def __init__(self, chunks=None, response=None):
+        self.chunks = chunks or []
+        self.response = response
+        self.calls = []
+
+    async def create(self, **params):
+        self.calls.append(params)
+        if params.get("stream"):
+            return self._stream()
+        return self.response
+
+    async def _stream(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+class FakeToolManager:
+    """记录工具调用所在线程的工具管理器"""
+
+    tool_caller = None
+
+    def __init__(self):
+        self.calls = []
+
+    def handle_tool_calls_complete(self, tool_calls, context, messages):
+        self.calls.append((tool_calls, threading.get_ident()))
+        messages.append({"role": "assistant", "content": "", "tool_calls": tool_calls})
+        return True
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(chat_module, "get_async_client", lambda *args: client)
+    return completions
+
+
+class TestAsyncChat:
+    """测试 ChatModel 的异步接口"""
+
+    def test_achat_returns_choice_and_records_usage(self, fake_client):
+        usage = SimpleNamespace(prompt_tokens=5, completion_tokens=2, total_tokens=7)
+        message = SimpleNamespace(role="assistant", content="hi", tool_calls=None)
+        fake_client.response = SimpleNamespace(
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")], usage=usage
+        )
+        model = DeepSeek(name="deepseek-chat", sk="sk")
+
+        choice = asyncio.run(model.achat([{"role": "user", "content": "hello"}], option={"temperature": 0.2}))
+
+        assert choice.message.content == "hi"
+        assert model.get_usage()["total_tokens"] == 7
+        (params,) = fake_client.calls
+        assert params["model"] == "deepseek-chat"
+        assert params["stream"] is False
+        assert params["temperature"] == 0.2
+
+    def test_achat_stream_yields_content_and_usage(self, fake_client):
+        usage = SimpleNamespace(prompt_tokens=5, completion_tokens=2, total_tokens=7)
+        fake_client.chunks = [_chunk("Hel"), _chunk("lo"), _chunk(usage=usage)]
+        model = DeepSeek(name="deepseek-chat", sk="sk")
+
+        async def consume():
+            return [chunk async for chunk in model.achat_stream([{"role": "user", "content": "hello"}])]
+
+        assert asyncio.run(consume()) == ["Hel", "lo"]
+        assert model.get_usage()["output_tokens"] == 2
+        assert fake_client.calls[0]["stream"] is True
+
+    def test_stream_tool_calls_run_off_event_loop(self, fake_client):
+        tool_call = {"id": "call_1", "type": "function", "function": {"name": "calc", "arguments": "{}"}}
+        fake_client.chunks = [_chunk(tool_calls=[tool_call])]
+        tool_manager = FakeToolManager()
+        model = DeepSeek(name="deepseek-chat", sk="sk")
+        model.tool_manager = tool_manager
+        messages = [{"role": "user", "content": "1+1"}]
+
+        async def consume():
+            chunks = [chunk async for chunk in model.achat_stream(messages, tools=[{"type": "function"}])]
+            return chunks, threading.get_ident()
+
+        chunks, loop_thread = asyncio.run(consume())
+
+        assert chunks == []
+        ((calls, tool_thread),) = tool_manager.calls
+        assert calls == [tool_call]
+        assert tool_thread != loop_thread
+        assert messages[-1]["tool_calls"] == [tool_call]
+
+    def test_tongyi_async_params_match_sync(self, fake_client):
+        fake_client.chunks = [_chunk("ok")]
+        model = Tongyi(name="qwen-max", sk="sk")
+        messages = [{"role": "user", "content": "hello"}]
+
+        async def consume():
+            return [chunk async for chunk in model.achat_stream(messages, option={"enable_search": True})]
+
+        assert asyncio.run(consume()) == ["ok"]
+        (params,) = fake_client.calls
+        assert params["stream_options"] == {"include_usage": True}
+        assert params["extra_body"]["extra_body"]["enable_search"] is True
+        assert "enable_search" not in params
+        assert params == model._build_api_params(messages, {"enable_search": True}, stream=True)
@@ -0,0 +1,291 @@
+import asyncio
+import threading
+import time
+
+from vertex_flow.workflow.constants import (
+    CONTENT_KEY,
+    MESSAGE_TYPE_END,
+    MESSAGE_TYPE_REGULAR,
+    TYPE_KEY,
+    VERTEX_ID_KEY,
+    WORKFLOW_COMPLETE,
+)
+from vertex_flow.workflow.event_channel import EventChannel, EventType
+
+
+class TestEventChannelThreading:
+    """测试跨线程发送事件与无轮询的事件流"""
+
+    def test_events_from_worker_thread_are_delivered_immediately(self):
+        channel = EventChannel()
+        latencies = []
+
+        def produce():
+            for index in range(20):
+                time.sleep(0.01)
+                channel.emit_event(EventType.MESSAGES, {"index": index, "sent": time.perf_counter()})
+            channel.emit_event(EventType.UPDATES, {"status": WORKFLOW_COMPLETE})
+
+        async def consume():
+            producer = threading.Thread(target=produce)
+            producer.start()
+            events = []
+            async for event in channel.astream([EventType.MESSAGES, EventType.UPDATES]):
+                if "sent" in event:
+                    latencies.append(time.perf_counter() - event["sent"])
+                events.append(event)
+            producer.join()
+            return events
+
+        events = asyncio.run(consume())
+
+        assert [event["index"] for event in events[:-1]] == list(range(20))
+        assert events[-1]["status"] == WORKFLOW_COMPLETE
+        # 原实现每个事件最多有 100ms 的轮询延迟
+        assert max(latencies) < 0.05
+
+    def test_merged_stream_keeps_emit_order(self):
+        channel = EventChannel()
+        channel.emit_event(EventType.VALUES, {"id": 1})
+        channel.emit_event(EventType.MESSAGES, {"id": 2})
+        channel.emit_event(EventType.VALUES, {"id": 3})
+        channel.emit_event(EventType.UPDATES, {"id": 4, "status": WORKFLOW_COMPLETE})
+
+        async def consume():
+            return [event async for event in channel.astream([EventType.MESSAGES, EventType.VALUES, EventType.UPDATES])]
+
+        assert [event["id"] for event in asyncio.run(consume())] == [1, 2, 3, 4]
+
+    def test_idle_stream_stops_after_wait_time(self):
+        channel = EventChannel(max_empty_duration=0.1)
+
+        async def consume():
+            return [event async for event in channel.astream(EventType.MESSAGES)]
+
+        start = time.monotonic()
+        assert asyncio.run(consume()) == []
+        # 没有收到结束事件时最多等待两倍的空事件持续时间
+        assert 0.15 < time.monotonic() - start < 1
+        assert channel._waiters == []
+
+    def test_burst_is_coalesced_into_one_wakeup(self):
+        channel = EventChannel()
+        wakeups = []
+
+        async def main():
+            waiter = channel._add_waiter([EventType.MESSAGES])
+            original = waiter.notify
+            waiter.notify = lambda: wakeups.append(1) or original()
+
+            thread = threading.Thread(
+                target=lambda: [channel.emit_event(EventType.MESSAGES, {"index": i}) for i in range(100)]
+            )
+            thread.start()
+            thread.join()
+            await asyncio.wait_for(waiter.event.wait(), timeout=1)
+            channel._arm(waiter)
+            drained = channel._drain([EventType.MESSAGES])
+            channel._remove_waiter(waiter)
+            return drained
+
+        drained = asyncio.run(main())
+
+        assert len(drained) == 100
+        assert len(wakeups) == 1
+
+    def test_get_event_from_queue(self):
+        channel = EventChannel(queue_timeout=0.5)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, channel.emit_event, EventType.VALUES, {"value": 1})
+            first = await channel.get_event_from_queue(EventType.VALUES)
+            channel.queue_timeout = 0.05
+            second = await channel.get_event_from_queue(EventType.VALUES)
+            return first, second
+
+        assert asyncio.run(main()) == ({"value": 1}, None)
+
+
+class TestEventChannelCoalescing:
+    """测试流式分片合并与有界队列背压"""
+
+    @staticmethod
+    def _chunk(vertex_id, content):
+        return {VERTEX_ID_KEY: vertex_id, CONTENT_KEY: content, TYPE_KEY: MESSAGE_TYPE_REGULAR}
+
+    def test_consecutive_chunks_from_same_vertex_are_merged(self):
+        channel = EventChannel(coalesce_max_chars=8)
+        for token in ["ab", "cd", "ef"]:
+            channel.emit_event(EventType.MESSAGES, self._chunk("llm", token))
+        channel.emit_event(EventType.MESSAGES, self._chunk("other", "x"))
+        channel.emit_event(EventType.MESSAGES, self._chunk("llm", "gh"))
+        channel.emit_event(EventType.MESSAGES, self._chunk("llm", "ijklmnop"))
+        channel.emit_event(EventType.MESSAGES, {VERTEX_ID_KEY: "llm", CONTENT_KEY: "", TYPE_KEY: MESSAGE_TYPE_END})
+
+        drained = channel._drain([EventType.MESSAGES])
+
+        assert [(event[VERTEX_ID_KEY], event[CONTENT_KEY]) for event in drained] == [
+            ("llm", "abcdef"),
+            ("other", "x"),
+            ("llm", "gh"),
+            ("llm", "ijklmnop"),
+            ("llm", ""),
+        ]
+
+    def test_chunks_are_not_merged_across_other_event_types(self):
+        channel = EventChannel()
+        channel.emit_event(EventType.MESSAGES, self._chunk("llm", "a"))
+        channel.emit_event(EventType.VALUES, {"id": 1})
+        channel.emit_event(EventType.MESSAGES, self._chunk("llm", "b"))
+
+        drained = channel._drain([EventType.MESSAGES, EventType.VALUES])
+
+        assert drained == [self._chunk("llm", "a"), {"id": 1}, self._chunk("llm", "b")]
+
+    def test_stream_batches_keep_first_token_latency(self):
+        channel = EventChannel(coalesce_window=0.05)
+
+        def produce():
+            for index in range(50):
+                channel.emit_event(EventType.MESSAGES, self._chunk("llm", str(index % 10)))
+                time.sleep(0.002)
+            channel.emit_event(EventType.UPDATES, {"status": WORKFLOW_COMPLETE})
+
+        async def consume():
+            producer = threading.Thread(target=produce)
+            start = time.perf_counter()
+            producer.start()
+            batches = []
+            first_latency = None
+            async for batch in channel.astream_batches([EventType.MESSAGES, EventType.UPDATES]):
+                if first_latency is None:
+                    first_latency = time.perf_counter() - start
+                batches.append(batch)
+            producer.join()
+            return batches, first_latency
+
+        batches, first_latency = asyncio.run(consume())
+        events = [event for batch in batches for event in batch]
+
+        assert "".join(event[CONTENT_KEY] for event in events[:-1]) == "0123456789" * 5
+        assert events[-1]["status"] == WORKFLOW_COMPLETE
+        assert len(events) < 20
+        assert first_latency < 0.04
+
+    def test_full_queue_blocks_producer_until_consumed(self):
+        channel = EventChannel(max_queue_size=2, put_timeout=5, coalesce=False)
+        emitted = []
+
+        def produce():
+            for index in range(5):
+                channel.emit_event(EventType.VALUES, {"index": index})
+                emitted.append(index)
+            channel.emit_event(EventType.UPDATES, {"status": WORKFLOW_COMPLETE})
+
+        async def consume():
+            events = []
+            producer = threading.Thread(target=produce)
+            async for event in channel.astream([EventType.VALUES, EventType.UPDATES]):
+                if not events:
+                    producer.start()
+                    await asyncio.sleep(0.05)
+                    # 队列已满，生产者被阻塞而不是丢弃事件
+                    assert len(emitted) <= 3
+                events.append(event)
+            producer.join()
+            return events
+
+        channel.emit_event(EventType.VALUES, {"index": "first"})
+        events = asyncio.run(consume())
+
+        assert [event.get("index") for event in events[:-1]] == ["first", 0, 1, 2, 3, 4]
+        assert channel.dropped_events == 0
+
+    def test_full_queue_without_consumer_drops_oldest(self):
+        channel = EventChannel(max_queue_size=3)
+        for index in range(5):
+            channel.emit_event(EventType.VALUES, {"index": index})
+
+        assert [event["index"] for event in channel._drain([EventType.VALUES])] == [2, 3, 4]
+        assert channel.dropped_events == 2
+
+
+class TestEventChannelReplay:
+    """测试多订阅者事件日志与断线续读"""
+
+    def test_subscribers_read_independently_of_astream(self):
+        channel = EventChannel()
+
+        def produce():
+            for index in range(10):
+                time.sleep(0.002)
+                channel.emit_event(EventType.VALUES, {"index": index})
+            channel.emit_event(EventType.UPDATES, {"status": WORKFLOW_COMPLETE})
+
+        async def replay():
+            return [event async for event in channel.areplay([EventType.VALUES, EventType.UPDATES])]
+
+        async def consume():
+            producer = threading.Thread(target=produce)
+            first = asyncio.ensure_future(replay())
+            second = asyncio.ensure_future(replay())
+            await asyncio.sleep(0)
+            producer.start()
+            streamed = [event async for event in channel.astream([EventType.VALUES, EventType.UPDATES])]
+            producer.join()
+            return streamed, await first, await second
+
+        streamed, first, second = asyncio.run(consume())
+
+        assert [event.get("index") for event in streamed] == list(range(10)) + [None]
+        assert first == second
+        assert [event.get("index") for _, event in first] == list(range(10)) + [None]
+        assert [event_id for event_id, _ in first] == list(range(11))
+        assert channel._waiters == []
+
+    def test_resume_after_last_event_id(self):
+        channel = EventChannel()
+        for index in range(5):
+            channel.emit_event(EventType.MESSAGES, {VERTEX_ID_KEY: "llm", CONTENT_KEY: str(index)})
+        channel.emit_event(EventType.UPDATES, {"status": WORKFLOW_COMPLETE})
+
+        async def replay(last_event_id):
+            return [event async for event in channel.areplay(EventType.MESSAGES, last_event_id)]
+
+        resumed = asyncio.run(replay(2))
+
+        # 日志保存原始分片，不受队列合并影响
+        assert [(event_id, event[CONTENT_KEY]) for event_id, event in resumed] == [(3, "3"), (4, "4")]
+
+    def test_evicted_cursor_resumes_from_oldest_retained_event(self):
+        channel = EventChannel(history_size=3)
+        for index in range(6):
+            channel.emit_event(EventType.VALUES, {"index": index})
+        channel.emit_event(EventType.UPDATES, {"status": WORKFLOW_COMPLETE})
+
+        async def replay():
+            return [event async for event in channel.areplay(EventType.VALUES, 0)]
+
+        assert [event["index"] for _, event in asyncio.run(replay())] == [4, 5]
+        assert channel.event_log.first_seq == 4
+
+    def test_replay_subscriber_does_not_apply_backpressure(self):
+        channel = EventChannel(max_queue_size=2, put_timeout=5)
+
+        async def main():
+            replay = channel.areplay(EventType.VALUES)
+            pending = asyncio.ensure_future(replay.__anext__())
+            await asyncio.sleep(0)
+            start = time.monotonic()
+            await asyncio.to_thread(lambda: [channel.emit_event(EventType.VALUES, {"index": i}) for i in range(4)])
+            elapsed = time.monotonic() - start
+            first = await pending
+            await replay.aclose()
+            return elapsed, first
+
+        elapsed, first = asyncio.run(main())
+
+        assert elapsed < 1
+        assert first == (0, {"index": 0})
+        assert channel.dropped_events == 2
@@ -0,0 +1,171 @@
+import asyncio
+import gc
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vertex_flow.workflow import http_clients
+from vertex_flow.workflow.chat import DeepSeek, Ollama
+from vertex_flow.workflow.http_clients import (
+    close_http_clients,
+    configure_http_clients,
+    get_async_client,
+    get_client,
+    http_client_stats,
+)
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    """返回固定 chat completion 的 keep-alive 服务端"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(
+            {
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "test-model",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "pong"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    close_http_clients()
+    yield
+    configure_http_clients(
+        max_connections=http_clients.DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections=http_clients.DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=http_clients.DEFAULT_KEEPALIVE_EXPIRY,
+        http2=True,
+    )
+    close_http_clients()
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+class TestSharedClients:
+    """测试共享客户端的注册表"""
+
+    def test_models_share_client_by_key(self):
+        first = DeepSeek(name="deepseek-chat", sk="sk-1")
+        second = DeepSeek(name="deepseek-reasoner", sk="sk-1")
+        other_key = DeepSeek(name="deepseek-chat", sk="sk-2")
+
+        assert first.client is second.client
+        assert first.client is not other_key.client
+
+    def test_timeout_profiles(self):
+        default = get_client("https://a.invalid/v1", "sk")
+        interactive = get_client("https://a.invalid/v1", "sk", timeout_profile="interactive")
+
+        assert default is not interactive
+        assert interactive.timeout == http_clients.TIMEOUT_PROFILES["interactive"]
+        with pytest.raises(ValueError):
+            get_client("https://a.invalid/v1", "sk", timeout_profile="unknown")
+
+    def test_http2_only_for_https_when_available(self, monkeypatch):
+        monkeypatch.setattr(http_clients, "HTTP2_AVAILABLE", True)
+
+        assert http_clients._client_key("https://a.invalid/v1", "sk", "default", True)[3] is True
+        assert http_clients._client_key("http://localhost:11434/v1", "sk", "default", True)[3] is False
+        assert http_clients._client_key("https://a.invalid/v1", "sk", "default", False)[3] is False
+        assert Ollama.supports_http2 is False
+
+        monkeypatch.setattr(http_clients, "HTTP2_AVAILABLE", False)
+        assert http_clients._client_key("https://a.invalid/v1", "sk", "default", True)[3] is False
+
+    def test_configure_applies_to_new_clients(self):
+        before = get_client("https://a.invalid/v1", "sk")
+        configure_http_clients(max_connections=8, max_keepalive_connections=4)
+        after = get_client("https://a.invalid/v1", "sk")
+
+        assert before is not after
+        assert http_clients._limits.max_connections == 8
+        assert http_clients._limits.keepalive_expiry == http_clients.DEFAULT_KEEPALIVE_EXPIRY
+
+    def test_configure_closes_retired_clients_once_released(self):
+        client = get_client("https://a.invalid/v1", "sk")
+        http_client = client._client
+        configure_http_clients(max_connections=8)
+
+        # 仍被持有（如进行中的请求）的客户端不会被关闭
+        assert not http_client.is_closed
+        del client
+        gc.collect()
+        assert http_client.is_closed
+
+    def test_connection_reused_across_models(self, server_url):
+        messages = [{"role": "user", "content": "ping"}]
+        for name in ["model-a", "model-b", "model-a"]:
+            model = DeepSeek(name=name, sk="sk")
+            model._base_url = server_url
+            assert model.chat(messages).message.content == "pong"
+
+        (stats,) = http_client_stats()
+        assert stats["base_url"] == server_url
+        assert stats["requests"] == 3
+        assert stats["connections"] == 1
+        assert stats["idle_connections"] == 1
+        assert "sk" not in stats.values()
+
+
+class TestSharedAsyncClients:
+    """测试异步客户端按事件循环共享"""
+
+    def test_client_shared_within_loop(self):
+        async def clients():
+            first = get_async_client("http://a.invalid/v1", "sk")
+            same = get_async_client("http://a.invalid/v1", "sk")
+            other = get_async_client("http://b.invalid/v1", "sk")
+            return first, same, other
+
+        first, same, other = asyncio.run(clients())
+        assert first is same
+        assert first is not other
+
+    def test_client_not_shared_across_loops(self):
+        async def client():
+            return get_async_client("http://a.invalid/v1", "sk")
+
+        assert asyncio.run(client()) is not asyncio.run(client())
+
+    def test_requires_running_loop(self):
+        with pytest.raises(RuntimeError):
+            get_async_client("http://a.invalid/v1", "sk")
+
+    def test_async_requests_counted(self, server_url):
+        model = DeepSeek(name="model-a", sk="sk")
+        model._base_url = server_url
+
+        async def run():
+            choices = await asyncio.gather(*[model.achat([{"role": "user", "content": "ping"}]) for _ in range(3)])
+            return choices, http_client_stats()
+
+        choices, stats = asyncio.run(run())
+        assert [choice.message.content for choice in choices] == ["pong"] * 3
+        (async_stats,) = [item for item in stats if item["async"]]
+        assert async_stats["requests"] == 3
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from vertex_flow.memory import FileMemory
+from vertex_flow.workflow.chat import ChatModel
+from vertex_flow.workflow.constants import ENABLE_STREAM, SYSTEM, USER
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.llm_cache import request_hash
+from vertex_flow.workflow.vertex.llm_vertex import LLMVertex
+from vertex_flow.workflow.vertex_cache import InProcessVertexCache, MemoryVertexCache
+
+
+def _completion(content):
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "cached-model",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+        }
+    )
+
+
+def _chunk(delta=None, usage=None):
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "cached-model",
+            "choices": [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": None}],
+            "usage": usage,
+        }
+    )
+
+
+TOOL_CALL = {"index": 0, "id": "call_1", "type": "function", "function": {"name": "calc", "arguments": "{}"}}
+
+
+class CountingModel(ChatModel):
+    """返回 openai 类型响应并记录请求次数的模型"""
+
+    def __init__(self, chunks=None, fail=False):
+        super().__init__(name="cached-model", sk="sk", base_url="https://cache.invalid/v1", provider="test")
+        self.chunks = chunks or [
+            _chunk({"role": "assistant", "reasoning_content": "think "}),
+            _chunk({"content": "Hello"}),
+            _chunk({"content": " World"}),
+            _chunk(usage={"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}),
+        ]
+        self.fail = fail
+        self.requests = 0
+
+    def _create_completion(self, messages, option=None, stream=False, tools=None):
+        self.requests += 1
+        if stream:
+            return self._stream()
+        return _completion(f"answer {self.requests}")
+
+    def _stream(self):
+        for chunk in self.chunks:
+            yield chunk
+        if self.fail:
+            raise RuntimeError("connection reset")
+
+    async def _acreate_completion(self, messages, option=None, stream=False, tools=None):
+        completion = self._create_completion(messages, option, stream, tools)
+        if not stream:
+            return completion
+        return self._astream(completion)
+
+    @staticmethod
+    async def _astream(chunks):
+        for chunk in chunks:
+            yield chunk
+
+
+class FakeToolManager:
+    tool_caller = None
+
+    def __init__(self):
+        self.calls = 0
+
+    def handle_tool_calls_complete(self, tool_calls, context, messages):
+        self.calls += 1
+        messages.append({"role": "assistant", "content": "", "tool_calls": tool_calls})
+        return True
+
+
+def _messages():
+    return [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+
+class TestRequestHash:
+    def test_option_order_and_stream_options_ignored(self):
+        model = CountingModel()
+        first = request_hash(model, _messages(), {"temperature": 0.1, "top_p": 1.0})
+        second = request_hash(model, _messages(), {"top_p": 1.0, "temperature": 0.1, "timeout": 5})
+
+        assert first == second
+        assert first != request_hash(model, _messages(), {"temperature": 0.2, "top_p": 1.0})
+        assert first != request_hash(model, _messages(), {"temperature": 0.1, "top_p": 1.0}, stream=True)
+        assert first != request_hash(model, _messages(), {"temperature": 0.1, "top_p": 1.0}, tools=[{"a": 1}])
+
+
+class TestResponseCache:
+    def test_disabled_by_default(self):
+        model = CountingModel()
+        model.chat(_messages())
+        model.chat(_messages())
+        assert model.requests == 2
+
+    def test_chat_hit_returns_stored_completion(self):
+        model = CountingModel()
+        model.response_cache = InProcessVertexCache()
+
+        first = model.chat(_messages(), option={"temperature": 0})
+        second = model.chat(_messages(), option={"temperature": 0})
+        other = model.chat(_messages(), option={"temperature": 1})
+
+        assert first.message.content == second.message.content == "answer 1"
+        assert other.message.content == "answer 2"
+        assert model.requests == 2
+        assert model.get_usage()["total_tokens"] == 5
+        assert model.response_cache.stats()["hits"] == 1
+
+    def test_stream_replays_chunks(self):
+        model = CountingModel()
+        model.response_cache = InProcessVertexCache()
+
+        live = list(model.chat_stream(_messages()))
+        replayed = list(model.chat_stream(_messages()))
+
+        assert live == replayed == ["think ", "Hello", " World"]
+        assert model.requests == 1
+        assert model.get_usage()["output_tokens"] == 2
+
+    def test_stream_replay_runs_tool_calls(self):
+        model = CountingModel(chunks=[_chunk({"tool_calls": [TOOL_CALL]})])
+        model.tool_manager = FakeToolManager()
+        model.response_cache = InProcessVertexCache()
+
+        for _ in range(2):
+            messages = _messages()
+            list(model.chat_stream(messages, tools=[{"type": "function"}]))
+            assert messages[-1]["tool_calls"][0].id == "call_1"
+
+        assert model.requests == 1
+        assert model.tool_manager.calls == 2
+
+    def test_incomplete_stream_not_cached(self):
+        model = CountingModel()
+        model.response_cache = InProcessVertexCache()
+
+        stream = model.chat_stream(_messages())
+        next(stream)
+        stream.close()
+        failing = CountingModel(fail=True)
+        failing.response_cache = model.response_cache
+        with pytest.raises(RuntimeError):
+            list(failing.chat_stream(_messages()))
+
+        assert len(model.response_cache) == 0
+        assert list(model.chat_stream(_messages())) == ["think ", "Hello", " World"]
+        assert len(model.response_cache) == 1
+
+    def test_async_shares_entries_with_sync(self):
+        model = CountingModel()
+        model.response_cache = InProcessVertexCache()
+        model.chat(_messages())
+        list(model.chat_stream(_messages()))
+
+        async def run():
+            choice = await model.achat(_messages())
+            chunks = [chunk async for chunk in model.achat_stream(_messages())]
+            return choice, chunks
+
+        choice, chunks = asyncio.run(run())
+        assert choice.message.content == "answer 1"
+        assert chunks == ["think ", "Hello", " World"]
+        assert model.requests == 2
+
+    def test_file_backend_shared_between_models(self, tmp_path):
+        writer = CountingModel()
+        writer.response_cache = MemoryVertexCache(FileMemory(storage_dir=str(tmp_path)), namespace="llm")
+        reader = CountingModel()
+        reader.response_cache = MemoryVertexCache(FileMemory(storage_dir=str(tmp_path)), namespace="llm")
+
+        list(writer.chat_stream(_messages()))
+        assert list(reader.chat_stream(_messages())) == ["think ", "Hello", " World"]
+        assert reader.requests == 0
+
+    def test_llm_vertex_stream_output_matches_live_call(self):
+        model = CountingModel()
+        model.response_cache = InProcessVertexCache()
+
+        def run():
+            vertex = LLMVertex(id="llm", params={"model": model, SYSTEM: "sys", USER: ["hi"], ENABLE_STREAM: True})
+            return vertex.chat({}, context=WorkflowContext())
+
+        assert run() == run()
+        assert model.requests == 1
@@ -0,0 +1,192 @@
+import numpy as np
+import pytest
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from vertex_flow.workflow.chat import ChatModel
+from vertex_flow.workflow.llm_cache import SemanticResponseCache, final_user_text
+from vertex_flow.workflow.vertex.embedding_providers import TextEmbeddingProvider
+from vertex_flow.workflow.vertex_cache import InProcessVertexCache
+
+VECTORS = {
+    "how do i reset my password?": [1.0, 0.0, 0.0],
+    "how can i reset the password": [0.98, 0.15, 0.0],
+    "what is the refund policy?": [0.0, 1.0, 0.0],
+    "password reset vs account recovery": [0.7, 0.0, 0.7],
+}
+
+
+class DictEmbedding(TextEmbeddingProvider):
+    """按预设文本返回向量的嵌入服务"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embedding(self, text):
+        self.calls += 1
+        return VECTORS.get(text.lower())
+
+
+class MemoryVectorEngine:
+    """与 LocalVectorEngine 接口相同的内存向量索引"""
+
+    def __init__(self):
+        self.docs = []
+
+    def insert(self, docs, index_name=None):
+        self.docs.extend(docs)
+
+    def search(self, query, index_name=None, include_vector=False, top_k=3, filter=None):
+        scored = [
+            {"id": doc["id"], "content": doc["content"], "score": float(np.dot(doc["vector"], query))}
+            for doc in self.docs
+        ]
+        return sorted(scored, key=lambda result: result["score"], reverse=True)[:top_k]
+
+
+class CountingModel(ChatModel):
+    def __init__(self):
+        super().__init__(name="slow-reasoner", sk="sk", base_url="https://semantic.invalid/v1", provider="test")
+        self.requests = 0
+
+    def _create_completion(self, messages, option=None, stream=False, tools=None):
+        self.requests += 1
+        content = f"answer {self.requests}"
+        if stream:
+            return iter(
+                [
+                    ChatCompletionChunk.model_validate(
+                        {
+                            "id": "c",
+                            "object": "chat.completion.chunk",
+                            "created": 0,
+                            "model": self.name,
+                            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+                        }
+                    )
+                ]
+            )
+        return ChatCompletion.model_validate(
+            {
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": self.name,
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ],
+            }
+        )
+
+
+def _messages(question, system="You are a support bot."):
+    return [{"role": "system", "content": system}, {"role": "user", "content": question}]
+
+
+@pytest.fixture
+def model():
+    model = CountingModel()
+    model.semantic_cache = SemanticResponseCache(DictEmbedding(), threshold=0.95, vector_engine=MemoryVectorEngine())
+    return model
+
+
+class TestSemanticCache:
+    def test_paraphrase_hits(self, model):
+        first = model.chat(_messages("How do I reset my password?"))
+        paraphrase = model.chat(_messages("How can I reset the password"))
+        unrelated = model.chat(_messages("What is the refund policy?"))
+
+        assert first.message.content == paraphrase.message.content == "answer 1"
+        assert unrelated.message.content == "answer 2"
+        assert model.requests == 2
+        assert model.semantic_cache.stats() == {"hits": 1, "misses": 2, "entries": 2, "evictions": 0}
+
+    def test_below_threshold_misses(self, model):
+        model.chat(_messages("How do I reset my password?"))
+        model.chat(_messages("Password reset vs account recovery"))
+        assert model.requests == 2
+
+    def test_system_prompt_and_tools_must_match(self, model):
+        model.chat(_messages("How do I reset my password?"))
+        model.chat(_messages("How can I reset the password", system="You are a pirate."))
+        model.chat(_messages("How can I reset the password"), tools=[{"type": "function", "function": {"name": "a"}}])
+        assert model.requests == 3
+
+    def test_stream_hit_replays_chunks(self, model):
+        assert list(model.chat_stream(_messages("How do I reset my password?"))) == ["answer 1"]
+        assert list(model.chat_stream(_messages("How can I reset the password"))) == ["answer 1"]
+        assert model.requests == 1
+
+    def test_embedding_failure_bypasses_cache(self, model):
+        model.chat(_messages("unknown question"))
+        model.chat(_messages("unknown question"))
+        assert model.requests == 2
+        assert model.semantic_cache._engine.docs == []
+
+    def test_hit_populates_exact_cache(self, model):
+        model.response_cache = InProcessVertexCache()
+        model.chat(_messages("How do I reset my password?"))
+        model.chat(_messages("How can I reset the password"))
+        embedding_calls = model.semantic_cache.embedding_provider.calls
+
+        model.chat(_messages("How can I reset the password"))
+        assert model.semantic_cache.embedding_provider.calls == embedding_calls
+        assert model.requests == 1
+
+    def test_final_user_text(self):
+        assert final_user_text(_messages("  hi ")) == "hi"
+        assert final_user_text([{"role": "assistant", "content": "hi"}]) is None
+        assert final_user_text([{"role": "user", "content": [{"type": "text", "text": "hi"}]}]) == "hi"
+        image = {"type": "image_url", "image_url": {"url": "http://x/a.png"}}
+        assert final_user_text([{"role": "user", "content": [{"type": "text", "text": "hi"}, image]}]) is None
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError):
+            SemanticResponseCache(DictEmbedding(), threshold=0)
+
+    def test_default_index_is_not_persisted(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        model = CountingModel()
+        model.semantic_cache = SemanticResponseCache(DictEmbedding(), threshold=0.95)
+        model.chat(_messages("How do I reset my password?"))
+        model.chat(_messages("How can I reset the password"))
+
+        assert model.requests == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_expired_entries_miss(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("vertex_flow.workflow.llm_cache.time.time", lambda: now[0])
+        model = CountingModel()
+        model.semantic_cache = SemanticResponseCache(DictEmbedding(), threshold=0.95, ttl_sec=60)
+        model.chat(_messages("How do I reset my password?"))
+        now[0] += 61
+        assert model.chat(_messages("How can I reset the password")).message.content == "answer 2"
+
+        model.chat(_messages("What is the refund policy?"))
+        assert model.semantic_cache.stats()["entries"] == 2
+        assert model.semantic_cache.stats()["evictions"] == 1
+
+    def test_max_entries_evicts_oldest(self):
+        model = CountingModel()
+        model.semantic_cache = SemanticResponseCache(DictEmbedding(), threshold=0.95, max_entries=1)
+        model.chat(_messages("How do I reset my password?"))
+        model.chat(_messages("What is the refund policy?"))
+        model.chat(_messages("How can I reset the password"))
+
+        assert model.requests == 3
+        assert model.semantic_cache.stats()["evictions"] == 2
+        assert model.semantic_cache.stats()["entries"] == 1
+
+    def test_local_vector_engine_persists(self, tmp_path):
+        pytest.importorskip("faiss")
+        writer = CountingModel()
+        writer.semantic_cache = SemanticResponseCache(DictEmbedding(), threshold=0.95, persist_dir=str(tmp_path))
+        writer.chat(_messages("How do I reset my password?"))
+        # 索引按批保存，未达到 save_every 时不写入磁盘
+        assert list(tmp_path.iterdir()) == []
+        writer.semantic_cache.flush()
+
+        reader = CountingModel()
+        reader.semantic_cache = SemanticResponseCache(DictEmbedding(), threshold=0.95, persist_dir=str(tmp_path))
+        assert reader.chat(_messages("How can I reset the password")).message.content == "answer 1"
+        assert reader.requests == 0
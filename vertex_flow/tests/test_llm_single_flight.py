@@ -0,0 +1,260 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletion
+
+from vertex_flow.workflow.cancellation import CancellationToken, DeadlineExceededError, current_cancellation
+from vertex_flow.workflow.chat import ChatModel
+from vertex_flow.workflow.single_flight import SingleFlight
+
+
+def _chunk(content):
+    delta = SimpleNamespace(content=content, tool_calls=None)
+    return SimpleNamespace(usage=None, choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+
+class GatedModel(ChatModel):
+    """上游调用可以被测试控制的模型，upstream 记录所有实例的上游调用"""
+
+    upstream = []
+
+    def __init__(self, tokens=("a", "b", "c")):
+        super().__init__(name="gated", sk="sk", base_url="https://flight.invalid/v1", provider="test")
+        self.tokens = tokens
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+        self.closed = False
+        self.upstream_tokens = []
+
+    def _create_completion(self, messages, option=None, stream=False, tools=None):
+        self.upstream.append(messages[-1]["content"])
+        self.upstream_tokens.append(current_cancellation())
+        if stream:
+            return self._stream()
+        return self._completion(messages)
+
+    def _completion(self, messages):
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("provider unavailable")
+        return ChatCompletion.model_validate(
+            {
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": self.name,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"answer to {messages[-1]['content']}"},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        )
+
+    def _stream(self):
+        try:
+            for token in self.tokens:
+                yield _chunk(token)
+        finally:
+            self.closed = True
+
+    async def _acreate_completion(self, messages, option=None, stream=False, tools=None):
+        self.upstream.append(messages[-1]["content"])
+        self.upstream_tokens.append(current_cancellation())
+        await asyncio.sleep(0.01)
+        if not stream:
+            return self._completion(messages)
+        return self._astream()
+
+    async def _astream(self):
+        for token in self.tokens:
+            await asyncio.sleep(0.01)
+            yield _chunk(token)
+
+
+@pytest.fixture
+def model():
+    GatedModel.upstream = []
+    model = GatedModel()
+    model.single_flight = SingleFlight()
+    return model
+
+
+def _messages(question="hi"):
+    return [{"role": "user", "content": question}]
+
+
+def _wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("condition not reached")
+
+
+class TestSingleFlightChat:
+    def test_concurrent_identical_requests_share_one_call(self, model):
+        model.release.clear()
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(model.chat, _messages()) for _ in range(5)]
+            _wait_for(lambda: model.single_flight.coalesced_calls == 4)
+            model.release.set()
+            choices = [future.result() for future in futures]
+
+        assert GatedModel.upstream == ["hi"]
+        assert {choice.message.content for choice in choices} == {"answer to hi"}
+        assert len({id(choice) for choice in choices}) == 5
+        assert model.single_flight.stats() == {"upstream_calls": 1, "coalesced_calls": 4, "in_flight": 0}
+
+    def test_distinct_prompts_not_coalesced(self, model):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda question: model.chat(_messages(question)), ["a", "b"]))
+        assert sorted(GatedModel.upstream) == ["a", "b"]
+
+    def test_error_shared_and_next_request_retries(self, model):
+        model.release.clear()
+        model.fail = True
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(model.chat, _messages()) for _ in range(3)]
+            _wait_for(lambda: model.single_flight.coalesced_calls == 2)
+            model.release.set()
+            for future in futures:
+                with pytest.raises(RuntimeError):
+                    future.result()
+
+        model.fail = False
+        assert model.chat(_messages()).message.content == "answer to hi"
+        assert GatedModel.upstream == ["hi", "hi"]
+
+    def test_shared_across_model_instances(self, model):
+        other = GatedModel()
+        other.single_flight = model.single_flight
+        model.release.clear()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(model.chat, _messages())
+            _wait_for(lambda: model.single_flight.upstream_calls == 1)
+            second = executor.submit(other.chat, _messages())
+            _wait_for(lambda: model.single_flight.coalesced_calls == 1)
+            model.release.set()
+            assert first.result().message.content == second.result().message.content
+
+        assert GatedModel.upstream == ["hi"]
+
+    def test_leader_deadline_does_not_reach_followers(self, model):
+        model.release.clear()
+
+        def leader():
+            with CancellationToken(timeout=0.1).activate():
+                return model.chat(_messages())
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(leader)
+            _wait_for(lambda: model.single_flight.upstream_calls == 1)
+            second = executor.submit(model.chat, _messages())
+            with pytest.raises(DeadlineExceededError):
+                first.result()
+            model.release.set()
+            assert second.result().message.content == "answer to hi"
+
+        assert GatedModel.upstream == ["hi"]
+        assert model.upstream_tokens == [None]
+
+    def test_follower_cancellation_only_stops_follower(self, model):
+        model.release.clear()
+        token = CancellationToken()
+
+        def follower():
+            with token.activate():
+                return model.chat(_messages())
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(model.chat, _messages())
+            _wait_for(lambda: model.single_flight.upstream_calls == 1)
+            second = executor.submit(follower)
+            _wait_for(lambda: model.single_flight.coalesced_calls == 1)
+            token.cancel()
+            with pytest.raises(Exception, match="cancelled"):
+                second.result()
+            model.release.set()
+            assert first.result().message.content == "answer to hi"
+
+
+class TestSingleFlightStream:
+    def test_late_subscriber_gets_buffered_then_live_chunks(self, model):
+        leader = model.chat_stream(_messages())
+        assert next(leader) == "a"
+        follower = model.chat_stream(_messages())
+
+        assert next(follower) == "a"
+        assert next(follower) == "b"
+        assert next(leader) == "b"
+        assert list(follower) == ["c"]
+        assert list(leader) == ["c"]
+        assert GatedModel.upstream == ["hi"]
+        assert model.single_flight.stats()["in_flight"] == 0
+
+    def test_leader_closing_does_not_stop_follower(self, model):
+        leader = model.chat_stream(_messages())
+        follower = model.chat_stream(_messages())
+        assert next(leader) == "a"
+        assert next(follower) == "a"
+        leader.close()
+
+        assert list(follower) == ["b", "c"]
+        assert GatedModel.upstream == ["hi"]
+
+    def test_all_subscribers_closing_closes_upstream(self, model):
+        stream = model.chat_stream(_messages())
+        assert next(stream) == "a"
+        stream.close()
+
+        assert model.closed
+        assert model.single_flight.stats()["in_flight"] == 0
+        assert list(model.chat_stream(_messages())) == ["a", "b", "c"]
+        assert GatedModel.upstream == ["hi", "hi"]
+
+    def test_upstream_runs_without_subscriber_deadline(self, model):
+        with CancellationToken(timeout=60).activate():
+            assert list(model.chat_stream(_messages())) == ["a", "b", "c"]
+        assert model.upstream_tokens == [None]
+
+
+class TestSingleFlightAsync:
+    def test_achat_coalesced(self, model):
+        async def run():
+            return await asyncio.gather(*[model.achat(_messages()) for _ in range(4)])
+
+        choices = asyncio.run(run())
+        assert [choice.message.content for choice in choices] == ["answer to hi"] * 4
+        assert GatedModel.upstream == ["hi"]
+
+    def test_achat_upstream_runs_without_leader_token(self, model):
+        async def leader():
+            with CancellationToken(timeout=60).activate():
+                return await model.achat(_messages())
+
+        async def run():
+            return await asyncio.gather(leader(), model.achat(_messages()))
+
+        assert [choice.message.content for choice in asyncio.run(run())] == ["answer to hi"] * 2
+        assert model.upstream_tokens == [None]
+
+    def test_achat_stream_coalesced_and_cancel_isolated(self, model):
+        async def consume():
+            return [chunk async for chunk in model.achat_stream(_messages())]
+
+        async def run():
+            cancelled = asyncio.ensure_future(consume())
+            results = asyncio.gather(consume(), consume())
+            await asyncio.sleep(0.015)
+            cancelled.cancel()
+            return await results
+
+        assert asyncio.run(run()) == [["a", "b", "c"], ["a", "b", "c"]]
+        assert GatedModel.upstream == ["hi"]
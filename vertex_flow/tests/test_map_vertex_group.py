@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from vertex_flow.workflow.constants import ITERATION_INDEX_KEY, LOCAL_VAR, SOURCE_SCOPE, SOURCE_VAR, SUBGRAPH_SOURCE
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.edge import Always, Edge
+from vertex_flow.workflow.vertex import FunctionVertex, MapVertexGroup, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def build_map_group(delay=0.0, active=None, **kwargs):
+    """double -> inc 子图：每个元素先乘 2 再加 1，元素为 "bad" 时失败"""
+    lock = threading.Lock()
+
+    def double(inputs):
+        if active is not None:
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+                active["calls"] = active.get("calls", 0) + 1
+        try:
+            time.sleep(delay)
+            if inputs["item"] == "bad":
+                raise ValueError("bad item")
+            return {"value": inputs["item"] * 2, "index": inputs[ITERATION_INDEX_KEY]}
+        finally:
+            if active is not None:
+                with lock:
+                    active["now"] -= 1
+
+    double_vertex = FunctionVertex(
+        id="double",
+        task=double,
+        variables=[
+            {SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: "item", LOCAL_VAR: "item"},
+            {SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: ITERATION_INDEX_KEY, LOCAL_VAR: ITERATION_INDEX_KEY},
+        ],
+    )
+    inc_vertex = FunctionVertex(
+        id="inc",
+        task=lambda inputs: {"value": inputs["value"] + 1},
+        variables=[{SOURCE_SCOPE: "double", SOURCE_VAR: "value", LOCAL_VAR: "value"}],
+    )
+    return MapVertexGroup(
+        id="map",
+        subgraph_vertices=[double_vertex, inc_vertex],
+        subgraph_edges=[Edge(double_vertex, inc_vertex, Always())],
+        variables=[{SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: "numbers", LOCAL_VAR: "items"}],
+        exposed_variables=[
+            {SOURCE_SCOPE: "inc", SOURCE_VAR: "value", LOCAL_VAR: "value"},
+            {SOURCE_SCOPE: "double", SOURCE_VAR: "index", LOCAL_VAR: "index"},
+        ],
+        **kwargs,
+    )
+
+
+class TestMapVertexGroup:
+    """测试并行 Map 顶点组"""
+
+    def test_items_run_in_parallel_and_results_keep_input_order(self):
+        active = {"now": 0, "max": 0}
+        group = build_map_group(delay=0.05, active=active, concurrency=3)
+
+        start = time.perf_counter()
+        output = group.execute(inputs={"numbers": list(range(6))}, context=WorkflowContext())
+        elapsed = time.perf_counter() - start
+
+        assert output["results"] == [{"value": 2 * index + 1, "index": index} for index in range(6)]
+        assert output["errors"] == []
+        assert output["item_count"] == 6
+        assert active["max"] == 3
+        # 6 个元素、并发 3，约为两轮而不是六轮的耗时
+        assert elapsed < 0.05 * 6
+
+    def test_fail_fast_cancels_remaining_items(self):
+        active = {"now": 0, "max": 0}
+        group = build_map_group(delay=0.02, active=active, concurrency=1)
+
+        with pytest.raises(ValueError, match="bad item"):
+            group.execute(inputs={"numbers": [1, "bad", 3, 4, 5]}, context=WorkflowContext())
+
+        time.sleep(0.1)
+        assert active["calls"] < 5
+
+    def test_collect_errors(self):
+        group = build_map_group(concurrency=2, fail_fast=False)
+
+        output = group.execute(inputs={"numbers": [1, "bad", 3]}, context=WorkflowContext())
+
+        assert output["results"] == [{"value": 3, "index": 0}, None, {"value": 7, "index": 2}]
+        assert output["errors"] == [{"index": 1, "error": "bad item"}]
+
+    def test_requires_list_input(self):
+        group = build_map_group()
+
+        with pytest.raises(ValueError, match="expects a list"):
+            group.execute(inputs={"numbers": "123"}, context=WorkflowContext())
+        with pytest.raises(ValueError, match="concurrency"):
+            build_map_group(concurrency=0)
+
+    def test_in_concurrent_workflow_runs(self):
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        group = build_map_group(delay=0.01, concurrency=4)
+        group.variables = [{SOURCE_SCOPE: "source", SOURCE_VAR: "numbers", LOCAL_VAR: "items"}]
+        sink = SinkVertex(
+            id="sink", task=lambda inputs, context: [result["value"] for result in inputs["map"]["results"]]
+        )
+        for vertex in [source, group, sink]:
+            workflow.add_vertex(vertex)
+        source | group | sink
+        plan = workflow.compile()
+
+        results = list(plan.execute_batch([{"numbers": [1, 2, 3]}, {"numbers": [10, 20]}], concurrency=2))
+
+        assert [result.output for result in results] == [{"sink": [3, 5, 7]}, {"sink": [21, 41]}]
+        # 元素的子图输出不会写回共享的顶点对象，也不会留在所在运行中
+        assert group.subgraph_vertices["inc"].output is None
+        assert results[0].run.get_output("map")["item_count"] == 3
+
+    def test_executor_reused_across_executions(self):
+        group = build_map_group(concurrency=2)
+
+        group.execute(inputs={"numbers": [1, 2, 3]}, context=WorkflowContext())
+        executor = group._map_executor
+        assert executor._max_workers == 2
+        assert group.execute(inputs={"numbers": [4]}, context=WorkflowContext())["results"] == [
+            {"value": 9, "index": 0}
+        ]
+        assert group._map_executor is executor
+        # 元素与子图顶点使用不同的线程池
+        assert group._executor is not executor
+
+        group.shutdown()
+        assert group._map_executor is None and group._executor is None
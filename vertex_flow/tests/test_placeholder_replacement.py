@@ -114,3 +114,72 @@ def test_two_llm_placeholder_replacement(workflow, context):
 
             # 验证第一个LLM也被正确调用
             mock_chat1.assert_called_once()
+
+
+class TestCompiledTemplate:
+    """测试模板编译与一次遍历替换"""
+
+    def test_compile_template_tokens_and_cache(self):
+        from vertex_flow.workflow.template import Placeholder, compile_template
+
+        text = "A {{#src.a.b#}} B {{src.x}} C {{name}} D {{env.var.k}} E"
+        tokens = compile_template(text)
+
+        assert tokens == (
+            "A ",
+            Placeholder("{{#src.a.b#}}", "vertex", "src", "a.b"),
+            " B ",
+            Placeholder("{{src.x}}", "vertex", "src", "x"),
+            " C ",
+            Placeholder("{{name}}", "local", "name"),
+            " D ",
+            Placeholder("{{env.var.k}}", "other"),
+            " E",
+        )
+        assert compile_template(text) is tokens
+
+    def test_replace_placeholders_single_pass(self, workflow):
+        source = SourceVertex(id="src", task=lambda inputs, context=None: inputs)
+        workflow.add_vertex(source)
+        source.output = {"x": "{{src.y}}", "y": "Y", "a.b": 1}
+        vertex = LLMVertex(
+            id="llm",
+            params={"model": Mock(), SYSTEM: "", USER: []},
+            variables=[{SOURCE_SCOPE: "src", SOURCE_VAR: "y", LOCAL_VAR: "local_y"}],
+        )
+        workflow.add_vertex(vertex)
+
+        calls = []
+        resolve = vertex._get_replacement_value_via_dependencies
+
+        def counting_resolve(vertex_id, var_name):
+            calls.append((vertex_id, var_name))
+            return resolve(vertex_id, var_name)
+
+        vertex._get_replacement_value_via_dependencies = counting_resolve
+        text = "{{src.x}}|{{src.x}}|{{#src.a.b#}}|{{local_y}}|{{unknown}}|{{src.missing}}|{{key}}"
+
+        result = vertex._replace_placeholders(text, literals={"{{key}}": "value"})
+
+        # 替换进来的文本不会再被当作模板解析，无法解析的占位符保留原文
+        assert result == "{{src.y}}|{{src.y}}|1|Y|{{unknown}}|{{src.missing}}|value"
+        assert calls.count(("src", "x")) == 1
+        assert vertex._replace_placeholders("no placeholders") == "no placeholders"
+
+    def test_llm_messages_use_env_user_and_input_literals(self, workflow):
+        workflow.context = WorkflowContext(env_parameters={"region": "cn"}, user_parameters={"name": "Ada"})
+        vertex = LLMVertex(id="llm", params={"model": Mock(), SYSTEM: "", USER: []})
+        workflow.add_vertex(vertex)
+
+        literals = vertex._placeholder_literals({"topic": 42, "text": "skip"}, workflow.context)
+
+        assert literals == {
+            "{{env.var.region}}": "cn",
+            "{{#env.region#}}": "cn",
+            "{{user.var.name}}": "Ada",
+            "{{topic}}": "42",
+        }
+        rendered = vertex._replace_placeholders(
+            "{{env.var.region}} {{#env.region#}} {{user.var.name}} {{topic}} {{text}}", literals
+        )
+        assert rendered == "cn cn Ada 42 {{text}}"
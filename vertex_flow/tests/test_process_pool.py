@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+from vertex_flow.workflow import process_pool
+from vertex_flow.workflow.cancellation import CancellationToken, DeadlineExceededError
+from vertex_flow.workflow.constants import EXECUTOR_PROCESS
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.vertex import CodeVertex, FunctionVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def count_primes(inputs):
+    limit = inputs["source"]["limit"]
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0:2] = b"\x00\x00"
+    for number in range(2, int(limit**0.5) + 1):
+        if sieve[number]:
+            sieve[number * number :: number] = bytearray(len(sieve[number * number :: number]))
+    return {"primes": sum(sieve), "pid": os.getpid()}
+
+
+def large_output(inputs):
+    return {"payload": "x" * (process_pool.SHARED_MEMORY_THRESHOLD * 2), "pid": os.getpid()}
+
+
+def slow_large_output(delay):
+    time.sleep(delay)
+    return "x" * (process_pool.SHARED_MEMORY_THRESHOLD * 2)
+
+
+def env_echo(inputs, context):
+    return {"env": context.get_env_parameter("region"), "outputs": context.get_outputs()}
+
+
+def failing_task(inputs):
+    raise ValueError("process task failed")
+
+
+def build_process_workflow(task, env_parameters=None):
+    workflow = Workflow(WorkflowContext(env_parameters=env_parameters))
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    worker = FunctionVertex(id="worker", task=task, executor=EXECUTOR_PROCESS)
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["worker"])
+    for vertex in [source, worker, sink]:
+        workflow.add_vertex(vertex)
+    source | worker | sink
+    return workflow
+
+
+@pytest.fixture(scope="module", autouse=True)
+def small_pool():
+    process_pool.configure_process_pool(max_workers=2)
+    yield
+    process_pool.configure_process_pool(None)
+
+
+class TestProcessExecutor:
+    """测试 FunctionVertex/CodeVertex 的进程池执行"""
+
+    def test_function_runs_in_process(self):
+        workflow = build_process_workflow(count_primes)
+
+        workflow.execute_workflow({"limit": 10000})
+
+        output = workflow.result()["sink"]
+        assert output["primes"] == 1229
+        assert output["pid"] != os.getpid()
+
+    def test_large_output_uses_shared_memory(self, monkeypatch):
+        packed = []
+        original_unpack = process_pool._unpack_result
+
+        def spy(result):
+            packed.append(result)
+            return original_unpack(result)
+
+        monkeypatch.setattr(process_pool, "_unpack_result", spy)
+        workflow = build_process_workflow(large_output)
+
+        workflow.execute_workflow({})
+
+        assert isinstance(packed[0], process_pool.SharedMemoryResult)
+        assert len(workflow.result()["sink"]["payload"]) == process_pool.SHARED_MEMORY_THRESHOLD * 2
+
+    def test_abandoned_shared_memory_result_is_released(self, monkeypatch):
+        discarded = []
+        finished = threading.Event()
+        original_discard = process_pool._discard_result
+
+        def spy(future):
+            original_discard(future)
+            discarded.append(future.result())
+            finished.set()
+
+        monkeypatch.setattr(process_pool, "_discard_result", spy)
+        process_pool.warm_up_process_pool()
+        with CancellationToken(timeout=0.2).activate():
+            with pytest.raises(DeadlineExceededError):
+                process_pool.run_task_in_process(slow_large_output, delay=0.5)
+
+        assert finished.wait(5)
+        assert isinstance(discarded[0], process_pool.SharedMemoryResult)
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=discarded[0].name)
+
+    def test_context_carries_parameters_only(self):
+        workflow = build_process_workflow(env_echo, env_parameters={"region": "cn"})
+
+        workflow.execute_workflow({})
+
+        assert workflow.result()["sink"] == {"env": "cn", "outputs": {}}
+
+    def test_task_error_propagates(self):
+        workflow = build_process_workflow(failing_task)
+
+        with pytest.raises(ValueError, match="process task failed"):
+            workflow.execute_workflow({})
+
+    def test_rejects_unshippable_task(self):
+        with pytest.raises(ValueError, match="module level"):
+            FunctionVertex(id="lambda", task=lambda inputs: inputs, executor=EXECUTOR_PROCESS)
+
+    def test_rejects_unknown_executor(self):
+        with pytest.raises(ValueError, match="Unsupported executor"):
+            FunctionVertex(id="bad", task=count_primes, executor="gpu")
+
+    def test_code_vertex_ships_source(self):
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        code = CodeVertex(
+            id="code",
+            params={
+                "code": "def main(limit):\n    return {'total': sum(range(limit))}",
+                "executor": EXECUTOR_PROCESS,
+            },
+        )
+        code.add_variable(source_scope="source", source_var="limit", local_var="limit")
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["code"])
+        for vertex in [source, code, sink]:
+            workflow.add_vertex(vertex)
+        source | code | sink
+
+        workflow.execute_workflow({"limit": 100})
+
+        assert code.executor == EXECUTOR_PROCESS
+        assert workflow.result()["sink"] == {"total": 4950}
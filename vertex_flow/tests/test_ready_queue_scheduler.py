@@ -0,0 +1,261 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from vertex_flow.workflow.constants import SCHEDULER_READY_QUEUE, SCHEDULER_TOPOLOGICAL
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.edge import Condition, Edge
+from vertex_flow.workflow.scheduler import ReadyQueueScheduler
+from vertex_flow.workflow.vertex import FunctionVertex, IfCase, IfElseVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def build_wide_workflow(finish_times):
+    """source 分出一个慢分支和一个快分支，最终汇合到 sink"""
+
+    def record(name, delay=0.0):
+        def task(inputs, context=None):
+            time.sleep(delay)
+            finish_times[name] = time.time()
+            return {name: True}
+
+        return task
+
+    workflow = Workflow(WorkflowContext())
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    slow = FunctionVertex(id="slow", task=record("slow", 0.5))
+    slow_child = FunctionVertex(id="slow_child", task=record("slow_child"))
+    fast = FunctionVertex(id="fast", task=record("fast"))
+    fast_child = FunctionVertex(id="fast_child", task=record("fast_child"))
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+    for vertex in [source, slow, slow_child, fast, fast_child, sink]:
+        workflow.add_vertex(vertex)
+
+    source | slow | slow_child | sink
+    source | fast | fast_child | sink
+    return workflow
+
+
+class TestReadyQueueScheduler:
+    """测试就绪队列调度器"""
+
+    def test_dispatch_when_dependencies_complete(self):
+        order = []
+        lock = threading.Lock()
+
+        def run_vertex(vertex_id):
+            with lock:
+                order.append(vertex_id)
+
+        with ThreadPoolExecutor() as executor:
+            scheduler = ReadyQueueScheduler(
+                vertex_ids=["a", "b", "c", "d"],
+                dependencies={"b": {"a"}, "c": {"a"}, "d": {"b", "c"}},
+                run_vertex=run_vertex,
+                executor=executor,
+            )
+            scheduler.run()
+
+        assert order[0] == "a"
+        assert order[-1] == "d"
+        assert set(order) == {"a", "b", "c", "d"}
+
+    def test_skipped_vertex_releases_successors(self):
+        executed = []
+
+        with ThreadPoolExecutor() as executor:
+            scheduler = ReadyQueueScheduler(
+                vertex_ids=["a", "b", "c"],
+                dependencies={"b": {"a"}, "c": {"b"}},
+                run_vertex=executed.append,
+                executor=executor,
+                should_skip=lambda vertex_id: vertex_id == "b",
+            )
+            scheduler.run()
+
+        assert executed == ["a", "c"]
+        assert scheduler.skipped == {"b"}
+
+    def test_error_is_raised(self):
+        def run_vertex(vertex_id):
+            if vertex_id == "b":
+                raise RuntimeError("boom")
+
+        with ThreadPoolExecutor() as executor:
+            scheduler = ReadyQueueScheduler(
+                vertex_ids=["a", "b", "c"],
+                dependencies={"b": {"a"}, "c": {"b"}},
+                run_vertex=run_vertex,
+                executor=executor,
+            )
+            with pytest.raises(RuntimeError, match="boom"):
+                scheduler.run()
+        assert "c" not in scheduler.finished
+
+    def test_priorities_order_ready_vertices(self):
+        order = []
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            scheduler = ReadyQueueScheduler(
+                vertex_ids=["a", "b", "c", "d"],
+                dependencies={"b": {"a"}, "c": {"a"}, "d": {"a"}},
+                run_vertex=order.append,
+                executor=executor,
+                priorities={"a": 4, "b": 1, "c": 3, "d": 2},
+            )
+            scheduler.run()
+
+        assert order == ["a", "c", "d", "b"]
+
+    def test_submissions_bounded_by_pool_size(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def run_vertex(vertex_id):
+            with lock:
+                running.append(vertex_id)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(vertex_id)
+
+        vertex_ids = [f"v{index}" for index in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            scheduler = ReadyQueueScheduler(
+                vertex_ids=vertex_ids,
+                dependencies={},
+                run_vertex=run_vertex,
+                executor=executor,
+                max_workers=2,
+            )
+            scheduler.run()
+
+        assert max(peak) <= 2
+        assert scheduler.finished == set(vertex_ids)
+
+    def test_cycle_is_detected(self):
+        with ThreadPoolExecutor() as executor:
+            scheduler = ReadyQueueScheduler(
+                vertex_ids=["a", "b"],
+                dependencies={"a": {"b"}, "b": {"a"}},
+                run_vertex=lambda vertex_id: None,
+                executor=executor,
+            )
+            with pytest.raises(ValueError, match="cycle"):
+                scheduler.run()
+
+
+class TestWorkflowReadyQueueMode:
+    """测试 Workflow 的就绪队列调度模式"""
+
+    def test_invalid_scheduler_mode(self):
+        with pytest.raises(ValueError):
+            Workflow().set_scheduler_mode("unknown")
+
+    def test_fast_branch_not_blocked_by_slow_branch(self):
+        finish_times = {}
+        workflow = build_wide_workflow(finish_times)
+        workflow.set_scheduler_mode(SCHEDULER_READY_QUEUE)
+
+        workflow.execute_workflow({"question": "q"})
+
+        assert finish_times["fast_child"] < finish_times["slow"]
+        assert finish_times["slow_child"] >= finish_times["slow"]
+        sink_output = workflow.result()["sink"]
+        assert sink_output["slow_child"] == {"slow_child": True}
+        assert sink_output["fast_child"] == {"fast_child": True}
+
+    def test_stream_runs_vertices_one_at_a_time(self):
+        active = {"now": 0, "max": 0}
+        lock = threading.Lock()
+        workflow = build_wide_workflow({})
+        for vertex_id in ["slow", "fast"]:
+            task = workflow.vertices[vertex_id]._task
+
+            def tracked(inputs, context=None, task=task):
+                with lock:
+                    active["now"] += 1
+                    active["max"] = max(active["max"], active["now"])
+                try:
+                    time.sleep(0.05)
+                    return task(inputs, context)
+                finally:
+                    with lock:
+                        active["now"] -= 1
+
+            workflow.vertices[vertex_id]._task = tracked
+        workflow.set_scheduler_mode(SCHEDULER_READY_QUEUE)
+
+        workflow.execute_workflow({"question": "q"}, stream=True)
+
+        assert active["max"] == 1
+        assert workflow.result()["sink"]["fast_child"] == {"fast_child": True}
+
+    def test_same_result_as_topological_mode(self):
+        results = {}
+        for mode in [SCHEDULER_TOPOLOGICAL, SCHEDULER_READY_QUEUE]:
+            workflow = build_wide_workflow({})
+            workflow.set_scheduler_mode(mode)
+            workflow.execute_workflow({"question": "q"})
+            results[mode] = workflow.result()
+            assert workflow.context.get_output("fast") == {"fast": True}
+        assert results[SCHEDULER_TOPOLOGICAL] == results[SCHEDULER_READY_QUEUE]
+
+    def test_if_else_branch_is_filtered(self):
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: {"flag": inputs["flag"]})
+        if_else = IfElseVertex(
+            id="if_else",
+            cases=[
+                IfCase(
+                    conditions=[
+                        {
+                            "variable_selector": {"source_scope": "source", "source_var": "flag", "local_var": "flag"},
+                            "operator": "==",
+                            "value": "yes",
+                        }
+                    ],
+                    id="true",
+                )
+            ],
+        )
+        true_branch = FunctionVertex(id="true_branch", task=lambda inputs: {"branch": "true"})
+        false_branch = FunctionVertex(id="false_branch", task=lambda inputs: {"branch": "false"})
+        true_sink = SinkVertex(id="true_sink", task=lambda inputs, context: inputs)
+        false_sink = SinkVertex(id="false_sink", task=lambda inputs, context: inputs)
+        for vertex in [source, if_else, true_branch, false_branch, true_sink, false_sink]:
+            workflow.add_vertex(vertex)
+        source | if_else
+        workflow.add_edge(Edge(if_else, true_branch, Condition(id="true")))
+        workflow.add_edge(Edge(if_else, false_branch, Condition(id="false")))
+        true_branch | true_sink
+        false_branch | false_sink
+
+        workflow.set_scheduler_mode(SCHEDULER_READY_QUEUE)
+        workflow.execute_workflow({"flag": "no"})
+
+        assert false_branch.is_executed
+        assert not true_branch.is_executed
+        assert not true_sink.is_executed
+        assert "false_sink" in workflow.result()
+
+    def test_vertex_failure_propagates(self):
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+
+        def failing(inputs):
+            raise RuntimeError("vertex failed")
+
+        broken = FunctionVertex(id="broken", task=failing)
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+        for vertex in [source, broken, sink]:
+            workflow.add_vertex(vertex)
+        source | broken | sink
+
+        workflow.set_scheduler_mode(SCHEDULER_READY_QUEUE)
+        with pytest.raises(RuntimeError, match="vertex failed"):
+            workflow.execute_workflow({})
+        assert not sink.is_executed
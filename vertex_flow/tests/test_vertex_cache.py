@@ -0,0 +1,352 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from vertex_flow.memory import InnerMemory
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.vertex import FunctionVertex, LLMVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.vertex_cache import (
+    InProcessVertexCache,
+    MemoryVertexCache,
+    UnhashableValueError,
+    stable_hash,
+)
+from vertex_flow.workflow.workflow import Workflow
+
+
+def build_counting_workflow(calls, env_parameters=None):
+    """source -> square -> sink，square 记录调用次数"""
+
+    def square(inputs):
+        calls.append(inputs["source"]["value"])
+        return {"square": inputs["source"]["value"] ** 2}
+
+    workflow = Workflow(WorkflowContext(env_parameters=env_parameters))
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    worker = FunctionVertex(id="square", task=square)
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["square"])
+    for vertex in [source, worker, sink]:
+        workflow.add_vertex(vertex)
+    source | worker | sink
+    return workflow
+
+
+class TestStableHash:
+    """测试稳定哈希"""
+
+    def test_order_independent(self):
+        assert stable_hash({"a": 1, "b": [1, 2]}) == stable_hash({"b": [1, 2], "a": 1})
+        assert stable_hash({1, 2, 3}) == stable_hash({3, 2, 1})
+
+    def test_distinguishes_values(self):
+        assert stable_hash({"a": 1}) != stable_hash({"a": "1"})
+        assert stable_hash([1, 2]) != stable_hash([2, 1])
+
+    def test_large_arrays_hash_full_content(self):
+        np = pytest.importorskip("numpy")
+        first = np.zeros(5000)
+        second = first.copy()
+        second[2500] = 1.0
+
+        assert stable_hash(first) != stable_hash(second)
+        assert stable_hash(first) == stable_hash(first.copy())
+        assert stable_hash(first) != stable_hash(first.astype(np.float32))
+        assert stable_hash(first) != stable_hash(first.reshape(50, 100))
+
+    def test_objects_hashed_by_state(self):
+        class Point:
+            def __init__(self, x):
+                self.x = x
+
+        assert stable_hash(Point(1)) == stable_hash(Point(1))
+        assert stable_hash(Point(1)) != stable_hash(Point(2))
+
+    def test_stateless_objects_are_unhashable(self):
+        with pytest.raises(UnhashableValueError):
+            stable_hash({"lock": threading.Lock()})
+
+
+class TestInProcessVertexCache:
+    """测试进程内 LRU 缓存"""
+
+    def test_returns_copy(self):
+        cache = InProcessVertexCache()
+        cache.set("key", {"items": [1]})
+
+        hit, output = cache.get("key")
+        output["items"].append(2)
+
+        assert hit is True
+        assert cache.get("key") == (True, {"items": [1]})
+        assert cache.get("missing") == (False, None)
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction_by_entries(self):
+        cache = InProcessVertexCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        cache = InProcessVertexCache(max_entries=None, max_bytes=300)
+        cache.set("a", "x" * 100)
+        cache.set("b", "y" * 100)
+        cache.set("c", "z" * 100)
+
+        assert cache.stats()["bytes"] <= 300
+        assert cache.get("a") == (False, None)
+        assert cache.get("c") == (True, "z" * 100)
+        assert cache.set("huge", "h" * 1000) is False
+
+    def test_ttl(self):
+        cache = InProcessVertexCache(ttl_sec=1)
+        cache.set("key", "value")
+        assert cache.get("key") == (True, "value")
+
+        time.sleep(1.05)
+        assert cache.get("key") == (False, None)
+        assert len(cache) == 0
+
+
+class TestMemoryVertexCache:
+    """测试基于 Memory 后端的缓存"""
+
+    def test_roundtrip_and_none_output(self):
+        memory = InnerMemory()
+        cache = MemoryVertexCache(memory)
+        cache.set("none", None)
+        cache.set("dict", {"answer": 42})
+
+        assert cache.get("none") == (True, None)
+        assert cache.get("dict") == (True, {"answer": 42})
+        assert memory.ctx_get("vertex_cache", "dict") == {"output": {"answer": 42}}
+
+    def test_skips_unserializable_output(self):
+        cache = MemoryVertexCache(InnerMemory())
+
+        assert cache.set("key", object()) is False
+        assert cache.get("key") == (False, None)
+
+    def test_max_entries_deletes_from_backend(self):
+        memory = InnerMemory()
+        cache = MemoryVertexCache(memory, namespace="ns", max_entries=1)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert memory.ctx_get("ns", "a") is None
+        assert cache.get("b") == (True, 2)
+
+
+class TestVertexResultCache:
+    """测试顶点执行时的结果缓存"""
+
+    def test_disabled_by_default(self):
+        calls = []
+        for _ in range(2):
+            workflow = build_counting_workflow(calls)
+            workflow.execute_workflow({"value": 3})
+        assert calls == [3, 3]
+
+    def test_hit_skips_task(self):
+        calls = []
+        cache = InProcessVertexCache()
+        for value in [3, 3, 4]:
+            workflow = build_counting_workflow(calls)
+            workflow.set_result_cache(cache, vertex_ids=["square"])
+            workflow.execute_workflow({"value": value})
+            assert workflow.result()["sink"] == {"square": value**2}
+
+        assert calls == [3, 4]
+        assert workflow.vertices["source"].result_cache is None
+        assert workflow.vertices["square"].success is True
+        assert cache.stats()["hits"] == 1
+
+    def test_default_skips_side_effecting_vertices(self):
+        workflow = build_counting_workflow([])
+        llm = LLMVertex(id="llm", task=lambda inputs, context=None: "ok")
+        tool_llm = LLMVertex(id="tool_llm", task=lambda inputs, context=None: "ok", tools=["search"])
+        workflow.add_vertex(llm)
+        workflow.add_vertex(tool_llm)
+        cache = InProcessVertexCache()
+        workflow.set_result_cache(cache)
+
+        assert workflow.vertices["llm"].result_cache is cache
+        assert workflow.vertices["square"].result_cache is None
+        assert workflow.vertices["tool_llm"].result_cache is None
+        assert workflow.vertices["source"].result_cache is None
+
+    def test_unhashable_inputs_bypass_cache(self):
+        calls = []
+        cache = InProcessVertexCache()
+        for _ in range(2):
+            workflow = build_counting_workflow(calls, env_parameters={"lock": threading.Lock()})
+            workflow.set_result_cache(cache, vertex_ids=["square"])
+            workflow.execute_workflow({"value": 3})
+
+        assert calls == [3, 3]
+        assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+    def test_hit_does_not_update_cost_estimate(self):
+        calls = []
+        cache = InProcessVertexCache()
+        workflow = build_counting_workflow(calls)
+        workflow.set_result_cache(cache, vertex_ids=["square"])
+        workflow.execute_workflow({"value": 3})
+        estimate = workflow.vertices["square"].cost_estimate
+
+        workflow = build_counting_workflow(calls)
+        workflow.vertices["square"].cost_estimate = estimate
+        workflow.set_result_cache(cache, vertex_ids=["square"])
+        workflow.execute_workflow({"value": 3})
+
+        assert calls == [3]
+        assert workflow.vertices["square"].cost_estimate == estimate
+
+    def test_env_parameters_are_part_of_key(self):
+        calls = []
+        cache = InProcessVertexCache()
+        for region in ["cn", "us"]:
+            workflow = build_counting_workflow(calls, env_parameters={"region": region})
+            workflow.set_result_cache(cache, vertex_ids=["square"])
+            workflow.execute_workflow({"value": 3})
+
+        assert calls == [3, 3]
+
+    def test_memory_backend_shared_between_workflows(self):
+        calls = []
+        cache = MemoryVertexCache(InnerMemory(), ttl_sec=60)
+        for _ in range(2):
+            workflow = build_counting_workflow(calls)
+            workflow.set_result_cache(cache, vertex_ids=["square"])
+            workflow.execute_workflow({"value": 5})
+            assert workflow.result()["sink"] == {"square": 25}
+
+        assert calls == [5]
+
+    def test_compiled_runs_share_cache(self):
+        calls = []
+        workflow = build_counting_workflow(calls)
+        workflow.set_result_cache(InProcessVertexCache(), vertex_ids=["square"])
+        plan = workflow.compile()
+
+        first = plan.run({"value": 6})
+        second = plan.run({"value": 6})
+
+        assert calls == [6]
+        assert second.result() == first.result() == {"sink": {"square": 36}}
+        assert second.context.get_output("square") == {"square": 36}
+
+    def test_llm_fingerprint_and_placeholder_scopes(self):
+        def fake_chat(inputs, context=None):
+            return llm.user_messages[0]
+
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        other = FunctionVertex(id="other", task=lambda inputs: {"topic": inputs["source"]["topic"]})
+        llm = LLMVertex(id="llm", task=fake_chat)
+        llm.user_messages = ["{{other.topic}}"]
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["llm"])
+        for vertex in [source, other, llm, sink]:
+            workflow.add_vertex(vertex)
+        source | other
+        source | llm | sink
+        other | sink
+        llm.result_cache = InProcessVertexCache()
+
+        first_key = llm.result_cache_key({}, workflow.context)
+        llm.system_message = "changed"
+        assert llm.result_cache_key({}, workflow.context) != first_key
+        assert "other" in llm.cache_scopes()
+
+    def test_async_vertex_uses_cache(self):
+        calls = []
+
+        class AsyncDouble(FunctionVertex):
+            async def execute(self, inputs=None, context=None):
+                calls.append(inputs)
+                self.output = {"double": inputs["source"]["value"] * 2}
+
+        async def main():
+            cache = InProcessVertexCache()
+            for _ in range(2):
+                workflow = Workflow(WorkflowContext())
+                source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+                double = AsyncDouble(id="double", task=lambda inputs: inputs)
+                sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["double"])
+                for vertex in [source, double, sink]:
+                    workflow.add_vertex(vertex)
+                source | double | sink
+                double.result_cache = cache
+                await workflow.execute_workflow_async({"value": 2})
+                assert workflow.result()["sink"] == {"double": 4}
+
+        asyncio.run(main())
+        assert len(calls) == 1
+
+    def test_hit_returns_output_like_a_miss(self):
+        calls = []
+        vertex = FunctionVertex(id="square", task=lambda inputs: calls.append(1) or {"square": inputs["value"] ** 2})
+        vertex.result_cache = InProcessVertexCache()
+
+        miss = vertex.execute(inputs={"value": 3}, context=WorkflowContext())
+        hit = vertex.execute(inputs={"value": 3}, context=WorkflowContext())
+
+        assert len(calls) == 1
+        assert miss == hit == {"square": 9}
+
+    def test_async_hit_returns_output_like_a_miss(self):
+        calls = []
+
+        class AsyncSquare(FunctionVertex):
+            async def execute(self, inputs=None, context=None):
+                calls.append(inputs)
+                self.output = {"square": inputs["value"] ** 2}
+                return self.output
+
+        vertex = AsyncSquare(id="square", task=lambda inputs: inputs)
+        vertex.result_cache = InProcessVertexCache()
+
+        async def main():
+            miss = await vertex.execute(inputs={"value": 3}, context=WorkflowContext())
+            hit = await vertex.execute(inputs={"value": 3}, context=WorkflowContext())
+            return miss, hit
+
+        miss, hit = asyncio.run(main())
+        assert len(calls) == 1
+        assert miss == hit == {"square": 9}
+
+    def test_failure_is_not_cached(self):
+        cache = InProcessVertexCache()
+        attempts = []
+
+        def flaky(inputs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("flaky")
+            return {"ok": True}
+
+        for expect_error in [True, False]:
+            workflow = Workflow(WorkflowContext())
+            source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+            worker = FunctionVertex(id="worker", task=flaky)
+            sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["worker"])
+            for vertex in [source, worker, sink]:
+                workflow.add_vertex(vertex)
+            source | worker | sink
+            worker.result_cache = cache
+            if expect_error:
+                with pytest.raises(RuntimeError, match="flaky"):
+                    workflow.execute_workflow({})
+            else:
+                workflow.execute_workflow({})
+
+        assert len(attempts) == 2
+        assert len(cache) == 1
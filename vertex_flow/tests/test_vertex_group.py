@@ -1,3 +1,5 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock
 
 import pytest
@@ -6,6 +8,7 @@ from vertex_flow.workflow.constants import LOCAL_VAR, SOURCE_SCOPE, SOURCE_VAR
 from vertex_flow.workflow.context import WorkflowContext
 from vertex_flow.workflow.edge import Always, Edge
 from vertex_flow.workflow.vertex import FunctionVertex, SubgraphContext, VertexGroup
+from vertex_flow.workflow.vertex.vertex_group import DEFAULT_MAX_WORKERS
 
 
 class TestSubgraphContext:
@@ -277,5 +280,116 @@ class TestVertexGroup:
         assert repr(group) == str(group)
 
 
+class TestVertexGroupParallel:
+    """测试子图中互不依赖的顶点并行执行"""
+
+    def create_diamond(self, left_task, right_task, max_workers=None):
+        """source -> (left, right) -> join"""
+        source = FunctionVertex(id="source", task=lambda inputs, context=None: {"value": 1})
+        left = FunctionVertex(
+            id="left", task=left_task, variables=[{SOURCE_SCOPE: "source", SOURCE_VAR: "value", LOCAL_VAR: "value"}]
+        )
+        right = FunctionVertex(
+            id="right", task=right_task, variables=[{SOURCE_SCOPE: "source", SOURCE_VAR: "value", LOCAL_VAR: "value"}]
+        )
+        join = FunctionVertex(
+            id="join",
+            task=lambda inputs, context=None: {"total": inputs["left"] + inputs["right"]},
+            variables=[
+                {SOURCE_SCOPE: "left", SOURCE_VAR: "value", LOCAL_VAR: "left"},
+                {SOURCE_SCOPE: "right", SOURCE_VAR: "value", LOCAL_VAR: "right"},
+            ],
+        )
+        edges = [Edge(source, left, Always()), Edge(source, right, Always())]
+        edges += [Edge(left, join, Always()), Edge(right, join, Always())]
+        return VertexGroup(
+            id="diamond", subgraph_vertices=[source, left, right, join], subgraph_edges=edges, max_workers=max_workers
+        )
+
+    def test_independent_vertices_run_concurrently(self):
+        """两个分支互相等待对方开始，依次执行时会超时"""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def branch(inputs, context=None):
+            barrier.wait()
+            return {"value": inputs["value"] + 1}
+
+        group = self.create_diamond(branch, branch)
+        result = group.execute(inputs={}, context=WorkflowContext())
+
+        assert result["join"] == {"total": 4}
+        assert group.subgraph_context.get_internal_output("join") == {"total": 4}
+        assert all(vertex.is_executed for vertex in group.subgraph_vertices.values())
+
+    def test_max_workers_one_runs_on_calling_thread(self):
+        threads = set()
+
+        def branch(inputs, context=None):
+            threads.add(threading.get_ident())
+            return {"value": inputs["value"]}
+
+        group = self.create_diamond(branch, branch, max_workers=1)
+        result = group.execute(inputs={}, context=WorkflowContext())
+
+        assert result["join"] == {"total": 2}
+        assert threads == {threading.get_ident()}
+
+    def test_failure_cancels_subgraph(self):
+        def fail(inputs, context=None):
+            raise RuntimeError("branch failed")
+
+        group = self.create_diamond(fail, lambda inputs, context=None: {"value": 1})
+
+        with pytest.raises(RuntimeError, match="branch failed"):
+            group.execute(inputs={}, context=WorkflowContext())
+        assert not group.subgraph_vertices["join"].is_executed
+
+    def test_executor_reused_across_executions(self, monkeypatch):
+        created = Mock(wraps=ThreadPoolExecutor)
+        monkeypatch.setattr("vertex_flow.workflow.vertex.vertex_group.ThreadPoolExecutor", created)
+
+        def branch(inputs, context=None):
+            return {"value": inputs["value"]}
+
+        group = self.create_diamond(branch, branch)
+        group.execute(inputs={}, context=WorkflowContext())
+        executor = group._executor
+        assert executor._max_workers == DEFAULT_MAX_WORKERS
+
+        group.execute(inputs={}, context=WorkflowContext())
+        assert group._executor is executor
+        assert created.call_count == 1
+        group.shutdown()
+        assert group._executor is None
+
+    def test_failed_execution_keeps_executor_usable(self):
+        calls = []
+
+        def flaky(inputs, context=None):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("branch failed")
+            return {"value": 1}
+
+        group = self.create_diamond(flaky, lambda inputs, context=None: {"value": 1})
+        with pytest.raises(RuntimeError, match="branch failed"):
+            group.execute(inputs={}, context=WorkflowContext())
+        assert group.execute(inputs={}, context=WorkflowContext())["join"] == {"total": 2}
+
+    def test_topological_order_is_cached_until_subgraph_changes(self):
+        group = self.create_diamond(lambda inputs, context=None: inputs, lambda inputs, context=None: inputs)
+
+        schedule = group._get_subgraph_schedule()
+        assert group._get_subgraph_schedule() is schedule
+        assert not schedule[2]
+
+        tail = FunctionVertex(id="tail", task=lambda inputs, context=None: {})
+        group.add_subgraph_vertex(tail)
+        group.add_subgraph_edge(Edge(group.subgraph_vertices["join"], tail, Always()))
+
+        order = [vertex.id for vertex in group.topological_sort_subgraph()]
+        assert order[0] == "source" and order[-2:] == ["join", "tail"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -2,9 +2,17 @@ from unittest.mock import Mock
 
 import pytest
 
-from vertex_flow.workflow.constants import LOCAL_VAR, SOURCE_SCOPE, SOURCE_VAR
+from vertex_flow.workflow.constants import (
+    ITERATION_INDEX_KEY,
+    LOCAL_VAR,
+    OUTPUT_KEY,
+    SOURCE_SCOPE,
+    SOURCE_VAR,
+    VERTEX_ID_KEY,
+)
 from vertex_flow.workflow.context import WorkflowContext
-from vertex_flow.workflow.vertex import WhileCondition, WhileVertex
+from vertex_flow.workflow.event_channel import EventType
+from vertex_flow.workflow.vertex import FunctionVertex, WhileCondition, WhileVertex, WhileVertexGroup
 from vertex_flow.workflow.workflow import Workflow
 
 
@@ -203,3 +211,106 @@ class TestWhileVertex:
         result = while_vertex.output
         assert result["iteration_count"] == 1
         assert len(result["results"]) == 1
+
+
+class TestWhileVertexStreaming:
+    """测试WhileVertex的有界结果与流式输出"""
+
+    @staticmethod
+    def create_counter(**kwargs):
+        return WhileVertex(
+            id="counter",
+            execute_task=lambda inputs: {"count": inputs[ITERATION_INDEX_KEY] + 1},
+            condition_task=lambda inputs: True,
+            max_iterations=5,
+            **kwargs,
+        )
+
+    def test_results_window_and_reducer(self):
+        while_vertex = self.create_counter(
+            results_window=2, reducer=lambda total, result: total + result["count"], reducer_initial=0
+        )
+        while_vertex.execute(inputs={}, context=WorkflowContext())
+
+        result = while_vertex.output
+        assert result["iteration_count"] == 5
+        assert result["results"] == [{"count": 4}, {"count": 5}]
+        assert result["reduced"] == 15
+        assert result["final_inputs"]["count"] == 5
+
+        while_vertex = self.create_counter(results_window=0)
+        while_vertex.execute(inputs={}, context=WorkflowContext())
+        assert while_vertex.output["results"] == []
+        assert "reduced" not in while_vertex.output
+
+        with pytest.raises(ValueError, match="results_window"):
+            self.create_counter(results_window=-1)
+
+    def test_iter_loop_yields_each_iteration(self):
+        while_vertex = self.create_counter(results_window=1)
+
+        seen = []
+        for index, result in while_vertex.iter_loop(inputs={}):
+            # 产出时循环尚未结束
+            assert while_vertex.get_iteration_index() == index + 1
+            seen.append((index, result["count"]))
+
+        assert seen == [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5)]
+        assert while_vertex.output["iteration_count"] == 5
+        assert while_vertex.output["results"] == [{"count": 5}]
+
+    def test_iter_loop_stops_when_closed(self):
+        calls = []
+        while_vertex = self.create_counter()
+        while_vertex.execute_task = lambda inputs: calls.append(inputs[ITERATION_INDEX_KEY]) or {}
+
+        loop = while_vertex.iter_loop(inputs={})
+        next(loop)
+        loop.close()
+        assert calls == [0]
+
+    def test_stream_results_emits_values_events(self):
+        workflow = Workflow("test_while_stream")
+        while_vertex = self.create_counter(stream_results=True)
+        workflow.add_vertex(while_vertex)
+        events = []
+        workflow.subscribe(EventType.VALUES, events.append)
+
+        while_vertex.execute(inputs={}, context=WorkflowContext(workflow))
+
+        # 每次迭代一个带迭代序号的事件，循环结束后仍有一个携带完整输出的事件
+        iterations = [event for event in events if ITERATION_INDEX_KEY in event]
+        assert [event[ITERATION_INDEX_KEY] for event in iterations] == [0, 1, 2, 3, 4]
+        assert iterations[-1][VERTEX_ID_KEY] == "counter"
+        assert iterations[-1][OUTPUT_KEY] == {"count": 5}
+        assert events[-1][OUTPUT_KEY]["iteration_count"] == 5
+
+    def test_while_vertex_group_streams_subgraph_outputs(self):
+        workflow = Workflow("test_while_group_stream")
+        step = FunctionVertex(id="step", task=lambda inputs: {"count": inputs[ITERATION_INDEX_KEY] + 1})
+        group = WhileVertexGroup(
+            id="loop",
+            subgraph_vertices=[step],
+            condition_task=lambda inputs: True,
+            max_iterations=3,
+            results_window=1,
+            reducer=lambda total, result: total + result["step"]["count"],
+            reducer_initial=0,
+            stream_results=True,
+        )
+        workflow.add_vertex(group)
+        events = []
+        workflow.subscribe(EventType.VALUES, events.append)
+
+        seen = [result["step"]["count"] for _, result in group.iter_loop(inputs={}, context=WorkflowContext(workflow))]
+
+        assert seen == [1, 2, 3]
+        assert [
+            (event[VERTEX_ID_KEY], event[ITERATION_INDEX_KEY]) for event in events if ITERATION_INDEX_KEY in event
+        ] == [
+            ("loop", 0),
+            ("loop", 1),
+            ("loop", 2),
+        ]
+        assert group.output["results"] == [{"step": {"count": 3}}]
+        assert group.output["reduced"] == 6
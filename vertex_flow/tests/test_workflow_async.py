@@ -0,0 +1,358 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from vertex_flow.workflow import workflow as workflow_module
+from vertex_flow.workflow.chat import DeepSeek
+from vertex_flow.workflow.constants import ENABLE_STREAM, MODEL, SYSTEM, USER, WORKFLOW_FAILED
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.event_channel import EventType
+from vertex_flow.workflow.scheduler import AsyncReadyQueueScheduler
+from vertex_flow.workflow.tools.functions import FunctionTool
+from vertex_flow.workflow.vertex import FunctionVertex, LLMVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.vertex_executor import configure_vertex_executor, get_vertex_executor
+from vertex_flow.workflow.workflow import Workflow
+
+
+class AsyncSleepVertex(FunctionVertex):
+    """异步顶点：await 一段时间后输出自身 id 与执行线程"""
+
+    async def execute(self, inputs=None, context=None):
+        await asyncio.sleep(self.params.get("delay", 0))
+        if self.params.get("fail"):
+            raise RuntimeError(f"{self.id} failed")
+        self.output = {"id": self.id, "thread": threading.get_ident()}
+
+
+def _completion(content=None, tool_calls=None):
+    message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+    finish_reason = "tool_calls" if tool_calls else "stop"
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)], usage=None)
+
+
+class SleepyModel(DeepSeek):
+    """等待一段时间后依次返回预设响应的模型，只允许异步请求，记录请求所在线程"""
+
+    def __init__(self, responses, delay=0.0):
+        super().__init__(name="deepseek-chat", sk="sk")
+        self.responses = list(responses)
+        self.delay = delay
+        self.threads = []
+        self.requests = []
+
+    async def _acreate_completion(self, messages, option=None, stream=False, tools=None):
+        self.threads.append(threading.get_ident())
+        self.requests.append(list(messages))
+        await asyncio.sleep(self.delay)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return self._stream(response) if stream else response
+
+    @staticmethod
+    async def _stream(contents):
+        for content in contents:
+            await asyncio.sleep(0)
+            delta = SimpleNamespace(content=content, tool_calls=None)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+    def _create_completion(self, messages, option=None, stream=False, tools=None):
+        raise AssertionError("LLMVertex should not send blocking requests in the async engine")
+
+
+def build_async_workflow(delay=0.2, fail=False):
+    """source 分出两个异步分支和一个同步分支，汇合到 sink"""
+    workflow = Workflow(WorkflowContext())
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    first = AsyncSleepVertex(id="first", params={"delay": delay})
+    second = AsyncSleepVertex(id="second", params={"delay": delay, "fail": fail})
+    sync = FunctionVertex(id="sync", task=lambda inputs: {"thread": threading.get_ident()})
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+    for vertex in [source, first, second, sync, sink]:
+        workflow.add_vertex(vertex)
+    source | first | sink
+    source | second | sink
+    source | sync | sink
+    return workflow
+
+
+class TestAsyncReadyQueueScheduler:
+    """测试异步就绪队列调度器"""
+
+    def test_dispatch_and_skip(self):
+        executed = []
+
+        async def run_vertex(vertex_id):
+            executed.append(vertex_id)
+
+        scheduler = AsyncReadyQueueScheduler(
+            vertex_ids=["a", "b", "c", "d"],
+            dependencies={"b": {"a"}, "c": {"a"}, "d": {"b", "c"}},
+            run_vertex=run_vertex,
+            should_skip=lambda vertex_id: vertex_id == "c",
+        )
+        asyncio.run(scheduler.run())
+
+        assert executed == ["a", "b", "d"]
+        assert scheduler.skipped == {"c"}
+
+    def test_failure_cancels_running_tasks(self):
+        cancelled = []
+
+        async def run_vertex(vertex_id):
+            if vertex_id == "fail":
+                raise RuntimeError("boom")
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(vertex_id)
+                raise
+
+        scheduler = AsyncReadyQueueScheduler(
+            vertex_ids=["slow", "fail"],
+            dependencies={},
+            run_vertex=run_vertex,
+        )
+        with pytest.raises(RuntimeError, match="boom"):
+            asyncio.run(scheduler.run())
+        assert cancelled == ["slow"]
+
+    def test_cycle_is_detected(self):
+        async def run_vertex(vertex_id):
+            pass
+
+        scheduler = AsyncReadyQueueScheduler(
+            vertex_ids=["a", "b"],
+            dependencies={"a": {"b"}, "b": {"a"}},
+            run_vertex=run_vertex,
+        )
+        with pytest.raises(ValueError, match="cycle"):
+            asyncio.run(scheduler.run())
+
+
+class TestExecuteWorkflowAsync:
+    """测试 execute_workflow_async 异步执行引擎"""
+
+    def test_async_and_sync_vertices(self):
+        workflow = build_async_workflow()
+
+        async def main():
+            start = time.time()
+            await workflow.execute_workflow_async({"question": "q"})
+            return time.time() - start, threading.get_ident()
+
+        elapsed, loop_thread = asyncio.run(main())
+
+        # 两个异步分支在同一个事件循环中并发等待
+        assert elapsed < 0.38
+        sink_output = workflow.result()["sink"]
+        assert sink_output["first"]["thread"] == loop_thread
+        assert sink_output["second"]["thread"] == loop_thread
+        # 同步顶点在顶点线程池中执行
+        assert sink_output["sync"]["thread"] != loop_thread
+        first = workflow.vertices["first"]
+        assert first.success is True
+        assert first.cost_time >= 0.2
+        assert workflow.context.get_output("first")["id"] == "first"
+
+    def test_failure_propagates(self):
+        workflow = build_async_workflow(delay=0.01, fail=True)
+        updates = []
+        workflow.subscribe(EventType.UPDATES, updates.append)
+
+        with pytest.raises(RuntimeError, match="second failed"):
+            asyncio.run(workflow.execute_workflow_async({}))
+
+        second = workflow.vertices["second"]
+        assert second.success is False
+        assert "second failed" in second.error_message
+        assert not workflow.vertices["sink"].is_executed
+        assert updates[-1]["status"] == WORKFLOW_FAILED
+
+    def test_sync_engine_runs_async_vertex(self):
+        workflow = build_async_workflow(delay=0.01)
+
+        workflow.execute_workflow({})
+
+        assert workflow.result()["sink"]["first"]["id"] == "first"
+
+    def test_concurrent_runs_on_one_loop(self):
+        plan = build_async_workflow(delay=0.2).compile()
+
+        async def main():
+            start = time.time()
+            runs = await asyncio.gather(*[plan.run_async({"index": index}) for index in range(20)])
+            return runs, time.time() - start
+
+        runs, elapsed = asyncio.run(main())
+
+        assert elapsed < 1.0
+        for run in runs:
+            assert run.get_output("first")["id"] == "first"
+            assert run.status()["second"]["status"] is True
+        assert plan.workflow.vertices["first"].output is None
+
+    def test_sync_vertices_not_bound_by_default_executor(self):
+        """40 个运行的同步顶点互相等待对方开始，在事件循环默认的线程池（最多 32 个线程）中会超时"""
+        runs = 40
+        barrier = threading.Barrier(runs, timeout=5)
+        threads = []
+
+        def block(inputs):
+            threads.append(threading.current_thread().name)
+            barrier.wait()
+            return {}
+
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        sync = FunctionVertex(id="sync", task=block)
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+        for vertex in [source, sync, sink]:
+            workflow.add_vertex(vertex)
+        source | sync | sink
+        plan = workflow.compile()
+
+        async def main():
+            return await asyncio.gather(*[plan.run_async({"index": index}) for index in range(runs)])
+
+        assert all(run.get_output("sync") == {} for run in asyncio.run(main()))
+        assert all(name.startswith("workflow-vertex") for name in threads)
+
+    def test_configure_vertex_executor(self):
+        try:
+            configure_vertex_executor(max_workers=2)
+            assert get_vertex_executor()._max_workers == 2
+            asyncio.run(build_async_workflow(delay=0.01).execute_workflow_async({}))
+        finally:
+            configure_vertex_executor()
+        assert get_vertex_executor()._max_workers > 2
+        with pytest.raises(ValueError):
+            configure_vertex_executor(max_workers=0)
+
+
+class TestAsyncLLMVertex:
+    """测试异步执行引擎中的 LLMVertex：直接 await aexecute，不占用顶点线程"""
+
+    @pytest.fixture
+    def sync_calls(self, monkeypatch):
+        calls = []
+        run_sync = workflow_module.run_sync
+
+        async def recording_run_sync(func, *args, **kwargs):
+            calls.append(func)
+            return await run_sync(func, *args, **kwargs)
+
+        monkeypatch.setattr(workflow_module, "run_sync", recording_run_sync)
+        return calls
+
+    def test_llm_vertices_run_concurrently_on_loop(self, sync_calls):
+        model = SleepyModel([_completion("answer")], delay=0.2)
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+        workflow.add_vertex(source)
+        workflow.add_vertex(sink)
+        for index in range(5):
+            llm = LLMVertex(id=f"llm{index}", params={MODEL: model, SYSTEM: "system", USER: [f"question {index}"]})
+            workflow.add_vertex(llm)
+            source | llm | sink
+
+        async def main():
+            start = time.time()
+            await workflow.execute_workflow_async({})
+            return time.time() - start, threading.get_ident()
+
+        elapsed, loop_thread = asyncio.run(main())
+
+        # 5 个 LLM 请求在事件循环中并发等待，串行至少需要 1 秒
+        assert elapsed < 0.6
+        assert len(model.threads) == 5
+        assert set(model.threads) == {loop_thread}
+        # source 与 sink 在顶点线程池中执行，LLMVertex 没有占用线程
+        assert {func.__self__.id for func in sync_calls} == {"source", "sink"}
+        for index in range(5):
+            vertex = workflow.vertices[f"llm{index}"]
+            assert vertex.output == "answer"
+            assert vertex.success is True
+            assert vertex.cost_time >= 0.2
+
+    def test_tool_calls_in_aexecute(self):
+        threads = []
+
+        def add(inputs, context):
+            threads.append(threading.get_ident())
+            return inputs["a"] + inputs["b"]
+
+        tool = FunctionTool(name="add", description="add two numbers", func=add)
+        tool_call = {"id": "call_1", "type": "function", "function": {"name": "add", "arguments": '{"a": 1, "b": 2}'}}
+        model = SleepyModel([_completion("", tool_calls=[tool_call]), _completion("3")])
+        llm = LLMVertex(id="llm", params={MODEL: model, SYSTEM: "system", USER: ["1 + 2"]}, tools=[tool])
+        assert llm.supports_aexecute()
+
+        async def main():
+            return await llm.aexecute({}, WorkflowContext()), threading.get_ident()
+
+        output, loop_thread = asyncio.run(main())
+
+        assert output == "3"
+        assert llm.output == "3"
+        # 工具在顶点线程池中执行，结果作为 tool 消息发给模型
+        assert threads and threads[0] != loop_thread
+        tool_message = model.requests[1][-1]
+        assert tool_message["role"] == "tool"
+        assert tool_message["tool_call_id"] == "call_1"
+        assert tool_message["content"] == "3"
+
+    def test_stream_vertices_emit_messages_on_loop(self, sync_calls):
+        model = SleepyModel([["Hello", ", ", "world"]], delay=0.2)
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+        workflow.add_vertex(source)
+        workflow.add_vertex(sink)
+        for index in range(3):
+            params = {MODEL: model, SYSTEM: "system", USER: [f"question {index}"], ENABLE_STREAM: True}
+            llm = LLMVertex(id=f"llm{index}", params=params)
+            workflow.add_vertex(llm)
+            source | llm | sink
+        messages = []
+        workflow.subscribe(EventType.MESSAGES, messages.append)
+
+        async def main():
+            start = time.time()
+            await workflow.execute_workflow_async({})
+            return time.time() - start, threading.get_ident()
+
+        elapsed, loop_thread = asyncio.run(main())
+
+        assert elapsed < 0.5
+        assert set(model.threads) == {loop_thread}
+        assert {func.__self__.id for func in sync_calls} == {"source", "sink"}
+        for index in range(3):
+            vertex_id = f"llm{index}"
+            assert workflow.vertices[vertex_id].output == "Hello, world"
+            events = [message for message in messages if message["vertex_id"] == vertex_id]
+            assert [event.get("content") for event in events[:-1]] == ["Hello", ", ", "world"]
+            assert events[-1]["status"] == "end"
+
+    def test_stream_error_becomes_content(self):
+        model = SleepyModel([RuntimeError("boom")])
+        llm = LLMVertex(id="llm", params={MODEL: model, USER: ["q"], ENABLE_STREAM: True})
+        assert llm.supports_aexecute()
+
+        output = asyncio.run(llm.aexecute({}, WorkflowContext()))
+
+        assert output == "流式处理遇到错误: boom"
+
+    def test_overridden_vertex_keeps_thread_path(self):
+        class CustomLLMVertex(LLMVertex):
+            def messages_redirect(self, inputs, context):
+                super().messages_redirect(inputs, context)
+
+        model = SleepyModel([_completion("answer")])
+        assert LLMVertex(id="llm", params={MODEL: model, USER: ["q"]}).supports_aexecute()
+        assert not CustomLLMVertex(id="custom", params={MODEL: model, USER: ["q"]}).supports_aexecute()
+        assert not LLMVertex(id="task", task=lambda inputs: "done", params={MODEL: model}).supports_aexecute()
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from threading import Event
+
+import pytest
+
+from vertex_flow.workflow.cancellation import (
+    CancellationToken,
+    DeadlineExceededError,
+    WorkflowCancelledError,
+    check_cancelled,
+    current_cancellation,
+    remaining_time,
+)
+from vertex_flow.workflow.chat import DeepSeek
+from vertex_flow.workflow.constants import SCHEDULER_READY_QUEUE, SCHEDULER_TOPOLOGICAL
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.vertex import FunctionVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def build_fan_out(slow_task, sibling_task, slow_params=None):
+    """source -> (slow, sibling) -> sink"""
+    workflow = Workflow(WorkflowContext())
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    slow = FunctionVertex(id="slow", task=slow_task, params=slow_params)
+    sibling = FunctionVertex(id="sibling", task=sibling_task)
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+    for vertex in [source, slow, sibling, sink]:
+        workflow.add_vertex(vertex)
+    source | slow | sink
+    source | sibling | sink
+    return workflow
+
+
+@pytest.fixture
+def release():
+    """阻塞且不检查取消的任务在测试结束时释放，避免线程残留到测试之后"""
+    event = Event()
+    yield event
+    event.set()
+
+
+class TestCancellationToken:
+    """测试取消令牌"""
+
+    def test_deadline(self):
+        token = CancellationToken(timeout=0.05)
+        assert not token.cancelled
+        time.sleep(0.06)
+
+        assert token.cancelled
+        assert token.remaining() == 0.0
+        with pytest.raises(DeadlineExceededError):
+            token.check()
+
+    def test_child_inherits_deadline_and_cancel(self):
+        parent = CancellationToken(timeout=10)
+        child = parent.child(timeout=100)
+        assert child.deadline == parent.deadline
+
+        parent.cancel(RuntimeError("sibling failed"))
+        assert child.cancelled
+        with pytest.raises(RuntimeError, match="sibling failed"):
+            child.check()
+
+    def test_activate_and_helpers(self):
+        assert current_cancellation() is None
+        assert remaining_time(default=3) == 3
+        check_cancelled()
+
+        token = CancellationToken(timeout=5)
+        with token.activate():
+            assert current_cancellation() is token
+            assert 0 < remaining_time() <= 5
+            token.cancel()
+            with pytest.raises(WorkflowCancelledError):
+                check_cancelled()
+        assert current_cancellation() is None
+
+    def test_wait_returns_when_cancelled(self):
+        token = CancellationToken()
+        token.cancel()
+        start = time.monotonic()
+        assert token.wait(5) is True
+        assert time.monotonic() - start < 1
+
+
+class TestWorkflowDeadlines:
+    """测试顶点超时、运行截止时间与快速失败"""
+
+    @pytest.mark.parametrize("scheduler_mode", [SCHEDULER_TOPOLOGICAL, SCHEDULER_READY_QUEUE])
+    def test_vertex_timeout_fails_fast(self, scheduler_mode, release):
+        observed = []
+
+        def sibling(inputs):
+            # 可中断的等待，运行失败后协作式退出
+            observed.append(current_cancellation().wait(5))
+            return {}
+
+        workflow = build_fan_out(lambda inputs: release.wait(5), sibling, slow_params={"timeout": 0.1})
+        workflow.set_scheduler_mode(scheduler_mode)
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError, match="vertex slow"):
+            workflow.execute_workflow({})
+
+        assert time.monotonic() - start < 0.8
+        deadline = time.monotonic() + 2
+        while not observed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert observed == [True]
+
+    def test_sibling_failure_cancels_running_vertices(self):
+        observed = []
+
+        def sibling(inputs):
+            observed.append(current_cancellation().wait(5))
+            return {}
+
+        def failing(inputs):
+            time.sleep(0.05)
+            raise ValueError("broken")
+
+        workflow = build_fan_out(failing, sibling)
+        workflow.set_scheduler_mode(SCHEDULER_READY_QUEUE)
+
+        start = time.monotonic()
+        with pytest.raises(ValueError, match="broken"):
+            workflow.execute_workflow({})
+        assert time.monotonic() - start < 1
+        deadline = time.monotonic() + 2
+        while not observed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert observed == [True]
+
+    def test_run_deadline(self, release):
+        workflow = build_fan_out(lambda inputs: release.wait(5), lambda inputs: {})
+        workflow.set_scheduler_mode(SCHEDULER_READY_QUEUE)
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError, match="workflow run"):
+            workflow.execute_workflow({}, timeout=0.1)
+        assert time.monotonic() - start < 0.8
+
+    def test_compiled_run_deadline(self, release):
+        workflow = build_fan_out(lambda inputs: release.wait(5), lambda inputs: {})
+        run = workflow.compile().create_run()
+
+        with pytest.raises(DeadlineExceededError):
+            run.execute({}, timeout=0.1)
+        assert run.error is not None
+
+    def test_async_vertex_timeout(self):
+        class AsyncSlow(FunctionVertex):
+            async def execute(self, inputs=None, context=None):
+                await asyncio.sleep(5)
+
+        workflow = build_fan_out(lambda inputs: {}, lambda inputs: {})
+        workflow.vertices["slow"].__class__ = AsyncSlow
+        workflow.vertices["slow"].params["timeout"] = 0.1
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(workflow.execute_workflow_async({}))
+        assert time.monotonic() - start < 1
+
+    def test_fast_vertices_unaffected(self):
+        workflow = build_fan_out(lambda inputs: {"v": 1}, lambda inputs: {"v": 2}, slow_params={"timeout": 5})
+        workflow.execute_workflow({}, timeout=5)
+
+        assert workflow.result()["sink"] == {"slow": {"v": 1}, "sibling": {"v": 2}}
+
+
+class TestChatModelDeadline:
+    """测试 LLM 请求超时取自截止时间"""
+
+    def test_request_timeout_from_deadline(self):
+        model = DeepSeek(sk="test")
+        assert "timeout" not in model._build_api_params([{"role": "user", "content": "hi"}])
+
+        with CancellationToken(timeout=5).activate():
+            params = model._build_api_params([{"role": "user", "content": "hi"}])
+        assert 0 < params["timeout"] <= 5
+
+    def test_cancelled_run_does_not_call_provider(self):
+        model = DeepSeek(sk="test")
+        token = CancellationToken()
+        token.cancel()
+        with token.activate():
+            with pytest.raises(WorkflowCancelledError):
+                model.chat([{"role": "user", "content": "hi"}])
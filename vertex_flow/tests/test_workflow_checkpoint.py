@@ -0,0 +1,231 @@
+import asyncio
+
+import pytest
+
+from vertex_flow.memory import FileMemory, InnerMemory
+from vertex_flow.workflow.checkpoint import CheckpointStore
+from vertex_flow.workflow.constants import (
+    LOCAL_VAR,
+    SCHEDULER_READY_QUEUE,
+    SCHEDULER_TOPOLOGICAL,
+    SOURCE_SCOPE,
+    SOURCE_VAR,
+    SUBGRAPH_SOURCE,
+)
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.vertex import FunctionVertex, MapVertexGroup, SinkVertex, SourceVertex
+from vertex_flow.workflow.vertex.while_vertex import WhileVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+class Crash(BaseException):
+    """模拟进程中断，不会被顶点内部的 except Exception 吞掉"""
+
+
+def build_pipeline(calls, fail_on=None, store=None):
+    """source -> research -> summarize -> sink，记录各顶点执行次数"""
+
+    def research(inputs):
+        calls.append("research")
+        return {"notes": f"notes of {inputs['source']['topic']}"}
+
+    def summarize(inputs):
+        calls.append("summarize")
+        if fail_on == "summarize":
+            raise RuntimeError("provider unavailable")
+        return {"summary": inputs["research"]["notes"].upper()}
+
+    workflow = Workflow(WorkflowContext())
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    first = FunctionVertex(id="research", task=research)
+    second = FunctionVertex(id="summarize", task=summarize)
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["summarize"])
+    for vertex in [source, first, second, sink]:
+        workflow.add_vertex(vertex)
+    source | first | second | sink
+    if store is not None:
+        workflow.set_checkpoint_store(store)
+    return workflow
+
+
+class TestCheckpointResume:
+    """测试检查点保存与恢复"""
+
+    @pytest.mark.parametrize("scheduler_mode", [SCHEDULER_TOPOLOGICAL, SCHEDULER_READY_QUEUE])
+    def test_resume_skips_completed_vertices(self, tmp_path, scheduler_mode):
+        store = CheckpointStore(FileMemory(storage_dir=str(tmp_path)))
+        calls = []
+        failed = build_pipeline(calls, fail_on="summarize", store=store)
+        failed.set_scheduler_mode(scheduler_mode)
+        with pytest.raises(RuntimeError, match="provider unavailable"):
+            failed.execute_workflow({"topic": "vertex"})
+        assert store.load_completed(failed.run_id).keys() == {"source", "research"}
+
+        calls.clear()
+        # 新的进程中使用同一份持久化存储恢复
+        resumed = build_pipeline(calls, store=CheckpointStore(FileMemory(storage_dir=str(tmp_path))))
+        resumed.set_scheduler_mode(scheduler_mode)
+        resumed.execute_workflow({"topic": "vertex"}, resume_from=failed.run_id)
+
+        assert calls == ["summarize"]
+        assert resumed.run_id == failed.run_id
+        assert resumed.result()["sink"] == {"summary": "NOTES OF VERTEX"}
+        assert resumed.vertices["research"].is_executed
+        assert resumed.context.get_output("research") == {"notes": "notes of vertex"}
+
+    def test_resume_requires_store(self):
+        workflow = build_pipeline([])
+        with pytest.raises(ValueError, match="checkpoint store"):
+            workflow.execute_workflow({"topic": "vertex"}, resume_from="missing")
+
+    def test_unserializable_output_is_recomputed(self):
+        store = CheckpointStore(InnerMemory())
+        workflow = build_pipeline([], store=store)
+        workflow.vertices["research"].task = lambda inputs: {"notes": "n", "handle": object()}
+        workflow.execute_workflow({"topic": "vertex"})
+
+        assert set(store.load_completed(workflow.run_id)) == {"source", "summarize", "sink"}
+
+    def test_clear(self):
+        store = CheckpointStore(InnerMemory())
+        workflow = build_pipeline([], store=store)
+        workflow.execute_workflow({"topic": "vertex"})
+
+        store.clear(workflow.run_id)
+        assert store.load_completed(workflow.run_id) == {}
+
+    def test_async_resume(self):
+        store = CheckpointStore(InnerMemory())
+        calls = []
+        failed = build_pipeline(calls, fail_on="summarize", store=store)
+        with pytest.raises(RuntimeError):
+            asyncio.run(failed.execute_workflow_async({"topic": "vertex"}))
+
+        calls.clear()
+        resumed = build_pipeline(calls, store=store)
+        asyncio.run(resumed.execute_workflow_async({"topic": "vertex"}, resume_from=failed.run_id))
+
+        assert calls == ["summarize"]
+        assert resumed.result()["sink"] == {"summary": "NOTES OF VERTEX"}
+
+    def test_compiled_run_resumes_by_run_id(self):
+        store = CheckpointStore(InnerMemory())
+        calls = []
+        failing = build_pipeline(calls, fail_on="summarize", store=store)
+        with pytest.raises(RuntimeError):
+            failing.compile().run({"topic": "vertex"}, run_id="run-1")
+
+        calls.clear()
+        run = build_pipeline(calls, store=store).compile().run({"topic": "vertex"}, run_id="run-1")
+
+        assert calls == ["summarize"]
+        assert run.result() == {"sink": {"summary": "NOTES OF VERTEX"}}
+
+
+class TestLoopCheckpoint:
+    """测试循环迭代状态的检查点"""
+
+    @staticmethod
+    def build_loop(iterations, crash_at=None, store=None):
+        def step(inputs):
+            index = inputs["iteration_index"]
+            if index == crash_at:
+                raise Crash()
+            iterations.append(index)
+            return {"total": inputs.get("total", 0) + index}
+
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        loop = WhileVertex(
+            id="loop",
+            execute_task=step,
+            condition_task=lambda inputs: inputs.get("total", 0) < 10,
+            max_iterations=10,
+        )
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["loop"])
+        for vertex in [source, loop, sink]:
+            workflow.add_vertex(vertex)
+        source | loop | sink
+        workflow.set_checkpoint_store(store)
+        return workflow
+
+    def test_loop_resumes_from_last_iteration(self):
+        store = CheckpointStore(InnerMemory())
+        iterations = []
+        crashed = self.build_loop(iterations, crash_at=3, store=store)
+        with pytest.raises(Crash):
+            crashed.execute_workflow({})
+        assert iterations == [0, 1, 2]
+        assert store.load_loop_state(crashed.run_id, "loop")["iteration_index"] == 3
+
+        iterations.clear()
+        resumed = self.build_loop(iterations, store=store)
+        resumed.execute_workflow({}, resume_from=crashed.run_id)
+
+        assert iterations == [3, 4]
+        output = resumed.result()["sink"]
+        assert output["iteration_count"] == 5
+        assert output["final_inputs"]["total"] == 10
+        assert len(output["results"]) == 5
+        # 循环完成后不再保留迭代状态
+        assert store.load_loop_state(crashed.run_id, "loop") is None
+
+    def test_loop_state_cleared_when_loop_finishes(self):
+        store = CheckpointStore(InnerMemory())
+        iterations = []
+        loop = WhileVertex(
+            id="loop",
+            execute_task=lambda inputs: iterations.append(inputs["iteration_index"]) or {"n": inputs.get("n", 0) + 1},
+            condition_task=lambda inputs: inputs.get("n", 0) < 3,
+        )
+        checkpoint = store.open("run-1")
+        with checkpoint.activate():
+            loop.execute(inputs={}, context=WorkflowContext())
+            assert store.load_loop_state("run-1", "loop") is None
+            loop.execute(inputs={}, context=WorkflowContext())
+
+        assert iterations == [0, 1, 2, 0, 1, 2]
+
+    def test_clear_removes_nested_loop_state(self):
+        store = CheckpointStore(InnerMemory())
+        checkpoint = store.open("run-1")
+        checkpoint.save_loop_state("group_while_controller", {"iteration_index": 2})
+
+        store.clear("run-1")
+        assert store.load_loop_state("run-1", "group_while_controller") is None
+        assert store.open("run-1")._loops == set()
+
+    def test_map_items_keep_loop_state_in_own_scope(self):
+        store = CheckpointStore(InnerMemory())
+        iterations = []
+
+        def build_map(crash=None):
+            def step(inputs):
+                item, index = inputs["item"], inputs["iteration_index"]
+                if (item, index) == crash:
+                    raise Crash()
+                iterations.append((item, index))
+                return {"count": index + 1}
+
+            loop = WhileVertex(
+                id="loop",
+                execute_task=step,
+                condition_task=lambda inputs: inputs.get("count", 0) < inputs["item"],
+                variables=[{SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: "item", LOCAL_VAR: "item"}],
+            )
+            return MapVertexGroup(id="map", subgraph_vertices=[loop], concurrency=1)
+
+        checkpoint = store.open("run-1")
+        with checkpoint.activate():
+            with pytest.raises(Crash):
+                build_map(crash=(3, 1)).execute(inputs={"items": [2, 3]}, context=WorkflowContext())
+        assert iterations == [(2, 0), (2, 1), (3, 0)]
+        assert store.load_loop_state("run-1", "map.0.loop") is None
+        assert store.load_loop_state("run-1", "map.1.loop")["iteration_index"] == 1
+        assert store.load_loop_state("run-1", "loop") is None
+
+        iterations.clear()
+        with store.open("run-1").activate():
+            build_map().execute(inputs={"items": [2, 3]}, context=WorkflowContext())
+        assert sorted(iterations) == [(2, 0), (2, 1), (3, 1), (3, 2)]
+        assert store.open("run-1")._loops == set()
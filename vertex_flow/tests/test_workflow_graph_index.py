@@ -0,0 +1,151 @@
+import pytest
+
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.edge import Condition, Edge
+from vertex_flow.workflow.vertex import FunctionVertex, IfCase, IfElseVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def build_diamond_workflow():
+    """source -> a -> b -> sink，同时 source -> c -> sink，最长路径为 3"""
+    workflow = Workflow(WorkflowContext())
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    a = FunctionVertex(id="a", task=lambda inputs: {"a": 1})
+    b = FunctionVertex(id="b", task=lambda inputs: {"b": 1})
+    c = FunctionVertex(id="c", task=lambda inputs: {"c": 1})
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+    for vertex in [source, a, b, c, sink]:
+        workflow.add_vertex(vertex)
+    source | a | b | sink
+    source | c | sink
+    return workflow
+
+
+class TestWorkflowGraphIndex:
+    """测试 Workflow 的邻接索引及基于索引的图算法"""
+
+    def test_edge_indexes(self):
+        workflow = build_diamond_workflow()
+
+        assert {edge.target_vertex.id for edge in workflow.get_out_edges("source")} == {"a", "c"}
+        assert {edge.source_vertex.id for edge in workflow.get_in_edges("sink")} == {"b", "c"}
+        assert workflow.get_in_edges("source") == []
+        assert workflow.get_out_edges("sink") == []
+
+    def test_duplicate_edge_is_not_indexed_twice(self):
+        workflow = build_diamond_workflow()
+        a, b = workflow.vertices["a"], workflow.vertices["b"]
+
+        workflow.add_edge(Edge(a, b))
+
+        assert len(workflow.get_out_edges("a")) == 1
+        assert len(workflow.get_in_edges("b")) == 1
+
+    def test_topological_sort_keeps_in_degree(self):
+        workflow = build_diamond_workflow()
+
+        workflow.topological_sort()
+
+        order = [vertex.id for vertex in workflow.topological_order]
+        assert order[0] == "source"
+        assert order[-1] == "sink"
+        assert order.index("a") < order.index("b")
+        assert workflow.vertices["sink"].in_degree == 2
+
+    def test_topological_sort_detects_cycle(self):
+        workflow = build_diamond_workflow()
+        workflow.add_edge(Edge(workflow.vertices["b"], workflow.vertices["a"]))
+
+        with pytest.raises(ValueError, match="cycle"):
+            workflow.topological_sort()
+
+    def test_find_subgraph(self):
+        workflow = build_diamond_workflow()
+
+        subgraph = {vertex.id for vertex in workflow.find_subgraph("a")}
+
+        assert subgraph == {"a", "b", "sink"}
+
+    def test_dag_length(self):
+        workflow = build_diamond_workflow()
+
+        assert workflow._calculate_dag_length() == 3
+
+        workflow.smart_wait_time_enabled = True
+        workflow._calculate_wait_time()
+        assert workflow.wait_time == 30 + 3 * 15
+
+    def test_critical_path_priorities(self):
+        workflow = build_diamond_workflow()
+
+        # 没有历史耗时时按剩余顶点数计算，a 所在的分支更长
+        priorities = workflow._vertex_priorities()
+        assert priorities["a"] == 3
+        assert priorities["c"] == 2
+        assert priorities["source"] == 4
+
+        # c 的历史耗时更长时优先派发 c
+        workflow.vertices["a"].cost_estimate = 0.1
+        workflow.vertices["b"].cost_estimate = 0.1
+        workflow.vertices["c"].cost_estimate = 2.0
+        priorities = workflow._vertex_priorities()
+        assert priorities["c"] > priorities["a"]
+
+    def test_cost_estimate_is_moving_average(self):
+        workflow = build_diamond_workflow()
+        vertex = workflow.vertices["c"]
+        assert vertex.cost_estimate is None
+
+        workflow.execute_workflow({})
+        assert vertex.cost_estimate == pytest.approx(vertex.cost_time)
+
+        vertex.cost_estimate = 1.0
+        vertex.record_cost_time(2.0)
+        assert vertex.cost_estimate == pytest.approx(1.3)
+
+    def test_dag_length_on_long_chain(self):
+        workflow = Workflow(WorkflowContext())
+        previous = workflow.add_vertex(SourceVertex(id="source", task=lambda inputs, context: inputs))
+        # 宽度为 2 的长链，原有的路径 DFS 在这种图上是指数级的
+        for index in range(200):
+            left = workflow.add_vertex(FunctionVertex(id=f"l{index}", task=lambda inputs: inputs))
+            right = workflow.add_vertex(FunctionVertex(id=f"r{index}", task=lambda inputs: inputs))
+            join = workflow.add_vertex(FunctionVertex(id=f"j{index}", task=lambda inputs: inputs))
+            previous | left | join
+            previous | right | join
+            previous = join
+        previous | workflow.add_vertex(SinkVertex(id="sink", task=lambda inputs, context: inputs))
+
+        assert workflow._calculate_dag_length() == 200 * 2 + 1
+
+    def test_filter_subgraph_uses_in_edges(self):
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        if_else = IfElseVertex(
+            id="if_else",
+            cases=[
+                IfCase(
+                    conditions=[
+                        {
+                            "variable_selector": {"source_scope": "source", "source_var": "flag", "local_var": "flag"},
+                            "operator": "==",
+                            "value": "yes",
+                        }
+                    ],
+                    id="true",
+                )
+            ],
+        )
+        branch = FunctionVertex(id="branch", task=lambda inputs: inputs)
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+        for vertex in [source, if_else, branch, sink]:
+            workflow.add_vertex(vertex)
+        source | if_else
+        workflow.add_edge(Edge(if_else, branch, Condition(id="true")))
+        branch | sink
+        if_else.output = {"false": True}
+
+        filtered, subgraph = workflow.mayebe_filter_subgraph(branch)
+
+        assert filtered
+        assert subgraph == {"branch", "sink"}
@@ -0,0 +1,120 @@
+import pytest
+
+from vertex_flow.workflow.constants import LOCAL_VAR, SOURCE_SCOPE, SOURCE_VAR
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.vertex import FunctionVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+from vertex_flow.workflow.workflow_instance import WorkflowInstance
+
+
+def input_selector(name):
+    return {SOURCE_SCOPE: None, SOURCE_VAR: name, LOCAL_VAR: name, "required": True}
+
+
+def build_qa_workflow(calls):
+    """docs -> index -> answer <- question，answer -> sink"""
+
+    def index(inputs):
+        calls.append("index")
+        return {"size": len(inputs["docs"]["docs"])}
+
+    def answer(inputs):
+        calls.append("answer")
+        return {"text": f"{inputs['question']['question']}@{inputs['index']['size']}"}
+
+    workflow = Workflow(WorkflowContext())
+    docs = SourceVertex(id="docs", variables=[input_selector("docs")])
+    question = SourceVertex(id="question", variables=[input_selector("question")])
+    index_vertex = FunctionVertex(id="index", task=index)
+    answer_vertex = FunctionVertex(id="answer", task=answer)
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["answer"])
+    for vertex in [docs, question, index_vertex, answer_vertex, sink]:
+        workflow.add_vertex(vertex)
+    docs | index_vertex | answer_vertex
+    question | answer_vertex | sink
+    return workflow
+
+
+class TestWorkflowRerun:
+    """测试增量重新执行"""
+
+    def test_only_affected_subgraph_reruns(self):
+        calls = []
+        workflow = build_qa_workflow(calls)
+        workflow.execute_workflow({"docs": ["a", "b"], "question": "q1"})
+        calls.clear()
+
+        rerun_ids = workflow.rerun({"question": "q2"})
+
+        assert rerun_ids == ["question", "answer", "sink"]
+        assert calls == ["answer"]
+        assert workflow.result()["sink"] == {"text": "q2@2"}
+        assert workflow.context.get_output("answer") == {"text": "q2@2"}
+
+    def test_unchanged_inputs_rerun_nothing(self):
+        calls = []
+        workflow = build_qa_workflow(calls)
+        workflow.execute_workflow({"docs": ["a"], "question": "q1"})
+        calls.clear()
+
+        assert workflow.rerun({"question": "q1"}) == []
+        assert calls == []
+
+    def test_dirty_vertices_and_accumulated_inputs(self):
+        calls = []
+        workflow = build_qa_workflow(calls)
+        workflow.execute_workflow({"docs": ["a"], "question": "q1"})
+        workflow.rerun({"docs": ["a", "b", "c"]})
+        calls.clear()
+
+        rerun_ids = workflow.rerun(dirty_vertices=["index"])
+
+        assert rerun_ids == ["index", "answer", "sink"]
+        assert calls == ["index", "answer"]
+        assert workflow.result()["sink"] == {"text": "q1@3"}
+
+    def test_requires_executed_workflow(self):
+        workflow = build_qa_workflow([])
+        with pytest.raises(RuntimeError, match="execute_workflow"):
+            workflow.rerun({"question": "q"})
+
+    def test_compiled_run_rerun(self):
+        calls = []
+        workflow = build_qa_workflow(calls)
+        run = workflow.compile().run({"docs": ["a", "b"], "question": "q1"})
+        calls.clear()
+
+        rerun_ids = run.rerun({"question": "q2"})
+
+        assert rerun_ids == ["question", "answer", "sink"]
+        assert calls == ["answer"]
+        assert run.result() == {"sink": {"text": "q2@2"}}
+        assert run.source_inputs == {"docs": ["a", "b"], "question": "q2"}
+        assert workflow.vertices["answer"].output is None
+
+    def test_failed_run_can_not_rerun(self):
+        workflow = build_qa_workflow([])
+        workflow.vertices["index"].task = lambda inputs: 1 / 0
+        run = workflow.compile().create_run()
+        with pytest.raises(ZeroDivisionError):
+            run.execute({"docs": [], "question": "q"})
+
+        with pytest.raises(RuntimeError, match="not completed"):
+            run.rerun({"question": "q2"})
+
+    def test_workflow_instance_rerun(self):
+        calls = []
+
+        class StubManager:
+            def _create_workflow_from_nodes_edges(self, nodes, edges):
+                return build_qa_workflow(calls)
+
+        instance = WorkflowInstance({"id": "workflow_1"}, {"docs": ["a"], "question": "q1"}, StubManager())
+        instance.execute()
+        calls.clear()
+
+        assert instance.rerun({"question": "q2"}) == ["question", "answer", "sink"]
+        assert calls == ["answer"]
+        assert instance.status == "completed"
+        assert instance.input_data == {"docs": ["a"], "question": "q2"}
+        assert instance.node_outputs["answer"] == {"text": "q2@1"}
@@ -0,0 +1,297 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from vertex_flow.workflow.constants import WORKFLOW_COMPLETE, WORKFLOW_FAILED
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.event_channel import EventType
+from vertex_flow.workflow.run_state import RunScoped, RunState
+from vertex_flow.workflow.vertex import FunctionVertex, LLMVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def build_echo_workflow(delay=0.0):
+    """source -> upper -> sink，upper 把问题转成大写"""
+
+    def upper(inputs, context=None):
+        time.sleep(delay)
+        return {"answer": inputs["source"]["question"].upper()}
+
+    workflow = Workflow(WorkflowContext(env_parameters={"env": "test"}))
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+    worker = FunctionVertex(id="upper", task=upper)
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["upper"])
+    for vertex in [source, worker, sink]:
+        workflow.add_vertex(vertex)
+    source | worker | sink
+    return workflow
+
+
+class Holder:
+    value = RunScoped(default=0)
+    items = RunScoped(factory=list)
+    configured = RunScoped(inherit=True)
+
+
+class TestRunState:
+    """测试运行作用域属性"""
+
+    def test_falls_back_to_instance_without_run(self):
+        holder = Holder()
+        holder.value = 3
+        holder.items.append("a")
+
+        assert holder.value == 3
+        assert holder.items == ["a"]
+
+    def test_isolated_between_runs(self):
+        holder = Holder()
+        holder.value = 1
+        first, second = RunState(), RunState()
+
+        with first.activate():
+            holder.value = 10
+            holder.items.append("first")
+        with second.activate():
+            assert holder.value == 0
+            assert holder.items == []
+
+        with first.activate():
+            assert holder.value == 10
+            assert holder.items == ["first"]
+        assert holder.value == 1
+
+    def test_inherit_copies_configured_value(self):
+        holder = Holder()
+        holder.configured = ["configured"]
+        state = RunState()
+
+        with state.activate():
+            holder.configured.append("run")
+            assert holder.configured == ["configured", "run"]
+        assert holder.configured == ["configured"]
+
+    def test_wrap_binds_state_in_other_thread(self):
+        holder = Holder()
+        state = RunState()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(state.wrap(lambda: setattr(holder, "value", 5))).result()
+
+        with state.activate():
+            assert holder.value == 5
+        assert holder.value == 0
+
+
+class TestWorkflowRun:
+    """测试编译后的执行计划与并发运行"""
+
+    def test_compile_is_cached_until_graph_changes(self):
+        workflow = build_echo_workflow()
+        plan = workflow.compile()
+
+        assert workflow.compile() is plan
+        assert plan.topological_order == ("source", "upper", "sink")
+        assert plan.source_ids == {"source"}
+        assert plan.dependencies["sink"] == {"upper"}
+
+        extra = workflow.add_vertex(SinkVertex(id="extra", task=lambda inputs, context: inputs))
+        workflow.vertices["upper"] | extra
+        assert workflow.compile() is not plan
+
+    def test_compile_validates_graph(self):
+        workflow = Workflow(WorkflowContext())
+        workflow.add_vertex(SourceVertex(id="source", task=lambda inputs, context: inputs))
+
+        with pytest.raises(ValueError, match="sink"):
+            workflow.compile()
+
+    def test_runs_are_repeatable_and_isolated(self):
+        workflow = build_echo_workflow()
+        plan = workflow.compile()
+
+        first = plan.run({"question": "first"})
+        second = plan.run({"question": "second"})
+
+        assert first.result() == {"sink": {"answer": "FIRST"}}
+        assert second.result() == {"sink": {"answer": "SECOND"}}
+        assert first.context.get_output("upper") == {"answer": "FIRST"}
+        assert first.context.get_env_parameter("env") == "test"
+        assert first.status()["upper"]["status"] is True
+        # 运行结果不会写回共享的顶点对象
+        assert workflow.vertices["upper"].output is None
+        assert not workflow.vertices["upper"].is_executed
+        assert not workflow.executed
+
+    def test_concurrent_runs(self):
+        workflow = build_echo_workflow(delay=0.05)
+        plan = workflow.compile()
+        questions = [f"q{index}" for index in range(8)]
+
+        with ThreadPoolExecutor(max_workers=len(questions)) as executor:
+            runs = list(executor.map(lambda question: plan.run({"question": question}), questions))
+
+        for question, run in zip(questions, runs):
+            assert run.get_output("sink") == {"answer": question.upper()}
+        assert len({run.run_id for run in runs}) == len(questions)
+
+    def test_run_failure(self):
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+
+        def failing(inputs):
+            raise RuntimeError("run failed")
+
+        broken = FunctionVertex(id="broken", task=failing)
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+        for vertex in [source, broken, sink]:
+            workflow.add_vertex(vertex)
+        source | broken | sink
+        plan = workflow.compile()
+        run = plan.create_run()
+
+        updates = []
+        run.subscribe(EventType.UPDATES, updates.append)
+        with pytest.raises(RuntimeError, match="run failed"):
+            run.execute({})
+
+        assert isinstance(run.error, RuntimeError)
+        assert run.is_finished()
+        assert run.status()["broken"]["status"] is False
+        assert updates[-1]["status"] == WORKFLOW_FAILED
+        with pytest.raises(RuntimeError, match="duplicated"):
+            run.execute({})
+
+    def test_events_go_to_run_channel(self):
+        workflow = build_echo_workflow()
+        plan = workflow.compile()
+
+        async def collect():
+            run = plan.start_run({"question": "stream"})
+            events = [event async for event in run.astream([EventType.VALUES, EventType.UPDATES])]
+            assert run.wait(5)
+            return run, events
+
+        run, events = asyncio.run(collect())
+
+        assert events[-1]["status"] == WORKFLOW_COMPLETE
+        assert any(event.get("vertex_id") == "upper" for event in events)
+        assert workflow.event_channel.event_queues[EventType.VALUES].qsize() == 0
+
+    def test_llm_messages_are_per_run(self):
+        def fake_chat(inputs, context=None):
+            return " ".join(message["content"] for message in llm.messages)
+
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        llm = LLMVertex(id="llm", task=fake_chat)
+        llm.system_message = "sys"
+        llm.user_messages = ["{{source.question}}"]
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["llm"])
+        for vertex in [source, llm, sink]:
+            workflow.add_vertex(vertex)
+        source | llm | sink
+        plan = workflow.compile()
+
+        barrier = threading.Barrier(2)
+
+        def run(question):
+            return plan.run({"question": question})
+
+        original_redirect = llm.messages_redirect
+
+        def synchronized_redirect(inputs, context):
+            original_redirect(inputs, context)
+            barrier.wait(timeout=5)
+
+        llm.messages_redirect = synchronized_redirect
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first, second = executor.map(run, ["alpha", "beta"])
+
+        assert first.get_output("llm") == "sys alpha"
+        assert second.get_output("llm") == "sys beta"
+        assert llm.messages == []
+        assert llm.user_messages == ["{{source.question}}"]
+
+
+class TestExecuteBatch:
+    """测试在执行计划上批量执行多条记录"""
+
+    @staticmethod
+    def build_workflow(active=None):
+        """source -> upper -> sink，记录中的 delay 控制耗时，问题为 bad 时失败"""
+        lock = threading.Lock()
+
+        def upper(inputs, context=None):
+            record = inputs["source"]
+            if active is not None:
+                with lock:
+                    active["now"] += 1
+                    active["max"] = max(active["max"], active["now"])
+            try:
+                time.sleep(record.get("delay", 0))
+                if record["question"] == "bad":
+                    raise ValueError("bad record")
+                return {"answer": record["question"].upper()}
+            finally:
+                if active is not None:
+                    with lock:
+                        active["now"] -= 1
+
+        workflow = Workflow(WorkflowContext())
+        source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+        worker = FunctionVertex(id="upper", task=upper)
+        sink = SinkVertex(id="sink", task=lambda inputs, context: inputs["upper"])
+        for vertex in [source, worker, sink]:
+            workflow.add_vertex(vertex)
+        source | worker | sink
+        return workflow
+
+    def test_results_in_input_order_and_failures_do_not_abort(self):
+        workflow = self.build_workflow()
+        records = [{"question": "a", "delay": 0.05}, {"question": "bad"}, {"question": "c"}]
+
+        results = list(workflow.execute_batch(records, concurrency=3))
+
+        assert [result.index for result in results] == [0, 1, 2]
+        assert results[0].output == {"sink": {"answer": "A"}}
+        assert not results[1].ok
+        assert isinstance(results[1].error, ValueError)
+        assert results[1].run.status()["upper"]["status"] is False
+        assert results[2].output == {"sink": {"answer": "C"}}
+        assert len({result.run.run_id for result in results}) == 3
+
+    def test_unordered_results_and_bounded_concurrency(self):
+        active = {"now": 0, "max": 0}
+        plan = self.build_workflow(active).compile()
+        records = [{"question": f"q{index}", "delay": 0.1 if index == 0 else 0.01} for index in range(8)]
+
+        results = list(plan.execute_batch(records, concurrency=2, ordered=False))
+
+        assert sorted(result.index for result in results) == list(range(8))
+        # 慢记录不阻塞其它记录返回
+        assert results[0].index != 0
+        assert active["max"] == 2
+        assert all(result.output == {"sink": {"answer": result.inputs["question"].upper()}} for result in results)
+
+    def test_records_are_consumed_lazily_and_close_stops_batch(self):
+        plan = self.build_workflow().compile()
+        consumed = []
+
+        def records():
+            for index in range(100):
+                consumed.append(index)
+                yield {"question": f"q{index}", "delay": 0.01}
+
+        batch = plan.execute_batch(records(), concurrency=2)
+        first = next(batch)
+        batch.close()
+
+        assert first.output == {"sink": {"answer": "Q0"}}
+        assert len(consumed) <= 5
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError, match="concurrency"):
+            self.build_workflow().compile().execute_batch([], concurrency=0)
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from vertex_flow.workflow.chat import DeepSeek
+from vertex_flow.workflow.constants import SCHEDULER_READY_QUEUE, SCHEDULER_TOPOLOGICAL
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.tools.functions import FunctionTool
+from vertex_flow.workflow.tracing import Tracer, bind_trace, current_tracer, trace_instant, trace_span
+from vertex_flow.workflow.vertex import FunctionVertex, SinkVertex, SourceVertex
+from vertex_flow.workflow.workflow import Workflow
+
+
+def build_workflow(tool=None):
+    """source -> (slow, fast) -> sink"""
+    workflow = Workflow(WorkflowContext())
+    source = SourceVertex(id="source", task=lambda inputs, context: inputs)
+
+    def slow_task(inputs, context):
+        time.sleep(0.05)
+        if tool is not None:
+            tool.execute({}, context)
+        return 1
+
+    slow = FunctionVertex(id="slow", task=slow_task)
+    fast = FunctionVertex(id="fast", task=lambda inputs, context: 2)
+    sink = SinkVertex(id="sink", task=lambda inputs, context: inputs)
+    for vertex in [source, slow, fast, sink]:
+        workflow.add_vertex(vertex)
+    source | slow | sink
+    source | fast | sink
+    return workflow
+
+
+def spans(tracer, category=None):
+    return [event for event in tracer.events if event["ph"] == "X" and (category is None or event["cat"] == category)]
+
+
+class TestTracer:
+    """测试追踪器本身"""
+
+    def test_disabled_tracing_records_nothing(self):
+        assert current_tracer() is None
+        with trace_span("noop", "vertex") as span:
+            trace_instant("noop", "vertex")
+        assert span is None
+
+    def test_nested_spans_and_cross_thread_parent(self):
+        tracer = Tracer()
+        with tracer.activate():
+            with trace_span("outer", "workflow") as outer:
+                with trace_span("inner", "vertex"):
+                    pass
+
+                def run():
+                    with trace_span("worker", "vertex"):
+                        pass
+
+                thread = threading.Thread(target=bind_trace(run))
+                thread.start()
+                thread.join()
+
+        events = {event["name"]: event for event in spans(tracer)}
+        assert events["inner"]["args"]["parent_id"] == outer.span_id
+        assert events["worker"]["args"]["parent_id"] == outer.span_id
+        assert events["worker"]["tid"] != events["outer"]["tid"]
+        assert events["outer"]["dur"] >= events["inner"]["dur"]
+        # 跨线程的父子关系以 flow 事件表示
+        flows = [event for event in tracer.events if event["cat"] == "flow"]
+        assert {event["ph"] for event in flows} == {"s", "f"}
+
+    def test_span_records_error(self):
+        tracer = Tracer()
+        with tracer.activate(), pytest.raises(ValueError):
+            with trace_span("failing", "vertex"):
+                raise ValueError("boom")
+
+        assert "boom" in spans(tracer)[0]["args"]["error"]
+
+
+class TestWorkflowTracing:
+    """测试工作流执行的追踪"""
+
+    @pytest.mark.parametrize("scheduler_mode", [SCHEDULER_TOPOLOGICAL, SCHEDULER_READY_QUEUE])
+    def test_execute_workflow_records_vertex_and_tool_spans(self, scheduler_mode, tmp_path):
+        tool = FunctionTool(name="lookup", description="lookup", func=lambda inputs, context: "ok")
+        workflow = build_workflow(tool)
+        workflow.set_scheduler_mode(scheduler_mode)
+        tracer = workflow.set_tracer(Tracer())
+
+        workflow.execute_workflow({})
+
+        (run,) = spans(tracer, "workflow")
+        vertex_spans = {event["name"]: event for event in spans(tracer, "vertex")}
+        assert set(vertex_spans) == {"source", "slow", "fast", "sink"}
+        for event in vertex_spans.values():
+            assert event["args"]["parent_id"] == run["args"]["span_id"]
+        assert vertex_spans["slow"]["dur"] >= 50_000
+
+        (tool_span,) = spans(tracer, "tool")
+        assert tool_span["args"]["parent_id"] == vertex_spans["slow"]["args"]["span_id"]
+
+        schedule_events = [event for event in tracer.events if event["cat"] == "schedule"]
+        assert any(event["args"].get("vertex_id") == "sink" for event in schedule_events if "args" in event)
+
+        path = tracer.export_chrome_trace(str(tmp_path / "trace.json"))
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+        assert trace["displayTimeUnit"] == "ms"
+        assert any(event["ph"] == "M" and event["name"] == "thread_name" for event in trace["traceEvents"])
+
+    def test_execute_workflow_async_records_queue_delay(self):
+        workflow = build_workflow()
+        tracer = workflow.set_tracer(Tracer())
+
+        asyncio.run(workflow.execute_workflow_async({}))
+
+        assert {event["name"] for event in spans(tracer, "vertex")} == {"source", "slow", "fast", "sink"}
+        queued = [event for event in tracer.events if event["name"] == "queued" and event["ph"] == "b"]
+        assert {event["args"]["vertex_id"] for event in queued} == {"source", "slow", "fast", "sink"}
+
+    def test_tracing_disabled_by_default(self):
+        workflow = build_workflow()
+        workflow.execute_workflow({})
+        assert workflow.tracer is None
+
+
+class TestChatModelTracing:
+    """测试模型请求的追踪"""
+
+    def test_stream_records_time_to_first_token_and_chunks(self, monkeypatch):
+        model = DeepSeek(sk="test")
+
+        def chunk(content):
+            delta = SimpleNamespace(content=content)
+            return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+        def fake_create(**kwargs):
+            time.sleep(0.02)
+            return iter([chunk("a"), chunk("bc")])
+
+        monkeypatch.setattr(model.client.chat.completions, "create", fake_create)
+        tracer = Tracer()
+        with tracer.activate():
+            output = list(model.chat_stream([{"role": "user", "content": "hi"}]))
+
+        assert output == ["a", "bc"]
+        (request,) = spans(tracer, "llm")
+        assert request["name"] == "chat_stream"
+        assert request["args"]["chunks"] == 2
+        assert request["args"]["ttft_ms"] >= 20
+        chunks = [event for event in tracer.events if event["name"] == "chunk"]
+        assert [event["args"]["size"] for event in chunks] == [1, 2]
+        assert all(event["args"]["parent_id"] == request["args"]["span_id"] for event in chunks)
@@ -1,8 +1,8 @@
 import argparse
+import asyncio
 import datetime
 import json
 import os
-import threading
 import time
 import traceback
 from typing import Any, Dict, List, Optional
@@ -467,19 +467,58 @@ def get_default_workflow(input_data):
     return workflow
 
 
-# 定义一个函数来执行您希望在新线程中运行的任务
-def execute_in_thread(workflow, user_vars):
+# 后台执行中的工作流任务，持有引用避免任务被垃圾回收
+_background_tasks = set()
+
+
+async def execute_in_background(workflow, user_vars):
     try:
-        workflow.execute_workflow(user_vars, stream=True)
-        logger.info("Workflow executed successfully in a separate thread.")
+        await workflow.execute_workflow_async(user_vars)
+        logger.info("Workflow executed successfully in background task.")
     except Exception as e:
-        logger.error(f"Error executing workflow in thread: {e}")
-
+        logger.error(f"Error executing workflow in background task: {e}")
+
+
+# 在当前事件循环中以后台任务执行工作流，不再为每个请求单独创建线程
+def execute_workflow_in_background(workflow, user_vars):
+    task = asyncio.create_task(execute_in_background(workflow, user_vars))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def format_stream_event(workflow: Workflow, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """把一个工作流事件转换为流式响应的消息体，非顶点消息返回 None"""
+    if not result.get(VERTEX_ID_KEY):
+        return None
+    # 统一处理不同的消息键名
+    output_content = result.get(CONTENT_KEY) or result.get(MESSAGE_KEY) or ""
+    # 获取消息类型，用于前端区分显示
+    message_type = result.get(TYPE_KEY, MESSAGE_TYPE_REGULAR)
+    line = {
+        VERTEX_ID_KEY: result[VERTEX_ID_KEY],
+        OUTPUT_KEY: output_content,
+        TYPE_KEY: message_type,
+        "status": True,
+    }
 
-# 在您的代码中创建并启动一个新线程
-def execute_workflow_in_thread(workflow, user_vars):
-    thread = threading.Thread(target=execute_in_thread, args=(workflow, user_vars))
-    thread.start()
+    # 检查是否为流式结束消息，附加usage
+    if message_type == MESSAGE_TYPE_END:
+        token_usage = {}
+        total_token_usage = {}
+        try:
+            if hasattr(workflow, "vertices"):
+                for vertex in workflow.vertices.values():
+                    if hasattr(vertex, "task_type") and vertex.task_type == "LLM":
+                        if hasattr(vertex, "token_usage") and vertex.token_usage:
+                            token_usage = vertex.token_usage
+                        if hasattr(vertex, "get_total_usage"):
+                            total_token_usage = vertex.get_total_usage()
+                        break
+        except Exception as e:
+            logger.warning(f"Could not collect token usage: {e}")
+        line["token_usage"] = token_usage
+        line["total_token_usage"] = total_token_usage
+    return line
 
 
 @vertex_flow.post("/workflow", response_model=WorkflowOutput)
@@ -523,54 +562,23 @@ async def execute_workflow_endpoint(request: Request, input_data: WorkflowInput)
         # 使用WorkflowInstanceManager创建新实例进行流式执行
         workflow_instance = workflow_instance_manager.create_instance(workflow, input_data.user_vars)
 
-        execute_workflow_in_thread(workflow_instance.workflow_obj, input_data.user_vars)
+        execute_workflow_in_background(workflow_instance.workflow_obj, input_data.user_vars)
+
+        def format_result(result):
+            """把一个事件编码为一行 JSON，非顶点消息返回 None"""
+            line = format_stream_event(workflow, result)
+            return None if line is None else json.dumps(line, ensure_ascii=False) + "\n"
 
         async def result_generator():
             try:
-                async for result in workflow_instance.workflow_obj.astream([EventType.MESSAGES, EventType.UPDATES]):
-                    logger.info(f"workflow result {result}")
-                    if result.get(VERTEX_ID_KEY):
-                        # 统一处理不同的消息键名
-                        output_content = result.get(CONTENT_KEY) or result.get(MESSAGE_KEY) or ""
-                        # 获取消息类型，用于前端区分显示
-                        message_type = result.get(TYPE_KEY, MESSAGE_TYPE_REGULAR)
-
-                        # 检查是否为流式结束消息，附加usage
-                        if message_type == MESSAGE_TYPE_END:
-                            token_usage = {}
-                            total_token_usage = {}
-                            try:
-                                if hasattr(workflow, "vertices"):
-                                    for vertex in workflow.vertices.values():
-                                        if hasattr(vertex, "task_type") and vertex.task_type == "LLM":
-                                            if hasattr(vertex, "token_usage") and vertex.token_usage:
-                                                token_usage = vertex.token_usage
-                                            if hasattr(vertex, "get_total_usage"):
-                                                total_token_usage = vertex.get_total_usage()
-                                            break
-                            except Exception as e:
-                                logger.warning(f"Could not collect token usage: {e}")
-                            yield json.dumps(
-                                {
-                                    VERTEX_ID_KEY: result[VERTEX_ID_KEY],
-                                    OUTPUT_KEY: output_content,
-                                    TYPE_KEY: message_type,
-                                    "status": True,
-                                    "token_usage": token_usage,
-                                    "total_token_usage": total_token_usage,
-                                },
-                                ensure_ascii=False,
-                            ) + "\n"
-                        else:
-                            yield json.dumps(
-                                {
-                                    VERTEX_ID_KEY: result[VERTEX_ID_KEY],
-                                    OUTPUT_KEY: output_content,
-                                    TYPE_KEY: message_type,
-                                    "status": True,
-                                },
-                                ensure_ascii=False,
-                            ) + "\n"
+                # 按批获取事件：连续的 token 分片已在事件通道中合并，每批只写出一次
+                async for batch in workflow_instance.workflow_obj.astream_batches(
+                    [EventType.MESSAGES, EventType.UPDATES]
+                ):
+                    logger.debug(f"workflow result batch {batch}")
+                    lines = [line for line in map(format_result, batch) if line is not None]
+                    if lines:
+                        yield "".join(lines)
             except BaseException as e:
                 logger.info(f"workflow run exception {e}")
                 traceback.print_exc()
@@ -586,7 +594,13 @@ async def execute_workflow_endpoint(request: Request, input_data: WorkflowInput)
         return StreamingResponse(
             result_generator(),
             media_type="application/json",
-            headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"},
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",
+                # 断线后可通过 /workflow/{instance_id}/events 重新订阅
+                "X-Workflow-Instance-Id": workflow_instance.id,
+            },
         )
     else:
         # 普通响应
@@ -631,6 +645,40 @@ async def execute_workflow_endpoint(request: Request, input_data: WorkflowInput)
             }
 
 
+@vertex_flow.get("/workflow/{instance_id}/events")
+async def workflow_events_endpoint(request: Request, instance_id: str, last_event_id: Optional[int] = None):
+    """以 SSE 订阅流式工作流实例的事件，可通过 Last-Event-ID 请求头在断线后续读
+
+    读取实例的事件日志，不影响发起请求的流式响应与其它订阅者；实例已结束时回放保留的事件后结束。
+    """
+    instance = workflow_instance_manager.instances.get(instance_id)
+    if instance is None or instance.workflow_obj is None:
+        raise HTTPException(status_code=404, detail=f"Workflow instance {instance_id} not found")
+    workflow = instance.workflow_obj
+
+    header_event_id = request.headers.get("last-event-id")
+    if header_event_id is not None:
+        try:
+            last_event_id = int(header_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid Last-Event-ID: {header_event_id}")
+
+    async def event_generator():
+        async for event_id, result in workflow.areplay([EventType.MESSAGES, EventType.UPDATES], last_event_id):
+            line = format_stream_event(workflow, result)
+            if line is None:
+                # 没有消息体的事件也下发 ID，客户端重连时不会重复读取
+                yield f"id: {event_id}\n\n"
+                continue
+            yield f"id: {event_id}\ndata: {json.dumps(line, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"},
+    )
+
+
 # 🆕 新增MCP状态检查端点
 @vertex_flow.get("/mcp/status")
 async def get_mcp_status():
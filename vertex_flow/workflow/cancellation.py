@@ -0,0 +1,135 @@
+"""
+工作流取消与截止时间
+
+每次执行创建一个 CancellationToken，并通过 contextvars 传递到顶点、LLM 调用和工具调用中：
+- 运行级截止时间（execute_workflow(timeout=...)）与顶点级超时（params["timeout"]）
+  由调度器强制执行，超时后运行立即失败，不再等待仍在执行的线程
+- 任一顶点失败或超时后令牌被取消，仍在执行的顶点在下一个检查点（LLM 请求前、
+  流式输出的每个分片、工具调用前）协作式退出
+- LLM 请求的 HTTP 超时取令牌剩余时间，挂起的服务商调用不会占用线程超过截止时间
+"""
+
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Event
+from typing import Callable, Optional
+
+
+class WorkflowCancelledError(Exception):
+    """运行已被取消（其它顶点失败或被主动取消）"""
+
+
+class DeadlineExceededError(WorkflowCancelledError):
+    """超过运行或顶点的截止时间"""
+
+
+# 当前线程/协程所属运行（或顶点）的取消令牌
+_current_token: ContextVar[Optional["CancellationToken"]] = ContextVar("vertex_flow_cancellation", default=None)
+
+
+def current_cancellation() -> Optional["CancellationToken"]:
+    """获取当前激活的取消令牌，未在工作流运行中时返回 None"""
+    return _current_token.get()
+
+
+def check_cancelled():
+    """协作式取消检查点：当前运行已取消或超时时抛出异常"""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def remaining_time(default: Optional[float] = None) -> Optional[float]:
+    """当前截止时间前的剩余秒数，没有截止时间时返回 default"""
+    token = _current_token.get()
+    remaining = token.remaining() if token is not None else None
+    return default if remaining is None else remaining
+
+
+class CancellationToken:
+    """取消令牌
+
+    Args:
+        timeout: 从创建起的超时时间（秒），None 表示没有截止时间
+        parent: 父令牌，父令牌取消时本令牌同样视为取消，截止时间取两者中较早的一个
+        name: 令牌名称，用于错误信息
+    """
+
+    def __init__(
+        self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None, name: str = "workflow"
+    ):
+        self.name = name
+        self.parent = parent
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        if parent is not None and parent.deadline is not None:
+            self.deadline = parent.deadline if self.deadline is None else min(self.deadline, parent.deadline)
+        self.reason: Optional[BaseException] = None
+        self._event = Event()
+        self._children: "weakref.WeakSet[CancellationToken]" = weakref.WeakSet()
+        if parent is not None:
+            parent._children.add(self)
+
+    def child(self, timeout: Optional[float] = None, name: Optional[str] = None) -> "CancellationToken":
+        """创建子令牌，例如带有独立超时的顶点"""
+        return CancellationToken(timeout=timeout, parent=self, name=name or self.name)
+
+    def cancel(self, reason: Optional[BaseException] = None):
+        """取消令牌，已取消时保留第一次的原因"""
+        if self._event.is_set():
+            return
+        self.reason = reason or WorkflowCancelledError(f"{self.name} cancelled.")
+        self._event.set()
+        for child in list(self._children):
+            child.cancel(self.reason)
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DeadlineExceededError(f"{self.name} exceeded deadline of {self.timeout}s."))
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason)
+            return True
+        return False
+
+    def remaining(self) -> Optional[float]:
+        """截止时间前的剩余秒数，没有截止时间时返回 None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """已取消或超时时抛出取消原因"""
+        if self.cancelled:
+            raise self.reason
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待令牌被取消（最多等到截止时间），返回是否已取消，可替代 time.sleep 实现可中断等待"""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self._event.wait(timeout)
+        return self.cancelled
+
+    @contextmanager
+    def activate(self):
+        """在当前上下文中激活本令牌"""
+        token = _current_token.set(self)
+        try:
+            yield self
+        finally:
+            _current_token.reset(token)
+
+    def wrap(self, func: Callable) -> Callable:
+        """包装一个函数，使其无论在哪个线程中被调用都运行在本令牌下"""
+
+        def wrapper(*args, **kwargs):
+            with self.activate():
+                return func(*args, **kwargs)
+
+        return wrapper
@@ -1,12 +1,15 @@
 import abc
+import asyncio
 import base64
 from typing import Any, Dict, List, Optional, Union
 
 import requests
+from openai import AsyncOpenAI as AsyncOpenAIClient
 from openai import OpenAI as OpenAIClient
 from openai.types.chat.chat_completion import Choice
 
 from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.cancellation import check_cancelled, remaining_time
 from vertex_flow.workflow.constants import (
     CONTENT_ATTR,
     ENABLE_REASONING_KEY,
@@ -14,17 +17,47 @@ from vertex_flow.workflow.constants import (
     REASONING_CONTENT_ATTR,
     SHOW_REASONING_KEY,
 )
+from vertex_flow.workflow.http_clients import get_async_client, get_client
+from vertex_flow.workflow.llm_cache import copy_response, dump_response, load_chunks, load_completion, request_hash
+from vertex_flow.workflow.tracing import start_span, trace_span
 from vertex_flow.workflow.utils import factory_creator, timer_decorator
+from vertex_flow.workflow.vertex_executor import run_sync
 
 logging = LoggerUtil.get_logger()
 
 
+class _StreamToolCallState:
+    """流式响应中工具调用片段的收集状态"""
+
+    def __init__(self):
+        self.fragments = []
+        self.detected = False
+        self.completed = False
+
+    def reset(self):
+        self.fragments = []
+        self.detected = False
+        self.completed = False
+
+
 @factory_creator
 class ChatModel(abc.ABC):
     """
     这是一个抽象基类示例。
+
+    客户端取自进程内共享的连接池（见 http_clients），按 (base_url, sk, timeout_profile) 复用连接。
     """
 
+    # TIMEOUT_PROFILES 中的超时配置名称
+    timeout_profile = "default"
+    # 服务端是否支持 HTTP/2
+    supports_http2 = True
+    # 响应缓存（vertex_cache.VertexResultCache）与语义缓存（llm_cache.SemanticResponseCache），None 表示不缓存
+    response_cache = None
+    semantic_cache = None
+    # 相同请求合并（single_flight.SingleFlight），None 表示不合并；可在多个模型实例之间共享
+    single_flight = None
+
     def __init__(self, name: str, sk: str, base_url: str, provider: str, tool_manager=None, tool_caller=None):
         self.name = name
         self.sk = sk
@@ -33,10 +66,6 @@ class ChatModel(abc.ABC):
         logging.info(f"Chat model : {self.name}, sk {self.sk}, provider = {self.provider}, base url {base_url}.")
         # 为序列化保存.
         self._base_url = base_url
-        self.client = OpenAIClient(
-            base_url=self._base_url,
-            api_key=sk,
-        )
 
         # 工具管理器
         self.tool_manager = tool_manager
@@ -153,8 +182,16 @@ class ChatModel(abc.ABC):
         if stream and self._should_include_stream_usage():
             api_params["stream_options"] = {"include_usage": True}
 
+        self._apply_deadline(api_params)
         return api_params
 
+    def _apply_deadline(self, api_params: Dict[str, Any]):
+        """在工作流运行中调用时，请求超时取运行/顶点截止时间前的剩余时间"""
+        check_cancelled()
+        remaining = remaining_time()
+        if remaining is not None and "timeout" not in api_params:
+            api_params["timeout"] = remaining
+
     def _should_include_stream_usage(self) -> bool:
         """判断是否应该在流式调用中包含usage统计，子类可重写此方法"""
         # 默认对大多数支持OpenAI格式的提供商启用
@@ -192,10 +229,221 @@ class ChatModel(abc.ABC):
             logging.error(f"Error creating completion: {e}, api_params: {api_params}")
             raise
 
-    def chat(self, messages, option: Optional[Dict[str, Any]] = None, tools=None) -> Choice:
+    @property
+    def client(self) -> OpenAIClient:
+        """进程内共享的客户端"""
+        return get_client(self._base_url, self.sk, self.timeout_profile, self.supports_http2)
+
+    @property
+    def async_client(self) -> AsyncOpenAIClient:
+        """当前事件循环中共享的异步客户端"""
+        return get_async_client(self._base_url, self.sk, self.timeout_profile, self.supports_http2)
+
+    async def _acreate_completion(
+        self, messages, option: Optional[Dict[str, Any]] = None, stream: bool = False, tools=None
+    ):
+        """_create_completion 的异步版本，请求参数与同步版本相同"""
+        api_params = self._build_api_params(messages, option, stream, tools)
+        try:
+            completion = await self.async_client.chat.completions.create(**api_params)
+            logging.debug(f"show completion: {completion}")
+            return completion
+        except Exception as e:
+            logging.error(f"Error creating completion: {e}, api_params: {api_params}")
+            raise
+
+    def _lookup_response(self, messages, option, stream: bool, tools):
+        """查找缓存的响应，返回 (响应, 写入位置)
+
+        响应为 ChatCompletion 或分片列表，未命中时为 None；写入位置为 None 表示无需写入缓存。
+        须在请求前调用：流式工具调用会向 messages 追加消息。
+        """
+        if self.response_cache is None and self.semantic_cache is None:
+            return None, None
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = request_hash(self, messages, option, tools, stream)
+        if cache_key is not None:
+            hit, data = self.response_cache.get(cache_key)
+            if hit:
+                logging.info(f"LLM response cache hit, model {self.name}.")
+                return self._load_response(data), None
+        semantic_key = None
+        if self.semantic_cache is not None:
+            data, semantic_key = self.semantic_cache.lookup(self, messages, option, tools, stream)
+            if data is not None:
+                # 语义命中的响应同时写入精确缓存，相同的问题不必再计算嵌入向量
+                if cache_key is not None:
+                    self.response_cache.set(cache_key, data)
+                return self._load_response(data), None
+        if cache_key is None and semantic_key is None:
+            return None, None
+        return None, (cache_key, semantic_key)
+
+    @staticmethod
+    def _load_response(data):
+        return load_chunks(data) if isinstance(data, list) else load_completion(data)
+
+    def _store_response(self, target, data):
+        cache_key, semantic_key = target
+        if cache_key is not None:
+            self.response_cache.set(cache_key, data)
+        if semantic_key is not None:
+            self.semantic_cache.store(semantic_key, data)
+
+    def _store_completion(self, target, completion):
+        if target is None:
+            return
+        data = dump_response(completion)
+        if data is None:
+            logging.debug(f"Completion of {self.name} is not serializable, skip caching.")
+            return
+        self._store_response(target, data)
+
+    def _complete(self, messages, option, tools):
+        """非流式请求，依次经过请求合并与响应缓存，返回 (completion, 是否命中缓存)"""
+        key = None if self.single_flight is None else request_hash(self, messages, option, tools, False)
+        if key is None:
+            return self._complete_cached(messages, option, tools)
+        (completion, cache_hit), joined = self.single_flight.call(
+            key, lambda: self._complete_cached(messages, option, tools)
+        )
+        if joined:
+            logging.info(f"LLM request coalesced with an in-flight request, model {self.name}.")
+            completion = copy_response(completion)
+        return completion, cache_hit
+
+    async def _acomplete(self, messages, option, tools):
+        key = None if self.single_flight is None else request_hash(self, messages, option, tools, False)
+        if key is None:
+            return await self._acomplete_cached(messages, option, tools)
+        (completion, cache_hit), joined = await self.single_flight.acall(
+            key, lambda: self._acomplete_cached(messages, option, tools)
+        )
+        if joined:
+            logging.info(f"LLM request coalesced with an in-flight request, model {self.name}.")
+            completion = copy_response(completion)
+        return completion, cache_hit
+
+    def _complete_cached(self, messages, option, tools):
+        """非流式请求，开启响应缓存时优先使用缓存"""
+        completion, target = self._lookup_response(messages, option, False, tools)
+        if completion is not None:
+            return completion, True
         completion = self._create_completion(messages, option, stream=False, tools=tools)
-        # 记录usage信息
-        self._set_usage(completion)
+        self._store_completion(target, completion)
+        return completion, False
+
+    async def _acomplete_cached(self, messages, option, tools):
+        completion, target = await self._alookup_response(messages, option, False, tools)
+        if completion is not None:
+            return completion, True
+        completion = await self._acreate_completion(messages, option, stream=False, tools=tools)
+        if target is not None:
+            await self._acache_call(self._store_completion, target, completion)
+        return completion, False
+
+    async def _alookup_response(self, messages, option, stream: bool, tools):
+        return await self._acache_call(self._lookup_response, messages, option, stream, tools)
+
+    async def _acache_call(self, func, *args):
+        """语义缓存需要计算嵌入向量（网络请求），在线程中执行，不阻塞事件循环"""
+        if self.semantic_cache is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _stream_completion(self, messages, option, tools):
+        """流式请求，开启请求合并时订阅进行中的相同请求：先收到已产生的分片，再跟随实时流"""
+        key = None if self.single_flight is None else request_hash(self, messages, option, tools, True)
+        if key is None:
+            return self._stream_completion_cached(messages, option, tools)
+        chunks, joined = self.single_flight.stream(key, lambda: self._stream_completion_cached(messages, option, tools))
+        if joined:
+            logging.info(f"LLM stream coalesced with an in-flight request, model {self.name}.")
+        return chunks
+
+    async def _astream_completion(self, messages, option, tools):
+        key = None if self.single_flight is None else request_hash(self, messages, option, tools, True)
+        if key is None:
+            return await self._astream_completion_cached(messages, option, tools)
+        chunks, joined = self.single_flight.astream(
+            key, lambda: self._astream_completion_cached(messages, option, tools)
+        )
+        if joined:
+            logging.info(f"LLM stream coalesced with an in-flight request, model {self.name}.")
+        return chunks
+
+    def _stream_completion_cached(self, messages, option, tools):
+        """流式请求，命中响应缓存时按原顺序回放缓存的分片，未命中时边输出边记录分片"""
+        chunks, target = self._lookup_response(messages, option, True, tools)
+        if chunks is not None:
+            return iter(chunks)
+        completion = self._create_completion(messages, option, stream=True, tools=tools)
+        if target is None:
+            return completion
+        return self._record_stream(target, completion)
+
+    async def _astream_completion_cached(self, messages, option, tools):
+        chunks, target = await self._alookup_response(messages, option, True, tools)
+        if chunks is not None:
+            return self._areplay_stream(chunks)
+        completion = await self._acreate_completion(messages, option, stream=True, tools=tools)
+        if target is None:
+            return completion
+        return self._arecord_stream(target, completion)
+
+    def _record_stream(self, target, completion):
+        """流式响应被完整消费后写入缓存，请求失败或提前结束时不写入"""
+        recorded = []
+        for chunk in completion:
+            if recorded is not None:
+                data = dump_response(chunk)
+                if data is None:
+                    recorded = None
+                else:
+                    recorded.append(data)
+            yield chunk
+        if recorded is not None:
+            self._store_response(target, recorded)
+
+    async def _arecord_stream(self, target, completion):
+        recorded = []
+        async for chunk in completion:
+            if recorded is not None:
+                data = dump_response(chunk)
+                if data is None:
+                    recorded = None
+                else:
+                    recorded.append(data)
+            yield chunk
+        if recorded is not None:
+            await self._acache_call(self._store_response, target, recorded)
+
+    @staticmethod
+    async def _areplay_stream(chunks):
+        for chunk in chunks:
+            yield chunk
+
+    def chat(self, messages, option: Optional[Dict[str, Any]] = None, tools=None) -> Choice:
+        with trace_span("chat", "llm", model=self.name, provider=self.provider) as span:
+            completion, cache_hit = self._complete(messages, option, tools)
+            # 记录usage信息
+            self._set_usage(completion)
+            if span is not None:
+                span.set(usage=self._usage)
+                if self.response_cache is not None or self.semantic_cache is not None:
+                    span.set(cache_hit=cache_hit)
+        return completion.choices[0]
+
+    async def achat(self, messages, option: Optional[Dict[str, Any]] = None, tools=None) -> Choice:
+        """chat 的异步版本，等待响应期间不占用线程"""
+        with trace_span("chat", "llm", model=self.name, provider=self.provider) as span:
+            completion, cache_hit = await self._acomplete(messages, option, tools)
+            self._set_usage(completion)
+            if span is not None:
+                span.set(usage=self._usage)
+                if self.response_cache is not None or self.semantic_cache is not None:
+                    span.set(cache_hit=cache_hit)
         return completion.choices[0]
 
     def _set_usage(self, completion=None):
@@ -233,100 +481,174 @@ class ChatModel(abc.ABC):
 
     def chat_stream(self, messages, option: Optional[Dict[str, Any]] = None, tools=None):
         """统一的流式输出接口，处理所有内容类型包括reasoning"""
-        completion = self._create_completion(messages, option, stream=True, tools=tools)
+        # 流式请求跨越多次 yield，span 不设为当前 span，避免调用方的 span 挂到请求下
+        span = start_span("chat_stream", "llm", model=self.name, provider=self.provider)
+        if span is None:
+            completion = self._stream_completion(messages, option, tools)
+            # 统一的流式处理，根据可用的工具处理器动态选择策略
+            yield from self._unified_stream_processing(completion, messages)
+            return
 
-        # 统一的流式处理，根据可用的工具处理器动态选择策略
-        yield from self._unified_stream_processing(completion, messages)
+        error = None
+        try:
+            completion = self._stream_completion(messages, option, tools)
+            chunks = 0
+            for chunk in self._unified_stream_processing(completion, messages):
+                if chunks == 0:
+                    # 首个分片时间
+                    span.set(ttft_ms=round(span.elapsed() * 1000, 3))
+                chunks += 1
+                span.instant("chunk", size=len(chunk) if isinstance(chunk, str) else None)
+                yield chunk
+            span.set(chunks=chunks, usage=self._usage)
+        except GeneratorExit:
+            # 调用方提前结束消费，不视为请求失败
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            span.finish(error)
+
+    async def achat_stream(self, messages, option: Optional[Dict[str, Any]] = None, tools=None):
+        """chat_stream 的异步版本，输出内容与 chat_stream 相同"""
+        span = start_span("chat_stream", "llm", model=self.name, provider=self.provider)
+        if span is None:
+            completion = await self._astream_completion(messages, option, tools)
+            async for chunk in self._aunified_stream_processing(completion, messages):
+                yield chunk
+            return
+
+        error = None
+        try:
+            completion = await self._astream_completion(messages, option, tools)
+            chunks = 0
+            async for chunk in self._aunified_stream_processing(completion, messages):
+                if chunks == 0:
+                    # 首个分片时间
+                    span.set(ttft_ms=round(span.elapsed() * 1000, 3))
+                chunks += 1
+                span.instant("chunk", size=len(chunk) if isinstance(chunk, str) else None)
+                yield chunk
+            span.set(chunks=chunks, usage=self._usage)
+        except GeneratorExit:
+            # 调用方提前结束消费，不视为请求失败
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            span.finish(error)
 
     def _unified_stream_processing(self, completion, messages):
         """统一的流式处理方法，动态选择工具处理策略"""
-        tool_call_fragments = []
-        tool_calls_detected = False
-        tool_calls_completed = False
-        content_after_tool_calls = False  # 新增：标记工具调用后是否有内容
-
+        state = _StreamToolCallState()
         for chunk in completion:
-            # 检查并记录usage信息（通用支持）
-            if hasattr(chunk, "usage") and chunk.usage:
-                self._set_usage(chunk)
-                logging.debug(f"Streaming usage received from {self.provider}: {chunk.usage}")
-
-            if chunk.choices and len(chunk.choices) > 0:
-                delta = chunk.choices[0].delta
-
-                # 检查工具调用 - 使用可用的工具处理器
-                tool_calls_in_chunk = self._extract_tool_calls_from_chunk(chunk)
-                if tool_calls_in_chunk:
-                    # 如果工具调用已完成，但又检测到新的工具调用，重置状态
-                    if tool_calls_completed:
-                        # 处理之前遗留的片段
-                        if tool_call_fragments:
-                            remaining_calls = self._merge_tool_call_fragments(tool_call_fragments)
-                            if remaining_calls:
-                                logging.info(f"Processing {len(remaining_calls)} remaining tool calls before new batch")
-                                # 发送工具调用请求消息
-                                for request_msg in self._emit_tool_call_request(remaining_calls):
-                                    yield request_msg
-                                # 处理工具调用
-                                if self._handle_tool_calls_in_stream(remaining_calls, messages):
-                                    # 发送工具调用结果消息
-                                    for result_msg in self._emit_tool_call_results(remaining_calls, messages):
-                                        yield result_msg
-
-                        # 重置状态开始新的工具调用批次
-                        tool_call_fragments = []
-                        tool_calls_detected = False
-                        tool_calls_completed = False
-                        content_after_tool_calls = False
-                        logging.info("Reset tool call state for new batch")
-
-                    tool_calls_detected = True
-                    tool_call_fragments.extend(tool_calls_in_chunk)
-                    continue
-
-                # 注意：移除了中途处理工具调用的逻辑
-                # 现在只收集片段，不在有内容时立即处理
-
-                # 处理reasoning内容（DeepSeek R1等模型）
-                if hasattr(delta, REASONING_CONTENT_ATTR) and getattr(delta, REASONING_CONTENT_ATTR):
-                    reasoning_content = getattr(delta, REASONING_CONTENT_ATTR)
-                    yield reasoning_content
-                    continue
-
-                # 处理普通内容
-                if hasattr(delta, CONTENT_ATTR) and getattr(delta, CONTENT_ATTR):
-                    content = getattr(delta, CONTENT_ATTR)
-                    # 检查是否包含推理标记
-                    if any(
-                        marker in content for marker in ["<thinking>", "<think>", "<reasoning>", "思考：", "分析："]
-                    ):
-                        # 清理推理标记
-                        display_content = content
-                        for tag in ["<thinking>", "</thinking>", "<think>", "</think>", "<reasoning>", "</reasoning>"]:
-                            display_content = display_content.replace(tag, "")
-                        yield display_content
-                        continue
-                    # 普通内容
-                    yield content
-            else:
-                self._set_usage(chunk)
-                logging.debug("Chunk object does not have valid choices or delta content.")
+            # 协作式取消检查点：运行取消或超时后停止消费流
+            check_cancelled()
+            for item in self._process_stream_chunk(chunk, state):
+                if isinstance(item, str):
+                    yield item
+                else:
+                    yield from self._stream_tool_calls(item, messages)
 
         # 流式处理结束后，统一处理所有收集到的工具调用片段
-        if tool_calls_detected and tool_call_fragments:
-            tool_calls = self._merge_tool_call_fragments(tool_call_fragments)
+        tool_calls = self._collected_tool_calls(state)
+        if tool_calls:
+            logging.info(f"Processing {len(tool_calls)} tool calls after stream completion")
+            yield from self._stream_tool_calls(tool_calls, messages)
+
+    async def _aunified_stream_processing(self, completion, messages):
+        """_unified_stream_processing 的异步版本，工具调用在线程中执行，不阻塞事件循环"""
+        state = _StreamToolCallState()
+        async for chunk in completion:
+            check_cancelled()
+            for item in self._process_stream_chunk(chunk, state):
+                if isinstance(item, str):
+                    yield item
+                else:
+                    async for message in self._astream_tool_calls(item, messages):
+                        yield message
 
-            if tool_calls:  # 只有在有有效工具调用时才处理
-                logging.info(f"Processing {len(tool_calls)} tool calls after stream completion")
-                # 发送工具调用请求消息
-                for request_msg in self._emit_tool_call_request(tool_calls):
-                    yield request_msg
+        tool_calls = self._collected_tool_calls(state)
+        if tool_calls:
+            logging.info(f"Processing {len(tool_calls)} tool calls after stream completion")
+            async for message in self._astream_tool_calls(tool_calls, messages):
+                yield message
 
-                if self._handle_tool_calls_in_stream(tool_calls, messages):
-                    # 发送工具调用结果消息
-                    for result_msg in self._emit_tool_call_results(tool_calls, messages):
-                        yield result_msg
-                    logging.info(f"Tool calls completed after stream: {len(tool_calls)} calls")
+    def _process_stream_chunk(self, chunk, state: _StreamToolCallState) -> List[Union[str, List[Any]]]:
+        """处理一个流式分片，返回需要输出的文本，以及需要立即执行的工具调用批次（列表）"""
+        items = []
+        # 检查并记录usage信息（通用支持）
+        if hasattr(chunk, "usage") and chunk.usage:
+            self._set_usage(chunk)
+            logging.debug(f"Streaming usage received from {self.provider}: {chunk.usage}")
+
+        if not (chunk.choices and len(chunk.choices) > 0):
+            self._set_usage(chunk)
+            logging.debug("Chunk object does not have valid choices or delta content.")
+            return items
+
+        delta = chunk.choices[0].delta
+
+        # 检查工具调用 - 使用可用的工具处理器
+        tool_calls_in_chunk = self._extract_tool_calls_from_chunk(chunk)
+        if tool_calls_in_chunk:
+            # 如果工具调用已完成，但又检测到新的工具调用，先处理之前遗留的片段，再开始新的工具调用批次
+            if state.completed:
+                if state.fragments:
+                    remaining_calls = self._merge_tool_call_fragments(state.fragments)
+                    if remaining_calls:
+                        logging.info(f"Processing {len(remaining_calls)} remaining tool calls before new batch")
+                        items.append(remaining_calls)
+                state.reset()
+                logging.info("Reset tool call state for new batch")
+
+            state.detected = True
+            state.fragments.extend(tool_calls_in_chunk)
+            return items
+
+        # 只收集工具调用片段，不在有内容时立即处理
+
+        # 处理reasoning内容（DeepSeek R1等模型）
+        if hasattr(delta, REASONING_CONTENT_ATTR) and getattr(delta, REASONING_CONTENT_ATTR):
+            items.append(getattr(delta, REASONING_CONTENT_ATTR))
+            return items
+
+        # 处理普通内容
+        if hasattr(delta, CONTENT_ATTR) and getattr(delta, CONTENT_ATTR):
+            content = getattr(delta, CONTENT_ATTR)
+            # 检查是否包含推理标记
+            if any(marker in content for marker in ["<thinking>", "<think>", "<reasoning>", "思考：", "分析："]):
+                # 清理推理标记
+                for tag in ["<thinking>", "</thinking>", "<think>", "</think>", "<reasoning>", "</reasoning>"]:
+                    content = content.replace(tag, "")
+            items.append(content)
+        return items
+
+    def _collected_tool_calls(self, state: _StreamToolCallState) -> List[Any]:
+        """流式响应结束后合并收集到的工具调用片段"""
+        if state.detected and state.fragments:
+            return self._merge_tool_call_fragments(state.fragments)
+        return []
+
+    def _stream_tool_calls(self, tool_calls, messages):
+        """输出工具调用请求消息，执行工具调用，再输出工具调用结果消息"""
+        for request_msg in self._emit_tool_call_request(tool_calls):
+            yield request_msg
+        if self._handle_tool_calls_in_stream(tool_calls, messages):
+            for result_msg in self._emit_tool_call_results(tool_calls, messages):
+                yield result_msg
+            logging.info(f"Tool calls completed in stream: {len(tool_calls)} calls")
+
+    async def _astream_tool_calls(self, tool_calls, messages):
+        """_stream_tool_calls 的异步版本，工具调用可能阻塞，在顶点线程池中执行（保留取消令牌与运行状态等上下文）"""
+        for request_msg in self._emit_tool_call_request(tool_calls):
+            yield request_msg
+        if await run_sync(self._handle_tool_calls_in_stream, tool_calls, messages):
+            for result_msg in self._emit_tool_call_results(tool_calls, messages):
+                yield result_msg
+            logging.info(f"Tool calls completed in stream: {len(tool_calls)} calls")
 
     def _extract_tool_calls_from_chunk(self, chunk):
         """从流式响应块中提取工具调用，统一使用ToolManager中的ToolCaller"""
@@ -410,8 +732,8 @@ class Tongyi(ChatModel):
             provider="tongyi",
         )
 
-    def _create_completion(self, messages, option: Optional[Dict[str, Any]] = None, stream: bool = False, tools=None):
-        """Tongyi专属：流式时自动加stream_options.include_usage，并处理enable_search参数"""
+    def _build_api_params(self, messages, option: Optional[Dict[str, Any]] = None, stream: bool = False, tools=None):
+        """Tongyi专属：流式时自动加stream_options.include_usage，并处理enable_search参数，同步与异步请求共用"""
         # 先构建基础API参数
         default_option = {
             "temperature": 1.0,
@@ -448,7 +770,11 @@ class Tongyi(ChatModel):
             api_params["extra_body"] = {
                 "extra_body": {ENABLE_SEARCH_KEY: default_option[ENABLE_SEARCH_KEY], "search_options": True}
             }
+        self._apply_deadline(api_params)
+        return api_params
 
+    def _create_completion(self, messages, option: Optional[Dict[str, Any]] = None, stream: bool = False, tools=None):
+        api_params = self._build_api_params(messages, option, stream, tools)
         try:
             completion = self.client.chat.completions.create(**api_params)
             return completion
@@ -478,6 +804,9 @@ class OpenRouter(ChatModel):
 
 
 class Ollama(ChatModel):
+    # 本地服务为明文 HTTP，不使用 HTTP/2
+    supports_http2 = False
+
     def __init__(self, name="qwen:7b", sk="ollama-local", base_url="http://localhost:11434"):
         # Ollama不需要真实的API key，使用占位符
         super().__init__(
@@ -0,0 +1,199 @@
+"""
+工作流检查点
+
+每个顶点执行成功后把输出写入持久化存储（vertex_flow.memory 的 FileMemory、RDSMemory 等），
+WhileVertex 在每次迭代后保存循环状态。运行失败后通过 execute_workflow(resume_from=run_id)
+恢复：已完成的顶点直接使用检查点中的输出，循环从最后完成的迭代继续。
+
+检查点通过 Memory 的 ctx_* 接口存储，只能保存可 JSON 序列化的输出，无法序列化的顶点在恢复时会重新执行。
+"""
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Union
+
+from vertex_flow.utils.logger import LoggerUtil
+
+logging = LoggerUtil.get_logger()
+
+# 当前线程/协程所属运行的检查点，供 WhileVertex 等顶点保存内部状态
+_current_checkpoint: ContextVar[Optional[Union["RunCheckpoint", "ScopedCheckpoint"]]] = ContextVar(
+    "vertex_flow_checkpoint", default=None
+)
+
+_COMPLETED_KEY = "completed"
+# 保存过循环状态的顶点（包括 VertexGroup 内部与嵌套的循环），清理检查点时使用
+_LOOPS_KEY = "loops"
+
+
+def current_checkpoint() -> Optional[Union["RunCheckpoint", "ScopedCheckpoint"]]:
+    """获取当前激活的运行检查点，没有开启检查点时返回 None"""
+    return _current_checkpoint.get()
+
+
+def _is_json_serializable(value: Any) -> bool:
+    try:
+        json.dumps(value, ensure_ascii=False)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class CheckpointStore:
+    """基于 Memory 后端的检查点存储
+
+    Args:
+        memory: vertex_flow.memory.Memory 实例，需要持久化时使用 FileMemory、RDSMemory 或 RedisMemory
+        namespace: 存储使用的 user_id 前缀
+        ttl_sec: 检查点过期时间（秒），None 表示永不过期
+    """
+
+    def __init__(self, memory, namespace: str = "workflow_checkpoint", ttl_sec: Optional[int] = None):
+        self.memory = memory
+        self.namespace = namespace
+        self.ttl_sec = ttl_sec
+
+    def _user_id(self, run_id: str) -> str:
+        return f"{self.namespace}_{run_id}"
+
+    def open(self, run_id: str) -> "RunCheckpoint":
+        """打开一次运行的检查点，已有的检查点会被加载"""
+        return RunCheckpoint(self, run_id)
+
+    def load_completed(self, run_id: str) -> Dict[str, Any]:
+        """加载已完成顶点的输出：顶点 ID -> 输出"""
+        user_id = self._user_id(run_id)
+        completed = self.memory.ctx_get(user_id, _COMPLETED_KEY) or []
+        outputs = {}
+        for vertex_id in completed:
+            item = self.memory.ctx_get(user_id, f"vertex_{vertex_id}")
+            if isinstance(item, dict) and "output" in item:
+                outputs[vertex_id] = item["output"]
+        return outputs
+
+    def load_loop_state(self, run_id: str, vertex_id: str) -> Optional[Dict[str, Any]]:
+        return self.memory.ctx_get(self._user_id(run_id), f"loop_{vertex_id}")
+
+    def clear(self, run_id: str):
+        """删除一次运行的全部检查点"""
+        user_id = self._user_id(run_id)
+        for vertex_id in self.memory.ctx_get(user_id, _COMPLETED_KEY) or []:
+            self.memory.ctx_del(user_id, f"vertex_{vertex_id}")
+            self.memory.ctx_del(user_id, f"loop_{vertex_id}")
+        for vertex_id in self.memory.ctx_get(user_id, _LOOPS_KEY) or []:
+            self.memory.ctx_del(user_id, f"loop_{vertex_id}")
+        self.memory.ctx_del(user_id, _COMPLETED_KEY)
+        self.memory.ctx_del(user_id, _LOOPS_KEY)
+
+
+class RunCheckpoint:
+    """一次运行的检查点，记录已完成的顶点并在恢复时提供它们的输出"""
+
+    def __init__(self, store: CheckpointStore, run_id: str):
+        self.store = store
+        self.run_id = run_id
+        self.completed: Dict[str, Any] = store.load_completed(run_id)
+        self._loops = set(store.memory.ctx_get(self._user_id, _LOOPS_KEY) or [])
+        self._lock = Lock()
+        if self.completed:
+            logging.info(f"Checkpoint of run {run_id} loaded, completed vertices : {sorted(self.completed)}.")
+
+    @property
+    def _user_id(self) -> str:
+        return self.store._user_id(self.run_id)
+
+    def is_completed(self, vertex_id: str) -> bool:
+        return vertex_id in self.completed
+
+    def save_vertex(self, vertex_id: str, output: Any):
+        """保存顶点输出，无法 JSON 序列化时跳过，恢复时该顶点会重新执行"""
+        if not _is_json_serializable(output):
+            logging.warning(f"Output of vertex {vertex_id} is not JSON serializable, skip checkpoint.")
+            return
+        memory, ttl_sec = self.store.memory, self.store.ttl_sec
+        memory.ctx_set(self._user_id, f"vertex_{vertex_id}", {"output": output}, ttl_sec=ttl_sec)
+        with self._lock:
+            self.completed[vertex_id] = output
+            completed = list(self.completed)
+            # 输出写入后再更新完成列表，中途失败时最多重新执行该顶点
+            memory.ctx_set(self._user_id, _COMPLETED_KEY, completed, ttl_sec=ttl_sec)
+        self.clear_loop_state(vertex_id)
+
+    def save_loop_state(self, vertex_id: str, state: Dict[str, Any]):
+        """保存循环顶点的迭代状态"""
+        if not _is_json_serializable(state):
+            logging.warning(f"Loop state of vertex {vertex_id} is not JSON serializable, skip checkpoint.")
+            return
+        memory, ttl_sec = self.store.memory, self.store.ttl_sec
+        with self._lock:
+            if vertex_id not in self._loops:
+                # 先登记再写入状态，清理检查点时不会遗漏
+                self._loops.add(vertex_id)
+                memory.ctx_set(self._user_id, _LOOPS_KEY, sorted(self._loops), ttl_sec=ttl_sec)
+        memory.ctx_set(self._user_id, f"loop_{vertex_id}", state, ttl_sec=ttl_sec)
+
+    def clear_loop_state(self, vertex_id: str):
+        """删除循环顶点的迭代状态，循环结束后调用，同一运行中再次执行该循环时从头开始"""
+        memory = self.store.memory
+        memory.ctx_del(self._user_id, f"loop_{vertex_id}")
+        with self._lock:
+            if vertex_id in self._loops:
+                self._loops.discard(vertex_id)
+                memory.ctx_set(self._user_id, _LOOPS_KEY, sorted(self._loops), ttl_sec=self.store.ttl_sec)
+
+    def load_loop_state(self, vertex_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.load_loop_state(self.run_id, vertex_id)
+
+    def scoped(self, scope: str) -> "ScopedCheckpoint":
+        """本检查点在子作用域中的视图，循环状态的键带有作用域前缀"""
+        return ScopedCheckpoint(self, scope)
+
+    @contextmanager
+    def activate(self):
+        """在当前上下文中激活本检查点"""
+        token = _current_checkpoint.set(self)
+        try:
+            yield self
+        finally:
+            _current_checkpoint.reset(token)
+
+    def wrap(self, func: Callable) -> Callable:
+        """包装一个函数，使其无论在哪个线程中被调用都运行在本检查点下"""
+
+        def wrapper(*args, **kwargs):
+            with self.activate():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+class ScopedCheckpoint:
+    """检查点在子作用域中的视图
+
+    MapVertexGroup 的各个元素并发执行同一个子图，子图中的循环顶点 ID 相同，
+    在各自的作用域（例如 "map.0"）下保存循环状态，互不覆盖，恢复时各元素从自己的迭代继续。
+    """
+
+    def __init__(self, checkpoint: RunCheckpoint, scope: str):
+        self.checkpoint = checkpoint
+        self.scope = scope
+
+    def _key(self, vertex_id: str) -> str:
+        return f"{self.scope}.{vertex_id}"
+
+    def save_loop_state(self, vertex_id: str, state: Dict[str, Any]):
+        self.checkpoint.save_loop_state(self._key(vertex_id), state)
+
+    def clear_loop_state(self, vertex_id: str):
+        self.checkpoint.clear_loop_state(self._key(vertex_id))
+
+    def load_loop_state(self, vertex_id: str) -> Optional[Dict[str, Any]]:
+        return self.checkpoint.load_loop_state(self._key(vertex_id))
+
+    def scoped(self, scope: str) -> "ScopedCheckpoint":
+        return ScopedCheckpoint(self.checkpoint, self._key(scope))
+
+    activate = RunCheckpoint.activate
+    wrap = RunCheckpoint.wrap
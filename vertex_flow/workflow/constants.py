@@ -65,6 +65,19 @@ WORKFLOW_ERROR = "workflow_error"  # 工作流执行异常
 
 WORKFLOW_END_STATES = [WORKFLOW_COMPLETE, WORKFLOW_FAILED, WORKFLOW_ERROR]
 
+# FunctionVertex 执行方式常量
+EXECUTOR_THREAD = "thread"  # 在工作流线程中执行（默认）
+EXECUTOR_PROCESS = "process"  # 在常驻进程池中执行，适用于 CPU 密集型任务
+EXECUTORS = [EXECUTOR_THREAD, EXECUTOR_PROCESS]
+
+# 顶点执行超时（秒）在顶点 params 中的键名
+VERTEX_TIMEOUT_KEY = "timeout"
+
+# Workflow 调度模式常量
+SCHEDULER_TOPOLOGICAL = "topological"  # 按拓扑序逐个等待依赖后提交（默认）
+SCHEDULER_READY_QUEUE = "ready_queue"  # 依赖完成回调驱动的就绪队列调度
+SCHEDULER_MODES = [SCHEDULER_TOPOLOGICAL, SCHEDULER_READY_QUEUE]
+
 # Reasoning configuration constants
 SHOW_REASONING = True  # Default value for showing reasoning process in AI responses
 SHOW_REASONING_KEY = "show_reasoning"  # Key name for show_reasoning parameter
@@ -76,5 +89,5 @@ ENABLE_TOKEN_USAGE_KEY = "enable_token_usage"  # Key name for enable_token_usage
 CONTENT_ATTR = "content"  # Attribute name for regular content
 REASONING_CONTENT_ATTR = "reasoning_content"  # Attribute name for reasoning content
 
-# Loop index constants for WhileVertex and WhileVertexGroup
+# Loop index constants for WhileVertex, WhileVertexGroup and MapVertexGroup
 ITERATION_INDEX_KEY = "iteration_index"  # Iteration index key
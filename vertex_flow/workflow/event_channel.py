@@ -1,9 +1,17 @@
 import asyncio
-from collections import defaultdict
-from threading import Lock
+import itertools
+import time
+from collections import defaultdict, deque
+from threading import Condition, Lock
 
 from vertex_flow.utils.logger import LoggerUtil
-from vertex_flow.workflow.constants import WORKFLOW_END_STATES
+from vertex_flow.workflow.constants import (
+    CONTENT_KEY,
+    MESSAGE_TYPE_END,
+    TYPE_KEY,
+    VERTEX_ID_KEY,
+    WORKFLOW_END_STATES,
+)
 
 logger = LoggerUtil.get_logger()
 
@@ -17,6 +25,139 @@ class EventType:
     UPDATES = "updates"  # 更新事件：用于传递进度更新、状态变化等
 
 
+class EventQueue:
+    """
+    线程安全的事件缓冲队列
+
+    emit_event 可能在任意工作线程中调用，asyncio.Queue 只能在其事件循环线程中使用，
+    因此事件先写入基于 deque 的缓冲区（append/popleft 是原子操作），
+    再通过 call_soon_threadsafe 唤醒消费者所在的事件循环。
+    每个事件附带全局递增的序号，多个事件类型合并消费时按发送顺序输出。
+    """
+
+    def __init__(self):
+        self._items = deque()
+
+    def put_nowait(self, event_data, seq: int = 0):
+        self._items.append((seq, event_data))
+
+    def tail(self):
+        """最后一个事件 (序号, 事件数据)，队列为空时返回 None"""
+        try:
+            return self._items[-1]
+        except IndexError:
+            return None
+
+    def replace_tail(self, event_data, seq: int):
+        self._items[-1] = (seq, event_data)
+
+    def evict_oldest(self):
+        self._items.popleft()
+
+    def get_nowait(self):
+        try:
+            return self._items.popleft()[1]
+        except IndexError:
+            raise asyncio.QueueEmpty from None
+
+    def drain(self):
+        """取出当前全部事件，返回 [(序号, 事件数据), ...]"""
+        items = []
+        while True:
+            try:
+                items.append(self._items.popleft())
+            except IndexError:
+                return items
+
+    def clear(self):
+        self._items.clear()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+
+class EventLog:
+    """
+    可回放的事件日志：固定容量的环形缓冲区
+
+    保存最近 maxlen 个事件 (序号, 事件类型, 事件数据)，读取不会移除事件，
+    每个订阅者用自己的游标（最后读取的序号）独立读取，断线重连时从游标处继续。
+    事件序号连续递增，按序号定位，不需要扫描。
+    """
+
+    def __init__(self, maxlen: int):
+        self._entries = deque(maxlen=maxlen)
+
+    def append(self, seq: int, event_type, event_data):
+        self._entries.append((seq, event_type, event_data))
+
+    @property
+    def first_seq(self):
+        """最早保留的事件序号，日志为空时返回 None"""
+        return self._entries[0][0] if self._entries else None
+
+    @property
+    def last_seq(self):
+        """最新的事件序号，日志为空时返回 None"""
+        return self._entries[-1][0] if self._entries else None
+
+    def read_after(self, cursor):
+        """返回序号大于 cursor 的全部事件，cursor 为 None 时从最早保留的事件开始"""
+        if not self._entries:
+            return []
+        first = self._entries[0][0]
+        start = 0 if cursor is None else max(0, cursor + 1 - first)
+        return list(itertools.islice(self._entries, start, None))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Waiter:
+    """一个消费者的合并唤醒原语：监听的任一事件类型有新事件时唤醒其事件循环"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, event_types, drains: bool = True):
+        self.loop = loop
+        self.event_types = frozenset(event_types)
+        # 是否从事件队列中取出事件；只读事件日志的订阅者不参与背压
+        self.drains = drains
+        self.event = asyncio.Event()
+        # 已安排但尚未执行的唤醒，避免每个事件都向事件循环投递一次回调
+        self.pending = False
+
+    def _set(self):
+        self.event.set()
+
+    def notify(self) -> bool:
+        """在任意线程中唤醒消费者，事件循环已关闭时返回 False"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._set)
+            return True
+        except RuntimeError:
+            return False
+
+
+def _is_chunk(event_data) -> bool:
+    """是否为可合并的流式消息分片：只包含顶点 ID、字符串内容与消息类型"""
+    return (
+        isinstance(event_data, dict)
+        and isinstance(event_data.get(CONTENT_KEY), str)
+        and event_data.get(VERTEX_ID_KEY) is not None
+        and event_data.get(TYPE_KEY) != MESSAGE_TYPE_END
+        and event_data.keys() <= {VERTEX_ID_KEY, CONTENT_KEY, TYPE_KEY}
+    )
+
+
 class EventChannel:
     """
     事件通道类：提供异步事件发布订阅机制
@@ -26,7 +167,20 @@ class EventChannel:
     2. 提供异步流式事件监听（astream）
     3. 支持workflow_complete事件的特殊处理
     4. 智能退出策略，避免无限等待
-    5. 线程安全的事件分发
+    5. 线程安全的事件分发：任意线程中 emit_event，通过 call_soon_threadsafe 唤醒消费者的事件循环
+
+    astream 不轮询：空闲时挂起在单个合并的唤醒事件上，不占用 CPU，事件到达后立即被消费。
+
+    高吞吐流式输出：
+    - 分片合并：同一顶点连续的 MESSAGES 分片在队列中合并为一帧（不超过 coalesce_max_chars 个字符），
+      消费者两次取出之间至少间隔 coalesce_window 秒，第一帧立即送达，不影响首字延迟
+    - 有界队列：设置 max_queue_size 后，队列满时在其它线程中发送事件的生产者阻塞等待消费者（背压），
+      最多等待 put_timeout 秒；没有消费者或等待超时时丢弃最旧的事件，内存占用保持有界
+
+    多订阅者与断线重连：
+    - 每个事件同时写入容量为 history_size 的环形事件日志（EventLog），事件序号即事件 ID
+    - areplay 不消费队列，每个订阅者有独立游标，可从任意事件 ID 之后继续（对应 SSE 的 Last-Event-ID），
+      UI、日志与指标收集可以同时订阅同一次运行
 
     使用场景：
     - 工作流执行过程中的事件通信
@@ -34,25 +188,38 @@ class EventChannel:
     - 实时数据流处理
     """
 
-    def __init__(self, max_empty_duration=10.0, queue_timeout=0.1):
+    def __init__(
+        self,
+        max_empty_duration=10.0,
+        queue_timeout=0.1,
+        max_queue_size=None,
+        put_timeout=1.0,
+        coalesce=True,
+        coalesce_window=0.005,
+        coalesce_max_chars=4096,
+        history_size=4096,
+    ):
         """
         初始化事件通道
 
         Args:
-            max_empty_count (int): 最大连续空事件计数，默认100次
-                当连续检查到空事件超过此次数时，触发退出策略
             max_empty_duration (float): 最大空事件持续时间（秒），默认10.0秒
                 当空事件持续时间超过此值时，触发退出策略
-            queue_timeout (float): 队列获取超时时间（秒），默认0.1秒
-                单次队列获取操作的超时时间
+            queue_timeout (float): get_event_from_queue 单次获取的超时时间（秒），默认0.1秒
+            max_queue_size (int): 每个事件类型队列的最大事件数，None 表示不限制
+            put_timeout (float): 队列满时生产者最多阻塞的时间（秒）
+            coalesce (bool): 是否合并同一顶点连续的 MESSAGES 分片
+            coalesce_window (float): 合并窗口（秒），消费者两次取出事件的最小间隔
+            coalesce_max_chars (int): 合并后单帧内容的最大字符数
+            history_size (int): 事件日志保留的最大事件数，0 表示不保留
         """
         # 事件回调存储：event_type -> [callback, ...]
         # 用于同步事件分发给注册的回调函数
         self.event_channels = defaultdict(list)
 
-        # 异步事件队列：event_type -> asyncio.Queue
+        # 事件缓冲队列：event_type -> EventQueue
         # 用于异步流式事件处理
-        self.event_queues = defaultdict(asyncio.Queue)
+        self.event_queues = defaultdict(EventQueue)
 
         # 线程锁：保证事件分发的线程安全
         self.event_lock = Lock()
@@ -61,10 +228,42 @@ class EventChannel:
         self.max_empty_duration = max_empty_duration
         self.queue_timeout = queue_timeout
 
+        # 有界队列与分片合并配置
+        self.max_queue_size = max_queue_size
+        self.put_timeout = put_timeout
+        self.coalesce = coalesce
+        self.coalesce_window = coalesce_window
+        self.coalesce_max_chars = coalesce_max_chars
+        self.dropped_events = 0
+
+        # 可回放的事件日志，供 areplay 的订阅者按游标读取
+        self.history_size = history_size
+        self.event_log = EventLog(history_size)
+
+        # 事件序号与正在等待的消费者
+        self._seq = itertools.count()
+        self._last_seq = None
+        self._waiters = []
+        # 队列有空间时唤醒被背压阻塞的生产者
+        self._not_full = Condition(self.event_lock)
+
         # 预创建三个标准事件队列，提高性能
-        self.event_queues[EventType.MESSAGES] = asyncio.Queue()
-        self.event_queues[EventType.VALUES] = asyncio.Queue()
-        self.event_queues[EventType.UPDATES] = asyncio.Queue()
+        self.event_queues[EventType.MESSAGES] = EventQueue()
+        self.event_queues[EventType.VALUES] = EventQueue()
+        self.event_queues[EventType.UPDATES] = EventQueue()
+
+    def fork(self) -> "EventChannel":
+        """创建一个配置相同、没有事件与订阅者的新通道"""
+        return EventChannel(
+            max_empty_duration=self.max_empty_duration,
+            queue_timeout=self.queue_timeout,
+            max_queue_size=self.max_queue_size,
+            put_timeout=self.put_timeout,
+            coalesce=self.coalesce,
+            coalesce_window=self.coalesce_window,
+            coalesce_max_chars=self.coalesce_max_chars,
+            history_size=self.history_size,
+        )
 
     def set_wait_time(self, wait_time: float):
         """
@@ -80,7 +279,7 @@ class EventChannel:
         """
         发送事件到指定类型的通道
 
-        此方法是线程安全的，支持同时向同步回调和异步队列分发事件。
+        此方法是线程安全的，可以在任意线程中调用，支持同时向同步回调和异步队列分发事件。
 
         Args:
             event_type (str): 事件类型，应为EventType中定义的常量
@@ -89,8 +288,9 @@ class EventChannel:
         处理流程：
         1. 获取线程锁确保线程安全
         2. 遍历并调用所有注册的同步回调函数
-        3. 将事件数据放入对应的异步队列
-        4. 异常处理：回调异常不影响其他回调，队列满时记录警告
+        3. 分配事件序号并写入事件日志
+        4. 将事件数据合并到队尾的同一顶点分片，或放入对应的缓冲队列（队列满时背压）
+        5. 唤醒监听该事件类型的消费者（每个消费者最多一个待执行的唤醒）
         """
         with self.event_lock:
             # 同步回调处理：立即执行所有注册的回调函数
@@ -101,14 +301,102 @@ class EventChannel:
                     # 单个回调异常不应影响其他回调的执行
                     logger.error(f"Error in event callback: {e}")
 
-            # 异步队列处理：将事件放入队列供异步消费
-            if event_type in self.event_queues:
-                try:
-                    # 使用put_nowait避免阻塞，如果队列满则抛出异常
-                    self.event_queues[event_type].put_nowait(event_data)
-                except asyncio.QueueFull:
-                    # 队列满时记录警告但不阻塞程序执行
-                    logger.warning(f"Queue full for event type {event_type}, dropping event")
+            queue = self.event_queues.get(event_type)
+            merge = queue is not None and event_type == EventType.MESSAGES and self._can_coalesce(queue, event_data)
+            if queue is not None and not merge:
+                self._wait_for_space(event_type, queue)
+
+            seq = self._last_seq = next(self._seq)
+            self.event_log.append(seq, event_type, event_data)
+            if merge:
+                tail_data = queue.tail()[1]
+                queue.replace_tail({**tail_data, CONTENT_KEY: tail_data[CONTENT_KEY] + event_data[CONTENT_KEY]}, seq)
+            elif queue is not None:
+                queue.put_nowait(event_data, seq)
+
+            for waiter in list(self._waiters):
+                if event_type not in waiter.event_types or waiter.pending:
+                    continue
+                waiter.pending = True
+                if not waiter.notify():
+                    # 消费者的事件循环已关闭
+                    self._waiters.remove(waiter)
+
+    def _can_coalesce(self, queue: EventQueue, event_data) -> bool:
+        """在持有锁时调用：分片能否合并到队尾同一顶点的分片中
+
+        只有队尾事件是全部事件类型中最后发送的事件时才合并，不会改变跨事件类型的顺序。
+        """
+        if not self.coalesce or not _is_chunk(event_data):
+            return False
+        tail = queue.tail()
+        if tail is None or tail[0] != self._last_seq or not _is_chunk(tail[1]):
+            return False
+        tail_data = tail[1]
+        if tail_data[VERTEX_ID_KEY] != event_data[VERTEX_ID_KEY] or tail_data.get(TYPE_KEY) != event_data.get(TYPE_KEY):
+            return False
+        return len(tail_data[CONTENT_KEY]) + len(event_data[CONTENT_KEY]) <= self.coalesce_max_chars
+
+    def _wait_for_space(self, event_type, queue: EventQueue):
+        """在持有锁时调用：队列满时阻塞等待消费者取出事件，无法等待或超时时丢弃最旧的事件"""
+        if self.max_queue_size is None or queue.qsize() < self.max_queue_size:
+            return
+        consumer_loops = {waiter.loop for waiter in self._waiters if waiter.drains and event_type in waiter.event_types}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        # 没有消费者时不阻塞；在消费者的事件循环线程中阻塞会导致死锁
+        if consumer_loops and running not in consumer_loops:
+            deadline = time.monotonic() + self.put_timeout
+            while queue.qsize() >= self.max_queue_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._not_full.wait(remaining)
+        while queue.qsize() >= self.max_queue_size:
+            queue.evict_oldest()
+            self.dropped_events += 1
+            if self.dropped_events == 1 or self.dropped_events % 1000 == 0:
+                logger.warning(f"Queue full for event type {event_type}, dropped {self.dropped_events} oldest events")
+
+    def _add_waiter(self, event_types, drains: bool = True) -> _Waiter:
+        waiter = _Waiter(asyncio.get_running_loop(), event_types, drains)
+        with self.event_lock:
+            self._waiters.append(waiter)
+        return waiter
+
+    def _remove_waiter(self, waiter: _Waiter):
+        with self.event_lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _arm(self, waiter: _Waiter):
+        """在取出事件之前调用，之后到达的事件会重新唤醒消费者"""
+        with self.event_lock:
+            waiter.pending = False
+            waiter.event.clear()
+
+    def _drain(self, event_types):
+        """按发送顺序取出多个事件类型的全部事件"""
+        items = []
+        with self.event_lock:
+            # 与队尾合并互斥，避免分片合并到已被取出的事件中
+            for event_type in event_types:
+                items.extend(self.event_queues[event_type].drain())
+            if items and self.max_queue_size is not None:
+                self._not_full.notify_all()
+        if len(event_types) > 1:
+            items.sort(key=lambda item: item[0])
+        return [event_data for _, event_data in items]
+
+    def _get_nowait(self, queue: EventQueue):
+        """取出一个事件并唤醒被背压阻塞的生产者，队列为空时抛出 asyncio.QueueEmpty"""
+        with self.event_lock:
+            event_data = queue.get_nowait()
+            if self.max_queue_size is not None:
+                self._not_full.notify_all()
+        return event_data
 
     async def astream(self, event_types):
         """
@@ -121,17 +409,31 @@ class EventChannel:
             event_types (list): 要监听的事件类型列表，如[EventType.MESSAGES, EventType.VALUES]
 
         Yields:
-            event_data: 接收到的事件数据，按接收顺序yield
+            event_data: 接收到的事件数据，多个事件类型之间按发送顺序yield
 
         特性：
-        1. 并发监听：同时监听多个事件队列
+        1. 合并监听：所有事件类型共享一个唤醒原语，空闲时不轮询
         2. 智能退出：基于空事件持续时间的退出策略
         3. workflow状态处理：处理workflow_complete和workflow_failed两种结束状态
         4. 异常安全：妥善处理取消和异常情况
 
         退出条件：
-        - 接收到workflow_complete或workflow_failed事件且所有队列为空
-        - 空事件持续时间超过max_empty_duration秒
+        - 接收到workflow_complete或workflow_failed事件且其它队列为空
+        - 空事件持续时间超过max_empty_duration秒（尚未收到结束事件时为两倍）
+        """
+        async for batch in self.astream_batches(event_types):
+            for event_data in batch:
+                yield event_data
+
+    async def astream_batches(self, event_types):
+        """
+        与 astream 相同，但每次唤醒取出的事件作为一个列表 yield
+
+        适合按批写出的消费者（如 SSE 响应），一个批次只需一次编码与写入。
+        开启分片合并时，两次取出之间至少间隔 coalesce_window 秒，期间到达的分片在队列中合并。
+
+        Yields:
+            list: 按发送顺序排列的事件列表（不为空）
         """
         # 统一处理为列表格式：支持单个事件类型或事件类型列表
         if isinstance(event_types, str):
@@ -139,180 +441,138 @@ class EventChannel:
 
         logger.debug(f"astream called with event_types: {event_types}")
 
-        # 创建任务列表，每个事件类型对应一个任务
-        async def get_event_from_queue(event_type):
-            try:
-                # 先检查队列是否为空，如果不为空立即获取
-                if not self.event_queues[event_type].empty():
-                    event_data = await self.event_queues[event_type].get()
-                    return event_type, event_data
-
-                # 队列为空时使用超时机制等待
-                event_data = await asyncio.wait_for(self.event_queues[event_type].get(), timeout=self.queue_timeout)
-                return event_type, event_data
-            except asyncio.TimeoutError:
-                # 超时时返回None，让外层循环继续
-                return event_type, None
-            except asyncio.CancelledError:
-                logger.debug(f"Task for {event_type} was cancelled")
-                raise
-            except Exception as e:
-                logger.error(f"Error getting event from queue {event_type}: {e}")
-                raise
-
-        current_tasks = []
-        # 智能退出策略相关变量
-        empty_start_time = None  # 空事件开始时间
-        workflow_complete_event = None  # 暂存workflow状态事件，等待合适时机发送
-        workflow_ended = False  # 标记workflow是否已结束（包括完成和失败）
+        waiter = self._add_waiter(event_types)
+        loop = asyncio.get_running_loop()
+        workflow_complete_event = None  # 暂存workflow状态事件，等待其它队列清空后发送
+        empty_start_time = loop.time()
+        last_yield_time = None
 
         try:
             while True:
-                logger.debug(f"Event waiting: event_types={event_types}")
-
-                # 创建所有事件类型的等待任务
-                current_tasks = [asyncio.create_task(get_event_from_queue(event_type)) for event_type in event_types]
-
+                if self.coalesce and last_yield_time is not None:
+                    # 合并窗口：距上次输出不足窗口时间时稍等，让分片在队列中合并
+                    delay = last_yield_time + self.coalesce_window - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                self._arm(waiter)
+                events = self._drain(event_types)
+
+                batch = []
+                for event_data in events:
+                    status = event_data.get("status") if isinstance(event_data, dict) else None
+                    if status in WORKFLOW_END_STATES:
+                        logger.info(f"Workflow {status} event received, will be deferred until other queues are empty")
+                        workflow_complete_event = event_data
+                        continue
+                    batch.append(event_data)
+
+                if workflow_complete_event is not None and self.all_queues_empty_except_updates(event_types):
+                    # 除UPDATES外的其他队列都空了，才发送workflow状态事件
+                    logger.info("Other queues empty, now yielding workflow status event")
+                    batch.append(workflow_complete_event)
+                    yield batch
+                    break
+
+                if batch:
+                    yield batch
+                    last_yield_time = loop.time()
+                    logger.debug(f"Event batch yielded: {len(batch)} events")
+
+                if workflow_complete_event is not None:
+                    logger.info("Workflow ended but other queues not empty, continuing to process remaining events")
+                    continue
+
+                if events:
+                    empty_start_time = loop.time()
+                    continue
+
+                # 智能退出策略：没有收到结束事件时最多等待两倍的空事件持续时间
+                max_duration = self.max_empty_duration * 2
+                remaining = max_duration - (loop.time() - empty_start_time)
+                if remaining <= 0:
+                    logger.info(f"No events for extended period ({max_duration:.2f}s), stopping stream")
+                    break
                 try:
-                    # 等待所有任务完成
-                    done, _ = await asyncio.wait(current_tasks, return_when=asyncio.ALL_COMPLETED)
-
-                    # 处理所有完成的任务
-                    has_valid_event = False
-                    events_to_yield = []
-
-                    for task in done:
-                        try:
-                            event_type, event_data = await task
-                            if event_data is not None:  # 忽略超时返回的None
-                                has_valid_event = True
-                                logger.debug(f"Event received from {event_type}: {event_data}")
-
-                                # 检查是否收到 workflow 状态事件
-                                status = event_data.get("status")
-                                if status in WORKFLOW_END_STATES:
-                                    workflow_ended = True
-                                    workflow_complete_event = event_data
-                                    logger.info(
-                                        f"Workflow {status} event received, will be deferred until other queues are empty"
-                                    )
-                                    # 不立即yield，而是暂存起来
-                                else:
-                                    # 非workflow状态事件加入待yield列表
-                                    events_to_yield.append(event_data)
-                        except Exception as e:
-                            logger.error(f"Error processing task result: {e}")
-
-                    # yield所有非workflow状态事件
-                    for event_data in events_to_yield:
-                        yield event_data
-                        logger.debug(f"Event yielded: {event_data}")
-
-                    # 如果没有找到有效事件，短暂等待
-                    if not has_valid_event:
-                        await asyncio.sleep(self.queue_timeout)
-
-                    # 检查是否应该发送暂存的workflow状态事件
-                    if workflow_complete_event:
-                        # 检查除了UPDATES队列外的其他队列是否为空
-                        other_event_types = [et for et in event_types if et != EventType.UPDATES]
-                        other_queues_empty = all(self.event_queues[et].empty() for et in other_event_types)
-
-                        if other_queues_empty:
-                            # 其他队列都空了，现在可以发送workflow状态事件
-                            logger.info("Other queues empty, now yielding workflow status event")
-                            yield workflow_complete_event
-                            logger.debug(f"Workflow status event yielded: {workflow_complete_event}")
-                            break
-                        else:
-                            logger.info(
-                                "Workflow ended but other queues not empty, continuing to process remaining events"
-                            )
-                            # 继续处理剩余事件，不退出循环
-
-                    # 智能退出策略：基于工作流状态和超时机制
-                    all_queues_empty = all(self.event_queues[et].empty() for et in event_types)
-
-                    if not has_valid_event and all_queues_empty:
-                        # 初始化或更新空事件计数和时间戳
-                        current_time = asyncio.get_event_loop().time()
-                        if empty_start_time is None:
-                            empty_start_time = current_time
-                            empty_count = 0
-                        else:
-                            empty_count += 1
-
-                        empty_duration = current_time - empty_start_time
-
-                        # 退出条件：
-                        # 1. 空事件持续时间超过配置的最大时长
-                        # 2. 且所有队列确实为空
-                        # 3. 但如果还没收到workflow状态事件，则延长等待时间
-                        max_duration = self.max_empty_duration if workflow_ended else self.max_empty_duration * 2
-                        if empty_duration > max_duration and all_queues_empty:
-                            logger.info(
-                                f"No events for extended period (count: {empty_count}, duration: {empty_duration:.2f}s), stopping stream"
-                            )
-                            break
-                    else:
-                        # 重置空事件计数器
-                        empty_start_time = None
-                        empty_count = 0
-
-                    # 如果收到 workflow 状态事件，且所有队列都为空，则退出
-                    if workflow_ended and all_queues_empty:
-                        logger.info("Workflow ended and all queues are empty, stopping event channel")
-                        break
-
-                except Exception as e:
-                    # 取消所有任务
-                    for task in current_tasks:
-                        if not task.done():
-                            task.cancel()
-                            try:
-                                await task
-                            except asyncio.CancelledError:
-                                pass
-                    raise e
-
-                except asyncio.CancelledError:
-                    # 如果整个等待被取消，确保清理当前任务
-                    for task in current_tasks:
-                        if not task.done():
-                            task.cancel()
-                            try:
-                                await task
-                            except asyncio.CancelledError:
-                                pass
-                    if current_tasks:
-                        await asyncio.gather(*current_tasks, return_exceptions=True)
-                    raise
+                    await asyncio.wait_for(waiter.event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
 
         except Exception as e:
             logger.error(f"Error in astream: {e}")
         finally:
-            # 确保所有任务都被取消
-            for task in current_tasks:
-                if not task.done():
-                    task.cancel()
-                    try:
-                        await task
-                    except asyncio.CancelledError:
-                        pass
-            if current_tasks:
-                await asyncio.gather(*current_tasks, return_exceptions=True)
-
-            # 清空所有事件队列，确保没有残留事件阻止程序退出
+            self._remove_waiter(waiter)
+            # 清空所有事件队列，确保没有残留事件
             for event_type in event_types:
                 if event_type in self.event_queues:
-                    queue = self.event_queues[event_type]
-                    while not queue.empty():
-                        try:
-                            queue.get_nowait()
-                        except asyncio.QueueEmpty:
-                            break
+                    self.event_queues[event_type].clear()
+
+            logger.debug("Waiter removed and queues cleared in astream")
+
+    async def areplay(self, event_types, last_event_id=None):
+        """
+        从事件日志中读取事件，不消费事件队列
+
+        每次调用是一个独立的订阅者，游标从 last_event_id 之后开始（None 表示从日志中最早的事件开始），
+        多个订阅者之间、与 astream 之间互不影响。游标落后于日志保留的范围时，从最早保留的事件继续。
 
-            logger.debug("All tasks cleaned up and queues cleared in astream")
+        Args:
+            event_types: 单个事件类型字符串或事件类型列表
+            last_event_id (int): 订阅者已收到的最后一个事件 ID，断线重连时传入
+
+        Yields:
+            tuple: (事件 ID, 事件数据)，事件 ID 可作为下次重连的 last_event_id
+
+        退出条件：
+        - 读到 workflow_complete 或 workflow_failed 等结束事件（已在日志中的运行会回放后立即结束）
+        - 空事件持续时间超过 max_empty_duration 的两倍
+        """
+        if isinstance(event_types, str):
+            event_types = [event_types]
+        event_types = frozenset(event_types)
+
+        # 结束事件在 UPDATES 中发送，始终监听以便及时退出
+        waiter = self._add_waiter(event_types | {EventType.UPDATES}, drains=False)
+        loop = asyncio.get_running_loop()
+        cursor = last_event_id
+        empty_start_time = loop.time()
+
+        try:
+            while True:
+                self._arm(waiter)
+                with self.event_lock:
+                    first_seq = self.event_log.first_seq
+                    entries = self.event_log.read_after(cursor)
+                if cursor is not None and first_seq is not None and cursor + 1 < first_seq:
+                    logger.warning(f"Event log cursor {cursor} evicted, resuming from event {first_seq}")
+
+                finished = False
+                for seq, event_type, event_data in entries:
+                    cursor = seq
+                    if event_type in event_types:
+                        yield seq, event_data
+                    status = event_data.get("status") if isinstance(event_data, dict) else None
+                    if status in WORKFLOW_END_STATES:
+                        finished = True
+                        break
+                if finished:
+                    break
+
+                if entries:
+                    empty_start_time = loop.time()
+                    continue
+
+                max_duration = self.max_empty_duration * 2
+                remaining = max_duration - (loop.time() - empty_start_time)
+                if remaining <= 0:
+                    logger.info(f"No events for extended period ({max_duration:.2f}s), stopping replay")
+                    break
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._remove_waiter(waiter)
 
     def subscribe(self, event_type: str, callback):
         """
@@ -337,36 +597,38 @@ class EventChannel:
         """
         从指定队列获取事件
 
-        这是一个异步方法，用于从事件队列中获取事件数据。
-        采用两阶段获取策略：先尝试立即获取，失败则等待超时。
+        先尝试立即获取，队列为空时等待新事件到达，最多等待 queue_timeout 秒。
 
         Args:
             event_type (str): 事件类型
 
         Returns:
             event_data: 获取到的事件数据，如果超时则返回None
-
-        获取策略：
-        1. 首先检查队列是否为空，非空则立即获取
-        2. 如果队列为空，使用超时等待机制
-        3. 超时后返回None，避免无限阻塞
         """
         queue = self.event_queues[event_type]
+        try:
+            return self._get_nowait(queue)
+        except asyncio.QueueEmpty:
+            pass
 
-        # 第一阶段：尝试立即获取（避免不必要的等待）
-        if not queue.empty():
-            try:
-                return queue.get_nowait()
-            except asyncio.QueueEmpty:
-                # 队列在检查后被其他协程清空，继续到第二阶段
-                pass
-
-        # 第二阶段：超时等待获取
+        waiter = self._add_waiter([event_type])
         try:
-            return await asyncio.wait_for(queue.get(), timeout=self.queue_timeout)
-        except asyncio.TimeoutError:
-            # 超时返回None，让调用方知道没有事件
-            return None
+            deadline = asyncio.get_running_loop().time() + self.queue_timeout
+            while True:
+                self._arm(waiter)
+                try:
+                    return self._get_nowait(queue)
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return None
+        finally:
+            self._remove_waiter(waiter)
 
     def all_queues_empty_except_updates(self, event_types):
         """
@@ -0,0 +1,226 @@
+"""
+LLM 服务商的共享 HTTP 客户端
+
+每个 ChatModel 各自创建 OpenAI 客户端时，按请求或切换模型时新建的模型无法复用已建立的连接，
+每次都要重新进行 TCP/TLS 握手，占据首字延迟中可观的一部分。这里按 (base_url, api_key, 超时配置)
+在进程内共享客户端及其连接池：
+- 连接池上限、keep-alive 连接数与空闲过期时间可通过 configure_http_clients 调整
+- 安装了 h2 且服务端为 https 时启用 HTTP/2，多个并发请求复用同一连接
+- 异步客户端的连接池绑定创建它的事件循环，因此按事件循环分别共享
+- http_client_stats 返回各客户端的请求数与连接池状态
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import weakref
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI as AsyncOpenAIClient
+from openai import OpenAI as OpenAIClient
+
+from vertex_flow.utils.logger import LoggerUtil
+
+logging = LoggerUtil.get_logger()
+
+# 超时配置：名称 -> 超时时间，default 与 openai 客户端的默认值相同
+TIMEOUT_PROFILES: Dict[str, httpx.Timeout] = {
+    "default": httpx.Timeout(600.0, connect=5.0),
+    "interactive": httpx.Timeout(120.0, connect=5.0),
+    "batch": httpx.Timeout(1800.0, connect=10.0),
+}
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_limits = httpx.Limits(
+    max_connections=DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+)
+_http2_enabled = True
+
+ClientKey = Tuple[str, str, str, bool]
+
+_lock = Lock()
+_clients: Dict[ClientKey, "_PooledClient"] = {}
+# 事件循环 -> {客户端键: 异步客户端}，事件循环被回收后其客户端随之释放
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, _PooledClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class _PooledClient:
+    """共享的 OpenAI 客户端及其底层 HTTP 客户端，记录经由它发出的请求数"""
+
+    def __init__(self, key: ClientKey, client, http_client):
+        self.key = key
+        self.client = client
+        self.http_client = http_client
+        self.requests = 0
+
+    def _count_request(self, request):
+        self.requests += 1
+
+    async def _acount_request(self, request):
+        self.requests += 1
+
+    def stats(self) -> Dict[str, Any]:
+        base_url, _, timeout_profile, http2 = self.key
+        stats = {
+            "base_url": base_url,
+            "timeout_profile": timeout_profile,
+            "http2": http2,
+            "async": isinstance(self.client, AsyncOpenAIClient),
+            "requests": self.requests,
+        }
+        # 连接数来自 httpcore 连接池，无法获取时为 None
+        pool = getattr(getattr(self.http_client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            stats.update(connections=None, idle_connections=None)
+        else:
+            stats.update(
+                connections=len(connections),
+                idle_connections=sum(1 for connection in connections if connection.is_idle()),
+            )
+        return stats
+
+
+def configure_http_clients(
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+    http2: Optional[bool] = None,
+):
+    """调整连接池配置，只影响之后创建的客户端
+
+    已创建的客户端从注册表移出，正在进行的请求（包括流式响应）不受影响，
+    不再被引用后关闭其连接池。
+    """
+    global _limits, _http2_enabled
+    with _lock:
+        _limits = httpx.Limits(
+            max_connections=max_connections if max_connections is not None else _limits.max_connections,
+            max_keepalive_connections=(
+                max_keepalive_connections
+                if max_keepalive_connections is not None
+                else _limits.max_keepalive_connections
+            ),
+            keepalive_expiry=keepalive_expiry if keepalive_expiry is not None else _limits.keepalive_expiry,
+        )
+        if http2 is not None:
+            _http2_enabled = http2
+        retired = [(pooled, None) for pooled in _clients.values()]
+        for loop, clients in _async_clients.items():
+            retired.extend((pooled, loop) for pooled in clients.values())
+        _clients.clear()
+        _async_clients.clear()
+    for pooled, loop in retired:
+        _retire(pooled, loop)
+
+
+def _retire(pooled: _PooledClient, loop: Optional[asyncio.AbstractEventLoop] = None):
+    """OpenAI 客户端不再被引用（没有进行中的请求）后关闭其连接池"""
+    client, pooled.client = pooled.client, None
+    if loop is None:
+        weakref.finalize(client, pooled.http_client.close)
+    else:
+        weakref.finalize(client, _close_async_client, loop, pooled.http_client)
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, http_client: httpx.AsyncClient):
+    # 异步连接池只能在创建它的事件循环中关闭，事件循环已关闭时连接随之释放
+    try:
+        loop.call_soon_threadsafe(lambda: loop.create_task(http_client.aclose()))
+    except RuntimeError:
+        pass
+
+
+def _client_key(base_url: str, api_key: str, timeout_profile: str, http2: bool) -> ClientKey:
+    if timeout_profile not in TIMEOUT_PROFILES:
+        raise ValueError(f"Unknown timeout profile '{timeout_profile}', expected one of {list(TIMEOUT_PROFILES)}.")
+    # HTTP/2 需要 h2，且只用于 https（本地 Ollama 等 http 服务不支持 h2c 升级）
+    http2 = http2 and _http2_enabled and HTTP2_AVAILABLE and base_url.startswith("https://")
+    return (base_url, api_key, timeout_profile, http2)
+
+
+def get_client(base_url: str, api_key: str, timeout_profile: str = "default", http2: bool = True) -> OpenAIClient:
+    """获取进程内共享的 OpenAI 客户端
+
+    Args:
+        base_url: 服务商地址
+        api_key: API 密钥
+        timeout_profile: TIMEOUT_PROFILES 中的超时配置名称
+        http2: 服务商是否支持 HTTP/2，实际是否启用还取决于 h2 是否安装与全局配置
+    """
+    key = _client_key(base_url, api_key, timeout_profile, http2)
+    with _lock:
+        pooled = _clients.get(key)
+        if pooled is None:
+            timeout = TIMEOUT_PROFILES[timeout_profile]
+            pooled = _PooledClient(key, None, None)
+            pooled.http_client = httpx.Client(
+                limits=_limits,
+                timeout=timeout,
+                http2=key[3],
+                follow_redirects=True,
+                event_hooks={"request": [pooled._count_request]},
+            )
+            pooled.client = OpenAIClient(
+                base_url=base_url, api_key=api_key, timeout=timeout, http_client=pooled.http_client
+            )
+            _clients[key] = pooled
+            logging.info(f"HTTP client created for {base_url}, timeout profile {timeout_profile}, http2 {key[3]}.")
+    return pooled.client
+
+
+def get_async_client(
+    base_url: str, api_key: str, timeout_profile: str = "default", http2: bool = True
+) -> AsyncOpenAIClient:
+    """获取当前事件循环中共享的异步 OpenAI 客户端，只能在协程中调用，参数同 get_client"""
+    loop = asyncio.get_running_loop()
+    key = _client_key(base_url, api_key, timeout_profile, http2)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        pooled = clients.get(key)
+        if pooled is None:
+            timeout = TIMEOUT_PROFILES[timeout_profile]
+            pooled = _PooledClient(key, None, None)
+            pooled.http_client = httpx.AsyncClient(
+                limits=_limits,
+                timeout=timeout,
+                http2=key[3],
+                follow_redirects=True,
+                event_hooks={"request": [pooled._acount_request]},
+            )
+            pooled.client = AsyncOpenAIClient(
+                base_url=base_url, api_key=api_key, timeout=timeout, http_client=pooled.http_client
+            )
+            clients[key] = pooled
+    return pooled.client
+
+
+def http_client_stats() -> List[Dict[str, Any]]:
+    """各共享客户端的请求数与连接池状态（不包含 API 密钥）"""
+    with _lock:
+        pooled_clients = list(_clients.values())
+        for clients in _async_clients.values():
+            pooled_clients.extend(clients.values())
+    return [pooled.stats() for pooled in pooled_clients]
+
+
+@atexit.register
+def close_http_clients():
+    """关闭共享的同步客户端；异步客户端随事件循环释放"""
+    with _lock:
+        pooled_clients = list(_clients.values())
+        _clients.clear()
+        _async_clients.clear()
+    for pooled in pooled_clients:
+        pooled.http_client.close()
@@ -0,0 +1,329 @@
+"""
+LLM 响应缓存
+
+相同的提示词（固定问题、重试、评测重跑）重复请求服务商时直接复用之前的响应：
+- 缓存键为模型、消息、工具与采样参数的规范化哈希（request_hash），与字典键顺序无关
+- 存储后端复用 vertex_cache 中的实现：InProcessVertexCache（进程内 LRU + TTL），
+  MemoryVertexCache（FileMemory、RedisMemory 等 Memory 后端，可在进程间共享）
+- 非流式响应保存完整的 ChatCompletion，流式响应保存全部分片；命中流式缓存时分片按原顺序
+  经过与实时请求相同的流式处理路径，LLMVertex 产生的事件与实时请求一致
+
+缓存需要按模型显式开启：model.response_cache = InProcessVertexCache(max_entries=1024, ttl_sec=3600)。
+只缓存 openai 类型（pydantic 模型）的响应；请求失败或流式响应未被完整消费时不写入缓存。
+
+语义缓存（SemanticResponseCache）匹配措辞不同但含义相同的问题：对最后一轮用户消息计算嵌入向量，
+在专用的向量索引中检索之前的问题，相似度达到阈值且其余请求内容（系统提示词、历史消息、工具、采样参数）
+完全相同时直接返回之前的响应。通过 model.semantic_cache = SemanticResponseCache(...) 开启，
+与 response_cache 同时开启时先查精确缓存。默认使用进程内索引，条目按 ttl_sec 过期、按 max_entries 淘汰；
+指定 persist_dir 时使用 LocalVectorEngine，索引按批写入磁盘，可在进程重启后继续使用。
+"""
+
+import json
+import time
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.vertex_cache import UnhashableValueError, stable_hash
+
+logging = LoggerUtil.get_logger()
+
+# 不影响响应内容的请求参数，不参与缓存键
+_NON_SAMPLING_OPTIONS = {"stream", "stream_options", "timeout"}
+
+
+def canonical_request(model, messages, option: Optional[Dict[str, Any]] = None, tools=None) -> Dict[str, Any]:
+    """请求的规范化表示：同一服务商、模型、消息、工具与采样参数的请求得到相同的结果"""
+    return {
+        "provider": model.provider,
+        "base_url": getattr(model, "_base_url", None),
+        "model": model.name,
+        "messages": messages,
+        "tools": tools or None,
+        "option": {key: value for key, value in (option or {}).items() if key not in _NON_SAMPLING_OPTIONS},
+    }
+
+
+def request_hash(
+    model, messages, option: Optional[Dict[str, Any]] = None, tools=None, stream: bool = False
+) -> Optional[str]:
+    """请求的规范化哈希，流式与非流式响应的存储格式不同，分别缓存；请求无法稳定哈希时返回 None"""
+    try:
+        return stable_hash({**canonical_request(model, messages, option, tools), "stream": stream})
+    except UnhashableValueError as e:
+        logging.debug(f"LLM request can not be hashed, bypass cache: {e}")
+        return None
+
+
+def dump_response(response) -> Optional[Dict[str, Any]]:
+    """将 ChatCompletion / ChatCompletionChunk 转换为可 JSON 序列化的字典，不支持的对象返回 None"""
+    model_dump = getattr(response, "model_dump", None)
+    if not callable(model_dump):
+        return None
+    return model_dump(mode="json")
+
+
+def copy_response(response):
+    """响应的独立副本，合并的请求各自修改响应时互不影响；不支持复制的对象原样返回"""
+    model_copy = getattr(response, "model_copy", None)
+    if not callable(model_copy):
+        return response
+    return model_copy(deep=True)
+
+
+def load_completion(data: Dict[str, Any]) -> ChatCompletion:
+    return ChatCompletion.model_validate(data)
+
+
+def load_chunks(data: List[Dict[str, Any]]) -> List[ChatCompletionChunk]:
+    return [ChatCompletionChunk.model_validate(chunk) for chunk in data]
+
+
+class SemanticKey(NamedTuple):
+    """语义缓存的写入位置：除最后一轮用户消息外的请求哈希、用户问题及其嵌入向量"""
+
+    scope: str
+    question: str
+    vector: List[float]
+
+
+def final_user_text(messages) -> Optional[str]:
+    """最后一轮用户消息的文本，最后一条不是用户消息或包含图片等非文本内容时返回 None"""
+    if not messages or not isinstance(messages[-1], dict) or messages[-1].get("role") != "user":
+        return None
+    content = messages[-1].get("content")
+    if isinstance(content, list):
+        if not all(isinstance(part, dict) and part.get("type") == "text" for part in content):
+            return None
+        content = "\n".join(str(part.get("text", "")) for part in content)
+    if not isinstance(content, str) or not content.strip():
+        return None
+    return content.strip()
+
+
+class _InMemoryVectorIndex:
+    """进程内的向量索引（暴力内积检索），接口与 LocalVectorEngine 的 insert/search/delete 相同"""
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._contents: List[str] = []
+        self._vectors = None
+
+    def insert(self, docs, index_name=None):
+        import numpy as np
+
+        for doc in docs:
+            vector = np.asarray(doc["vector"], dtype=np.float32).reshape(1, -1)
+            self._vectors = vector if self._vectors is None else np.vstack([self._vectors, vector])
+            self._ids.append(doc["id"])
+            self._contents.append(doc["content"])
+
+    def delete(self, doc_ids, index_name=None):
+        doc_ids = set(doc_ids)
+        keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in doc_ids]
+        removed = len(self._ids) - len(keep)
+        if removed:
+            self._ids = [self._ids[i] for i in keep]
+            self._contents = [self._contents[i] for i in keep]
+            self._vectors = self._vectors[keep] if keep else None
+        return removed
+
+    def search(self, query, index_name=None, include_vector=False, top_k=3, filter=None):
+        import numpy as np
+
+        if self._vectors is None:
+            return []
+        scores = self._vectors @ np.asarray(query, dtype=np.float32)
+        top = np.argsort(-scores)[:top_k]
+        return [{"id": self._ids[i], "content": self._contents[i], "score": float(scores[i])} for i in top]
+
+
+class SemanticResponseCache:
+    """基于嵌入向量的语义响应缓存
+
+    问题向量归一化后写入向量索引（内积即余弦相似度），响应随问题一起保存在索引的文档内容中。
+    检索 top_k 个最相似的问题，只接受请求范围相同且未过期的条目。
+    默认使用进程内索引；指定 persist_dir 时使用 LocalVectorEngine，每 save_every 次写入保存一次索引，
+    flush() 立即保存，缓存被回收或进程退出时保存未写入的变更。
+    """
+
+    def __init__(
+        self,
+        embedding_provider,
+        threshold: float = 0.92,
+        top_k: int = 5,
+        vector_engine=None,
+        index_name: str = "llm_semantic_cache",
+        persist_dir: Optional[str] = None,
+        ttl_sec: Optional[int] = 3600,
+        max_entries: Optional[int] = 10000,
+        save_every: int = 32,
+    ):
+        """
+        Args:
+            embedding_provider: TextEmbeddingProvider 实例
+            threshold: 命中所需的最低余弦相似度
+            top_k: 每次检索的候选条目数
+            vector_engine: 向量引擎，None 时在首次使用时按嵌入向量的维度创建索引
+            index_name: LocalVectorEngine 的索引名称
+            persist_dir: LocalVectorEngine 的持久化目录，None 时使用不持久化的进程内索引
+            ttl_sec: 条目过期时间（秒），None 或小于等于 0 表示永不过期
+            max_entries: 最大条目数，超出时淘汰最早写入的条目（需要向量引擎支持 delete），None 表示不限制
+            save_every: 使用 LocalVectorEngine 时每多少次变更保存一次索引
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}.")
+        self.embedding_provider = embedding_provider
+        self.threshold = threshold
+        self.top_k = top_k
+        self.index_name = index_name
+        self.persist_dir = persist_dir
+        self.ttl_sec = ttl_sec if ttl_sec and ttl_sec > 0 else None
+        self.max_entries = max_entries
+        self.save_every = max(1, save_every)
+        self._engine = vector_engine
+        # 文档 ID -> 写入时间，按写入顺序排列，用于过期清理与淘汰
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = Lock()
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """计算归一化的嵌入向量，服务不可用或返回异常结果时返回 None（视为未命中）"""
+        import numpy as np
+
+        try:
+            vector = np.asarray(self.embedding_provider.embedding(text), dtype=np.float32).reshape(-1)
+        except Exception as e:
+            logging.warning(f"Semantic cache embedding failed, bypass cache: {e}")
+            return None
+        if vector.size == 0 or not np.all(np.isfinite(vector)):
+            logging.warning("Semantic cache embedding is empty or invalid, bypass cache.")
+            return None
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return None
+        return (vector / norm).tolist()
+
+    def _get_engine(self, dimension: int):
+        if self._engine is None:
+            if self.persist_dir is None:
+                self._engine = _InMemoryVectorIndex()
+            else:
+                from vertex_flow.workflow.vertex.vector_engines import LocalVectorEngine
+
+                self._engine = LocalVectorEngine(
+                    index_name=self.index_name, dimension=dimension, persist_dir=self.persist_dir, autosave=False
+                )
+                self._load_entries(self._engine)
+                weakref.finalize(self, self._engine.save)
+        return self._engine
+
+    def _load_entries(self, engine) -> None:
+        """记录持久化索引中已有条目的写入时间，使其同样参与过期清理与淘汰"""
+        loaded = []
+        for doc_id, content in zip(getattr(engine, "doc_ids", []), getattr(engine, "documents", [])):
+            try:
+                created_at = float(json.loads(content).get("created_at", 0))
+            except (ValueError, TypeError, AttributeError):
+                created_at = 0.0
+            loaded.append((created_at, doc_id))
+        for created_at, doc_id in sorted(loaded):
+            self._entries[doc_id] = created_at
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_sec is not None and now - created_at > self.ttl_sec
+
+    def lookup(
+        self, model, messages, option=None, tools=None, stream: bool = False
+    ) -> Tuple[Any, Optional[SemanticKey]]:
+        """查找语义相同的问题的响应，返回 (响应, 写入位置)；无法使用语义缓存时写入位置为 None"""
+        question = final_user_text(messages)
+        if question is None:
+            return None, None
+        vector = self._embed(question)
+        if vector is None:
+            return None, None
+        scope = request_hash(model, messages[:-1], option, tools, stream)
+        if scope is None:
+            return None, None
+        key = SemanticKey(scope, question, vector)
+
+        best_score, best_response = None, None
+        with self._lock:
+            results = self._get_engine(len(vector)).search(vector, top_k=self.top_k)
+        now = time.time()
+        for result in results:
+            score = result.get("score", 0.0)
+            if not score >= self.threshold or (best_score is not None and score <= best_score):
+                continue
+            try:
+                entry = json.loads(result.get("content") or "")
+            except ValueError:
+                continue
+            if not isinstance(entry, dict) or entry.get("scope") != key.scope:
+                continue
+            if self._expired(entry.get("created_at", 0), now):
+                continue
+            best_score, best_response = score, entry.get("response")
+
+        with self._lock:
+            if best_response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if best_response is not None:
+            logging.info(f"LLM semantic cache hit, model {model.name}, similarity {best_score:.3f}.")
+        return best_response, key
+
+    def store(self, key: SemanticKey, response: Any) -> None:
+        now = time.time()
+        content = json.dumps(
+            {"scope": key.scope, "question": key.question, "response": response, "created_at": now},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        doc_id = f"{key.scope[:16]}:{stable_hash(key.question)[:16]}"
+        with self._lock:
+            engine = self._get_engine(len(key.vector))
+            # 相同问题的并发未命中会重复写入，替换旧条目
+            removed = [doc_id] if self._entries.pop(doc_id, None) is not None else []
+            evicted = []
+            for entry_id, created_at in self._entries.items():
+                if not self._expired(created_at, now):
+                    break
+                evicted.append(entry_id)
+            for entry_id in evicted:
+                del self._entries[entry_id]
+            while self.max_entries is not None and len(self._entries) >= self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            delete = getattr(engine, "delete", None)
+            if (removed or evicted) and callable(delete):
+                delete(removed + evicted)
+            self.evictions += len(evicted)
+            engine.insert([{"id": doc_id, "content": content, "vector": key.vector}])
+            self._entries[doc_id] = now
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save()
+
+    def _save(self) -> None:
+        save = getattr(self._engine, "save", None)
+        if callable(save):
+            save()
+        self._unsaved = 0
+
+    def flush(self) -> None:
+        """立即保存未写入的变更，只对持久化的索引有效"""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "evictions": self.evictions}
@@ -16,6 +16,7 @@ import uuid
 from typing import Any, Dict, List, Optional, Set, Union
 
 from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.tracing import trace_span
 
 logger = LoggerUtil.get_logger(__name__)
 
@@ -188,7 +189,8 @@ class MCPManager:
         logger.info(f"MCP Manager Call - Tool Name: {tool_name}")
         logger.info(f"MCP Manager Call - Arguments: {json.dumps(arguments, indent=2, ensure_ascii=False)}")
 
-        result = self._submit_request("call_tool", tool_name=tool_name, arguments=arguments)
+        with trace_span(tool_name, "mcp", tool=tool_name):
+            result = self._submit_request("call_tool", tool_name=tool_name, arguments=arguments)
 
         logger.info(f"MCP Manager Result - Tool Name: {tool_name}")
         logger.info(f"MCP Manager Result - Result Type: {type(result)}")
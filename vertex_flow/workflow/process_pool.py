@@ -0,0 +1,193 @@
+"""
+CPU 密集型顶点的进程池执行
+
+FunctionVertex / CodeVertex 指定 executor="process" 时，任务在一个常驻的进程池中执行，
+避免与其它顶点、LLM 流式线程争抢 GIL：
+- 函数任务按模块/函数名引用（get_task_module_and_function_name）发送，子进程中通过
+  load_task_from_data 加载并缓存
+- CodeVertex 发送源代码，子进程按代码内容编译并缓存
+- 序列化后超过阈值的输出通过 multiprocessing.shared_memory 传回，避免大结果经由管道复制
+"""
+
+import atexit
+import hashlib
+import inspect
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.cancellation import check_cancelled, remaining_time
+from vertex_flow.workflow.utils import get_task_module_and_function_name, load_task_from_data
+
+logging = LoggerUtil.get_logger()
+
+# 序列化后超过该大小（字节）的结果通过共享内存返回
+SHARED_MEMORY_THRESHOLD = 1024 * 1024
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+_max_workers: Optional[int] = None
+
+# 子进程内的缓存：任务引用 -> 函数，代码摘要 -> 编译后的 main 函数
+_task_cache: Dict[str, Callable] = {}
+_code_cache: Dict[str, Callable] = {}
+
+
+class SharedMemoryResult:
+    """共享内存中的序列化结果，由父进程读取后释放"""
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+
+def configure_process_pool(max_workers: Optional[int] = None):
+    """设置进程池大小，已创建的进程池会被关闭并在下次使用时按新配置重建"""
+    global _max_workers
+    _max_workers = max_workers
+    shutdown_process_pool()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """获取常驻进程池，首次使用时创建"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # fork 多线程进程可能继承被持有的锁，优先使用 forkserver
+                methods = multiprocessing.get_all_start_methods()
+                mp_context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _pool = ProcessPoolExecutor(max_workers=_max_workers or os.cpu_count(), mp_context=mp_context)
+                logging.info(f"Process pool created, max workers : {_pool._max_workers}.")
+    return _pool
+
+
+def warm_up_process_pool():
+    """预先启动全部工作进程，避免首个任务承担进程启动开销"""
+    pool = get_process_pool()
+    futures = [pool.submit(os.getpid) for _ in range(pool._max_workers)]
+    for future in futures:
+        future.result()
+
+
+@atexit.register
+def shutdown_process_pool():
+    """关闭进程池"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def ensure_task_shippable(task: Callable):
+    """检查任务能否按模块/函数名在子进程中重新加载"""
+    if not inspect.isfunction(task) or task.__name__ == "<lambda>" or task.__qualname__ != task.__name__:
+        raise ValueError(
+            f"Task {task} can not run in process executor, only module level functions can be loaded by reference."
+        )
+
+
+def _pack_result(result: Any):
+    data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) < SHARED_MEMORY_THRESHOLD:
+        return data
+
+    from multiprocessing import resource_tracker, shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shm.buf[: len(data)] = data
+        # 共享内存由父进程读取后释放，子进程不再跟踪
+        resource_tracker.unregister(shm._name, "shared_memory")
+    finally:
+        shm.close()
+    return SharedMemoryResult(shm.name, len(data))
+
+
+def _unpack_result(packed) -> Any:
+    if not isinstance(packed, SharedMemoryResult):
+        return pickle.loads(packed)
+
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=packed.name)
+    try:
+        return pickle.loads(shm.buf[: packed.size])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _run_task(task_data: Dict[str, Any], kwargs: Dict[str, Any]):
+    """子进程入口：按引用加载并执行函数任务"""
+    key = f"{task_data['module']}:{task_data['name']}"
+    task = _task_cache.get(key)
+    if task is None:
+        task = _task_cache[key] = load_task_from_data(task_data)
+    return _pack_result(task(**kwargs))
+
+
+def _run_code(code: str, only_main: bool, kwargs: Dict[str, Any]):
+    """子进程入口：按代码内容编译并执行 CodeVertex 的 main 函数"""
+    key = hashlib.sha256(f"{only_main}:{code}".encode("utf-8")).hexdigest()
+    func = _code_cache.get(key)
+    if func is None:
+        from vertex_flow.workflow.vertex.function_vertex import compile_main_function
+
+        func = _code_cache[key] = compile_main_function(code, only_main)
+    return _pack_result(func(**kwargs))
+
+
+def _discard_result(future: Future):
+    """释放无人读取的结果占用的共享内存"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    packed = future.result()
+    if not isinstance(packed, SharedMemoryResult):
+        return
+
+    from multiprocessing import shared_memory
+
+    try:
+        shm = shared_memory.SharedMemory(name=packed.name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _abandon(future: Future):
+    """撤销尚未开始的任务；已经开始执行的任务无法撤销，完成后由回调释放其结果的共享内存"""
+    if not future.cancel():
+        future.add_done_callback(_discard_result)
+
+
+def _wait_result(future: Future) -> Any:
+    """等待子进程结果，最多等到当前运行/顶点的截止时间，超时后撤销尚未开始的任务"""
+    try:
+        packed = future.result(timeout=remaining_time())
+    except FuturesTimeoutError:
+        _abandon(future)
+        check_cancelled()
+        raise
+    except BaseException:
+        _abandon(future)
+        raise
+    return _unpack_result(packed)
+
+
+def run_task_in_process(task: Callable, **kwargs) -> Any:
+    """在进程池中执行模块级函数任务，阻塞直到返回结果"""
+    task_data = get_task_module_and_function_name(task)
+    return _wait_result(get_process_pool().submit(_run_task, task_data, kwargs))
+
+
+def run_code_in_process(code: str, only_main: bool = True, **kwargs) -> Any:
+    """在进程池中编译并执行 CodeVertex 代码，阻塞直到返回结果"""
+    return _wait_result(get_process_pool().submit(_run_code, code, only_main, kwargs))
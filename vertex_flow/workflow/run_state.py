@@ -0,0 +1,138 @@
+import copy
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# 当前线程/协程所属的运行状态，未激活时顶点状态退回到实例属性
+_current_run_state: ContextVar[Optional["RunState"]] = ContextVar("vertex_flow_run_state", default=None)
+
+
+def current_run_state() -> Optional["RunState"]:
+    """获取当前激活的运行状态，没有激活的运行时返回 None"""
+    return _current_run_state.get()
+
+
+class RunState:
+    """一次工作流运行的私有状态存储
+
+    顶点上由 RunScoped 声明的属性（输出、执行标记、消息列表等）在运行激活期间
+    读写这里的槽位，而不是共享的顶点实例，因此同一个编译后的工作流可以被多个运行并发使用。
+
+    Args:
+        run_id: 运行 ID，不指定时自动生成
+        owner: 拥有该状态的对象（通常是 WorkflowRun），供工作流路由事件等使用
+    """
+
+    def __init__(self, run_id: Optional[str] = None, owner: Any = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.owner = owner
+        # id(对象) -> (对象, 属性槽位)，持有对象引用避免 id 在运行期间被复用
+        self._slots: Dict[int, Tuple[Any, Dict[str, Any]]] = {}
+        self._lock = Lock()
+
+    def slot(self, instance: Any) -> Dict[str, Any]:
+        """获取对象在本次运行中的属性槽位"""
+        entry = self._slots.get(id(instance))
+        if entry is None:
+            with self._lock:
+                entry = self._slots.setdefault(id(instance), (instance, {}))
+        return entry[1]
+
+    @contextmanager
+    def activate(self):
+        """在当前上下文中激活本运行状态"""
+        token = _current_run_state.set(self)
+        try:
+            yield self
+        finally:
+            _current_run_state.reset(token)
+
+    def wrap(self, func: Callable) -> Callable:
+        """包装一个函数，使其无论在哪个线程中被调用都运行在本运行状态下"""
+
+        def wrapper(*args, **kwargs):
+            with self.activate():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+class ScopedRunState(RunState):
+    """只隔离指定对象的运行状态
+
+    指定对象（例如子图中的顶点）的 RunScoped 属性读写本状态自己的槽位，其它对象仍读写父运行状态，
+    没有父运行状态时读写实例自身。用于在同一次运行中并发执行同一组顶点多次（例如 MapVertexGroup
+    的每个元素），各次执行的输出互不覆盖，同时仍能读取子图外顶点的输出并把事件发送到所属运行。
+
+    Args:
+        parent: 父运行状态，通常为 current_run_state()
+        instances: 需要隔离的对象
+    """
+
+    def __init__(self, parent: Optional[RunState], instances: Iterable[Any]):
+        super().__init__(
+            run_id=parent.run_id if parent is not None else None,
+            owner=parent.owner if parent is not None else None,
+        )
+        self.parent = parent
+        self._scoped = {id(instance) for instance in instances}
+
+    def slot(self, instance: Any) -> Dict[str, Any]:
+        if id(instance) in self._scoped:
+            return super().slot(instance)
+        if self.parent is not None:
+            return self.parent.slot(instance)
+        # 与未激活运行时相同，直接读写实例属性
+        return instance.__dict__
+
+
+class RunScoped:
+    """运行作用域属性描述符
+
+    没有激活的运行时，读写实例自身的 __dict__，行为与普通属性一致；
+    运行激活期间，读写当前 RunState 中该实例的槽位。
+
+    Args:
+        default: 槽位中不存在该属性时的默认值
+        factory: 默认值工厂（用于 list/dict 等可变默认值），优先于 default
+        inherit: 为 True 时，运行中的初始值取实例上已配置值的浅拷贝
+    """
+
+    def __init__(self, default: Any = None, factory: Optional[Callable[[], Any]] = None, inherit: bool = False):
+        self.default = default
+        self.factory = factory
+        self.inherit = inherit
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def _new_value(self):
+        return self.factory() if self.factory is not None else self.default
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        state = _current_run_state.get()
+        if state is None:
+            values = instance.__dict__
+            if self.name not in values:
+                values[self.name] = self._new_value()
+            return values[self.name]
+
+        values = state.slot(instance)
+        if self.name not in values:
+            if self.inherit and self.name in instance.__dict__:
+                values[self.name] = copy.copy(instance.__dict__[self.name])
+            else:
+                values[self.name] = self._new_value()
+        return values[self.name]
+
+    def __set__(self, instance, value):
+        state = _current_run_state.get()
+        if state is None:
+            instance.__dict__[self.name] = value
+        else:
+            state.slot(instance)[self.name] = value
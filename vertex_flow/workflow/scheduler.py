@@ -0,0 +1,423 @@
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import Executor, Future
+from functools import partial
+from threading import Event, Lock
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.cancellation import CancellationToken
+from vertex_flow.workflow.tracing import current_span, current_tracer
+
+logger = LoggerUtil.get_logger()
+
+
+def build_dependency_counts(
+    vertex_ids: List[str], dependencies: Dict[str, Set[str]]
+) -> Tuple[Dict[str, int], Dict[str, List[str]]]:
+    """计算剩余依赖计数与后继索引，只统计调度范围内的依赖"""
+    known = set(vertex_ids)
+    remaining: Dict[str, int] = {}
+    successors: Dict[str, List[str]] = {vertex_id: [] for vertex_id in vertex_ids}
+    for vertex_id in vertex_ids:
+        deps = [dep for dep in dependencies.get(vertex_id, ()) if dep in known]
+        remaining[vertex_id] = len(deps)
+        for dep in deps:
+            successors[dep].append(vertex_id)
+    return remaining, successors
+
+
+class ReadyQueue:
+    """就绪队列：优先派发优先级高的顶点，优先级相同（或未指定优先级）时先进先出
+
+    Args:
+        priorities: 顶点 ID -> 优先级，通常为顶点到汇顶点的关键路径长度
+    """
+
+    def __init__(self, priorities: Optional[Mapping[str, float]] = None):
+        self.priorities = priorities
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+
+    def append(self, vertex_id: str):
+        priority = self.priorities.get(vertex_id, 0) if self.priorities else 0
+        heapq.heappush(self._heap, (-priority, next(self._counter), vertex_id))
+
+    def extend(self, vertex_ids: Iterable[str]):
+        for vertex_id in vertex_ids:
+            self.append(vertex_id)
+
+    def popleft(self) -> str:
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class ScheduleTrace:
+    """记录顶点等待依赖与在就绪队列中排队的时间，未开启追踪时不做任何事
+
+    在调度器创建时捕获当前的追踪器与 span，时间段记录在按名称分组的异步轨道上。
+    """
+
+    def __init__(self):
+        self.tracer = current_tracer()
+        self.parent = current_span()
+        self.started_at = time.perf_counter()
+        self._ready_at: Dict[str, float] = {}
+
+    def ready(self, vertex_id: str, has_dependencies: bool):
+        """顶点进入就绪队列，有依赖的顶点记录从调度开始到依赖全部完成的时间"""
+        if self.tracer is None:
+            return
+        now = time.perf_counter()
+        self._ready_at[vertex_id] = now
+        if has_dependencies:
+            self.tracer.interval(
+                "wait_dependencies", "schedule", self.started_at, now, parent=self.parent, vertex_id=vertex_id
+            )
+
+    def dispatched(self, vertex_id: str):
+        """顶点开始执行，记录在就绪队列中排队的时间"""
+        if self.tracer is None:
+            return
+        now = time.perf_counter()
+        ready_at = self._ready_at.pop(vertex_id, now)
+        self.tracer.interval("queued", "schedule", ready_at, now, parent=self.parent, vertex_id=vertex_id)
+
+
+class ReadyQueueScheduler:
+    """基于就绪队列的事件驱动调度器
+
+    每个顶点维护一个“剩余依赖计数”，顶点执行完成时通过 future 的完成回调
+    递减其下游顶点的计数，计数归零的顶点立即进入就绪队列并被派发执行。
+    与按拓扑序逐个阻塞等待依赖相比，一个就绪顶点不会因为排在某个慢分支之后而被拖住，
+    整体耗时趋近于关键路径长度。
+
+    调度器本身不关心顶点类型，具体的执行、跳过与完成处理通过回调注入：
+    - run_vertex(vertex_id): 在线程池中执行顶点
+    - should_skip(vertex_id): 派发前判断顶点是否需要跳过（例如 if-else 过滤的分支），
+      跳过的顶点视为已完成，其下游照常推进
+    - on_vertex_done(vertex_id): 顶点执行成功后、推进下游之前调用（例如写入上下文）
+
+    关键路径优先：
+    - priorities: 顶点优先级，多个顶点同时就绪时优先派发优先级高（关键路径更长）的顶点
+    - max_workers: 同时提交到线程池的顶点数上限，默认取线程池的工作线程数；
+      线程池饱和时顶点留在就绪队列中按优先级等待，而不是在线程池内部按提交顺序排队
+
+    超时与取消：
+    - vertex_timeout(vertex_id): 返回顶点的超时时间（秒），从顶点开始执行计时
+    - cancellation: 运行级取消令牌，其截止时间即运行截止时间；每个顶点在其子令牌下执行
+    任一顶点失败或超时后立即取消令牌、撤销尚未开始的顶点并返回，不等待仍在执行的线程，
+    这些线程在下一个取消检查点协作式退出。
+    """
+
+    def __init__(
+        self,
+        vertex_ids: Iterable[str],
+        dependencies: Dict[str, Set[str]],
+        run_vertex: Callable[[str], None],
+        executor: Executor,
+        should_skip: Optional[Callable[[str], bool]] = None,
+        on_vertex_done: Optional[Callable[[str], None]] = None,
+        vertex_timeout: Optional[Callable[[str], Optional[float]]] = None,
+        cancellation: Optional[CancellationToken] = None,
+        priorities: Optional[Mapping[str, float]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.vertex_ids: List[str] = list(vertex_ids)
+        self.run_vertex = run_vertex
+        self.executor = executor
+        self.should_skip = should_skip
+        self.on_vertex_done = on_vertex_done
+        self.vertex_timeout = vertex_timeout
+        self.cancellation = cancellation or CancellationToken()
+        self.max_workers = max_workers or getattr(executor, "_max_workers", None)
+
+        self.remaining, self.successors = build_dependency_counts(self.vertex_ids, dependencies)
+
+        self.ready_queue = ReadyQueue(priorities)
+        self.trace = ScheduleTrace()
+        # 已提交到线程池但尚未完成的顶点数
+        self.submitted = 0
+        self.futures: Dict[Future, str] = {}
+        self.finished: Set[str] = set()
+        self.skipped: Set[str] = set()
+        self.error: Optional[BaseException] = None
+        # 已出队但尚未完成的顶点数（包括正在判断是否跳过、已提交到线程池的顶点）
+        self.in_flight = 0
+        # 正在执行的顶点：顶点 ID -> 子取消令牌
+        self.running: Dict[str, CancellationToken] = {}
+
+        self._lock = Lock()
+        self._done_event = Event()
+        # 顶点开始执行或调度结束时唤醒 run()，重新计算最近的截止时间
+        self._wakeup = Event()
+
+    def run(self):
+        """派发所有无依赖的顶点，并阻塞直到全部完成、出现异常或超过截止时间"""
+        if not self.vertex_ids:
+            return
+
+        with self._lock:
+            for vertex_id in self.vertex_ids:
+                if self.remaining[vertex_id] == 0:
+                    self.ready_queue.append(vertex_id)
+                    self.trace.ready(vertex_id, has_dependencies=False)
+        self._drain_ready_queue()
+
+        while not self._done_event.is_set():
+            self._wakeup.wait(self._next_deadline_wait())
+            self._wakeup.clear()
+            self._check_deadlines()
+        if self.error is not None:
+            raise self.error
+
+        if len(self.finished) != len(self.vertex_ids):
+            raise ValueError(
+                f"Graph contains a cycle, scheduled {len(self.finished)} of {len(self.vertex_ids)} vertices."
+            )
+
+    def _drain_ready_queue(self):
+        """派发就绪队列中的顶点，跳过的顶点直接视为完成并推进下游"""
+        while True:
+            with self._lock:
+                if self.error is not None or not self.ready_queue:
+                    self._check_finished()
+                    return
+                if self.max_workers is not None and self.submitted >= self.max_workers:
+                    # 线程池已饱和，顶点完成后继续派发
+                    return
+                vertex_id = self.ready_queue.popleft()
+                self.in_flight += 1
+                # 出队时即占用线程池名额，避免并发派发时超过上限
+                self.submitted += 1
+
+            try:
+                skip = self.should_skip(vertex_id) if self.should_skip else False
+            except BaseException as e:
+                self._fail(vertex_id, e)
+                return
+
+            if skip:
+                logger.info(f"skip {vertex_id}.")
+                with self._lock:
+                    self.submitted -= 1
+                self._complete(vertex_id, skipped=True)
+                continue
+
+            try:
+                future = self.executor.submit(self._run_vertex, vertex_id)
+            except BaseException as e:
+                self._fail(vertex_id, e)
+                return
+            with self._lock:
+                self.futures[future] = vertex_id
+            future.add_done_callback(partial(self._on_future_done, vertex_id))
+
+    def _run_vertex(self, vertex_id: str):
+        """在顶点自己的子令牌下执行，顶点超时从此时开始计时"""
+        timeout = self.vertex_timeout(vertex_id) if self.vertex_timeout else None
+        token = self.cancellation.child(timeout, name=f"vertex {vertex_id}")
+        token.check()
+        self.trace.dispatched(vertex_id)
+        with self._lock:
+            self.running[vertex_id] = token
+        self._wakeup.set()
+        with token.activate():
+            self.run_vertex(vertex_id)
+
+    def _next_deadline_wait(self) -> Optional[float]:
+        """距离最近一个截止时间（运行或正在执行的顶点）的秒数，没有截止时间时返回 None"""
+        with self._lock:
+            remaining = [token.remaining() for token in self.running.values() if token.deadline is not None]
+        if self.cancellation.deadline is not None:
+            remaining.append(self.cancellation.remaining())
+        return min(remaining) if remaining else None
+
+    def _check_deadlines(self):
+        if self.cancellation.cancelled:
+            self._fail(None, self.cancellation.reason)
+            return
+        with self._lock:
+            running = list(self.running.items())
+        for vertex_id, token in running:
+            if token.cancelled:
+                self._fail(vertex_id, token.reason)
+
+    def _on_future_done(self, vertex_id: str, future: Future):
+        with self._lock:
+            self.running.pop(vertex_id, None)
+            self.submitted -= 1
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception is not None:
+            self._fail(vertex_id, exception)
+            return
+        try:
+            if self.on_vertex_done:
+                self.on_vertex_done(vertex_id)
+        except BaseException as e:
+            self._fail(vertex_id, e)
+            return
+        self._complete(vertex_id)
+        self._drain_ready_queue()
+
+    def _complete(self, vertex_id: str, skipped: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            self.finished.add(vertex_id)
+            if skipped:
+                self.skipped.add(vertex_id)
+            for successor in self.successors[vertex_id]:
+                self.remaining[successor] -= 1
+                if self.remaining[successor] == 0:
+                    self.ready_queue.append(successor)
+                    self.trace.ready(successor, has_dependencies=True)
+            self._check_finished()
+
+    def _fail(self, vertex_id: Optional[str], exception: BaseException):
+        if vertex_id is None:
+            logger.error(f"Workflow scheduling aborted: {exception}")
+        else:
+            logger.error(f"Failed to execute vertex {vertex_id}: {exception}")
+        with self._lock:
+            if self.error is not None:
+                return
+            self.error = exception
+            futures = list(self.futures)
+            self._done_event.set()
+            self._wakeup.set()
+        # 快速失败：通知仍在执行的顶点协作式退出，撤销尚未开始的顶点
+        self.cancellation.cancel(exception)
+        for future in futures:
+            future.cancel()
+
+    def _check_finished(self):
+        """在持有锁时调用：所有顶点完成，或再无可推进的顶点时结束等待"""
+        if len(self.finished) == len(self.vertex_ids):
+            self._done_event.set()
+            self._wakeup.set()
+            return
+        if not self.ready_queue and self.in_flight == 0:
+            # 存在环，剩余顶点永远无法就绪
+            self._done_event.set()
+            self._wakeup.set()
+
+
+class AsyncReadyQueueScheduler:
+    """ReadyQueueScheduler 的 asyncio 版本
+
+    依赖计数与派发规则与 ReadyQueueScheduler 相同，但每个就绪顶点以 asyncio.Task 的形式
+    在当前事件循环中执行，调度本身只在事件循环线程中推进，因此不需要加锁。
+    任一顶点失败或超时时取消令牌与其余正在执行的任务并抛出该异常。
+
+    - run_vertex(vertex_id): 执行顶点的协程函数
+    - should_skip / on_vertex_done: 同 ReadyQueueScheduler，在事件循环线程中同步调用
+    - vertex_timeout / cancellation / priorities: 同 ReadyQueueScheduler
+    """
+
+    def __init__(
+        self,
+        vertex_ids: Iterable[str],
+        dependencies: Dict[str, Set[str]],
+        run_vertex: Callable[[str], Awaitable[None]],
+        should_skip: Optional[Callable[[str], bool]] = None,
+        on_vertex_done: Optional[Callable[[str], None]] = None,
+        vertex_timeout: Optional[Callable[[str], Optional[float]]] = None,
+        cancellation: Optional[CancellationToken] = None,
+        priorities: Optional[Mapping[str, float]] = None,
+    ):
+        self.vertex_ids: List[str] = list(vertex_ids)
+        self.run_vertex = run_vertex
+        self.should_skip = should_skip
+        self.on_vertex_done = on_vertex_done
+        self.vertex_timeout = vertex_timeout
+        self.cancellation = cancellation or CancellationToken()
+
+        self.remaining, self.successors = build_dependency_counts(self.vertex_ids, dependencies)
+
+        # 关键路径更长的顶点先创建任务，同步顶点按创建顺序进入顶点线程池
+        self.ready_queue = ReadyQueue(priorities)
+        self.trace = ScheduleTrace()
+        self.finished: Set[str] = set()
+        self.skipped: Set[str] = set()
+
+    async def run(self):
+        """派发所有无依赖的顶点，直到全部完成或出现异常"""
+        for vertex_id in self.vertex_ids:
+            if self.remaining[vertex_id] == 0:
+                self.ready_queue.append(vertex_id)
+                self.trace.ready(vertex_id, has_dependencies=False)
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while True:
+                while self.ready_queue:
+                    vertex_id = self.ready_queue.popleft()
+                    if self.should_skip and self.should_skip(vertex_id):
+                        logger.info(f"skip {vertex_id}.")
+                        self._complete(vertex_id, skipped=True)
+                        continue
+                    running[asyncio.ensure_future(self._run_vertex(vertex_id))] = vertex_id
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(
+                    running.keys(), timeout=self.cancellation.remaining(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self.cancellation.check()
+                for task in done:
+                    vertex_id = running.pop(task)
+                    exception = task.exception()
+                    if exception is not None:
+                        logger.error(f"Failed to execute vertex {vertex_id}: {exception}")
+                        raise exception
+                    if self.on_vertex_done:
+                        self.on_vertex_done(vertex_id)
+                    self._complete(vertex_id)
+        except BaseException as e:
+            # 快速失败：通知在线程中执行的同步顶点协作式退出
+            self.cancellation.cancel(e)
+            raise
+        finally:
+            if running:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+        if len(self.finished) != len(self.vertex_ids):
+            raise ValueError(
+                f"Graph contains a cycle, scheduled {len(self.finished)} of {len(self.vertex_ids)} vertices."
+            )
+
+    async def _run_vertex(self, vertex_id: str):
+        """在顶点自己的子令牌下执行，超过顶点或运行截止时间时抛出 DeadlineExceededError"""
+        timeout = self.vertex_timeout(vertex_id) if self.vertex_timeout else None
+        token = self.cancellation.child(timeout, name=f"vertex {vertex_id}")
+        self.trace.dispatched(vertex_id)
+        with token.activate():
+            if token.deadline is None:
+                await self.run_vertex(vertex_id)
+                return
+            try:
+                await asyncio.wait_for(self.run_vertex(vertex_id), token.remaining())
+            except asyncio.TimeoutError:
+                if token.cancelled:
+                    raise token.reason
+                raise
+
+    def _complete(self, vertex_id: str, skipped: bool = False):
+        self.finished.add(vertex_id)
+        if skipped:
+            self.skipped.add(vertex_id)
+        for successor in self.successors[vertex_id]:
+            self.remaining[successor] -= 1
+            if self.remaining[successor] == 0:
+                self.ready_queue.append(successor)
+                self.trace.ready(successor, has_dependencies=True)
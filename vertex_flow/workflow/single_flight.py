@@ -0,0 +1,322 @@
+"""
+相同请求的合并（single-flight）
+
+同一问题在短时间内大量到达时（例如公众号群发），每个副本各自请求服务商既浪费配额也拖慢响应。
+开启后，键（LLM 请求为 llm_cache.request_hash）相同且同时进行中的请求共用一次上游调用：
+- 非流式请求：后到的调用等待进行中的调用完成，得到相同的结果或异常
+- 流式请求：后到的订阅者先收到已产生的分片，再跟随实时流。任何一个订阅者提前结束都不影响其他订阅者，
+  全部订阅者结束后关闭上游
+调用完成后即从登记中移除，之后的相同请求重新调用上游（复用已完成的响应请使用响应缓存）。
+异步调用只与同一事件循环中的调用合并。
+
+共享的上游调用在独立的线程（异步调用为独立的任务）与空白的 contextvars 上下文中执行，不继承发起者的
+取消令牌与截止时间：发起者的超时或取消不会中断其他调用方共用的请求。每个调用方（包括发起者）等待时
+只按自己所属运行的截止时间与取消状态退出。
+"""
+
+import asyncio
+import contextvars
+from threading import Condition, Event, Lock, Thread
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.cancellation import WorkflowCancelledError, check_cancelled, remaining_time
+
+logging = LoggerUtil.get_logger()
+
+# 等待共享调用时检查当前运行是否被取消的间隔（秒），取消令牌没有截止时间时也能及时退出
+CANCEL_CHECK_INTERVAL = 0.1
+
+
+def _wait_timeout() -> float:
+    return min(remaining_time(CANCEL_CHECK_INTERVAL), CANCEL_CHECK_INTERVAL)
+
+
+def _run_detached(func: Callable[[], Any], name: str) -> Thread:
+    """在独立线程与空白上下文中执行 func，不继承当前运行的取消令牌与截止时间"""
+    thread = Thread(target=contextvars.Context().run, args=(func,), name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def _ensure_detached(coro: Awaitable[Any]) -> "asyncio.Future":
+    """在空白上下文中创建任务，不继承当前运行的取消令牌与截止时间"""
+    return contextvars.Context().run(asyncio.ensure_future, coro)
+
+
+async def _await_shared(future: "asyncio.Future") -> Any:
+    """等待共享的任务：当前调用方超时或被取消时只有自己退出，任务继续为其他调用方执行"""
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=_wait_timeout())
+        if done:
+            return future.result()
+        check_cancelled()
+
+
+class _CallFlight:
+    """进行中的非流式调用"""
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None
+
+
+class _StreamFlight:
+    """进行中的流式调用：已产生的分片与拉取上游分片的线程"""
+
+    def __init__(self, owner: "SingleFlight", key: Hashable, factory: Callable[[], Iterable[Any]]):
+        self.owner = owner
+        self.key = key
+        self.factory = factory
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.abandoned = False
+        self.pump = None
+        self.condition = Condition()
+
+    def _start(self):
+        """首个订阅者拉取分片时启动上游"""
+        with self.condition:
+            if self.pump is None:
+                self.pump = _run_detached(self._run, name="single-flight-stream")
+
+    def _run(self):
+        upstream = None
+        try:
+            upstream = iter(self.factory())
+            for chunk in upstream:
+                with self.condition:
+                    if self.abandoned:
+                        break
+                    self.chunks.append(chunk)
+                    self.condition.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            if self.abandoned:
+                close = getattr(upstream, "close", None)
+                if callable(close):
+                    close()
+            with self.condition:
+                self.done = True
+                self.condition.notify_all()
+
+    def subscribe(self) -> Iterator[Any]:
+        index = 0
+        try:
+            self._start()
+            while True:
+                with self.condition:
+                    while not self.condition.wait_for(
+                        lambda: index < len(self.chunks) or self.done, timeout=_wait_timeout()
+                    ):
+                        check_cancelled()
+                    if index < len(self.chunks):
+                        chunk = self.chunks[index]
+                    else:
+                        # 最靠前的订阅者读完全部分片后，之后的相同请求重新调用上游
+                        self.owner._remove(self.owner._streams, self.key, self)
+                        if self.error is not None:
+                            raise self.error
+                        return
+                yield chunk
+                index += 1
+        finally:
+            self._unsubscribe()
+
+    def _unsubscribe(self):
+        with self.owner._lock:
+            self.subscribers -= 1
+            if self.subscribers == 0 and self.owner._streams.get(self.key) is self:
+                del self.owner._streams[self.key]
+        with self.condition:
+            # 全部订阅者提前结束：不再有人消费上游，关闭上游并允许之后的相同请求重新调用
+            abandoned = self.subscribers == 0 and not self.done
+            if abandoned:
+                self.abandoned = True
+            pump = self.pump
+        if abandoned:
+            if pump is not None:
+                # 上游在收到下一个分片后关闭
+                pump.join(remaining_time())
+
+
+class _AsyncStreamFlight:
+    """_StreamFlight 的异步版本，只在创建它的事件循环中使用
+
+    上游分片在独立的任务中拉取，拉取分片的订阅者被取消不会中断上游，其余订阅者照常继续。
+    """
+
+    def __init__(self, owner: "SingleFlight", key: Hashable, factory: Callable[[], Awaitable[AsyncIterator[Any]]]):
+        self.owner = owner
+        self.key = key
+        self.factory = factory
+        self.upstream = None
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.pending = None
+
+    async def _next(self):
+        try:
+            if self.upstream is None:
+                self.upstream = (await self.factory()).__aiter__()
+            self.chunks.append(await self.upstream.__anext__())
+        except StopAsyncIteration:
+            self._finish()
+        except Exception as e:
+            self.error = e
+            self._finish()
+        finally:
+            self.pending = None
+
+    async def _pull(self):
+        if self.pending is None:
+            self.pending = _ensure_detached(self._next())
+        await _await_shared(self.pending)
+
+    def _finish(self):
+        self.done = True
+        self.owner._remove(self.owner._async_streams, self.key, self)
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        try:
+            while True:
+                if index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                elif self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                else:
+                    await self._pull()
+        finally:
+            await self._unsubscribe()
+
+    async def _unsubscribe(self):
+        with self.owner._lock:
+            self.subscribers -= 1
+            abandoned = self.subscribers == 0 and not self.done
+            if abandoned:
+                self.done = True
+                self.error = RuntimeError("single-flight stream abandoned by all subscribers.")
+                if self.owner._async_streams.get(self.key) is self:
+                    del self.owner._async_streams[self.key]
+        if abandoned:
+            if self.pending is not None:
+                # 取消进行中的拉取，上游迭代器随之结束
+                self.pending.cancel()
+            else:
+                aclose = getattr(self.upstream, "aclose", None)
+                if callable(aclose):
+                    await aclose()
+
+
+class SingleFlight:
+    """按键合并同时进行中的相同调用，可在多个模型实例之间共享"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _CallFlight] = {}
+        self._streams: Dict[Hashable, _StreamFlight] = {}
+        self._async_calls: Dict[Hashable, "asyncio.Task"] = {}
+        self._async_streams: Dict[Hashable, _AsyncStreamFlight] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    def _remove(self, flights: Dict[Hashable, Any], key: Hashable, flight: Any):
+        with self._lock:
+            if flights.get(key) is flight:
+                del flights[key]
+
+    def _count(self, leader: bool):
+        if leader:
+            self.upstream_calls += 1
+        else:
+            self.coalesced_calls += 1
+
+    def call(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """执行或加入一个调用，返回 (结果, 是否加入了进行中的调用)"""
+        while True:
+            with self._lock:
+                flight = self._calls.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._calls[key] = _CallFlight()
+                self._count(leader)
+            if leader:
+                _run_detached(lambda: self._run_call(key, flight, func), name="single-flight-call")
+
+            # 等到共享的调用完成，或当前运行超时、被取消
+            while not flight.event.wait(_wait_timeout()):
+                check_cancelled()
+            if isinstance(flight.error, WorkflowCancelledError):
+                # 取消属于发起调用的运行，不传递给其他调用方，重新调用
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, not leader
+
+    def _run_call(self, key: Hashable, flight: _CallFlight, func: Callable[[], Any]):
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+        finally:
+            self._remove(self._calls, key, flight)
+            flight.event.set()
+
+    def stream(self, key: Hashable, factory: Callable[[], Iterable[Any]]) -> Tuple[Iterator[Any], bool]:
+        """订阅一个流式调用，返回 (分片迭代器, 是否加入了进行中的调用)；factory 在首次拉取分片时调用"""
+        with self._lock:
+            flight = self._streams.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._streams[key] = _StreamFlight(self, key, factory)
+            flight.subscribers += 1
+            self._count(leader)
+        return flight.subscribe(), not leader
+
+    async def acall(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """call 的异步版本；上游调用在独立的任务中执行，任何调用方超时或被取消都不影响其他调用方"""
+        loop_key = (asyncio.get_running_loop(), key)
+        while True:
+            with self._lock:
+                task = self._async_calls.get(loop_key)
+                leader = task is None
+                if leader:
+                    task = self._async_calls[loop_key] = _ensure_detached(func())
+                    task.add_done_callback(lambda done: self._remove(self._async_calls, loop_key, done))
+                self._count(leader)
+            try:
+                return await _await_shared(task), not leader
+            except WorkflowCancelledError as e:
+                if task.done() and not task.cancelled() and task.exception() is e:
+                    # 上游调用抛出的取消不传递给其他调用方，重新调用
+                    continue
+                raise
+
+    def astream(
+        self, key: Hashable, factory: Callable[[], Awaitable[AsyncIterator[Any]]]
+    ) -> Tuple[AsyncIterator[Any], bool]:
+        """stream 的异步版本，factory 为返回异步迭代器的协程函数"""
+        loop_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            flight = self._async_streams.get(loop_key)
+            leader = flight is None
+            if leader:
+                flight = self._async_streams[loop_key] = _AsyncStreamFlight(self, loop_key, factory)
+            flight.subscribers += 1
+            self._count(leader)
+        return flight.subscribe(), not leader
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._calls) + len(self._streams) + len(self._async_calls) + len(self._async_streams)
+        return {"upstream_calls": self.upstream_calls, "coalesced_calls": self.coalesced_calls, "in_flight": in_flight}
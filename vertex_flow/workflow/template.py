@@ -0,0 +1,108 @@
+"""
+提示词模板编译
+
+LLM 顶点每次调用都要替换系统提示词与用户消息中的占位符。模板文本在第一次使用时解析为
+文本片段与占位符组成的 token 列表，并按模板文本缓存；之后每次替换只需逐个 token 取值并拼接一次，
+不再对整段文本反复执行正则匹配和 str.replace。
+
+支持的占位符：
+- {{#vertex_id.var_name#}}：顶点输出中的变量（var_name 可以包含任意字符），也用于 {{#env.key#}}
+- {{vertex_id.var_name}}：顶点输出中的变量
+- {{name}}：本地变量或输入参数
+- 其它不含花括号的 {{...}}（例如 {{env.var.key}}、{{user.var.key}}）：只能通过字面值替换
+"""
+
+import functools
+import re
+from typing import Callable, Mapping, NamedTuple, Optional, Tuple, Union
+
+# 顶点变量占位符优先匹配，其余 {{...}} 作为通用占位符
+_TOKEN_PATTERN = re.compile(r"\{\{#([\w-]+)\.(.*?)#\}\}|\{\{([^{}]*)\}\}")
+_SCOPED_NAME_PATTERN = re.compile(r"([\w-]+)\.([\w-]+)")
+_LOCAL_NAME_PATTERN = re.compile(r"[\w-]+")
+
+# 模板缓存的条目数上限
+TEMPLATE_CACHE_SIZE = 1024
+
+PLACEHOLDER_VERTEX = "vertex"  # 顶点输出中的变量
+PLACEHOLDER_LOCAL = "local"  # 本地变量
+PLACEHOLDER_OTHER = "other"  # 只能通过字面值替换
+
+
+class Placeholder(NamedTuple):
+    """模板中的一个占位符
+
+    raw 为占位符原文，无法解析时原样保留；kind 为 vertex 时 scope/var 为顶点 ID 与变量名，
+    kind 为 local 时 scope 为本地变量名。
+    """
+
+    raw: str
+    kind: str
+    scope: Optional[str] = None
+    var: Optional[str] = None
+
+
+Token = Union[str, Placeholder]
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text: str) -> Tuple[Token, ...]:
+    """将模板文本解析为文本片段与占位符组成的 token 列表，结果按模板文本缓存"""
+    tokens = []
+    position = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        if match.start() > position:
+            tokens.append(text[position : match.start()])
+        position = match.end()
+        raw = match.group(0)
+        if match.group(1) is not None:
+            tokens.append(Placeholder(raw, PLACEHOLDER_VERTEX, match.group(1), match.group(2)))
+            continue
+        name = match.group(3)
+        scoped = _SCOPED_NAME_PATTERN.fullmatch(name)
+        if scoped:
+            tokens.append(Placeholder(raw, PLACEHOLDER_VERTEX, scoped.group(1), scoped.group(2)))
+        elif _LOCAL_NAME_PATTERN.fullmatch(name):
+            tokens.append(Placeholder(raw, PLACEHOLDER_LOCAL, name))
+        else:
+            tokens.append(Placeholder(raw, PLACEHOLDER_OTHER))
+    if position < len(text):
+        tokens.append(text[position:])
+    return tuple(tokens)
+
+
+def render_template(
+    text: str,
+    resolve: Callable[[Placeholder], Optional[object]],
+    literals: Optional[Mapping[str, str]] = None,
+) -> str:
+    """一次遍历替换模板中的占位符
+
+    Args:
+        text: 模板文本
+        resolve: 解析占位符的函数，返回 None 时保留占位符原文
+        literals: 占位符原文 -> 替换文本，优先于 resolve（例如环境变量、输入参数）
+
+    同一占位符在模板中多次出现时只解析一次；替换进来的文本不会再被当作模板解析。
+    """
+    if "{{" not in text:
+        # 不含占位符的文本（例如对话历史）直接返回，也不占用模板缓存
+        return text
+    tokens = compile_template(text)
+
+    resolved = {}
+    parts = []
+    for token in tokens:
+        if not isinstance(token, Placeholder):
+            parts.append(token)
+            continue
+        value = resolved.get(token.raw)
+        if value is None:
+            if literals is not None and token.raw in literals:
+                value = literals[token.raw]
+            else:
+                replacement = resolve(token)
+                value = token.raw if replacement is None else str(replacement)
+            resolved[token.raw] = value
+        parts.append(value)
+    return "".join(parts)
@@ -4,6 +4,8 @@ from typing import Callable, Optional
 
 import pytz
 
+from vertex_flow.workflow.tracing import trace_span
+
 
 def today_func(inputs, context=None):
     """获取当前时间，支持多种格式和时区。"""
@@ -57,7 +59,8 @@ class FunctionTool:
         logging.info(f"Tool '{self.name}' called with inputs: {inputs}")
         if context:
             logging.info(f"Tool '{self.name}' context: {context}")
-        return self.func(inputs, context)
+        with trace_span(self.name, "tool", tool=self.name):
+            return self.func(inputs, context)
 
     def to_dict(self):
         """Convert the function tool to OpenAI API compatible format"""
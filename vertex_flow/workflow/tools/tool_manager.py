@@ -19,6 +19,7 @@ try:
 except ImportError:
     HAS_PYTZ = False
 
+from vertex_flow.workflow.cancellation import check_cancelled
 from vertex_flow.workflow.context import WorkflowContext
 from vertex_flow.workflow.tools.tool_caller import RuntimeToolCall, ToolCaller
 
@@ -430,6 +431,8 @@ class ToolManager:
             executor = self._find_executor(tool_name)
 
             if executor:
+                # 运行已取消或超时时不再发起新的工具调用
+                check_cancelled()
                 # 执行工具调用
                 result = executor.execute_tool_call(tool_call, context)
                 tool_messages.append(result.to_message())
@@ -574,6 +577,7 @@ class ToolManager:
 
     def execute_tool(self, tool_name: str, arguments: Dict[str, Any], context=None) -> Any:
         """执行单个工具"""
+        check_cancelled()
         # 查找函数工具
         if tool_name in self.function_tools:
             tool = self.function_tools[tool_name]
@@ -0,0 +1,269 @@
+"""
+工作流执行追踪
+
+为一次运行记录带父子关系和线程 ID 的时间片（span），导出为 Chrome trace-event JSON，
+可以直接在 chrome://tracing 或 https://ui.perfetto.dev 中打开：
+- workflow: 一次执行/运行（execute_workflow、execute_workflow_async、WorkflowRun）
+- schedule: 等待依赖、在就绪队列中排队的时间（异步轨道）
+- vertex: 顶点执行，包括缓存命中
+- llm: 模型请求，流式请求记录首个分片时间（ttft_ms）和每个分片
+- tool / mcp: 函数工具与 MCP 工具调用
+
+追踪器通过 Workflow.set_tracer 开启，与取消令牌一样通过 contextvars 传递；
+未开启时各埋点只做一次 ContextVar 读取。线程池中执行的函数需要用 bind_trace 绑定当前追踪器与父 span。
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+# 当前线程/协程激活的追踪器与 span
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("vertex_flow_tracer", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("vertex_flow_span", default=None)
+
+_UNSET = object()
+
+
+def current_tracer() -> Optional["Tracer"]:
+    """获取当前激活的追踪器，未开启追踪时返回 None"""
+    return _current_tracer.get()
+
+
+def current_span() -> Optional["Span"]:
+    """获取当前激活的 span"""
+    return _current_span.get()
+
+
+@contextmanager
+def trace_span(name: str, category: str, **args):
+    """在当前追踪器下记录一个 span 并设为当前 span，未开启追踪时 yield None"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, category, **args) as span:
+        yield span
+
+
+def start_span(name: str, category: str, **args) -> Optional["Span"]:
+    """开始一个不设为当前 span 的 span（例如跨越多次 yield 的流式请求），需要调用 finish 结束"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return None
+    return tracer.start_span(name, category, **args)
+
+
+def trace_instant(name: str, category: str, **args):
+    """在当前 span 下记录一个瞬时事件"""
+    tracer = _current_tracer.get()
+    if tracer is not None:
+        tracer.instant(name, category, **args)
+
+
+def bind_trace(func: Callable) -> Callable:
+    """绑定当前的追踪器与 span，使函数在其它线程中执行时记录的 span 挂在当前 span 下"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return func
+    parent = _current_span.get()
+
+    def wrapper(*args, **kwargs):
+        tracer_token = _current_tracer.set(tracer)
+        span_token = _current_span.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_span.reset(span_token)
+            _current_tracer.reset(tracer_token)
+
+    return wrapper
+
+
+class Span:
+    """一个时间片，finish 时写入追踪器"""
+
+    __slots__ = ("tracer", "name", "category", "span_id", "parent", "tid", "start", "args", "finished")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, parent: Optional["Span"], args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.span_id = next(tracer._ids)
+        self.parent = parent
+        self.tid = threading.get_native_id()
+        self.start = time.perf_counter()
+        self.args = args
+        self.finished = False
+
+    def set(self, **args):
+        """补充 span 的参数，例如首个分片时间"""
+        self.args.update(args)
+
+    def elapsed(self) -> float:
+        """从开始到现在的秒数"""
+        return time.perf_counter() - self.start
+
+    def instant(self, name: str, **args):
+        """在本 span 下记录一个瞬时事件"""
+        self.tracer.instant(name, self.category, parent=self, **args)
+
+    def finish(self, error: Optional[BaseException] = None):
+        if self.finished:
+            return
+        self.finished = True
+        if error is not None:
+            self.args["error"] = repr(error)
+        self.tracer._finish(self, time.perf_counter())
+
+
+class Tracer:
+    """记录一次或多次运行的 span，导出为 Chrome trace-event JSON
+
+    Args:
+        name: 追踪名称，作为导出文件中的进程名
+    """
+
+    def __init__(self, name: str = "vertex_flow"):
+        self.name = name
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _ts(self, timestamp: float) -> float:
+        """perf_counter 时间戳转换为从追踪器创建起的微秒数"""
+        return round((timestamp - self._origin) * 1e6, 3)
+
+    def _record(self, *events: Dict[str, Any]):
+        tid = threading.get_native_id()
+        with self._lock:
+            if tid not in self._thread_names:
+                self._thread_names[tid] = threading.current_thread().name
+            self._events.extend(events)
+
+    @contextmanager
+    def activate(self):
+        """在当前上下文中激活本追踪器"""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    def start_span(self, name: str, category: str, parent=_UNSET, **args) -> Span:
+        """开始一个 span，父 span 默认取当前 span"""
+        if parent is _UNSET:
+            parent = _current_span.get()
+        return Span(self, name, category, parent, args)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        """记录一个 span 并在期间设为当前 span，异常时记录到 span 参数中"""
+        span = self.start_span(name, category, **args)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+
+    def _finish(self, span: Span, end: float):
+        args = dict(span.args, span_id=span.span_id)
+        if span.parent is not None:
+            args["parent_id"] = span.parent.span_id
+        ts = self._ts(span.start)
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": ts,
+                "dur": self._ts(end) - ts,
+                "pid": self.pid,
+                "tid": span.tid,
+                "args": args,
+            }
+        ]
+        if span.parent is not None and span.parent.tid != span.tid:
+            # 父 span 在其它线程中，用 flow 事件画出跨线程的父子关系
+            flow = {"name": span.name, "cat": "flow", "id": span.span_id, "pid": self.pid}
+            events.append({**flow, "ph": "s", "ts": ts, "tid": span.parent.tid})
+            events.append({**flow, "ph": "f", "bp": "e", "ts": ts, "tid": span.tid})
+        self._record(*events)
+
+    def instant(self, name: str, category: str, parent=_UNSET, **args):
+        """记录一个瞬时事件，父 span 默认取当前 span"""
+        if parent is _UNSET:
+            parent = _current_span.get()
+        if parent is not None:
+            args["parent_id"] = parent.span_id
+        self._record(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "i",
+                "s": "t",
+                "ts": self._ts(time.perf_counter()),
+                "pid": self.pid,
+                "tid": threading.get_native_id(),
+                "args": args,
+            }
+        )
+
+    def interval(self, name: str, category: str, start: float, end: Optional[float] = None, parent=_UNSET, **args):
+        """记录一段不占用线程的时间（例如排队等待），显示在按名称分组的异步轨道上
+
+        Args:
+            start: 开始时间（time.perf_counter）
+            end: 结束时间，默认为当前时间
+        """
+        if parent is _UNSET:
+            parent = _current_span.get()
+        if parent is not None:
+            args["parent_id"] = parent.span_id
+        span_id = next(self._ids)
+        event = {"name": name, "cat": category, "id": span_id, "pid": self.pid, "tid": threading.get_native_id()}
+        end_ts = self._ts(time.perf_counter() if end is None else end)
+        self._record(
+            {**event, "ph": "b", "ts": self._ts(start), "args": args},
+            {**event, "ph": "e", "ts": end_ts},
+        )
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """已记录的事件（副本）"""
+        with self._lock:
+            return list(self._events)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._thread_names.clear()
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """导出为 Chrome trace-event JSON 对象"""
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.name}}]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in thread_names.items()
+        )
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> str:
+        """把追踪写入 JSON 文件，返回文件路径"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+        return path
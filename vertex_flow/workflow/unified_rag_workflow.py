@@ -1630,12 +1630,10 @@ class UnifiedRAGSystem:
                 return self.query_fast(question)
 
         try:
-            # 清理之前的输出状态
-            self._reset_workflow_state(self._query_workflow_instance)
-
             retrieval_config = self.builder.config.get("retrieval", {}) if isinstance(self.builder.config, dict) else {}
 
-            self._query_workflow_instance.execute_workflow(
+            # 编译后的执行计划可重复运行，每次查询的输出保存在独立的 WorkflowRun 中
+            run = self._query_workflow_instance.compile().run(
                 source_inputs={
                     "query": question,
                     "top_k": retrieval_config.get("top_k", 3) if isinstance(retrieval_config, dict) else 3,
@@ -1646,11 +1644,8 @@ class UnifiedRAGSystem:
             )
 
             # 获取LLM的输出
-            llm_vertex = self._query_workflow_instance.get_vertice_by_id("LLM_GENERATE")
-            if llm_vertex and hasattr(llm_vertex, "output"):
-                return llm_vertex.output if llm_vertex.output else "无法生成答案"
-            else:
-                return "无法生成答案"
+            answer = run.get_output("LLM_GENERATE")
+            return answer if answer else "无法生成答案"
 
         except Exception as e:
             logging.error(f"查询执行失败: {e}")
@@ -1682,15 +1677,6 @@ class UnifiedRAGSystem:
                 logging.error(f"查询彻底失败，回退到快速查询: {e2}")
                 return self.query_fast(question)
 
-    def _reset_workflow_state(self, workflow_instance):
-        """重置工作流状态，准备下次执行"""
-        if workflow_instance and hasattr(workflow_instance, "vertices"):
-            for vertex in workflow_instance.vertices.values():
-                if hasattr(vertex, "output"):
-                    vertex.output = None
-                if hasattr(vertex, "_executed"):
-                    vertex._executed = False
-
     def query_fast(self, question: str) -> str:
         """
         快速查询模式（最小化LLM调用）
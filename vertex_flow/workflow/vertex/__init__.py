@@ -17,6 +17,9 @@ from .function_vertex import (
 from .llm_vertex import (
     LLMVertex,
 )
+from .map_vertex_group import (
+    MapVertexGroup,
+)
 from .mem_vertex import (
     MemVertex,
     SummaryRule,
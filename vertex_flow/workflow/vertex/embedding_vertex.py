@@ -16,6 +16,8 @@ T = TypeVar("T")  # 泛型类型变量
 class EmbeddingVertex(Vertex[T]):
     """嵌入顶点，有一个输入和一个输出"""
 
+    cacheable = True
+
     def __init__(
         self,
         id: str,
@@ -5,7 +5,7 @@ from functools import partial
 from types import FunctionType
 
 from vertex_flow.utils.logger import LoggerUtil
-from vertex_flow.workflow.constants import LOCAL_VAR, SOURCE_VAR
+from vertex_flow.workflow.constants import EXECUTOR_PROCESS, EXECUTORS, LOCAL_VAR, SOURCE_VAR
 
 from .vertex import (
     Any,
@@ -21,10 +21,42 @@ from .vertex import (
 logging = LoggerUtil.get_logger()
 
 
+def compile_main_function(code: str, only_main: bool = True) -> FunctionType:
+    """编译用户提供的代码，并返回其中的 main 函数"""
+    # 安全检查：仅允许函数定义，并且只能有一个名为 main 的函数
+    tree = ast.parse(code)
+    functions = [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+    if only_main:
+        if len(functions) != 1 or functions[0].name != "main":
+            raise ValueError("Only one function named 'main' is allowed.")
+    else:
+        logging.warning("any expression will be executed.")
+    from vertex_flow.workflow.utils import safe_globals
+
+    # 编译代码
+    compiled_func = compile(tree, filename="", mode="exec")
+    local_vars = {}
+
+    # 执行函数定义
+    exec(compiled_func, safe_globals, local_vars)
+
+    # 获取函数
+    func_name = "main"
+    if func_name not in local_vars:
+        raise ValueError("Function definition 'main' not found.")
+    return local_vars[func_name]
+
+
 class FunctionVertex(Vertex[T]):
-    """通用函数顶点，有一个输入和一个输出"""
+    """通用函数顶点，有一个输入和一个输出
+
+    executor 指定任务的执行方式：默认（EXECUTOR_THREAD）在工作流的线程中执行；
+    EXECUTOR_PROCESS 将任务按模块/函数引用发送到常驻进程池执行，适用于 CPU 密集型任务，
+    此时 task 必须是模块级函数，且 context 只携带环境参数与用户参数。
+    """
 
     SubTypeKey = "SubType"
+    ExecutorKey = "executor"
 
     def __init__(
         self,
@@ -33,6 +65,7 @@ class FunctionVertex(Vertex[T]):
         task: Callable[[Dict[str, Any], WorkflowContext[T]], T] = None,
         params: Dict[str, Any] = None,
         variables: List[Dict[str, Union[str, None]]] = None,
+        executor: str = None,
     ):
         subtype = None
         if params and FunctionVertex.SubTypeKey in params:
@@ -45,6 +78,28 @@ class FunctionVertex(Vertex[T]):
             params=params,
             variables=variables,
         )
+        self.executor = executor or self.params.get(FunctionVertex.ExecutorKey)
+        if self.executor is not None and self.executor not in EXECUTORS:
+            raise ValueError(f"Unsupported executor: {self.executor}, available: {EXECUTORS}")
+        if self.executor == EXECUTOR_PROCESS:
+            self._validate_process_task()
+
+    def _validate_process_task(self):
+        from vertex_flow.workflow.process_pool import ensure_task_shippable
+
+        ensure_task_shippable(self._task)
+
+    def _execute_in_process(self, inputs: Dict[str, Any], context: WorkflowContext[T], has_context: bool):
+        """在进程池中执行任务，context 只传递可序列化的环境参数与用户参数"""
+        from vertex_flow.workflow.process_pool import run_task_in_process
+
+        kwargs = {"inputs": inputs}
+        if has_context:
+            kwargs["context"] = WorkflowContext(
+                env_parameters=context.get_env_parameters() if context else None,
+                user_parameters=context.get_user_parameters() if context else None,
+            )
+        return run_task_in_process(self._task, **kwargs)
 
     def execute(self, inputs: Dict[str, T] = None, context: WorkflowContext[T] = None):
         if callable(self._task):
@@ -56,7 +111,9 @@ class FunctionVertex(Vertex[T]):
             has_context = "context" in sig.parameters
 
             try:
-                if has_context:
+                if self.executor == EXECUTOR_PROCESS:
+                    self.output = self._execute_in_process(all_inputs, context, has_context)
+                elif has_context:
                     # 如果 task 函数定义了 context 参数，则传递 context
                     self.output = self._task(inputs=all_inputs, context=context)
                 else:
@@ -216,10 +273,14 @@ class CodeVertex(FunctionVertex):
         id: str,
         name: str = None,
         params: Dict[str, Any] = None,
+        executor: str = None,
     ):
         code = params[self.CodeKey]
         assert code
         task = self.code_execute
+        self._only_main_func = True
+        if "only_main" in params:
+            self._only_main_func = params["only_main"]
         super().__init__(
             id=id,
             name=name,
@@ -228,39 +289,28 @@ class CodeVertex(FunctionVertex):
                 **(params or {}),
                 **{FunctionVertex.SubTypeKey: self.__class__.__name__},
             },
+            executor=executor,
         )
-        self._only_main_func = True
-        if "only_main" in params:
-            self._only_main_func = params["only_main"]
         self._func = self._compile_code(code)
 
+    def _validate_process_task(self):
+        # CodeVertex 发送源代码到子进程，不需要按引用加载 task
+        pass
+
+    def _execute_in_process(self, inputs: Dict[str, Any], context: WorkflowContext[T], has_context: bool):
+        # 依赖在当前进程解析，子进程只负责编译并执行 main 函数
+        from vertex_flow.workflow.process_pool import run_code_in_process
+
+        safe_locals = self.resolve_dependencies(inputs=inputs)
+        logging.info(f"safe_locals : {safe_locals}")
+        result = run_code_in_process(self.params[self.CodeKey], self._only_main_func, **safe_locals)
+        logging.info(f"code executed result : {result}")
+        return result
+
     def _compile_code(self, code: str) -> FunctionType:
         """编译用户提供的代码，并返回一个可调用的函数"""
         try:
-            # 安全检查：仅允许函数定义，并且只能有一个名为 main 的函数
-            tree = ast.parse(code)
-            functions = [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
-            if self._only_main_func:
-                if len(functions) != 1 or functions[0].name != "main":
-                    raise ValueError("Only one function named 'main' is allowed.")
-            else:
-                logging.warning("any expression will be executed.")
-            from vertex_flow.workflow.utils import safe_globals
-
-            # 编译代码
-            compiled_func = compile(tree, filename="", mode="exec")
-            local_vars = {}
-
-            # 执行函数定义
-            exec(compiled_func, safe_globals, local_vars)
-
-            # 获取函数
-            func_name = "main"
-            if func_name not in local_vars:
-                raise ValueError("Function definition 'main' not found.")
-            func = local_vars[func_name]
-
-            return func
+            return compile_main_function(code, self._only_main_func)
         except Exception as e:
             logging.error(f"Error compiling code: {e}")
             raise
@@ -1,6 +1,7 @@
 import asyncio
 import inspect
 import json
+import re
 import traceback
 from typing import List, Optional
 
@@ -33,6 +34,7 @@ from vertex_flow.workflow.constants import (
     VERTEX_ID_KEY,
 )
 from vertex_flow.workflow.event_channel import EventType
+from vertex_flow.workflow.run_state import RunScoped
 from vertex_flow.workflow.tools.tool_caller import RuntimeToolCall, create_tool_caller
 from vertex_flow.workflow.tools.tool_manager import ToolManager
 from vertex_flow.workflow.utils import (
@@ -40,6 +42,7 @@ from vertex_flow.workflow.utils import (
     env_str,
     var_str,
 )
+from vertex_flow.workflow.vertex_executor import run_sync
 
 from .vertex import (
     Any,
@@ -52,10 +55,22 @@ from .vertex import (
 
 logging = LoggerUtil.get_logger()
 
+# 消息模板中引用其它顶点输出的占位符：{{vertex_id.var}} 或 {{#vertex_id.var#}}
+_PLACEHOLDER_SCOPE_PATTERN = re.compile(r"\{\{#?([\w-]+)\.")
+
+# aexecute 依赖的方法，子类覆盖其中任一方法时 aexecute 不再等价于 execute
+_AEXECUTE_METHODS = ("execute", "chat", "messages_redirect", "_build_llm_tools", "_build_llm_option")
+
 
 class LLMVertex(Vertex[T]):
     """语言模型顶点，有一个输入和一个输出"""
 
+    # 对话消息与 token 统计属于单次运行
+    messages = RunScoped(factory=list)
+    user_messages = RunScoped(inherit=True)
+    token_usage = RunScoped(factory=dict)
+    usage_history = RunScoped(factory=list)
+
     def __init__(
         self,
         id: str,
@@ -123,6 +138,48 @@ class LLMVertex(Vertex[T]):
         )
         return data
 
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        fingerprint = super().cache_fingerprint()
+        model_state = dict(self.model.__get_state__()) if self.model else None
+        if model_state:
+            model_state.pop("sk", None)
+        fingerprint.update(
+            {
+                "model": model_state,
+                "system_message": self.system_message,
+                "user_messages": self.user_messages,
+                "tools": [getattr(tool, "name", tool) for tool in self.tools],
+                "preprocess": self.preprocess,
+                "postprocess": self.postprocess,
+            }
+        )
+        return fingerprint
+
+    @property
+    def cacheable(self) -> bool:
+        # 工具调用可能有副作用，配置了工具时不默认缓存
+        return not self.tools
+
+    def cache_scopes(self):
+        scopes = super().cache_scopes()
+        vertices = getattr(self.workflow, "vertices", None) or {}
+        templates = [self.system_message or ""] + [
+            message for message in self.user_messages or [] if isinstance(message, str)
+        ]
+        for template in templates:
+            scopes.update(scope for scope in _PLACEHOLDER_SCOPE_PATTERN.findall(template) if scope in vertices)
+        return scopes
+
+    def supports_aexecute(self) -> bool:
+        # 只有默认的 chat 任务有异步实现；子类覆盖了执行相关方法时仍在线程中执行
+        # （例如 MCPLLMVertex 阻塞获取 MCP 上下文与工具）
+        cls = type(self)
+        return (
+            self._task == self.chat
+            and inspect.iscoroutinefunction(getattr(self.model, "achat", None))
+            and all(getattr(cls, name) is getattr(LLMVertex, name) for name in _AEXECUTE_METHODS)
+        )
+
     def execute(self, inputs: Dict[str, T] = None, context: WorkflowContext[T] = None):
         if callable(self._task):
             resolved_inputs = self.resolve_dependencies(inputs=inputs)
@@ -154,6 +211,21 @@ class LLMVertex(Vertex[T]):
         else:
             raise ValueError("For LLM type, task should be a callable function.")
 
+    async def aexecute(self, inputs: Dict[str, T] = None, context: WorkflowContext[T] = None):
+        """execute 的异步版本，供异步执行引擎直接 await，LLM 请求不占用顶点线程（需 supports_aexecute）"""
+        resolved_inputs = self.resolve_dependencies(inputs=inputs)
+        all_inputs = {**(inputs or {}), **(resolved_inputs or {})}
+
+        logging.debug(f"LLM {self.id} all_inputs: {all_inputs}, resolved_inputs: {resolved_inputs}")
+
+        if not (all_inputs and CONVERSATION_HISTORY in all_inputs):
+            self.messages = []
+
+        self.messages_redirect(all_inputs, context=context)
+        self.output = await self.achat(inputs=all_inputs, context=context)
+        logging.info(f"LLM {self.id} finished, output : {self.output}.")
+        return self.output
+
     def messages_redirect(self, inputs, context: WorkflowContext[T]):
 
         logging.debug(f"{self.id} chat context inputs {inputs}")
@@ -225,6 +297,7 @@ class LLMVertex(Vertex[T]):
 
         system_contains = False
         # replace by env parameters, user parameters and inputs.
+        literals = self._placeholder_literals(inputs, context)
         for message in self.messages:
             if message["role"] == "system":
                 if system_contains:
@@ -239,57 +312,33 @@ class LLMVertex(Vertex[T]):
                 # 多模态消息，只处理文本部分
                 for content_item in message["content"]:
                     if content_item.get("type") == "text":
-                        text_content = content_item["text"]
-                        # 替换环境变量
-                        for key, value in context.get_env_parameters().items():
-                            value = value if isinstance(value, str) else str(value)
-                            text_content = text_content.replace(env_str(key), value)
-                            text_content = text_content.replace(compatiable_env_str(key), value)
-
-                        # 替换用户参数
-                        for key, value in context.get_user_parameters().items():
-                            value = value if isinstance(value, str) else str(value)
-                            text_content = text_content.replace(var_str(key), value)
-
-                        # 替换输入参数
-                        if inputs:
-                            for key, value in inputs.items():
-                                if key in [CONVERSATION_HISTORY, "current_message", "image_url", "text"]:
-                                    continue  # Skip special keys that we've already handled
-                                value = value if isinstance(value, str) else str(value)
-                                input_placeholder = "{{" + key + "}}"
-                                text_content = text_content.replace(input_placeholder, value)
-
-                        text_content = self._replace_placeholders(text_content)
-                        content_item["text"] = text_content
+                        content_item["text"] = self._replace_placeholders(content_item["text"], literals)
             else:
                 # 纯文本消息
-                text_content = message["content"]
-                for key, value in context.get_env_parameters().items():
-                    value = value if isinstance(value, str) else str(value)
-                    text_content = text_content.replace(env_str(key), value)
-                    # For dify workflow compatiable env.
-                    text_content = text_content.replace(compatiable_env_str(key), value)
-
-                for key, value in context.get_user_parameters().items():
-                    value = value if isinstance(value, str) else str(value)
-                    text_content = text_content.replace(var_str(key), value)
-
-                # replace by inputs parameters
-                if inputs:
-                    for key, value in inputs.items():
-                        if key in [CONVERSATION_HISTORY, "current_message", "image_url", "text"]:
-                            continue  # Skip special keys that we've already handled
-                        value = value if isinstance(value, str) else str(value)
-                        # Support {{inputs.key}} format
-                        input_placeholder = "{{" + key + "}}"
-                        text_content = text_content.replace(input_placeholder, value)
-
-                text_content = self._replace_placeholders(text_content)
-                message["content"] = text_content
+                message["content"] = self._replace_placeholders(message["content"], literals)
 
         logging.debug(f"{self}, {self.id} chat context messages {self.messages}")
 
+    @staticmethod
+    def _placeholder_literals(inputs: Dict[str, Any], context: WorkflowContext) -> Dict[str, str]:
+        """环境变量、用户参数与输入参数的占位符 -> 替换文本，同一占位符以先出现的为准"""
+        literals: Dict[str, str] = {}
+        for key, value in context.get_env_parameters().items():
+            value = value if isinstance(value, str) else str(value)
+            literals.setdefault(env_str(key), value)
+            # For dify workflow compatiable env.
+            literals.setdefault(compatiable_env_str(key), value)
+
+        for key, value in context.get_user_parameters().items():
+            literals.setdefault(var_str(key), value if isinstance(value, str) else str(value))
+
+        # Support {{inputs.key}} format
+        for key, value in (inputs or {}).items():
+            if key in [CONVERSATION_HISTORY, "current_message", "image_url", "text"]:
+                continue  # Skip special keys that we've already handled
+            literals.setdefault("{{" + key + "}}", value if isinstance(value, str) else str(value))
+        return literals
+
     def _handle_token_usage(self):
         """处理token使用统计的通用方法，供子类调用"""
         # 记录token使用情况
@@ -354,6 +403,36 @@ class LLMVertex(Vertex[T]):
 
         return "Error: Unexpected end of chat loop"
 
+    async def achat(self, inputs: Dict[str, Any], context: WorkflowContext[T] = None):
+        """chat 的异步版本，基于 ChatModel.achat / achat_stream，工具调用由 _handle_tool_calls_async 并发执行"""
+        if self.enable_stream and hasattr(self.model, "achat_stream"):
+            return await self._achat_stream(inputs, context)
+
+        option = self._build_llm_option(inputs, context)
+        llm_tools = self._build_llm_tools()
+
+        max_iterations = 10  # 防止无限循环
+        for iteration_count in range(1, max_iterations + 1):
+            choice = await self.model.achat(self.messages, option=option, tools=llm_tools)
+            if choice.finish_reason != "tool_calls":
+                content = choice.message.content or ""
+                result = content if self.postprocess is None else self.postprocess(content, inputs, context)
+                self.output = result
+
+                self._handle_token_usage()
+
+                logging.debug(f"chat bot response : {result}")
+                return result
+
+            logging.info(f"LLM {self.id} wants to call tools (iteration {iteration_count})")
+            if not (hasattr(choice.message, "tool_calls") and choice.message.tool_calls):
+                logging.warning(f"No tool calls found in choice for LLM {self.id}")
+                return "Error: Unexpected end of chat loop"
+            await self._handle_tool_calls_async(choice, context)
+
+        logging.error(f"LLM {self.id} exceeded maximum iterations ({max_iterations}), stopping")
+        return "Error: Maximum tool call iterations exceeded"
+
     def chat_stream_generator(self, inputs: Dict[str, Any], context: WorkflowContext[T] = None):
         """返回流式输出的生成器，支持reasoning和工具调用"""
         if not (self.enable_stream and hasattr(self.model, "chat_stream")):
@@ -380,6 +459,95 @@ class LLMVertex(Vertex[T]):
         logging.debug(f"chat bot response : {result}")
         return result
 
+    async def _achat_stream(self, inputs: Dict[str, Any], context: WorkflowContext[T] = None):
+        """_chat_stream 的异步版本：基于 achat_stream 逐片发送 MESSAGES 事件，流中的工具调用执行后继续对话"""
+        enable_reasoning = self.params.get(ENABLE_REASONING_KEY, False)
+        message_type = MESSAGE_TYPE_REASONING if enable_reasoning else MESSAGE_TYPE_REGULAR
+        full_content = ""
+        try:
+            option = self._build_llm_option(inputs, context)
+            llm_tools = self._build_llm_tools()
+            stream_option = option.copy() if option else {}
+            if llm_tools:
+                stream_option["tools"] = llm_tools
+
+            max_iterations = 10  # 防止无限循环
+            for _ in range(max_iterations):
+                try:
+                    # 先执行消息中尚未响应的工具调用（例如对话历史或上一轮流式输出中的工具调用）
+                    pending_tool_calls = self._extract_new_tool_calls(0)
+                    if pending_tool_calls:
+                        logging.info(f"LLM {self.id} executing {len(pending_tool_calls)} pending tools")
+                        await self._aexecute_stream_tool_calls(pending_tool_calls, context, message_type)
+                        continue
+
+                    has_content = False
+                    messages_before_stream = len(self.messages)
+                    async for chunk in self.model.achat_stream(self.messages, option=stream_option):
+                        if chunk:
+                            has_content = True
+                            full_content += chunk
+                            self._emit_message(chunk, message_type)
+                    if self._extract_new_tool_calls(messages_before_stream):
+                        # 新增的工具调用在下一轮执行，然后继续对话
+                        continue
+                    if has_content:
+                        break
+
+                    # 没有输出内容也没有工具调用，尝试获取最终响应
+                    logging.info(f"LLM {self.id} no content or tool calls found, getting final response")
+                    final_choice = await self.model.achat(self.messages, option=option, tools=llm_tools)
+                    if final_choice.finish_reason == "tool_calls":
+                        await self._handle_tool_calls_async(final_choice, context)
+                        continue
+                    content = final_choice.message.content or ""
+                    if content:
+                        full_content += content
+                        self._emit_message(content, message_type)
+                    break
+                except Exception as stream_error:
+                    # 与 _unified_stream_core 相同，流式处理错误作为内容输出，不回退到非流式
+                    logging.error(f"Streaming error occurred: {stream_error}")
+                    logging.error(f"Streaming error details: {traceback.format_exc()}")
+                    error_message = f"流式处理遇到错误: {str(stream_error)}"
+                    full_content += error_message
+                    self._emit_message(error_message, message_type)
+                    break
+        finally:
+            self._handle_token_usage()
+            if self.workflow:
+                self.workflow.emit_event(
+                    EventType.MESSAGES, {VERTEX_ID_KEY: self.id, MESSAGE_KEY: None, "status": MESSAGE_TYPE_END}
+                )
+
+        result = full_content if self.postprocess is None else self.postprocess(full_content, inputs, context)
+        self.output = result
+        logging.debug(f"chat bot response : {result}")
+        return result
+
+    async def _aexecute_stream_tool_calls(self, tool_calls, context, message_type):
+        """执行流式输出中的工具调用，工具调用请求与结果作为 MESSAGES 事件发送，不计入输出内容"""
+        tool_caller = self.tool_manager.tool_caller if getattr(self, "tool_manager", None) else None
+        if tool_caller:
+            for request_msg in tool_caller.format_tool_call_request(tool_calls):
+                self._emit_message(request_msg, message_type)
+
+        tool_messages = await run_sync(self.tool_manager.execute_tool_calls, tool_calls, context)
+        for tool_msg in tool_messages:
+            if tool_msg.get("content") is None:
+                tool_msg["content"] = ""
+        self.messages.extend(tool_messages)
+
+        if tool_caller:
+            for result_msg in tool_caller.format_tool_call_results(tool_calls, self.messages):
+                self._emit_message(result_msg, message_type)
+
+    def _emit_message(self, content: str, message_type: str):
+        if self.workflow:
+            self.workflow.emit_event(
+                EventType.MESSAGES, {VERTEX_ID_KEY: self.id, CONTENT_KEY: content, TYPE_KEY: message_type}
+            )
+
     def _stream_generator_core(self, inputs: Dict[str, Any], context: WorkflowContext):
         """
         专门用于chat_stream_generator的核心逻辑，支持reasoning和工具调用
@@ -838,7 +1006,9 @@ class LLMVertex(Vertex[T]):
             tool_call_name = tool_call.function.name
             tool_call_arguments = json.loads(tool_call.function.arguments)
             tool_call_id = tool_call.id
-            return tool_call, await asyncio.to_thread(tool.execute, tool_call_arguments, context)
+            if inspect.iscoroutinefunction(tool.execute):
+                return tool_call, await tool.execute(tool_call_arguments, context)
+            return tool_call, await run_sync(tool.execute, tool_call_arguments, context)
 
         tasks = []
         for tool_call in normalized_tool_calls:
@@ -0,0 +1,212 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.cancellation import CancellationToken, current_cancellation
+from vertex_flow.workflow.checkpoint import current_checkpoint
+from vertex_flow.workflow.constants import ITERATION_INDEX_KEY
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.edge import Edge
+from vertex_flow.workflow.run_state import ScopedRunState, current_run_state
+from vertex_flow.workflow.tracing import bind_trace, trace_span
+
+from .vertex import T, Vertex
+from .vertex_group import VertexGroup
+
+logging = LoggerUtil.get_logger()
+
+
+class MapVertexGroup(VertexGroup[T]):
+    """并行 Map 顶点组，对输入列表中的每个元素执行一次子图
+
+    与 WhileVertexGroup 逐次迭代不同，各元素的子图在线程池中并行执行，总耗时趋近于最慢的元素。
+    每个元素在独立的 ScopedRunState 中执行，子图顶点的输出、LLM 消息等互不覆盖，
+    子图外顶点的输出与事件仍属于所在的运行。
+
+    元素在本顶点组常驻的线程池中执行，concurrency 为线程池大小，并发的多个运行共享这一上限。
+    开启检查点时，每个元素在自己的作用域（"{id}.{序号}"）下保存子图中循环顶点的迭代状态，
+    恢复时 MapVertexGroup 重新执行，各元素的循环从各自最后完成的迭代继续。
+
+    子图顶点通过 {SOURCE_SCOPE: SUBGRAPH_SOURCE, SOURCE_VAR: item_var} 读取当前元素，
+    通过 ITERATION_INDEX_KEY 读取元素序号。配置了 exposed_variables 时每个元素的结果为暴露的变量，
+    否则为所有子图顶点的输出（同 VertexGroup）。
+
+    输出格式：
+        {"results": [按输入顺序的元素结果，失败的元素为 None], "errors": [{"index": 序号, "error": 错误信息}],
+         "item_count": 元素数}
+    """
+
+    def __init__(
+        self,
+        id: str,
+        name: Optional[str] = None,
+        subgraph_vertices: Optional[List[Vertex[T]]] = None,
+        subgraph_edges: Optional[List[Edge[T]]] = None,
+        items_var: str = "items",
+        item_var: str = "item",
+        concurrency: int = 4,
+        fail_fast: bool = True,
+        params: Optional[Dict[str, Any]] = None,
+        variables: Optional[List[Dict[str, Any]]] = None,
+        exposed_variables: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        初始化MapVertexGroup
+
+        Args:
+            id: 顶点组ID
+            name: 顶点组名称
+            subgraph_vertices: 子图中的顶点列表
+            subgraph_edges: 子图中的边列表
+            items_var: 输入（经 variables 筛选后）中待处理列表的变量名
+            item_var: 子图中当前元素的变量名
+            concurrency: 同时执行的元素数上限，即本顶点组线程池的大小
+            fail_fast: True 时任一元素失败即取消其余元素并抛出异常；False 时收集错误，其余元素照常执行
+            params: 参数字典
+            variables: 变量筛选列表，用于从外部输入中筛选变量传递给子图
+            exposed_variables: 变量暴露列表，用于从每个元素的子图输出中暴露变量
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be positive, got {concurrency}.")
+        super().__init__(
+            id=id,
+            name=name or id,
+            subgraph_vertices=subgraph_vertices or [],
+            subgraph_edges=subgraph_edges or [],
+            params=params or {},
+            variables=variables or [],
+            exposed_variables=exposed_variables or [],
+        )
+        self.items_var = items_var
+        self.item_var = item_var
+        self.concurrency = concurrency
+        self.fail_fast = fail_fast
+        self._task_type = "MAP_VERTEX_GROUP"
+        # 执行元素的线程池，与子图顶点的线程池（VertexGroup._executor）分开，元素等待子图顶点时不会互相占满
+        self._map_executor: Optional[ThreadPoolExecutor] = None
+        self._map_executor_lock = Lock()
+
+    def _scoped_instances(self) -> List[Any]:
+        """每个元素需要隔离运行状态的对象：本顶点组以及子图中（包括嵌套子图中）的所有顶点"""
+        instances = [self]
+        pending = list(self.subgraph_vertices.values())
+        while pending:
+            vertex = pending.pop()
+            instances.append(vertex)
+            if isinstance(vertex, VertexGroup):
+                pending.extend(vertex.subgraph_vertices.values())
+            # WhileVertexGroup 的循环控制顶点不在其子图中
+            while_vertex = getattr(vertex, "while_vertex", None)
+            if while_vertex is not None:
+                instances.append(while_vertex)
+        return instances
+
+    def _execute_item(self, index: int, item: Any, inputs: Dict[str, Any], context: Optional[WorkflowContext[T]]):
+        """在当前元素的运行状态中执行一次子图"""
+        item_inputs = {**inputs, self.item_var: item, ITERATION_INDEX_KEY: index}
+        with trace_span(f"{self.id}[{index}]", "vertex", vertex_id=self.id, index=index):
+            result = self._execute_subgraph_impl(inputs=item_inputs, context=context)
+            if self.exposed_variables:
+                exposed = self._expose_outputs(result)
+                if exposed:
+                    result = exposed
+        return result
+
+    def _map(
+        self, items: List[Any], inputs: Dict[str, Any], context: Optional[WorkflowContext[T]]
+    ) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        results: List[Any] = [None] * len(items)
+        errors: List[Dict[str, Any]] = []
+        if not items:
+            return results, errors
+
+        # 元素在子令牌下执行：fail_fast 时取消其余元素，不影响运行中的其它顶点
+        parent_token = current_cancellation()
+        name = f"map {self.id}"
+        token = parent_token.child(name=name) if parent_token is not None else CancellationToken(name=name)
+        instances = self._scoped_instances()
+        parent_state = current_run_state()
+        checkpoint = current_checkpoint()
+
+        def run_item(index: int):
+            scope = checkpoint.scoped(f"{self.id}.{index}").activate() if checkpoint is not None else nullcontext()
+            with ScopedRunState(parent_state, instances).activate(), token.activate(), scope:
+                token.check()
+                return self._execute_item(index, items[index], inputs, context)
+
+        executor = self._get_map_executor()
+        # 元素的 span 挂在本顶点的 span 下
+        run_item = bind_trace(run_item)
+        futures = {executor.submit(run_item, index): index for index in range(len(items))}
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    if self.fail_fast or token.cancelled:
+                        # 快速失败或运行已被取消、超时：正在执行的元素在下一个取消检查点退出
+                        token.cancel(e)
+                        raise
+                    logging.warning(f"MapVertexGroup {self.id} item {index} failed: {e}")
+                    errors.append({"index": index, "error": str(e)})
+        except BaseException:
+            # 撤销本次执行尚未开始的元素，线程池由后续执行继续使用
+            for future in futures:
+                future.cancel()
+            raise
+
+        errors.sort(key=lambda error: error["index"])
+        return results, errors
+
+    def _get_map_executor(self) -> ThreadPoolExecutor:
+        """获取执行元素的线程池，首次使用时创建"""
+        if self._map_executor is None:
+            with self._map_executor_lock:
+                if self._map_executor is None:
+                    self._map_executor = ThreadPoolExecutor(
+                        max_workers=self.concurrency, thread_name_prefix=f"map-{self.id}"
+                    )
+        return self._map_executor
+
+    def shutdown(self, wait: bool = True):
+        """关闭执行元素与子图顶点的线程池，之后再次执行时重新创建"""
+        with self._map_executor_lock:
+            executor, self._map_executor = self._map_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        super().shutdown(wait=wait)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["_map_executor"] = None
+        del state["_map_executor_lock"]
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._map_executor_lock = Lock()
+
+    def execute(self, inputs: Optional[Dict[str, Any]] = None, context: Optional[WorkflowContext[T]] = None):
+        """对 items_var 中的每个元素并行执行子图，按输入顺序收集结果"""
+        final_inputs = {**(inputs or {}), **self._filter_inputs(inputs, context)}
+        items = final_inputs.get(self.items_var)
+        if items is None or isinstance(items, (str, bytes, dict)):
+            raise ValueError(
+                f"MapVertexGroup {self.id} expects a list in input '{self.items_var}', got {type(items).__name__}."
+            )
+        items = list(items)
+        logging.info(f"Starting MapVertexGroup {self.id} over {len(items)} items, concurrency {self.concurrency}.")
+
+        results, errors = self._map(items, final_inputs, context)
+        self.output = {"results": results, "errors": errors, "item_count": len(items)}
+        logging.info(f"MapVertexGroup {self.id} completed, {len(items) - len(errors)} of {len(items)} items succeeded.")
+        return self.output
+
+    def __str__(self) -> str:
+        return (
+            f"MapVertexGroup(id={self.id}, vertices={len(self.subgraph_vertices)}, "
+            f"edges={len(self.subgraph_edges)}, concurrency={self.concurrency})"
+        )
@@ -50,6 +50,9 @@ class MCPLLMVertex(LLMVertex):
     - Minimal code duplication
     """
 
+    # MCP tools are loaded at runtime and may have side effects
+    cacheable = False
+
     def __init__(self, id: str, **kwargs):
         # Extract MCP-specific parameters
         self.mcp_enabled = kwargs.pop("mcp_enabled", True) and MCP_AVAILABLE
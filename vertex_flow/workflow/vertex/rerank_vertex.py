@@ -14,6 +14,8 @@ T = TypeVar("T")  # 泛型类型变量
 class RerankVertex(Vertex[T]):
     """重排序顶点，有一个输入和一个输出"""
 
+    cacheable = True
+
     def __init__(
         self,
         id: str,
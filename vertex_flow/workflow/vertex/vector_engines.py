@@ -309,7 +309,13 @@ class DashVector(VectorEngine):
 class LocalVectorEngine(VectorEngine):
     """本地向量引擎，使用FAISS进行向量存储和检索"""
 
-    def __init__(self, index_name: str = "default", dimension: int = 384, persist_dir: Optional[str] = None):
+    def __init__(
+        self,
+        index_name: str = "default",
+        dimension: int = 384,
+        persist_dir: Optional[str] = None,
+        autosave: bool = True,
+    ):
         """
         初始化本地向量引擎
 
@@ -317,10 +323,12 @@ class LocalVectorEngine(VectorEngine):
             index_name: 索引名称
             dimension: 向量维度
             persist_dir: 持久化目录
+            autosave: 每次插入或删除后立即保存索引；为 False 时由调用方批量调用 save()
         """
         super().__init__(api_key=None, endpoint=None, index_name=index_name)
 
         self.dimension = dimension
+        self.autosave = autosave
         self.persist_dir = persist_dir or os.path.join(os.getcwd(), "vector_db")
 
         logger.info(f"初始化本地向量引擎:")
@@ -461,6 +469,10 @@ class LocalVectorEngine(VectorEngine):
         except Exception as e:
             logger.error(f"保存索引失败: {e}")
 
+    def save(self):
+        """保存索引到本地文件，autosave 为 False 时使用"""
+        self._save_index()
+
     def _generate_content_hash(self, content: str) -> str:
         """生成文档内容的哈希值，支持编码异常兜底"""
         try:
@@ -567,6 +579,35 @@ class LocalVectorEngine(VectorEngine):
         except Exception as e:
             logger.error(f"删除索引失败: {e}")
 
+    def delete(self, doc_ids, index_name=None):
+        """
+        按文档ID删除文档
+
+        Args:
+            doc_ids: 文档ID列表
+            index_name: 索引名称（本地实现中忽略）
+
+        Returns:
+            删除的文档数
+        """
+        import numpy as np
+
+        doc_ids = set(doc_ids)
+        positions = [i for i, doc_id in enumerate(self.doc_ids) if doc_id in doc_ids]
+        if not positions:
+            return 0
+        # IndexFlat 删除后后续向量依次前移，与文档列表的删除保持一致
+        self.index.remove_ids(np.array(positions, dtype=np.int64))
+        removed = set(positions)
+        self.documents = [doc for i, doc in enumerate(self.documents) if i not in removed]
+        self.doc_ids = [doc_id for i, doc_id in enumerate(self.doc_ids) if i not in removed]
+        self.content_hashes = {
+            content_hash: info for content_hash, info in self.content_hashes.items() if info["id"] not in doc_ids
+        }
+        if self.autosave:
+            self._save_index()
+        return len(positions)
+
     def insert(self, docs, index_name=None):
         """
         插入文档到向量索引，支持去重和更新检测
@@ -702,7 +743,8 @@ class LocalVectorEngine(VectorEngine):
                     raise ValueError(error_msg)
 
                 self.index.add(vectors_array)
-            self._save_index()
+            if self.autosave:
+                self._save_index()
 
             # 简化日志输出，只显示关键统计信息
             if inserted_count > 0 or updated_count > 0:
@@ -739,7 +781,8 @@ class LocalVectorEngine(VectorEngine):
 
         results = []
         for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx < len(self.documents):
+            # 索引中的向量少于 top_k 时 faiss 以 -1 补齐
+            if 0 <= idx < len(self.documents):
                 result = {
                     "id": self.doc_ids[idx] if idx < len(self.doc_ids) else f"doc_{idx}",
                     "content": self.documents[idx],
@@ -1,9 +1,11 @@
+import contextvars
+import functools
 import inspect
-import re
 import time
 import traceback
 import weakref
-from typing import Any, Callable, Dict, Generic, List, Set, Type, TypeVar, Union
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Generic, List, Optional, Set, Type, TypeVar, Union
 
 from vertex_flow.utils.logger import LoggerUtil
 from vertex_flow.workflow.constants import (
@@ -12,6 +14,7 @@ from vertex_flow.workflow.constants import (
     SOURCE_SCOPE,
     SOURCE_VAR,
     VERTEX_ID_KEY,
+    VERTEX_TIMEOUT_KEY,
 )
 from vertex_flow.workflow.context import SubgraphContext, WorkflowContext
 from vertex_flow.workflow.edge import (
@@ -19,16 +22,34 @@ from vertex_flow.workflow.edge import (
     Edge,
     EdgeType,
 )
+from vertex_flow.workflow.run_state import RunScoped
+from vertex_flow.workflow.template import PLACEHOLDER_LOCAL, PLACEHOLDER_VERTEX, Placeholder, render_template
+from vertex_flow.workflow.tracing import current_span, trace_span
 from vertex_flow.workflow.utils import (
     get_task_module_and_function_name,
     is_lambda,
     is_method_of_class,
 )
+from vertex_flow.workflow.vertex_cache import UnhashableValueError, VertexResultCache, make_cache_key
 
 logging = LoggerUtil.get_logger()
 
 T = TypeVar("T")  # 泛型类型变量
 
+# 历史耗时估计（指数移动平均）中最新一次耗时的权重
+COST_ESTIMATE_SMOOTHING = 0.3
+
+# 正在查询结果缓存的顶点，避免子类 execute 调用 super().execute() 时重复查询
+_caching_vertex: contextvars.ContextVar = contextvars.ContextVar("caching_vertex", default=None)
+
+
+def trace_vertex(vertex):
+    """开启追踪时记录顶点执行的 span，子类 execute 调用 super().execute() 时不重复记录"""
+    span = current_span()
+    if span is not None and span.category == "vertex" and span.args.get(VERTEX_ID_KEY) == vertex.id:
+        return nullcontext()
+    return trace_span(vertex.id, "vertex", **{VERTEX_ID_KEY: vertex.id, "task_type": vertex.task_type})
+
 
 class VertexAroundMeta(type):
     def __new__(cls, name, bases, dct):
@@ -37,30 +58,112 @@ class VertexAroundMeta(type):
         if execute is not None:
             # 如果存在execute方法，则使用装饰器包装它
             dct["execute"] = cls._wrap_execute_with_timer(execute)
+        # 异步执行引擎使用的 aexecute 同样计时、缓存与追踪
+        aexecute = dct.get("aexecute", None)
+        if aexecute is not None:
+            dct["aexecute"] = cls._wrap_execute_with_timer(aexecute)
         return super().__new__(cls, name, bases, dct)
 
     @staticmethod
     def _wrap_execute_with_timer(func):
-        def wrapper(self, *args, **kwargs):
+        def on_start(self):
             self.success = True  # 默认认为执行成功
             self.cost_time = None
             self.error_message = None
             self.traceback = None
 
+        def on_error(self, e):
+            self.success = False
+            self.error_message = str(e)
+            self.traceback = traceback.format_exc()
+
+            self.on_failed()
+
+        def cache_lookup(self, args, kwargs):
+            """返回 (缓存键, 是否命中)，未开启缓存时缓存键为 None"""
+            if getattr(self, "_result_cache", None) is None or _caching_vertex.get() is self:
+                return None, False
+            inputs = args[0] if len(args) > 0 else kwargs.get("inputs")
+            context = args[1] if len(args) > 1 else kwargs.get("context")
+            cache_key = self.result_cache_key(inputs, context)
+            if cache_key is None:
+                return None, False
+            hit, output = self._result_cache.get(cache_key)
+            if hit:
+                logging.info(f"Vertex {self.id} result cache hit.")
+                self.output = output
+            return cache_key, hit
+
+        if inspect.iscoroutinefunction(func):
+            # async execute 使用协程包装，由异步执行引擎直接 await
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                on_start(self)
+                start_time = time.time()
+                hit = False
+                with trace_vertex(self) as span:
+                    try:
+                        cache_key, hit = cache_lookup(self, args, kwargs)
+                        if hit:
+                            # 与实际执行相同，返回（从缓存恢复的）输出
+                            result = self.output
+                        elif cache_key is None:
+                            result = await func(self, *args, **kwargs)
+                        else:
+                            token = _caching_vertex.set(self)
+                            try:
+                                result = await func(self, *args, **kwargs)
+                            finally:
+                                _caching_vertex.reset(token)
+                            self._result_cache.set(cache_key, self.output)
+                        if span is not None and cache_key is not None:
+                            span.set(cache_hit=hit)
+                        self.on_finished()
+                    except Exception as e:
+                        on_error(self, e)
+                        raise e from None  # 原样抛出异常
+                    finally:
+                        self.cost_time = time.time() - start_time
+                        # 缓存命中的耗时不代表执行开销，不计入耗时估计
+                        if not hit:
+                            self.record_cost_time(self.cost_time)
+
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            on_start(self)
             start_time = time.time()
-            try:
-                result = func(self, *args, **kwargs)
-                self.on_finished()
-            except Exception as e:
-                self.success = False
-                self.error_message = str(e)
-                self.traceback = traceback.format_exc()
-
-                self.on_failed()
-                raise e from None  # 原样抛出异常
-            finally:
-                end_time = time.time()
-                self.cost_time = end_time - start_time
+            hit = False
+            with trace_vertex(self) as span:
+                try:
+                    cache_key, hit = cache_lookup(self, args, kwargs)
+                    if hit:
+                        # 与实际执行相同，返回（从缓存恢复的）输出
+                        result = self.output
+                    elif cache_key is None:
+                        result = func(self, *args, **kwargs)
+                    else:
+                        token = _caching_vertex.set(self)
+                        try:
+                            result = func(self, *args, **kwargs)
+                        finally:
+                            _caching_vertex.reset(token)
+                        self._result_cache.set(cache_key, self.output)
+                    if span is not None and cache_key is not None:
+                        span.set(cache_hit=hit)
+                    self.on_finished()
+                except Exception as e:
+                    on_error(self, e)
+                    raise e from None  # 原样抛出异常
+                finally:
+                    end_time = time.time()
+                    self.cost_time = end_time - start_time
+                    # 缓存命中的耗时不代表执行开销，不计入耗时估计
+                    if not hit:
+                        self.record_cost_time(self.cost_time)
 
             return result
 
@@ -77,6 +180,18 @@ class Workflow(Generic[T]):
 class Vertex(Generic[T], metaclass=VertexAroundMeta):
     """基本的顶点类，可以被继承以实现具体的功能"""
 
+    # 执行结果属于单次运行，在 WorkflowRun 中运行时互不干扰
+    _output = RunScoped()
+    _is_executed = RunScoped(default=False)
+    success = RunScoped()
+    cost_time = RunScoped()
+    error_message = RunScoped()
+    traceback = RunScoped()
+
+    # 执行没有副作用，workflow.set_result_cache 默认为其开启结果缓存；
+    # 缓存命中时跳过执行，可能有副作用的顶点保持 False，需要显式开启
+    cacheable = False
+
     def __init__(
         self,
         id: str,
@@ -99,6 +214,8 @@ class Vertex(Generic[T], metaclass=VertexAroundMeta):
         self._output_type = None  # 输出类型
         self._input_type = None  # 输入类型
         self._workflow_ref = None
+        self._result_cache = None
+        self._cost_estimate = None
         self.variables = variables if variables else []
 
         # 如果提供了 task，则尝试推导 input_type 和 output_type
@@ -326,6 +443,81 @@ class Vertex(Generic[T], metaclass=VertexAroundMeta):
     def is_executed(self, executed: bool):
         self._is_executed = executed
 
+    @property
+    def cost_estimate(self) -> Optional[float]:
+        """历次执行耗时（秒）的指数移动平均，在多次运行之间共享，用于关键路径优先调度"""
+        return getattr(self, "_cost_estimate", None)
+
+    @cost_estimate.setter
+    def cost_estimate(self, cost_estimate: Optional[float]):
+        self._cost_estimate = cost_estimate
+
+    def record_cost_time(self, cost_time: float):
+        estimate = self.cost_estimate
+        if estimate is None:
+            self._cost_estimate = cost_time
+        else:
+            self._cost_estimate = estimate + COST_ESTIMATE_SMOOTHING * (cost_time - estimate)
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """顶点执行超时（秒），通过 params["timeout"] 配置，None 表示不限制"""
+        if not self.params:
+            return None
+        timeout = self.params.get(VERTEX_TIMEOUT_KEY)
+        return float(timeout) if timeout is not None else None
+
+    @property
+    def result_cache(self) -> Optional[VertexResultCache]:
+        """顶点结果缓存，默认关闭"""
+        return getattr(self, "_result_cache", None)
+
+    @result_cache.setter
+    def result_cache(self, cache: Optional[VertexResultCache]):
+        self._result_cache = cache
+
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        """顶点配置指纹，配置变化后旧的缓存结果不再命中"""
+        return {
+            "class": f"{self.__class__.__module__}.{self.__class__.__qualname__}",
+            "task_type": self.task_type,
+            "task": self.task,
+            "params": self.params,
+            "variables": self.variables,
+        }
+
+    def cache_scopes(self) -> Set[str]:
+        """顶点执行时可能读取输出的其它顶点"""
+        scopes = set(self.dependencies)
+        scopes.update(var_def[SOURCE_SCOPE] for var_def in self.variables if var_def.get(SOURCE_SCOPE))
+        return scopes
+
+    def cache_key_inputs(self, inputs: Dict[str, Any], context: Union[WorkflowContext[T], SubgraphContext[T]]):
+        """参与缓存键计算的已解析输入，无法完整解析时返回 None，本次不使用缓存"""
+        vertices = getattr(self.workflow, "vertices", None) or {}
+        upstream = {}
+        for scope in self.cache_scopes():
+            if scope not in vertices:
+                return None
+            upstream[scope] = vertices[scope].output
+        key_inputs = {"inputs": inputs, "upstream": upstream}
+        if isinstance(context, WorkflowContext):
+            key_inputs["env"] = context.get_env_parameters()
+            key_inputs["user"] = context.get_user_parameters()
+        return key_inputs
+
+    def result_cache_key(self, inputs: Dict[str, Any], context: Union[WorkflowContext[T], SubgraphContext[T]]):
+        """计算结果缓存键，无法计算时返回 None"""
+        key_inputs = self.cache_key_inputs(inputs, context)
+        if key_inputs is None:
+            logging.debug(f"Vertex {self.id} inputs can not be resolved for result cache, skip caching.")
+            return None
+        try:
+            return make_cache_key(self.id, self.cache_fingerprint(), key_inputs)
+        except UnhashableValueError as e:
+            logging.debug(f"Vertex {self.id} result cache bypassed: {e}")
+            return None
+
     def to(self, next_vertex: "Vertex[T]", edge_type: EdgeType = Edge.ALWAYS) -> "Vertex[T]":
         """
         Create a connection to the next vertex and return the target vertex for method chaining.
@@ -403,73 +595,52 @@ class Vertex(Generic[T], metaclass=VertexAroundMeta):
     def execute(self, inputs: Dict[str, T] = None, context: Union[WorkflowContext[T], SubgraphContext[T]] = None):
         raise NotImplementedError("Subclasses should implement this method.")
 
-    def _replace_placeholders(self, text):
-        """替换文本中的占位符"""
-        logging.debug(f"Replace in {self.id}")
+    def supports_aexecute(self) -> bool:
+        """异步执行引擎是否可以直接 await aexecute（不占用顶点线程），默认在线程中调用同步 execute"""
+        return False
 
-        # 定义支持的占位符格式
-        patterns = [
-            (r"\{\{\#([\w-]+)\.(.*?)#\}\}", "pattern1"),  # {{#vertex_id.var_name#}}
-            (r"\{\{([\w-]+)\.([\w-]+)\}\}", "pattern2"),  # {{vertex_id.var_name}}
-            (r"\{\{([\w-]+)\}\}", "pattern3"),  # {{vertex_id}} 或 {{local_var}}
-        ]
-
-        for pattern, pattern_name in patterns:
-            text = self._process_pattern(text, pattern, pattern_name)
-
-        return text
-
-    def _process_pattern(self, text, pattern, pattern_name):
-        """处理特定模式的占位符"""
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            vertex_id = match.group(1)
-            # pattern3 ({{vertex_id}}) 没有var_name，其他模式有
-            var_name = match.group(2) if len(match.groups()) > 1 else None
-            logging.debug(f"match {pattern_name} {vertex_id}, {var_name}, {match.group(0)}")
-
-            # 首先尝试作为本地变量处理（pattern3）
-            if var_name is None:
-                # 检查是否是本地变量
-                if hasattr(self, "variables") and self.variables:
-                    for var_def in self.variables:
-                        if var_def.get("local_var") == vertex_id:
-                            # 这是一个本地变量，构造variable_selector来解析
-                            try:
-                                variable_selector = {
-                                    SOURCE_SCOPE: var_def.get(SOURCE_SCOPE),
-                                    SOURCE_VAR: var_def.get(SOURCE_VAR),
-                                    LOCAL_VAR: var_def.get(LOCAL_VAR),
-                                }
-                                resolved_values = self.resolve_dependencies(variable_selector=variable_selector)
-                                if vertex_id in resolved_values:
-                                    replacement_value = resolved_values[vertex_id]
-                                    text = text.replace(match.group(0), str(replacement_value))
-                                    logging.debug(f"replaced local var {vertex_id}: {replacement_value}")
-                                    continue
-                            except Exception as e:
-                                logging.warning(f"Failed to resolve local variable {vertex_id}: {e}")
-
-                # 如果不是本地变量，跳过处理（避免错误调用_get_replacement_value_via_dependencies）
-                continue
+    def _replace_placeholders(self, text, literals: Optional[Dict[str, str]] = None):
+        """替换文本中的占位符
 
-            # 如果不是本地变量，按原来的逻辑处理
-            replacement_value = self._get_replacement_value_via_dependencies(vertex_id, var_name)
-            if replacement_value is not None:
-                text = text.replace(match.group(0), str(replacement_value))
-                logging.debug(f"replaced text : {text}")
+        模板按文本编译并缓存，替换时一次遍历；literals 为占位符原文 -> 替换文本，优先于顶点变量解析。
+        """
+        logging.debug(f"Replace in {self.id}")
+        return render_template(text, self._resolve_placeholder, literals)
+
+    def _resolve_placeholder(self, placeholder: Placeholder):
+        """解析一个占位符，无法解析时返回 None"""
+        if placeholder.kind == PLACEHOLDER_VERTEX:
+            logging.debug(f"match {placeholder.scope}, {placeholder.var}, {placeholder.raw}")
+            return self._get_replacement_value_via_dependencies(placeholder.scope, placeholder.var)
+        if placeholder.kind != PLACEHOLDER_LOCAL:
+            return None
 
-        return text
+        # {{local_var}} 只作为本地变量处理，不是本地变量时保留原文（避免错误调用_get_replacement_value_via_dependencies）
+        local_var = placeholder.scope
+        for var_def in self.variables or []:
+            if var_def.get(LOCAL_VAR) != local_var:
+                continue
+            # 这是一个本地变量，构造variable_selector来解析
+            try:
+                variable_selector = {
+                    SOURCE_SCOPE: var_def.get(SOURCE_SCOPE),
+                    SOURCE_VAR: var_def.get(SOURCE_VAR),
+                    LOCAL_VAR: var_def.get(LOCAL_VAR),
+                }
+                resolved_values = self.resolve_dependencies(variable_selector=variable_selector)
+                if local_var in resolved_values:
+                    logging.debug(f"replaced local var {local_var}: {resolved_values[local_var]}")
+                    return resolved_values[local_var]
+            except Exception as e:
+                logging.warning(f"Failed to resolve local variable {local_var}: {e}")
+        return None
 
     def _find_vertex_by_id(self, vertex_id):
         """根据ID查找顶点"""
-        for vertex in self.workflow.vertices.values():
-            if vertex.id == vertex_id:
-                logging.debug(f"matched vertex {vertex.id} : {vertex.output}")
-                return vertex
-
-        logging.warning(f"{vertex_id} not found.")
-        return None
+        vertex = self.workflow.vertices.get(vertex_id)
+        if vertex is None:
+            logging.warning(f"{vertex_id} not found.")
+        return vertex
 
     def _get_replacement_value_via_dependencies(self, vertex_id, var_name):
         """通过resolve_dependencies方法获取替换值"""
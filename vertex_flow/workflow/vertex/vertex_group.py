@@ -1,21 +1,34 @@
 import logging
 import traceback
 from collections import deque
-from typing import Any, Dict, List, Optional, Set, Union
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.cancellation import CancellationToken, current_cancellation
+from vertex_flow.workflow.checkpoint import current_checkpoint
 from vertex_flow.workflow.constants import LOCAL_VAR, SOURCE_SCOPE, SOURCE_VAR, SUBGRAPH_SOURCE
 from vertex_flow.workflow.context import SubgraphContext, WorkflowContext
 from vertex_flow.workflow.edge import Edge, EdgeType
+from vertex_flow.workflow.run_state import RunScoped, current_run_state
+from vertex_flow.workflow.scheduler import ReadyQueueScheduler
+from vertex_flow.workflow.tracing import bind_trace
 
 from .vertex import T, Vertex
 
 logging = LoggerUtil.get_logger()
 
+# 未指定 max_workers 时子图中同时执行的顶点数上限
+DEFAULT_MAX_WORKERS = 8
+
 
 class VertexGroup(Vertex[T]):
     """顶点组，包含一个子图，作为一个Vertex的子图/Subgraph"""
 
+    # 子图上下文保存子图内部输出，属于单次运行
+    subgraph_context = RunScoped(factory=SubgraphContext)
+
     def __init__(
         self,
         id: str,
@@ -25,6 +38,7 @@ class VertexGroup(Vertex[T]):
         params: Dict[str, Any] = None,
         variables: List[Dict[str, Union[str, None]]] = None,
         exposed_variables: List[Dict[str, Union[str, None]]] = None,
+        max_workers: Optional[int] = None,
     ):
         """
         初始化VertexGroup
@@ -39,6 +53,7 @@ class VertexGroup(Vertex[T]):
                 格式: [{"source_scope": "外部顶点ID", "source_var": "变量名", "local_var": "本地变量名"}]
             exposed_variables: 变量暴露列表，用于将子图内部顶点的输出暴露给外部
                 格式: [{"source_scope": "内部顶点ID", "source_var": "变量名", "local_var": "暴露名称"}]
+            max_workers: 子图中同时执行的顶点数上限，默认为 DEFAULT_MAX_WORKERS；为 1 时在调用线程中按拓扑序依次执行
         """
         super().__init__(
             id=id,
@@ -49,6 +64,13 @@ class VertexGroup(Vertex[T]):
             variables=variables,
         )
 
+        self.max_workers = max_workers
+        # 子图的拓扑序与依赖关系，在子图结构变化前可在多次执行（例如WhileVertexGroup的每次迭代）间复用
+        self._subgraph_schedule = None
+        # 并行执行子图的线程池，首次使用时创建，在多次执行（包括并发的运行）间复用
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = Lock()
+
         # 用add_subgraph_vertex方法注册所有子图顶点，保证依赖查找优先在子图内
         self.subgraph_vertices = {}
         for v in subgraph_vertices or []:
@@ -103,6 +125,7 @@ class VertexGroup(Vertex[T]):
     def add_subgraph_vertex(self, vertex: Vertex[T]) -> Vertex[T]:
         """添加顶点到子图"""
         self.subgraph_vertices[vertex.id] = vertex
+        self._subgraph_schedule = None
         vertex._vertex_group_ref = self
         # 如果VertexGroup已经有workflow引用，则传递给子图vertex
         if hasattr(self, "workflow") and self.workflow:
@@ -121,6 +144,7 @@ class VertexGroup(Vertex[T]):
             raise ValueError("Both vertices must be in the subgraph before adding edge")
 
         self.subgraph_edges.add(edge)
+        self._subgraph_schedule = None
 
         # 更新子图内顶点的度数和依赖关系
         target_vertex = self.subgraph_vertices[edge.target_vertex.id]
@@ -151,11 +175,28 @@ class VertexGroup(Vertex[T]):
         return sinks
 
     def topological_sort_subgraph(self) -> List[Vertex[T]]:
-        """对子图进行拓扑排序"""
-        # 创建顶点的入度副本（仅考虑子图内的边）
-        in_degrees = {}
-        for vertex_id in self.subgraph_vertices:
-            in_degrees[vertex_id] = sum(1 for edge in self.subgraph_edges if edge.target_vertex.id == vertex_id)
+        """对子图进行拓扑排序，结果在子图结构变化前缓存"""
+        return list(self._get_subgraph_schedule()[0])
+
+    def _get_subgraph_schedule(self) -> Tuple[List[Vertex[T]], Dict[str, Set[str]], bool]:
+        """返回 (拓扑序, 子图内依赖, 是否只能依次执行)
+
+        子图结构只通过 add_subgraph_vertex/add_subgraph_edge 修改，修改时清空缓存；
+        顶点数或边数与缓存时不一致（例如直接修改了 subgraph_edges）时同样重新计算。
+        """
+        key = (len(self.subgraph_vertices), len(self.subgraph_edges))
+        cached = getattr(self, "_subgraph_schedule", None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        # 仅考虑子图内的边
+        dependencies: Dict[str, Set[str]] = {vertex_id: set() for vertex_id in self.subgraph_vertices}
+        successors: Dict[str, List[str]] = {vertex_id: [] for vertex_id in self.subgraph_vertices}
+        in_degrees = {vertex_id: 0 for vertex_id in self.subgraph_vertices}
+        for edge in self.subgraph_edges:
+            dependencies[edge.target_vertex.id].add(edge.source_vertex.id)
+            successors[edge.source_vertex.id].append(edge.target_vertex.id)
+            in_degrees[edge.target_vertex.id] += 1
 
         # 获取入度为0的顶点
         queue = deque([self.subgraph_vertices[vertex_id] for vertex_id, degree in in_degrees.items() if degree == 0])
@@ -167,12 +208,10 @@ class VertexGroup(Vertex[T]):
             topological_order.append(vertex)
 
             # 减少相邻顶点的入度
-            for edge in self.subgraph_edges:
-                if edge.source_vertex.id == vertex.id:
-                    target_id = edge.target_vertex.id
-                    in_degrees[target_id] -= 1
-                    if in_degrees[target_id] == 0:
-                        queue.append(self.subgraph_vertices[target_id])
+            for target_id in successors[vertex.id]:
+                in_degrees[target_id] -= 1
+                if in_degrees[target_id] == 0:
+                    queue.append(self.subgraph_vertices[target_id])
 
         if len(topological_order) != len(self.subgraph_vertices):
             raise ValueError(
@@ -180,7 +219,14 @@ class VertexGroup(Vertex[T]):
                 f"Sorted: {len(topological_order)}, Total: {len(self.subgraph_vertices)}"
             )
 
-        return topological_order
+        # 拓扑序中每个顶点都依赖前一个顶点时，子图是一条链，没有可以并行的顶点
+        sequential = all(
+            topological_order[i - 1].id in dependencies[topological_order[i].id]
+            for i in range(1, len(topological_order))
+        )
+        schedule = (topological_order, dependencies, sequential)
+        self._subgraph_schedule = (key, schedule)
+        return schedule
 
     def resolve_subgraph_dependencies(self, vertex: Vertex[T], inputs: Dict[str, Any]) -> Dict[str, Any]:
         """解析子图内顶点的依赖关系"""
@@ -333,33 +379,15 @@ class VertexGroup(Vertex[T]):
             all_inputs = {**(inputs or {}), **external_inputs}
 
             # 获取拓扑排序
-            execution_order = self.topological_sort_subgraph()
+            execution_order, dependencies, sequential = self._get_subgraph_schedule()
             logging.info(f"Subgraph execution order: {[v.id for v in execution_order]}")
 
-            # 按拓扑顺序执行顶点
-            for vertex in execution_order:
-                logging.info(f"Executing subgraph vertex: {vertex.id}")
-
-                try:
-                    # 解析顶点的依赖关系
-                    vertex_inputs = self.resolve_dependencies(vertex, all_inputs, context=context)
-
-                    # 执行顶点，传递SubgraphContext而不是原始context
-                    vertex.execute(inputs=vertex_inputs, context=context)
-
-                    # 存储输出到子图上下文
-                    if vertex.output is not None:
-                        self.subgraph_context.store_internal_output(vertex.id, vertex.output)
-
-                    # 标记为已执行
-                    vertex.is_executed = True
-
-                    logging.info(f"Subgraph vertex {vertex.id} executed successfully")
-
-                except Exception as e:
-                    logging.error(f"Error executing subgraph vertex {vertex.id}: {e}")
-                    traceback.print_exc()
-                    raise e
+            if sequential or self.max_workers == 1:
+                # 子图是一条链，在调用线程中按拓扑顺序执行
+                for vertex in execution_order:
+                    self._execute_subgraph_vertex(vertex, all_inputs, context)
+            else:
+                self._execute_subgraph_parallel(execution_order, dependencies, all_inputs, context)
 
             # 构建最终输出 - 返回所有子图顶点的输出
             result = {}
@@ -379,6 +407,100 @@ class VertexGroup(Vertex[T]):
             # 重新抛出异常，让上层处理
             raise e
 
+    def _execute_subgraph_vertex(self, vertex: Vertex[T], all_inputs: Dict[str, Any], context: WorkflowContext[T]):
+        """执行一个子图顶点，并将输出存入子图上下文"""
+        logging.info(f"Executing subgraph vertex: {vertex.id}")
+
+        try:
+            # 解析顶点的依赖关系
+            vertex_inputs = self.resolve_dependencies(vertex, all_inputs, context=context)
+
+            # 执行顶点，传递SubgraphContext而不是原始context
+            vertex.execute(inputs=vertex_inputs, context=context)
+
+            # 存储输出到子图上下文
+            if vertex.output is not None:
+                self.subgraph_context.store_internal_output(vertex.id, vertex.output)
+
+            # 标记为已执行
+            vertex.is_executed = True
+
+            logging.info(f"Subgraph vertex {vertex.id} executed successfully")
+
+        except Exception as e:
+            logging.error(f"Error executing subgraph vertex {vertex.id}: {e}")
+            traceback.print_exc()
+            raise e
+
+    def _execute_subgraph_parallel(
+        self,
+        execution_order: List[Vertex[T]],
+        dependencies: Dict[str, Set[str]],
+        all_inputs: Dict[str, Any],
+        context: WorkflowContext[T],
+    ):
+        """使用就绪队列调度器执行子图，互不依赖的顶点并行执行
+
+        顶点在当前运行状态、检查点、追踪上下文与取消令牌下执行，子图顶点的输出仍然只写入本顶点组的子图上下文。
+        任一顶点失败时取消子图内其余顶点并抛出该异常，不影响运行中的其它顶点。
+        """
+
+        def run_vertex(vertex_id: str):
+            self._execute_subgraph_vertex(self.subgraph_vertices[vertex_id], all_inputs, context)
+
+        run_state = current_run_state()
+        if run_state is not None:
+            # 顶点在线程池中执行，显式绑定运行状态（包括MapVertexGroup为每个元素隔离的运行状态）
+            run_vertex = run_state.wrap(run_vertex)
+        checkpoint = current_checkpoint()
+        if checkpoint is not None:
+            # 子图中的循环顶点在线程池中同样保存迭代状态
+            run_vertex = checkpoint.wrap(run_vertex)
+        run_vertex = bind_trace(run_vertex)
+
+        parent_token = current_cancellation()
+        name = f"group {self.id}"
+        cancellation = parent_token.child(name=name) if parent_token is not None else CancellationToken(name=name)
+
+        # 调度器失败时撤销本次执行尚未开始的顶点，不等待仍在执行的顶点，它们在下一个取消检查点退出
+        scheduler = ReadyQueueScheduler(
+            vertex_ids=[vertex.id for vertex in execution_order],
+            dependencies=dependencies,
+            run_vertex=run_vertex,
+            executor=self._get_executor(),
+            vertex_timeout=lambda vertex_id: self.subgraph_vertices[vertex_id].timeout,
+            cancellation=cancellation,
+        )
+        scheduler.run()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取本顶点组的线程池，首次使用时创建；线程按需启动，空闲的线程在多次执行间复用"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers or DEFAULT_MAX_WORKERS, thread_name_prefix=f"group-{self.id}"
+                    )
+        return self._executor
+
+    def shutdown(self, wait: bool = True):
+        """关闭本顶点组的线程池，之后再次执行时重新创建"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # 线程池与锁不能被序列化，反序列化后按需重新创建
+        state["_executor"] = None
+        del state["_executor_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor_lock = Lock()
+
     def execute(self, inputs: Dict[str, T] = None, context: WorkflowContext[T] = None):
         """执行VertexGroup"""
         if self._task and callable(self._task):
@@ -1,9 +1,14 @@
 import inspect
 import traceback
-from typing import Any, Callable, Dict, List, Union
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from vertex_flow.utils.logger import LoggerUtil
-from vertex_flow.workflow.constants import ITERATION_INDEX_KEY, SOURCE_VAR
+from vertex_flow.workflow.cancellation import WorkflowCancelledError, check_cancelled
+from vertex_flow.workflow.checkpoint import current_checkpoint
+from vertex_flow.workflow.constants import ITERATION_INDEX_KEY, OUTPUT_KEY, SOURCE_VAR, VERTEX_ID_KEY
+from vertex_flow.workflow.event_channel import EventType
+from vertex_flow.workflow.run_state import RunScoped
 
 from .function_vertex import FunctionVertex
 from .vertex import T, WorkflowContext
@@ -30,9 +35,52 @@ class WhileCondition:
         self.logical_operator = logical_operator
 
 
+class LoopResults:
+    """循环结果收集器
+
+    默认保留每次迭代的完整结果；指定 window 时只保留最近 window 次的结果（0 表示不保留），
+    指定 reducer 时每次迭代的结果通过 reducer(累积值, 结果) 归约为一个累积值，
+    长循环只占用固定的内存。
+    """
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        reducer: Optional[Callable[[Any, Any], Any]] = None,
+        initial: Any = None,
+    ):
+        self.window = window
+        self.reducer = reducer
+        self.reduced = initial
+        self._results = deque(maxlen=window)
+
+    def add(self, result: Any):
+        if self.window != 0:
+            self._results.append(result)
+        if self.reducer is not None:
+            self.reduced = self.reducer(self.reduced, result)
+
+    @property
+    def results(self) -> List[Any]:
+        return list(self._results)
+
+    def restore(self, results: List[Any], reduced: Any = None):
+        """从检查点恢复已保留的结果与归约值"""
+        self._results.clear()
+        if self.window != 0:
+            self._results.extend(results)
+        if self.reducer is not None:
+            self.reduced = reduced
+
+
 class WhileVertex(FunctionVertex):
     """While循环顶点，支持条件判断和固定次数的循环控制"""
 
+    # 循环状态属于单次运行
+    _iteration_index = RunScoped(default=0)
+    _loop_data = RunScoped(factory=dict)
+    _is_first_iteration = RunScoped(default=True)
+
     def __init__(
         self,
         id: str,
@@ -44,6 +92,10 @@ class WhileVertex(FunctionVertex):
         max_iterations: int = None,
         params: Dict[str, Any] = None,
         variables: List[Dict[str, Any]] = None,
+        results_window: Optional[int] = None,
+        reducer: Optional[Callable[[Any, Any], Any]] = None,
+        reducer_initial: Any = None,
+        stream_results: bool = False,
     ):
         """
         初始化WhileVertex
@@ -58,6 +110,10 @@ class WhileVertex(FunctionVertex):
             max_iterations: 最大迭代次数（可选）
             params: 参数字典
             variables: 变量列表
+            results_window: 输出的 results 中只保留最近几次迭代的结果，默认全部保留，0 表示不保留
+            reducer: 归约函数 reducer(累积值, 本次结果) -> 新累积值，最终累积值输出为 reduced
+            reducer_initial: 归约的初始累积值
+            stream_results: 每次迭代完成后发送一个带迭代序号的 VALUES 事件，下游消费者无需等待循环结束
         """
         # 设置默认的task为while_loop方法
         task = self.while_loop
@@ -87,6 +143,12 @@ class WhileVertex(FunctionVertex):
         self.conditions = conditions or []
         self.logical_operator = logical_operator
         self.max_iterations = max_iterations
+        self.results_window = results_window
+        self.reducer = reducer
+        self.reducer_initial = reducer_initial
+        self.stream_results = stream_results
+        # 迭代事件中的顶点ID，WhileVertexGroup 使用顶点组自身的ID
+        self._event_vertex_id = id
 
         # 内部状态管理
         self._iteration_index = 0
@@ -94,6 +156,8 @@ class WhileVertex(FunctionVertex):
         self._is_first_iteration = True
 
         self._validate_conditions()
+        if results_window is not None and results_window < 0:
+            raise ValueError(f"results_window must not be negative, got {results_window}.")
 
     def _validate_conditions(self):
         """验证条件的有效性"""
@@ -217,6 +281,62 @@ class WhileVertex(FunctionVertex):
         Returns:
             循环执行的结果
         """
+        collected = self._create_loop_results()
+        final_inputs = {}
+        for _ in self._iterate(inputs, context, collected, final_inputs):
+            pass
+        return self._loop_output(collected, final_inputs)
+
+    def iter_loop(self, inputs: Dict[str, Any] = None, context: WorkflowContext[T] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        逐次执行循环，每完成一次迭代产出 (迭代序号, 结果)
+
+        循环在调用方线程中随迭代器推进，调用方可以边执行边处理结果；迭代器耗尽后 output 为循环的输出，
+        与 execute 相同。提前关闭迭代器时循环停止，不再执行后续迭代。
+
+        Args:
+            inputs: 输入数据
+            context: 工作流上下文
+        """
+        collected = self._create_loop_results()
+        final_inputs = {}
+        yield from self._iterate(inputs, context, collected, final_inputs)
+        self.output = self._loop_output(collected, final_inputs)
+
+    def _create_loop_results(self) -> LoopResults:
+        return LoopResults(window=self.results_window, reducer=self.reducer, initial=self.reducer_initial)
+
+    def _loop_output(self, collected: LoopResults, final_inputs: Dict[str, Any]) -> Dict[str, Any]:
+        output = {
+            "results": collected.results,
+            "iteration_count": self._iteration_index,
+            "final_inputs": final_inputs,
+            "loop_data": self.get_loop_data(),
+        }
+        if self.reducer is not None:
+            output["reduced"] = collected.reduced
+        return output
+
+    def _emit_iteration_result(self, index: int, result: Any):
+        """发送一次迭代的结果事件"""
+        if not self.stream_results or not self.workflow:
+            return
+        try:
+            self.workflow.emit_event(
+                EventType.VALUES,
+                {VERTEX_ID_KEY: self._event_vertex_id, ITERATION_INDEX_KEY: index, OUTPUT_KEY: result},
+            )
+        except Exception as e:
+            logging.warning(f"Failed to emit iteration result of vertex {self.id}: {e}")
+
+    def _iterate(
+        self,
+        inputs: Optional[Dict[str, Any]],
+        context: Optional[WorkflowContext[T]],
+        collected: LoopResults,
+        final_inputs: Dict[str, Any],
+    ) -> Iterator[Tuple[int, Any]]:
+        """执行循环，每次迭代的结果写入 collected 并产出，循环结束后 final_inputs 为最终的输入"""
         # 重置循环状态
         self.reset_loop_state()
 
@@ -224,14 +344,28 @@ class WhileVertex(FunctionVertex):
         if inputs:
             self.set_loop_data(inputs)
 
-        results = []
-        current_inputs = inputs.copy() if inputs else {}
+        current_inputs = final_inputs
+        current_inputs.update(inputs or {})
+
+        # 从检查点恢复已完成的迭代
+        checkpoint = current_checkpoint()
+        loop_state = checkpoint.load_loop_state(self.id) if checkpoint is not None else None
+        if loop_state:
+            collected.restore(loop_state["results"], loop_state.get("reduced"))
+            current_inputs.clear()
+            current_inputs.update(loop_state["current_inputs"])
+            self._loop_data = loop_state["loop_data"]
+            self._iteration_index = loop_state["iteration_index"]
+            self._is_first_iteration = False
+            logging.info(f"While loop in vertex {self.id} resumed at iteration {self._iteration_index}")
 
         logging.info(f"Starting while loop in vertex {self.id}, current_inputs: {current_inputs}")
 
         try:
             while True:
                 logging.info(f"Iteration {self._iteration_index} in vertex {self.id}")
+                # 运行取消或超时后不再开始新的迭代
+                check_cancelled()
                 # 检查最大迭代次数
                 if self.max_iterations is not None and self._iteration_index >= self.max_iterations:
                     logging.info(f"Reached max iterations ({self.max_iterations}) in vertex {self.id}")
@@ -250,6 +384,7 @@ class WhileVertex(FunctionVertex):
                 # 自动注入循环索引到inputs中
                 enhanced_inputs = current_inputs.copy()
                 enhanced_inputs[ITERATION_INDEX_KEY] = self._iteration_index
+                index = self._iteration_index
 
                 try:
                     if has_context:
@@ -257,7 +392,7 @@ class WhileVertex(FunctionVertex):
                     else:
                         result = self.execute_task(inputs=enhanced_inputs)
 
-                    results.append(result)
+                    collected.add(result)
 
                     # 用新输出全量替换current_inputs，避免旧值残留
                     if isinstance(result, dict):
@@ -270,6 +405,9 @@ class WhileVertex(FunctionVertex):
 
                     logging.debug(f"Completed iteration {self._iteration_index} in vertex {self.id}")
 
+                    self._emit_iteration_result(index, result)
+                    yield index, result
+
                     # 在执行完循环体后检查循环条件（除了第一次迭代）
                     if not self.should_continue(current_inputs, context):
                         logging.info(
@@ -277,25 +415,40 @@ class WhileVertex(FunctionVertex):
                         )
                         break
 
+                    if checkpoint is not None:
+                        loop_state = {
+                            "iteration_index": self._iteration_index,
+                            "results": collected.results,
+                            "current_inputs": current_inputs,
+                            "loop_data": self._loop_data,
+                        }
+                        if self.reducer is not None:
+                            loop_state["reduced"] = collected.reduced
+                        checkpoint.save_loop_state(self.id, loop_state)
+
+                except WorkflowCancelledError:
+                    raise
                 except Exception as e:
                     logging.error(f"Error in execute_task at iteration {self._iteration_index}: {e}")
                     traceback.print_exc()
                     break
 
+        except GeneratorExit:
+            # 调用方提前结束（只取部分迭代结果）同样视为循环结束
+            if checkpoint is not None:
+                checkpoint.clear_loop_state(self.id)
+            raise
         except Exception as e:
             logging.error(f"Error in while loop: {e}")
             traceback.print_exc()
             raise e
 
+        # 循环正常结束或提前跳出后删除迭代状态，同一运行中再次执行该循环时从头开始；
+        # 异常退出时保留，恢复运行时从最后完成的迭代继续
+        if checkpoint is not None:
+            checkpoint.clear_loop_state(self.id)
         logging.info(f"While loop completed in vertex {self.id} after {self._iteration_index} iterations")
 
-        return {
-            "results": results,
-            "iteration_count": self._iteration_index,
-            "final_inputs": current_inputs,
-            "loop_data": self.get_loop_data(),
-        }
-
     def get_iteration_index(self) -> int:
         """获取当前循环索引"""
         return self._iteration_index
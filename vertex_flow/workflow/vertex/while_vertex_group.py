@@ -1,5 +1,5 @@
 import traceback
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from vertex_flow.utils.logger import LoggerUtil
 from vertex_flow.workflow.constants import ITERATION_INDEX_KEY, LOCAL_VAR, SOURCE_SCOPE, SOURCE_VAR, SUBGRAPH_SOURCE
@@ -29,6 +29,10 @@ class WhileVertexGroup(VertexGroup[T]):
         conditions: Optional[List[WhileCondition]] = None,
         logical_operator: str = "and",
         max_iterations: Optional[int] = None,
+        results_window: Optional[int] = None,
+        reducer: Optional[Callable[[Any, Any], Any]] = None,
+        reducer_initial: Any = None,
+        stream_results: bool = False,
         # 通用参数
         params: Optional[Dict[str, Any]] = None,
         variables: Optional[List[Dict[str, Any]]] = None,
@@ -46,6 +50,10 @@ class WhileVertexGroup(VertexGroup[T]):
             conditions: 条件列表（可选，与condition_task二选一）
             logical_operator: 多个条件之间的逻辑操作符
             max_iterations: 最大迭代次数（可选）
+            results_window: 输出的 results 中只保留最近几次迭代的子图输出，默认全部保留，0 表示不保留
+            reducer: 归约函数 reducer(累积值, 本次子图输出) -> 新累积值，最终累积值输出为 reduced
+            reducer_initial: 归约的初始累积值
+            stream_results: 每次迭代完成后以顶点组ID发送一个 VALUES 事件
             params: 参数字典
             variables: 变量筛选列表，用于从外部输入中筛选变量传递给子图
             exposed_variables: 变量暴露列表，用于将子图内部顶点的输出暴露给外部
@@ -61,6 +69,10 @@ class WhileVertexGroup(VertexGroup[T]):
             "name": f"{name or id} While Controller",
             "execute_task": execute_task,
             "logical_operator": logical_operator,
+            "results_window": results_window,
+            "reducer": reducer,
+            "reducer_initial": reducer_initial,
+            "stream_results": stream_results,
         }
 
         # 只有当值不为None时才添加参数
@@ -72,6 +84,7 @@ class WhileVertexGroup(VertexGroup[T]):
             while_vertex_params["max_iterations"] = max_iterations
 
         self.while_vertex = WhileVertex(**while_vertex_params)
+        self.while_vertex._event_vertex_id = id
 
         # 重写WhileVertex的should_continue方法，使其使用WhileVertexGroup的变量筛选逻辑
         original_should_continue = self.while_vertex.should_continue
@@ -139,6 +152,38 @@ class WhileVertexGroup(VertexGroup[T]):
             traceback.print_exc()
             raise e
 
+    def _prepare_loop(self, inputs: Optional[Dict[str, Any]], context: Optional[WorkflowContext[T]]) -> Dict[str, Any]:
+        """传递workflow引用并筛选变量，返回WhileVertex的输入"""
+        self._current_context = context
+        if hasattr(self, "workflow") and self.workflow:
+            self.while_vertex.workflow = self.workflow
+            for vertex in self.subgraph_vertices.values():
+                vertex.workflow = self.workflow
+        elif context is not None and hasattr(context, "workflow") and context.workflow:
+            self.while_vertex.workflow = context.workflow
+            for vertex in self.subgraph_vertices.values():
+                vertex.workflow = context.workflow
+        # 统一用父类的变量筛选逻辑
+        return {**(inputs or {}), **self._filter_inputs(inputs, context)}
+
+    def _finish_loop(self):
+        """以WhileVertex的输出作为本顶点组的输出，并处理暴露的变量"""
+        self.output = self.while_vertex.output
+        iteration_count = self.output.get("iteration_count", 0) if self.output else 0
+        logging.info(f"WhileVertexGroup {self.id} completed with {iteration_count} iterations")
+
+        # 复用父类的变量暴露逻辑
+        # 需要传递子图顶点的输出字典，而不是 WhileVertex 的整体输出
+        subgraph_outputs = {}
+        for vertex in self.subgraph_vertices.values():
+            if hasattr(vertex, "output") and vertex.output:
+                subgraph_outputs[vertex.id] = vertex.output
+
+        exposed_output = self._expose_outputs(subgraph_outputs)
+        if exposed_output:
+            self.output = exposed_output
+        return self.output
+
     def execute(self, inputs: Optional[Dict[str, Any]] = None, context: Optional[WorkflowContext[T]] = None):
         """
         执行WhileVertexGroup，通过内置的WhileVertex进行循环控制
@@ -152,41 +197,29 @@ class WhileVertexGroup(VertexGroup[T]):
         """
         try:
             logging.info(f"Starting WhileVertexGroup {self.id} execution, inputs: {inputs}.")
-            self._current_context = context
-            if hasattr(self, "workflow") and self.workflow:
-                self.while_vertex.workflow = self.workflow
-                for vertex in self.subgraph_vertices.values():
-                    vertex.workflow = self.workflow
-            elif context is not None and hasattr(context, "workflow") and context.workflow:
-                self.while_vertex.workflow = context.workflow
-                for vertex in self.subgraph_vertices.values():
-                    vertex.workflow = context.workflow
-            # 统一用父类的变量筛选逻辑
-            final_inputs = {**(inputs or {}), **self._filter_inputs(inputs, context)}
-            if context is not None:
-                self.while_vertex.execute(inputs=final_inputs, context=context)
-            else:
-                self.while_vertex.execute(inputs=final_inputs, context=None)
-            self.output = self.while_vertex.output
-            iteration_count = self.output.get("iteration_count", 0) if self.output else 0
-            logging.info(f"WhileVertexGroup {self.id} completed with {iteration_count} iterations")
-
-            # 复用父类的变量暴露逻辑
-            # 需要传递子图顶点的输出字典，而不是 WhileVertex 的整体输出
-            subgraph_outputs = {}
-            for vertex in self.subgraph_vertices.values():
-                if hasattr(vertex, "output") and vertex.output:
-                    subgraph_outputs[vertex.id] = vertex.output
-
-            exposed_output = self._expose_outputs(subgraph_outputs)
-            if exposed_output:
-                self.output = exposed_output
-            return self.output
+            final_inputs = self._prepare_loop(inputs, context)
+            self.while_vertex.execute(inputs=final_inputs, context=context)
+            return self._finish_loop()
         except Exception as e:
             logging.error(f"Error executing WhileVertexGroup {self.id}: {e}")
             traceback.print_exc()
             raise e
 
+    def iter_loop(
+        self, inputs: Optional[Dict[str, Any]] = None, context: Optional[WorkflowContext[T]] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        逐次执行循环，每完成一次迭代产出 (迭代序号, 子图输出)，迭代器耗尽后 output 与 execute 相同
+
+        Args:
+            inputs: 输入数据
+            context: 工作流上下文
+        """
+        logging.info(f"Starting WhileVertexGroup {self.id} streaming execution, inputs: {inputs}.")
+        final_inputs = self._prepare_loop(inputs, context)
+        yield from self.while_vertex.iter_loop(inputs=final_inputs, context=context)
+        self._finish_loop()
+
     def add_condition(self, condition: WhileCondition):
         """
         添加循环条件
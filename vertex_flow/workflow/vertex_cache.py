@@ -0,0 +1,292 @@
+"""
+顶点结果缓存
+
+按「顶点 ID + 顶点配置指纹 + 已解析输入的稳定哈希」对顶点输出做内容寻址缓存，
+相同输入重复运行工作流时直接复用 LLM、Embedding、工具调用等昂贵顶点的结果。
+
+- InProcessVertexCache：进程内 LRU 缓存，支持 TTL、条目数与字节数上限
+- MemoryVertexCache：基于 vertex_flow.memory 的 ctx_* 接口存储（InnerMemory、RedisMemory、
+  RDSMemory 等），可在多个进程之间共享，只缓存可 JSON 序列化的输出
+
+缓存需要按顶点显式开启：vertex.result_cache = cache，或 workflow.set_result_cache(cache)。
+后者默认只为 cacheable 的顶点（LLM、Embedding、Rerank 等没有副作用的顶点）开启，
+命中缓存时顶点不会执行，函数、工具、记忆写入等有副作用的顶点需要通过 vertex_ids 显式指定。
+"""
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from vertex_flow.utils.logger import LoggerUtil
+
+logging = LoggerUtil.get_logger()
+
+
+class UnhashableValueError(TypeError):
+    """对象无法稳定哈希（内容无法完整表示），使用该对象的缓存应直接跳过"""
+
+
+def _normalize(value: Any) -> Any:
+    """把任意对象转换为可稳定 JSON 序列化的结构"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {
+            key if isinstance(key, str) else f"<{type(key).__name__}>{key!r}": _normalize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": sorted(_dumps(item) for item in value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": hashlib.sha256(value).hexdigest()}
+    if inspect.isfunction(value) or inspect.ismethod(value) or inspect.isclass(value):
+        return {"__callable__": f"{value.__module__}.{value.__qualname__}"}
+    if dataclasses.is_dataclass(value):
+        return {"__dataclass__": type(value).__qualname__, "fields": _normalize(dataclasses.asdict(value))}
+    if all(hasattr(value, attr) for attr in ("dtype", "shape", "tobytes")):
+        # numpy 数组与标量：repr 会截断大数组，按完整的字节内容哈希
+        if value.dtype.hasobject:
+            return {"__ndarray__": str(value.dtype), "shape": list(value.shape), "items": _normalize(value.tolist())}
+        return {
+            "__ndarray__": str(value.dtype),
+            "shape": list(value.shape),
+            "sha256": hashlib.sha256(value.tobytes()).hexdigest(),
+        }
+    get_state = getattr(value, "__getstate__", None)
+    state = get_state() if callable(get_state) else getattr(value, "__dict__", None)
+    if state is not None:
+        return {"__object__": f"{type(value).__module__}.{type(value).__qualname__}", "state": _normalize(state)}
+    # 没有可用状态的对象（C 扩展类型等）无法稳定表示，repr 可能截断或省略内容而导致错误命中
+    raise UnhashableValueError(f"Can not hash {type(value).__module__}.{type(value).__qualname__} stably.")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(_normalize(value), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def stable_hash(value: Any) -> str:
+    """计算对象的稳定哈希，字典与集合与元素顺序无关
+
+    Raises:
+        UnhashableValueError: 对象包含无法稳定表示的内容
+    """
+    return hashlib.sha256(_dumps(value).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(vertex_id: str, fingerprint: Any, key_inputs: Any) -> str:
+    """生成顶点结果的缓存键，无法稳定哈希时抛出 UnhashableValueError"""
+    return f"{vertex_id}:{stable_hash(fingerprint)[:16]}:{stable_hash(key_inputs)}"
+
+
+class VertexResultCache(ABC):
+    """顶点结果缓存基类"""
+
+    def __init__(self, ttl_sec: Optional[int] = None):
+        """
+        Args:
+            ttl_sec: 条目过期时间（秒），None 或小于等于 0 表示永不过期
+        """
+        self.ttl_sec = ttl_sec if ttl_sec and ttl_sec > 0 else None
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = Lock()
+
+    @abstractmethod
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        """返回 (是否命中, 输出)"""
+
+    @abstractmethod
+    def set(self, key: str, output: Any) -> bool:
+        """写入缓存，返回是否成功写入"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """读取缓存并记录命中统计，返回 (是否命中, 输出)"""
+        hit, output = self._get(key)
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit, output
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class InProcessVertexCache(VertexResultCache):
+    """进程内 LRU 缓存
+
+    输出以 pickle 字节保存，命中时返回新的副本，调用方修改输出不会影响缓存内容。
+    """
+
+    def __init__(
+        self, max_entries: Optional[int] = 1024, max_bytes: Optional[int] = None, ttl_sec: Optional[int] = None
+    ):
+        """
+        Args:
+            max_entries: 最大条目数，None 表示不限制
+            max_bytes: 全部条目序列化后的最大字节数，None 表示不限制
+            ttl_sec: 条目过期时间（秒）
+        """
+        super().__init__(ttl_sec=ttl_sec)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, data = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+        return True, pickle.loads(data)
+
+    def set(self, key: str, output: Any) -> bool:
+        try:
+            data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logging.debug(f"Vertex output of {key} is not picklable, skip caching: {e}")
+            return False
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            logging.debug(f"Vertex output of {key} exceeds cache size limit, skip caching.")
+            return False
+
+        expires_at = time.time() + self.ttl_sec if self.ttl_sec else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, data)
+            self._size += len(data)
+            self._evict()
+        return True
+
+    def _remove(self, key: str):
+        _, data = self._entries.pop(key)
+        self._size -= len(data)
+
+    def _evict(self):
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({"entries": len(self._entries), "bytes": self._size, "evictions": self.evictions})
+        return stats
+
+
+class MemoryVertexCache(VertexResultCache):
+    """基于 Memory 后端（ctx_* 接口）的缓存
+
+    TTL 由后端负责过期；max_entries 只约束当前进程写入的条目，超出时按 LRU 删除，
+    后端自身的容量策略（例如 Redis maxmemory）仍然生效。
+    """
+
+    def __init__(
+        self,
+        memory,
+        namespace: str = "vertex_cache",
+        ttl_sec: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Args:
+            memory: vertex_flow.memory.Memory 实例
+            namespace: 存储使用的 user_id 命名空间
+            ttl_sec: 条目过期时间（秒）
+            max_entries: 当前进程写入条目的最大数量，None 表示不限制
+        """
+        super().__init__(ttl_sec=ttl_sec)
+        self.memory = memory
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._keys: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = Lock()
+
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        item = self.memory.ctx_get(self.namespace, key)
+        # 以字典包装输出，区分未命中与缓存的 None 输出
+        if not isinstance(item, dict) or "output" not in item:
+            return False, None
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+        return True, item["output"]
+
+    def set(self, key: str, output: Any) -> bool:
+        try:
+            json.dumps(output, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logging.debug(f"Vertex output of {key} is not JSON serializable, skip caching: {e}")
+            return False
+
+        self.memory.ctx_set(self.namespace, key, {"output": output}, ttl_sec=self.ttl_sec)
+        evicted = []
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            while self.max_entries is not None and len(self._keys) > self.max_entries:
+                evicted.append(self._keys.popitem(last=False)[0])
+                self.evictions += 1
+        for evicted_key in evicted:
+            self.memory.ctx_del(self.namespace, evicted_key)
+        return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._keys.pop(key, None)
+        self.memory.ctx_del(self.namespace, key)
+
+    def clear(self) -> None:
+        """删除当前进程写入的全部条目"""
+        with self._lock:
+            keys, self._keys = list(self._keys), OrderedDict()
+        for key in keys:
+            self.memory.ctx_del(self.namespace, key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({"entries": len(self._keys), "evictions": self.evictions})
+        return stats
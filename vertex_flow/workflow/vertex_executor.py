@@ -0,0 +1,68 @@
+"""
+异步引擎中同步顶点的线程池
+
+execute_workflow_async / WorkflowRun.execute_async 中没有定义 async execute 的顶点（包括 LLMVertex）
+在线程中执行。asyncio.to_thread 使用事件循环的默认线程池，整个进程最多 min(32, cpu + 4) 个线程，
+服务并发执行多个工作流时超出的顶点只能排队等待，这里改用独立的常驻线程池：
+- 线程池大小可通过 configure_vertex_executor 调整，默认 DEFAULT_MAX_WORKERS，线程按需启动
+- run_sync 与 asyncio.to_thread 相同，函数运行在调用方的 contextvars 上下文中
+"""
+
+import asyncio
+import atexit
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from vertex_flow.utils.logger import LoggerUtil
+
+logging = LoggerUtil.get_logger()
+
+# 同时在线程中执行的同步顶点数上限，顶点大多在等待 LLM 等外部服务，不受 CPU 核数限制
+DEFAULT_MAX_WORKERS = 256
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+_max_workers: Optional[int] = None
+
+
+def configure_vertex_executor(max_workers: Optional[int] = None):
+    """设置线程池大小，已创建的线程池不再接收新顶点（正在执行的顶点照常完成），下次使用时按新配置重建"""
+    global _max_workers
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be positive, got {max_workers}.")
+    _max_workers = max_workers
+    shutdown_vertex_executor(wait=False)
+
+
+def get_vertex_executor() -> ThreadPoolExecutor:
+    """获取常驻线程池，首次使用时创建"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_max_workers or DEFAULT_MAX_WORKERS, thread_name_prefix="workflow-vertex"
+                )
+                logging.info(f"Vertex executor created, max workers : {_executor._max_workers}.")
+    return _executor
+
+
+@atexit.register
+def shutdown_vertex_executor(wait: bool = True):
+    """关闭线程池"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_sync(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """在常驻线程池中执行同步函数并等待结果"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_vertex_executor(), call)
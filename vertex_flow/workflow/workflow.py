@@ -1,22 +1,55 @@
+import asyncio
+import inspect
 import json
+import uuid
 from collections import deque
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import wait as wait_futures
+from contextlib import contextmanager, nullcontext
 from threading import Event, Lock
-from typing import Any, Dict, Generic, List, Optional, Set, TypeVar, cast
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Set, TypeVar, cast
 
 from vertex_flow.utils.logger import LoggerUtil
-from vertex_flow.workflow.constants import MESSAGE_KEY, WORKFLOW_COMPLETE, WORKFLOW_ERROR, WORKFLOW_FAILED
+from vertex_flow.workflow.cancellation import CancellationToken
+from vertex_flow.workflow.checkpoint import CheckpointStore, RunCheckpoint
+from vertex_flow.workflow.constants import (
+    MESSAGE_KEY,
+    SCHEDULER_MODES,
+    SCHEDULER_READY_QUEUE,
+    SCHEDULER_TOPOLOGICAL,
+    SOURCE_VAR,
+    WORKFLOW_COMPLETE,
+    WORKFLOW_ERROR,
+    WORKFLOW_FAILED,
+)
 from vertex_flow.workflow.context import WorkflowContext
 from vertex_flow.workflow.edge import Edge
 from vertex_flow.workflow.event_channel import EventChannel, EventType
+from vertex_flow.workflow.run_state import RunState, current_run_state
+from vertex_flow.workflow.scheduler import AsyncReadyQueueScheduler, ReadyQueueScheduler
+from vertex_flow.workflow.tracing import Tracer, bind_trace, trace_span
 from vertex_flow.workflow.utils import timer_decorator
 from vertex_flow.workflow.vertex import FunctionVertex, IfElseVertex, LLMVertex, SinkVertex, SourceVertex, Vertex
+from vertex_flow.workflow.vertex_cache import VertexResultCache
+from vertex_flow.workflow.vertex_executor import run_sync
 
 logger = LoggerUtil.get_logger()
 
 T = TypeVar("T")  # 泛型类型变量
 
 
+@contextmanager
+def trace_workflow(owner, name: str):
+    """开启追踪时激活工作流（或 WorkflowRun）的追踪器，并记录整个执行的 span"""
+    tracer: Optional[Tracer] = getattr(owner, "tracer", None)
+    if tracer is None:
+        yield
+        return
+    with tracer.activate(), tracer.span(name, "workflow", run_id=getattr(owner, "run_id", None)):
+        yield
+
+
 def around_workflow(func):
     def on_workflow_finished(self):
         logger.info("on workflow finished.")
@@ -50,9 +83,24 @@ def around_workflow(func):
                 except BaseException as e:
                     logger.error(f"Failed to execute vertex {vertex.id} workflow failed callback.")
 
+    if inspect.iscoroutinefunction(func):
+
+        async def async_wrapper(self, *args, **kwargs):
+            try:
+                with trace_workflow(self, func.__name__):
+                    result = await func(self, *args, **kwargs)
+                on_workflow_finished(self)
+            except BaseException as e:
+                on_workflow_failed(self)
+                raise e
+            return result
+
+        return async_wrapper
+
     def wrapper(self, *args, **kwargs):
         try:
-            result = func(self, *args, **kwargs)
+            with trace_workflow(self, func.__name__):
+                result = func(self, *args, **kwargs)
             on_workflow_finished(self)
         except BaseException as e:
             on_workflow_failed(self)
@@ -62,12 +110,31 @@ def around_workflow(func):
     return wrapper
 
 
+def call_vertex_execute(vertex: Vertex, inputs: Dict[str, Any], context: WorkflowContext):
+    """在线程中同步执行顶点，async execute 在当前线程新建事件循环运行"""
+    if inspect.iscoroutinefunction(vertex.execute):
+        return asyncio.run(vertex.execute(inputs, context))
+    return vertex.execute(inputs, context)
+
+
+async def acall_vertex_execute(vertex: Vertex, inputs: Dict[str, Any], context: WorkflowContext):
+    """在事件循环中执行顶点：async execute 与支持 aexecute 的顶点直接 await，其余同步顶点在顶点线程池中执行"""
+    if inspect.iscoroutinefunction(vertex.execute):
+        return await vertex.execute(inputs, context)
+    if vertex.supports_aexecute():
+        return await vertex.aexecute(inputs, context)
+    return await run_sync(vertex.execute, inputs, context)
+
+
 class Workflow(Generic[T]):
     """工作流类，管理顶点和边，并提供执行工作流的方法"""
 
     def __init__(self, context: Optional[WorkflowContext[T]] = None):
         self.vertices = {}
         self.edges = set()
+        # 邻接索引：顶点 id -> 入边/出边列表，由 add_edge 增量维护
+        self._in_edges: Dict[str, List[Edge[T]]] = {}
+        self._out_edges: Dict[str, List[Edge[T]]] = {}
         self.context = context or WorkflowContext[T]()
         self.topological_order: List[str] = []
         self.lock = Lock()
@@ -77,6 +144,30 @@ class Workflow(Generic[T]):
         # 新增智能等待时间配置
         self.smart_wait_time_enabled = False
         self.wait_time = 30  # 默认等待时间（秒）
+        # 调度模式，默认按拓扑序执行
+        self.scheduler_mode = SCHEDULER_TOPOLOGICAL
+        # 编译后的执行计划缓存，图结构变化时失效
+        self._plan = None
+        # 检查点存储，开启后每个顶点完成时保存输出，可通过 resume_from 恢复失败的运行
+        self.checkpoint_store: Optional[CheckpointStore] = None
+        self.run_id: Optional[str] = None
+        # 最近一次执行的源输入，供 rerun 增量重新执行
+        self._source_inputs: Dict[str, Any] = {}
+        # 当前执行的取消令牌，携带运行截止时间
+        self.cancellation: Optional[CancellationToken] = None
+        # 执行追踪器，开启后记录调度、顶点执行、模型请求与工具调用的 span
+        self.tracer: Optional[Tracer] = None
+
+    def set_scheduler_mode(self, scheduler_mode: str):
+        """设置调度模式
+
+        Args:
+            scheduler_mode: SCHEDULER_TOPOLOGICAL 按拓扑序执行；
+                SCHEDULER_READY_QUEUE 在顶点最后一个依赖完成时立即派发
+        """
+        if scheduler_mode not in SCHEDULER_MODES:
+            raise ValueError(f"Unsupported scheduler mode: {scheduler_mode}, available: {SCHEDULER_MODES}")
+        self.scheduler_mode = scheduler_mode
 
     def enable_smart_wait_time(self):
         """启用智能等待时间功能"""
@@ -90,29 +181,35 @@ class Workflow(Generic[T]):
             int: DAG 的长度
         """
 
-        def dfs(vertex_id: str, visited: set, path_length: int) -> int:
-            if vertex_id in visited:
-                return path_length
-            visited.add(vertex_id)
-            max_length = path_length
+        # 每个顶点权重为 1 时，最长路径经过的顶点数减一即为边数
+        remaining = self._remaining_path_lengths(lambda vertex_id: 1)
+        return int(max(remaining.values(), default=1)) - 1
 
-            # 获取当前顶点的所有出边
-            out_edges = [edge for edge in self.edges if edge.source_vertex.id == vertex_id]
-            for edge in out_edges:
-                target_id = edge.target_vertex.id
-                length = dfs(target_id, visited.copy(), path_length + 1)
-                max_length = max(max_length, length)
+    def _remaining_path_lengths(self, weight: Callable[[str], float]) -> Dict[str, float]:
+        """计算每个顶点到汇顶点的最长剩余路径长度（包含顶点自身的权重）
 
-            return max_length
+        按逆拓扑序做动态规划：remaining[v] = weight(v) + max(remaining[w])，w 为 v 的后继。
+        """
+        remaining: Dict[str, float] = {}
+        for vertex_id in reversed(self._topological_ids()):
+            remaining[vertex_id] = weight(vertex_id) + max(
+                (remaining.get(edge.target_vertex.id, 0) for edge in self.get_out_edges(vertex_id)),
+                default=0,
+            )
+        return remaining
 
-        # 从所有源顶点开始计算
-        source_vertices = self.get_sources()
-        max_dag_length = 0
-        for source in source_vertices:
-            length = dfs(source.id, set(), 0)
-            max_dag_length = max(max_dag_length, length)
+    def _vertex_priorities(self) -> Dict[str, float]:
+        """关键路径优先级：顶点到汇顶点的最长剩余路径，按各顶点的历史平均耗时加权
 
-        return max_dag_length
+        没有历史耗时的顶点取已有估计的平均值，全部没有时退化为按顶点数计算的路径长度。
+        """
+        estimates = {
+            vertex_id: vertex.cost_estimate
+            for vertex_id, vertex in self.vertices.items()
+            if vertex.cost_estimate is not None
+        }
+        default = sum(estimates.values()) / len(estimates) if estimates else 1.0
+        return self._remaining_path_lengths(lambda vertex_id: estimates.get(vertex_id, default))
 
     def _calculate_wait_time(self):
         """根据 DAG 长度计算合适的等待时间"""
@@ -126,6 +223,12 @@ class Workflow(Generic[T]):
 
     def emit_event(self, event_type: str, event_data: dict):
         logger.debug(f"emit event {event_type} {event_data}")
+        # 在 WorkflowRun 中执行时，事件发送到该运行自己的事件通道
+        state = current_run_state()
+        run = state.owner if state else None
+        if run is not None and getattr(run, "workflow", None) is self:
+            run.event_channel.emit_event(event_type, event_data)
+            return
         self.event_channel.emit_event(event_type, event_data)
 
     def subscribe(self, event_type: str, callback):
@@ -158,8 +261,23 @@ class Workflow(Generic[T]):
             logger.error(f"Error in astream: {e}")
             raise
 
+    async def astream_batches(self, event_types):
+        """与 astream 相同，但按批获取事件（见 EventChannel.astream_batches），收到工作流结束事件后退出"""
+        if self.smart_wait_time_enabled:
+            self.event_channel.set_wait_time(self.wait_time)
+        async for batch in self.event_channel.astream_batches(event_types):
+            yield batch
+
+    async def areplay(self, event_types, last_event_id: Optional[int] = None):
+        """从事件日志中读取 (事件 ID, 事件数据)，不影响 astream 与其它订阅者，见 EventChannel.areplay"""
+        if self.smart_wait_time_enabled:
+            self.event_channel.set_wait_time(self.wait_time)
+        async for event in self.event_channel.areplay(event_types, last_event_id):
+            yield event
+
     def add_vertex(self, vertex: Vertex[T]) -> Vertex[T]:
         self.vertices[vertex.id] = vertex
+        self._plan = None
         vertex.workflow = self
         return vertex
 
@@ -168,10 +286,70 @@ class Workflow(Generic[T]):
             self.add_vertex(vertex)
         return vertex
 
+    def set_checkpoint_store(self, checkpoint_store: Optional[CheckpointStore]):
+        """设置检查点存储，None 表示关闭检查点"""
+        self.checkpoint_store = checkpoint_store
+
+    def set_tracer(self, tracer: Optional[Tracer] = None) -> Optional[Tracer]:
+        """设置执行追踪器，None 表示关闭追踪，可通过 tracer.export_chrome_trace 导出"""
+        self.tracer = tracer
+        return tracer
+
+    def _open_checkpoint(self, run_id: str, context: WorkflowContext[T]) -> Optional[RunCheckpoint]:
+        """打开运行检查点，并把已完成顶点的输出恢复到顶点与上下文中"""
+        if self.checkpoint_store is None:
+            return None
+        checkpoint = self.checkpoint_store.open(run_id)
+        for vertex_id, output in checkpoint.completed.items():
+            vertex = self.vertices.get(vertex_id)
+            if vertex is None:
+                continue
+            vertex.output = output
+            vertex.is_executed = True
+            vertex.success = True
+            context.store_output(vertex_id, output)
+        return checkpoint
+
+    def _begin_run(self, resume_from: Optional[str], timeout: Optional[float] = None) -> Optional[RunCheckpoint]:
+        if resume_from is not None and self.checkpoint_store is None:
+            raise ValueError(f"Can not resume from run {resume_from}, checkpoint store is not configured.")
+        self.run_id = resume_from or uuid.uuid4().hex
+        self.cancellation = CancellationToken(timeout, name=f"workflow run {self.run_id}")
+        return self._open_checkpoint(self.run_id, self.context)
+
+    def cancel(self, reason: Optional[BaseException] = None):
+        """取消正在执行的工作流，未开始的顶点不再执行，正在执行的顶点在下一个取消检查点退出"""
+        if self.cancellation is not None:
+            self.cancellation.cancel(reason)
+
+    @staticmethod
+    def _shutdown_executor(executor: ThreadPoolExecutor, failed: bool):
+        """失败时快速返回：撤销未开始的任务，不等待仍在执行的线程，它们在下一个取消检查点退出"""
+        if failed:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            executor.shutdown()
+
+    def set_result_cache(self, cache: Optional[VertexResultCache], vertex_ids: Optional[Iterable[str]] = None):
+        """为顶点开启结果缓存，cache 为 None 时关闭
+
+        Args:
+            cache: 结果缓存，多个顶点可以共享同一个缓存
+            vertex_ids: 开启缓存的顶点，默认只包含 cacheable 为 True 的顶点；
+                函数、工具、记忆与向量存储等可能有副作用的顶点需要显式指定
+        """
+        if vertex_ids is None:
+            vertex_ids = [vertex_id for vertex_id, vertex in self.vertices.items() if vertex.cacheable]
+        for vertex_id in vertex_ids:
+            self.get_vertice_by_id(vertex_id).result_cache = cache
+
     def __getstate__(self):
         # 返回一个字典，包含可以被序列化的状态
         state = self.__dict__.copy()
         del state["lock"]  # 排除不能被序列化的属性
+        state["_plan"] = None  # 执行计划在反序列化后重新编译
+        state["cancellation"] = None
+        state["tracer"] = None
         return state
 
     def __setstate__(self, state):
@@ -195,27 +373,46 @@ class Workflow(Generic[T]):
         #   edge.source_vertex.output_type is not None and \
         #   edge.source_vertex.output_type != edge.target_vertex.input_type:
         #    raise TypeError(f"Incompatible types between vertex {edge.source_vertex.id} and {edge.target_vertex.id}")
-        logger.info(f"Edge add {edge}.")
+        logger.debug(f"Edge add {edge}.")
         self.edges.add(edge)
+        self._plan = None
+        self._out_edges.setdefault(edge.source_vertex.id, []).append(edge)
+        self._in_edges.setdefault(edge.target_vertex.id, []).append(edge)
         self.vertices[edge.target_vertex.id].in_degree += 1  # 更新入度
         self.vertices[edge.target_vertex.id].dependencies.add(edge.source_vertex.id)
         # 更新出度
         self.vertices[edge.source_vertex.id].out_degree += 1
 
-    def topological_sort(self):
-        queue = deque(self.get_sources())
-        self.topological_order = []
-        logger.info(f"Source vertex length : {len(queue)}")
+    def get_in_edges(self, vertex_id: str) -> List[Edge[T]]:
+        """获取以该顶点为终点的所有边"""
+        return self._in_edges.get(vertex_id, [])
+
+    def get_out_edges(self, vertex_id: str) -> List[Edge[T]]:
+        """获取以该顶点为起点的所有边"""
+        return self._out_edges.get(vertex_id, [])
+
+    def _topological_ids(self) -> List[str]:
+        """基于邻接索引的 Kahn 算法，返回从源顶点可达且不在环上的顶点 id（拓扑序）
+
+        使用局部入度计数，不修改顶点上的 in_degree。
+        """
+        in_degree = {vertex_id: len(self.get_in_edges(vertex_id)) for vertex_id in self.vertices}
+        queue = deque(vertex.id for vertex in self.get_sources())
+        order = []
         while queue:
-            vertex = queue.popleft()
-            self.topological_order.append(vertex)
-            logger.debug(f"Topological in {vertex}")
-            for edge in self.edges:
-                if edge.get_source_vertex().id == vertex.id:
-                    target_vertex = edge.get_target_vertex()
-                    target_vertex.in_degree -= 1
-                    if target_vertex.in_degree == 0:
-                        queue.append(target_vertex)
+            vertex_id = queue.popleft()
+            order.append(vertex_id)
+            for edge in self.get_out_edges(vertex_id):
+                target_id = edge.target_vertex.id
+                in_degree[target_id] -= 1
+                if in_degree[target_id] == 0:
+                    queue.append(target_id)
+        return order
+
+    def topological_sort(self):
+        order = self._topological_ids()
+        logger.info(f"Topological order length : {len(order)}")
+        self.topological_order = [self.vertices[vertex_id] for vertex_id in order]
 
         if len(self.topological_order) != len(self.vertices):
             raise ValueError(
@@ -228,6 +425,10 @@ class Workflow(Generic[T]):
         """
         if self.executed:
             raise RuntimeError(f"Workflow running duplicated.")
+        self._validate_graph()
+
+    def _validate_graph(self):
+        """验证图结构，不检查是否已执行，供编译执行计划复用"""
         # 1. 检查顶点上下游的输入输出类型是否匹配
         for edge in self.edges:
             source_vertex = edge.get_source_vertex()
@@ -291,8 +492,7 @@ class Workflow(Generic[T]):
             subgraph.add(current_vertex)
 
             # 获取当前顶点的所有邻居（依赖于当前顶点的顶点）
-            neighbors = [edge.target_vertex for edge in self.edges if edge.source_vertex == current_vertex]
-            queue.extend(neighbors)
+            queue.extend(edge.target_vertex for edge in self.get_out_edges(current_vertex.id))
 
         return subgraph
 
@@ -307,12 +507,7 @@ class Workflow(Generic[T]):
         # 目前只有一个ifelse
         assert len(ifelse_deps) == 1
         ifelse_dep: IfElseVertex = ifelse_deps[0]
-        ifedeg: Edge = list(
-            filter(
-                lambda x: x.source_vertex == ifelse_dep and x.target_vertex == vertex,
-                self.edges,
-            )
-        )
+        ifedeg: List[Edge] = [edge for edge in self.get_in_edges(vertex.id) if edge.source_vertex == ifelse_dep]
         if ifedeg and not ifelse_dep.iftrue(ifedeg[0].edge_type.id):
             return (
                 True,
@@ -322,16 +517,39 @@ class Workflow(Generic[T]):
 
     @around_workflow
     @timer_decorator
-    def execute_workflow(self, source_inputs: Dict[str, Any] = {}, stream: bool = False):
+    def execute_workflow(
+        self,
+        source_inputs: Dict[str, Any] = {},
+        stream: bool = False,
+        resume_from: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        """执行工作流
+
+        Args:
+            source_inputs: 源顶点输入
+            stream: 是否逐个等待顶点完成（流式输出）
+            resume_from: 从该运行 ID 的检查点恢复，已完成的顶点不再执行，需要先调用 set_checkpoint_store
+            timeout: 运行截止时间（秒），超过后抛出 DeadlineExceededError；顶点超时通过 params["timeout"] 配置
+        """
         self.validate_workflow()  # 在执行之前先验证图的正确性
         self.topological_sort()
         self.executed = True
         filtered_vertices: Set[str] = set()
+        checkpoint = self._begin_run(resume_from, timeout)
+        self._source_inputs = dict(source_inputs)
 
-        with ThreadPoolExecutor() as executor:
-            futures = {}
-            checked_futures = set()
+        if self.scheduler_mode == SCHEDULER_READY_QUEUE:
+            self._execute_with_ready_queue(
+                source_inputs, filtered_vertices, checkpoint=checkpoint, cancellation=self.cancellation, stream=stream
+            )
+            logger.info("workflow finished.")
+            return True
 
+        executor = ThreadPoolExecutor()
+        futures = {}
+        checked_futures = set()
+        try:
             for vertex in self.topological_order:
                 self.execute_vertex(
                     vertex,
@@ -341,14 +559,315 @@ class Workflow(Generic[T]):
                     filtered_vertices,
                     executor,
                     stream,
+                    checkpoint,
+                    self.cancellation,
                 )
 
             if not stream:
                 self.process_results(futures, checked_futures)
+        except BaseException as e:
+            self.cancellation.cancel(e)
+            self._shutdown_executor(executor, failed=True)
+            raise
+        self._shutdown_executor(executor, failed=False)
+
+        logger.info("workflow finished.")
+        return True
+
+    @around_workflow
+    async def execute_workflow_async(
+        self, source_inputs: Dict[str, Any] = {}, resume_from: Optional[str] = None, timeout: Optional[float] = None
+    ):
+        """在当前事件循环中执行工作流
 
+        顶点在其最后一个依赖完成时以 asyncio.Task 派发：定义了 async execute 或支持 aexecute 的顶点
+        （如 LLMVertex）直接 await，LLM 请求不占用线程；其余同步顶点在进程内共享的顶点线程池
+        （vertex_executor，大小可通过 configure_vertex_executor 调整）中执行，
+        不再为每个工作流创建独立的线程池，也不占用事件循环默认的线程池。
+        """
+        self.validate_workflow()
+        self.topological_sort()
+        self.executed = True
+        checkpoint = self._begin_run(resume_from, timeout)
+        self._source_inputs = dict(source_inputs)
+        await self._execute_async(source_inputs, set(), checkpoint=checkpoint, cancellation=self.cancellation)
         logger.info("workflow finished.")
         return True
 
+    @around_workflow
+    def rerun(self, changed_inputs: Optional[Dict[str, Any]] = None, dirty_vertices: Iterable[str] = ()) -> List[str]:
+        """在已完成的执行上增量重新执行
+
+        只重新执行受影响的顶点：输入发生变化的源顶点、显式指定的顶点、上次执行失败的顶点，
+        以及它们通过 find_subgraph 找到的全部下游，其余顶点直接复用上次的输出。
+
+        Args:
+            changed_inputs: 变化的源输入，与上次执行的源输入合并，值未变化的键不会触发重新执行
+            dirty_vertices: 需要强制重新执行的顶点（例如在编辑器中修改了配置的顶点）
+
+        Returns:
+            重新执行的顶点 ID 列表（拓扑序）
+        """
+        if not self.executed:
+            raise RuntimeError("Workflow has not been executed, call execute_workflow before rerun.")
+        self.cancellation = CancellationToken(name=f"workflow rerun {self.run_id}")
+        self._source_inputs, rerun_ids = self._rerun(
+            self._source_inputs, changed_inputs, dirty_vertices, self.context, cancellation=self.cancellation
+        )
+        return rerun_ids
+
+    def _dirty_vertices(self, changed_keys: Set[str], dirty_vertices: Iterable[str]) -> Set[str]:
+        """计算需要重新执行的顶点集合"""
+        roots = set(dirty_vertices)
+        if changed_keys:
+            for vertex in self.get_sources():
+                # 通过变量选择输入的源顶点只受所选键影响，否则源顶点接收全部输入
+                selected = {var_def[SOURCE_VAR] for var_def in vertex.variables}
+                if not selected or selected & changed_keys:
+                    roots.add(vertex.id)
+        roots.update(vertex_id for vertex_id, vertex in self.vertices.items() if vertex.success is False)
+
+        dirty: Set[str] = set()
+        while roots:
+            for root in roots:
+                if root not in dirty:
+                    dirty.update(vertex.id for vertex in self.find_subgraph(root))
+            # 通过变量或占位符读取脏顶点输出、但不在其下游的顶点同样需要重新执行
+            roots = {
+                vertex_id
+                for vertex_id, vertex in self.vertices.items()
+                if vertex_id not in dirty and vertex.cache_scopes() & dirty
+            }
+        return dirty
+
+    def _rerun(
+        self,
+        previous_inputs: Dict[str, Any],
+        changed_inputs: Optional[Dict[str, Any]],
+        dirty_vertices: Iterable[str],
+        context: WorkflowContext[T],
+        run_state: Optional[RunState] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ):
+        """增量重新执行，返回 (合并后的源输入, 重新执行的顶点 ID 列表)"""
+        changed_inputs = changed_inputs or {}
+        changed_keys = {
+            key for key, value in changed_inputs.items() if key not in previous_inputs or previous_inputs[key] != value
+        }
+        source_inputs = {**previous_inputs, **changed_inputs}
+        dirty = self._dirty_vertices(changed_keys, dirty_vertices)
+        rerun_ids = [vertex_id for vertex_id in self._topological_ids() if vertex_id in dirty]
+        logger.info(f"Rerun {len(rerun_ids)} of {len(self.vertices)} vertices : {rerun_ids}.")
+
+        for vertex_id in rerun_ids:
+            vertex = self.vertices[vertex_id]
+            vertex.output = None
+            vertex.is_executed = False
+            vertex.success = None
+            context.outputs.pop(vertex_id, None)
+
+        if rerun_ids:
+            # 只调度脏顶点，干净的依赖已经完成，输出保留在顶点与上下文中
+            self._execute_with_ready_queue(
+                source_inputs,
+                set(),
+                vertex_ids=rerun_ids,
+                dependencies={vertex_id: self.vertices[vertex_id].dependencies & dirty for vertex_id in rerun_ids},
+                context=context,
+                run_state=run_state,
+                cancellation=cancellation,
+            )
+        return source_inputs, rerun_ids
+
+    def compile(self):
+        """将工作流编译为不可变的执行计划（WorkflowPlan）
+
+        计划只在图结构变化后重新编译，可以在其上并发启动任意多个 WorkflowRun，
+        每个运行拥有独立的输出、消息、状态和事件通道。
+        """
+        from vertex_flow.workflow.workflow_run import WorkflowPlan
+
+        with self.lock:
+            if self._plan is None:
+                self._plan = WorkflowPlan(self)
+            return self._plan
+
+    def execute_batch(
+        self,
+        records: Iterable[Dict[str, Any]],
+        concurrency: int = 4,
+        ordered: bool = True,
+        timeout: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """在编译后的执行计划上对多条记录批量执行，参数与返回值同 WorkflowPlan.execute_batch"""
+        return self.compile().execute_batch(
+            records, concurrency=concurrency, ordered=ordered, timeout=timeout, max_workers=max_workers
+        )
+
+    def _execute_with_ready_queue(
+        self,
+        source_inputs: Dict[str, Any],
+        filtered_vertices: Set[str],
+        vertex_ids: Optional[List[str]] = None,
+        dependencies: Optional[Dict[str, Set[str]]] = None,
+        context: Optional[WorkflowContext[T]] = None,
+        run_state: Optional[RunState] = None,
+        checkpoint: Optional[RunCheckpoint] = None,
+        cancellation: Optional[CancellationToken] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        stream: bool = False,
+    ):
+        """使用就绪队列调度器执行工作流，顶点在其最后一个依赖完成时立即派发
+
+        Args:
+            vertex_ids: 参与调度的顶点（拓扑序），默认取 topological_order
+            dependencies: 顶点依赖关系，默认取各顶点的 dependencies
+            context: 存储输出的上下文，默认取工作流自身的上下文
+            run_state: 运行状态，指定时所有回调都在该运行状态下执行
+            checkpoint: 运行检查点，已完成的顶点不再执行，新完成的顶点保存输出
+            cancellation: 运行取消令牌，携带运行截止时间，顶点超时取各顶点的 timeout
+            executor: 执行顶点的线程池（例如批量执行时多个运行共享），由调用方负责关闭；默认每次新建
+            stream: 同拓扑序模式的 stream，顶点逐个执行，上一个顶点完成并写入上下文后才派发下一个
+        """
+        context = context or self.context
+        if vertex_ids is None:
+            vertex_ids = [vertex.id for vertex in self.topological_order]
+        if dependencies is None:
+            dependencies = {vertex_id: vertex.dependencies for vertex_id, vertex in self.vertices.items()}
+        source_ids = {vertex.id for vertex in self.get_sources()}
+
+        def should_skip(vertex_id: str) -> bool:
+            return self._should_skip_vertex(vertex_id, filtered_vertices)
+
+        def run_vertex(vertex_id: str):
+            if checkpoint is not None and checkpoint.is_completed(vertex_id):
+                return
+            vertex = self.vertices[vertex_id]
+            inputs = self._prepare_vertex_inputs(vertex, source_ids, source_inputs)
+            self._call_vertex(vertex, inputs, context, checkpoint)
+
+        def on_vertex_done(vertex_id: str):
+            vertex = self.vertices[vertex_id]
+            logger.debug(f"vertex finished, detail {vertex}")
+            context.store_output(vertex_id, vertex.output)
+
+        if run_state is not None:
+            # 回调可能在任意工作线程中执行，显式绑定运行状态
+            should_skip = run_state.wrap(should_skip)
+            run_vertex = run_state.wrap(run_vertex)
+            on_vertex_done = run_state.wrap(on_vertex_done)
+        # 顶点在线程池中执行，span 挂在当前运行的 span 下
+        run_vertex = bind_trace(run_vertex)
+
+        owns_executor = executor is None
+        if owns_executor:
+            executor = ThreadPoolExecutor()
+        scheduler = ReadyQueueScheduler(
+            vertex_ids=vertex_ids,
+            dependencies=dependencies,
+            run_vertex=run_vertex,
+            executor=executor,
+            should_skip=should_skip,
+            on_vertex_done=on_vertex_done,
+            vertex_timeout=lambda vertex_id: self.vertices[vertex_id].timeout,
+            cancellation=cancellation,
+            priorities=self._vertex_priorities(),
+            max_workers=1 if stream else None,
+        )
+        try:
+            scheduler.run()
+        except BaseException:
+            if owns_executor:
+                self._shutdown_executor(executor, failed=True)
+            raise
+        if owns_executor:
+            self._shutdown_executor(executor, failed=False)
+
+    async def _execute_async(
+        self,
+        source_inputs: Dict[str, Any],
+        filtered_vertices: Set[str],
+        vertex_ids: Optional[List[str]] = None,
+        dependencies: Optional[Dict[str, Set[str]]] = None,
+        context: Optional[WorkflowContext[T]] = None,
+        checkpoint: Optional[RunCheckpoint] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ):
+        """异步就绪队列执行，参数同 _execute_with_ready_queue
+
+        顶点通过 acall_vertex_execute 执行，同步顶点在常驻的顶点线程池中执行，
+        运行状态通过 contextvars 随 Task 与 run_sync 自动传递，不需要显式绑定。
+        """
+        context = context or self.context
+        if vertex_ids is None:
+            vertex_ids = [vertex.id for vertex in self.topological_order]
+        if dependencies is None:
+            dependencies = {vertex_id: vertex.dependencies for vertex_id, vertex in self.vertices.items()}
+        source_ids = {vertex.id for vertex in self.get_sources()}
+
+        async def run_vertex(vertex_id: str):
+            if checkpoint is not None and checkpoint.is_completed(vertex_id):
+                return
+            vertex = self.vertices[vertex_id]
+            inputs = self._prepare_vertex_inputs(vertex, source_ids, source_inputs)
+            with checkpoint.activate() if checkpoint is not None else nullcontext():
+                await acall_vertex_execute(vertex, inputs, context)
+            if checkpoint is not None:
+                await run_sync(checkpoint.save_vertex, vertex_id, vertex.output)
+
+        def on_vertex_done(vertex_id: str):
+            vertex = self.vertices[vertex_id]
+            logger.debug(f"vertex finished, detail {vertex}")
+            context.store_output(vertex_id, vertex.output)
+
+        scheduler = AsyncReadyQueueScheduler(
+            vertex_ids=vertex_ids,
+            dependencies=dependencies,
+            run_vertex=run_vertex,
+            should_skip=lambda vertex_id: self._should_skip_vertex(vertex_id, filtered_vertices),
+            on_vertex_done=on_vertex_done,
+            vertex_timeout=lambda vertex_id: self.vertices[vertex_id].timeout,
+            cancellation=cancellation,
+            priorities=self._vertex_priorities(),
+        )
+        await scheduler.run()
+
+    def _should_skip_vertex(self, vertex_id: str, filtered_vertices: Set[str]) -> bool:
+        """就绪队列派发前判断顶点是否被过滤（if-else 未命中的分支及其子图）"""
+        if vertex_id in filtered_vertices:
+            return True
+        vertex = self.vertices[vertex_id]
+        filter_result = self.mayebe_filter_subgraph(vertex=vertex)
+        if filter_result[0]:
+            logger.info(f"vertex : {vertex} has been filterd, its subgraph might be skipped {filter_result[1]}")
+            filtered_vertices.update(filter_result[1])
+            return True
+        return False
+
+    def _prepare_vertex_inputs(self, vertex: Vertex[T], source_ids: Set[str], source_inputs: Dict[str, Any]):
+        """源顶点使用工作流输入，其它顶点使用依赖顶点的输出，并标记为已执行"""
+        logger.info(f"Executing {vertex.id}, task_type : {vertex.task_type} deps : {vertex._dependencies}.")
+        vertex.is_executed = True
+        if vertex.id in source_ids:
+            return source_inputs
+        return {dep_id: self.vertices[dep_id].output for dep_id in vertex._dependencies}
+
+    def _call_vertex(
+        self,
+        vertex: Vertex[T],
+        inputs: Dict[str, Any],
+        context: WorkflowContext[T],
+        checkpoint: Optional[RunCheckpoint] = None,
+    ):
+        """在线程中执行顶点，开启检查点时在检查点下执行并在成功后保存输出"""
+        if checkpoint is None:
+            return call_vertex_execute(vertex, inputs, context)
+        with checkpoint.activate():
+            result = call_vertex_execute(vertex, inputs, context)
+        checkpoint.save_vertex(vertex.id, vertex.output)
+        return result
+
     def execute_vertex(
         self,
         vertex,
@@ -358,6 +877,8 @@ class Workflow(Generic[T]):
         filtered_vertices,
         executor,
         stream,
+        checkpoint: Optional[RunCheckpoint] = None,
+        cancellation: Optional[CancellationToken] = None,
     ):
         logger.info(f"Executing {vertex.id}, task_type : {vertex.task_type} deps : {vertex._dependencies}.")
 
@@ -365,9 +886,17 @@ class Workflow(Generic[T]):
             logger.info(f"skip {vertex.id}.")
             return
 
+        if checkpoint is not None and checkpoint.is_completed(vertex.id):
+            logger.info(f"{vertex.id} restored from checkpoint of run {checkpoint.run_id}.")
+            return
+
         self.wait_for_dependencies(vertex, futures, checked_futures)
+        if cancellation is not None:
+            cancellation.check()
 
-        dependency_outputs = {dep._id: dep.output for dep in self.vertices.values() if dep._id in vertex._dependencies}
+        dependency_outputs = {
+            dep_id: self.vertices[dep_id].output for dep_id in vertex._dependencies if dep_id in self.vertices
+        }
 
         filter_result = self.mayebe_filter_subgraph(vertex=vertex)
         if filter_result[0]:
@@ -375,11 +904,16 @@ class Workflow(Generic[T]):
             filtered_vertices.update(filter_result[1])
             return
 
+        # 拓扑序模式下顶点超时从提交时开始计时
+        token = (cancellation or CancellationToken()).child(vertex.timeout, name=f"vertex {vertex.id}")
         future = executor.submit(
-            vertex.execute,
-            (dependency_outputs if vertex not in self.get_sources() else source_inputs),
+            bind_trace(token.wrap(self._call_vertex)),
+            vertex,
+            (source_inputs if vertex.task_type == "SOURCE" else dependency_outputs),
             self.context,
+            checkpoint,
         )
+        future.cancellation = token
 
         futures[future] = vertex
         vertex.is_executed = True
@@ -391,22 +925,49 @@ class Workflow(Generic[T]):
         dependencies_finished = all(future.done() for future in futures.keys() if future)
 
         if not dependencies_finished:
-            for dep_id in vertex._dependencies:
-                dep_future = [item for item in futures.items() if item[1]._id == dep_id]
-                for item in dep_future:
-                    f, v = item[0], item[1]
-                    try:
-                        logger.info(f"waiting for {v.id}.")
-                        f.result()
-                        checked_futures.add(f)
-                        self.context.store_output(v._id, v.output)
-                        logger.info(f"deps finished, info {v.id}")
-                    except Exception as e:
-                        raise e
+            dep_futures = [f for f, v in futures.items() if v._id in vertex._dependencies]
+            logger.info(f"waiting for {[futures[f].id for f in dep_futures]}.")
+            with trace_span("wait_dependencies", "schedule", vertex_id=vertex.id):
+                # 同时等待全部依赖，任一依赖失败或超时立即返回，不会被排在前面的慢依赖拖住
+                for f in self._as_completed(dep_futures):
+                    v = futures[f]
+                    f.result()
+                    checked_futures.add(f)
+                    self.context.store_output(v._id, v.output)
+                    logger.info(f"deps finished, info {v.id}")
+
+    @staticmethod
+    def _as_completed(futures):
+        """按完成顺序产出 future，超过任一顶点或运行截止时间时抛出 DeadlineExceededError"""
+        pending = set(futures)
+        while pending:
+            tokens = [getattr(future, "cancellation", None) for future in pending]
+            deadlines = [token.remaining() for token in tokens if token is not None and token.deadline is not None]
+            done, pending = wait_futures(
+                pending, timeout=min(deadlines) if deadlines else None, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                # 没有顶点完成说明最近的截止时间已到
+                for token in tokens:
+                    if token is not None:
+                        token.check()
+            yield from done
+
+    @staticmethod
+    def _future_result(future):
+        """等待顶点完成，超过顶点或运行截止时间时抛出 DeadlineExceededError"""
+        token: Optional[CancellationToken] = getattr(future, "cancellation", None)
+        if token is None:
+            return future.result()
+        try:
+            return future.result(timeout=token.remaining())
+        except FuturesTimeoutError:
+            token.check()
+            raise
 
     def process_stream_result(self, future, vertex):
         try:
-            future.result()
+            self._future_result(future)
             logger.debug(f"vertex finished, detail {vertex}")
             self.context.store_output(vertex._id, vertex.output)
         except Exception as e:
@@ -414,10 +975,7 @@ class Workflow(Generic[T]):
             raise e
 
     def process_results(self, futures, checked_futures):
-        for future in as_completed(futures):
-            if future in checked_futures:
-                logger.debug(f"skip already checked future {future}.")
-                continue
+        for future in self._as_completed(future for future in futures if future not in checked_futures):
             with self.lock:
                 vertex = futures[future]
                 try:
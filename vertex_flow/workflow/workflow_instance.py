@@ -42,6 +42,28 @@ class WorkflowInstance:
             self.completed_at = datetime.now()
             raise
 
+    def rerun(self, changed_inputs=None, dirty_vertices=()):
+        """在已完成的实例上增量重新执行，只重新执行受变化影响的节点，返回重新执行的节点 ID 列表"""
+        if self.status != "completed" or self.workflow_obj is None:
+            raise RuntimeError(f"Workflow instance {self.id} is not completed, can not rerun.")
+        try:
+            self.status = "running"
+            self.started_at = datetime.now()
+
+            rerun_ids = self.workflow_obj.rerun(changed_inputs, dirty_vertices)
+            self.input_data = {**self.input_data, **(changed_inputs or {})}
+            self.node_outputs = self.workflow_obj.context.get_outputs()
+
+            self.status = "completed"
+            self.completed_at = datetime.now()
+            return rerun_ids
+
+        except Exception as e:
+            self.status = "failed"
+            self.error_message = str(e)
+            self.completed_at = datetime.now()
+            raise
+
     def _create_workflow_from_template(self):
         """基于模板创建工作流对象"""
         if not self.workflow_manager:
@@ -673,6 +673,42 @@ class WorkflowManager:
             logger.error(f"Failed to execute workflow: {e}\nTraceback:\n{error_traceback}")
             return {"error": str(e), "status": "failed", "traceback": error_traceback}
 
+    def rerun_workflow_instance(self, instance_id: str, input_data: dict = None, dirty_nodes: list = None) -> dict:
+        """在已完成的实例上增量重新执行，只重新执行输入变化或指定节点的下游"""
+        try:
+            instance = self.get_workflow_instance(instance_id)
+            if not instance:
+                return {"error": "Workflow instance not found", "status": "failed"}
+
+            rerun_nodes = instance.rerun(input_data, dirty_nodes or [])
+
+            self.execution_history.setdefault(instance.workflow_template_id, []).append(
+                {
+                    "instance_id": instance.id,
+                    "executed_at": instance.started_at.isoformat(),
+                    "status": instance.status,
+                    "input_data": instance.input_data,
+                    "output_data": instance.output_data,
+                    "rerun_nodes": rerun_nodes,
+                }
+            )
+
+            return {
+                "instance_id": instance.id,
+                "result": instance.output_data,
+                "status": instance.status,
+                "node_outputs": instance.node_outputs,
+                "rerun_nodes": rerun_nodes,
+                "executed_at": instance.started_at.isoformat(),
+            }
+
+        except Exception as e:
+            import traceback
+
+            error_traceback = traceback.format_exc()
+            logger.error(f"Failed to rerun workflow instance: {e}\nTraceback:\n{error_traceback}")
+            return {"error": str(e), "status": "failed", "traceback": error_traceback}
+
     def get_execution_history(self, workflow_id: str) -> list:
         """获取工作流执行历史"""
         return self.execution_history.get(workflow_id, [])
@@ -0,0 +1,441 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from threading import Event, Lock, Thread
+from types import MappingProxyType
+from typing import Any, Deque, Dict, FrozenSet, Generic, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+from vertex_flow.utils.logger import LoggerUtil
+from vertex_flow.workflow.cancellation import CancellationToken
+from vertex_flow.workflow.constants import WORKFLOW_END_STATES
+from vertex_flow.workflow.context import WorkflowContext
+from vertex_flow.workflow.run_state import RunState
+from vertex_flow.workflow.vertex_executor import run_sync
+from vertex_flow.workflow.workflow import Workflow, around_workflow
+
+logger = LoggerUtil.get_logger()
+
+T = TypeVar("T")  # 泛型类型变量
+
+
+class WorkflowPlan(Generic[T]):
+    """编译后的工作流执行计划
+
+    编译时完成图校验与拓扑排序，并冻结顶点依赖关系。计划本身不保存任何运行结果，
+    可以在其上并发启动任意多个 WorkflowRun。修改工作流的图结构后需要重新调用
+    Workflow.compile() 获取新的计划。
+    """
+
+    def __init__(self, workflow: Workflow[T]):
+        workflow._validate_graph()
+        order = workflow._topological_ids()
+        if len(order) != len(workflow.vertices):
+            raise ValueError(
+                f"Graph contains a cycle, cannot compile workflow, size of topo order : {len(order)}, orignal size : {len(workflow.vertices)}."
+            )
+
+        self.workflow = workflow
+        self.topological_order: Tuple[str, ...] = tuple(order)
+        self.dependencies: Mapping[str, FrozenSet[str]] = MappingProxyType(
+            {vertex_id: frozenset(workflow.vertices[vertex_id].dependencies) for vertex_id in order}
+        )
+        self.source_ids: FrozenSet[str] = frozenset(vertex.id for vertex in workflow.get_sources())
+        self.sink_ids: FrozenSet[str] = frozenset(vertex.id for vertex in workflow.get_sinks())
+        logger.info(f"Workflow compiled, vertices : {len(order)}, sources : {len(self.source_ids)}.")
+
+    def create_run(
+        self, context: Optional[WorkflowContext[T]] = None, run_id: Optional[str] = None
+    ) -> "WorkflowRun[T]":
+        """创建一个尚未执行的运行
+
+        Args:
+            context: 运行上下文，默认复制工作流上下文的环境参数与用户参数
+            run_id: 运行 ID，不指定时自动生成；工作流开启检查点且该运行已有检查点时从检查点恢复
+        """
+        return WorkflowRun(self, context=context, run_id=run_id)
+
+    def run(
+        self,
+        source_inputs: Optional[Dict[str, Any]] = None,
+        context: Optional[WorkflowContext[T]] = None,
+        run_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> "WorkflowRun[T]":
+        """同步执行一次运行，执行失败时抛出顶点异常"""
+        run = self.create_run(context=context, run_id=run_id)
+        run.execute(source_inputs, timeout=timeout)
+        return run
+
+    async def run_async(
+        self,
+        source_inputs: Optional[Dict[str, Any]] = None,
+        context: Optional[WorkflowContext[T]] = None,
+        run_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> "WorkflowRun[T]":
+        """在当前事件循环中执行一次运行，执行失败时抛出顶点异常"""
+        run = self.create_run(context=context, run_id=run_id)
+        await run.execute_async(source_inputs, timeout=timeout)
+        return run
+
+    def start_run(
+        self,
+        source_inputs: Optional[Dict[str, Any]] = None,
+        context: Optional[WorkflowContext[T]] = None,
+        run_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> "WorkflowRun[T]":
+        """在后台线程中启动一次运行，立即返回，可通过 astream/wait 获取进度与结果"""
+        run = self.create_run(context=context, run_id=run_id)
+        run.start(source_inputs, timeout=timeout)
+        return run
+
+    def execute_batch(
+        self,
+        records: Iterable[Dict[str, Any]],
+        concurrency: int = 4,
+        ordered: bool = True,
+        timeout: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ) -> Iterator["BatchResult[T]"]:
+        """对每条记录执行一次运行，逐条返回 BatchResult
+
+        所有运行共享同一个顶点线程池与同一组顶点配置（包括模型客户端），不再为每条记录重新建图、
+        创建线程池。同时执行的运行不超过 concurrency 个，已提交但尚未返回的记录不超过 2 * concurrency 条，
+        records 可以是惰性的迭代器。单条记录失败不会中止批处理，异常记录在 BatchResult.error 中；
+        提前结束迭代时取消尚未完成的运行。
+
+        Args:
+            records: 记录列表或迭代器，每条记录为一次运行的源顶点输入
+            concurrency: 同时执行的运行数
+            ordered: True 按输入顺序返回，False 按完成顺序返回
+            timeout: 每条记录的运行截止时间（秒）
+            max_workers: 共享顶点线程池的工作线程数，默认与 ThreadPoolExecutor 相同
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be positive, got {concurrency}.")
+        return self._iter_batch(records, concurrency, ordered, timeout, max_workers)
+
+    def _iter_batch(
+        self,
+        records: Iterable[Dict[str, Any]],
+        concurrency: int,
+        ordered: bool,
+        timeout: Optional[float],
+        max_workers: Optional[int],
+    ) -> Iterator["BatchResult[T]"]:
+        numbered = enumerate(records)
+        window = concurrency * 2
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-batch-vertex")
+        runners = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="workflow-batch")
+        pending: Dict[Future, BatchResult[T]] = {}
+        # ordered 模式下按提交顺序等待的运行
+        submitted: Deque[Future] = deque()
+        exhausted = False
+        completed = False
+
+        def submit_records():
+            nonlocal exhausted
+            while not exhausted and len(pending) < window:
+                try:
+                    index, record = next(numbered)
+                except StopIteration:
+                    exhausted = True
+                    return
+                result = BatchResult(index, record, self.create_run())
+                future = runners.submit(self._execute_batch_record, result, timeout, executor)
+                pending[future] = result
+                if ordered:
+                    submitted.append(future)
+
+        try:
+            submit_records()
+            while pending:
+                if ordered:
+                    done = [submitted.popleft()]
+                    wait_futures(done)
+                else:
+                    finished, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                    done = sorted(finished, key=lambda future: pending[future].index)
+                results = [pending.pop(future) for future in done]
+                # 先补充记录再返回结果，调用方处理结果期间其它运行继续执行
+                submit_records()
+                yield from results
+            completed = True
+        finally:
+            if completed:
+                runners.shutdown()
+                executor.shutdown()
+            else:
+                for result in pending.values():
+                    result.run.cancel()
+                runners.shutdown(wait=False, cancel_futures=True)
+                # 已派发的顶点不撤销：它们在运行的取消令牌下立即失败，使各运行的调度器正常退出
+                executor.shutdown(wait=False)
+
+    @staticmethod
+    def _execute_batch_record(
+        result: "BatchResult[T]", timeout: Optional[float], executor: ThreadPoolExecutor
+    ) -> "BatchResult[T]":
+        try:
+            result.run.execute(result.inputs, timeout=timeout, executor=executor)
+            result.output = result.run.result()
+        except Exception as e:
+            result.error = e
+            logger.warning(f"Batch record {result.index} failed in workflow run {result.run.run_id}: {e}")
+        return result
+
+
+class WorkflowRun(Generic[T]):
+    """基于 WorkflowPlan 的一次运行
+
+    每个运行拥有独立的 RunState（顶点输出、执行状态、LLM 消息等）、上下文和事件通道，
+    顶点对象本身只作为配置在多个运行之间共享。
+    """
+
+    def __init__(
+        self,
+        plan: WorkflowPlan[T],
+        context: Optional[WorkflowContext[T]] = None,
+        run_id: Optional[str] = None,
+    ):
+        self.plan = plan
+        self.workflow = plan.workflow
+        self.state = RunState(run_id=run_id, owner=self)
+        self.context = context or WorkflowContext[T](
+            env_parameters=dict(self.workflow.context.get_env_parameters()),
+            user_parameters=dict(self.workflow.context.get_user_parameters()),
+        )
+        # 每次运行独立的事件通道，沿用工作流事件通道的队列与合并配置
+        self.event_channel = self.workflow.event_channel.fork()
+        if self.workflow.smart_wait_time_enabled:
+            self.event_channel.set_wait_time(self.workflow.wait_time)
+        self.error: Optional[BaseException] = None
+        self.source_inputs: Dict[str, Any] = {}
+        self.cancellation = CancellationToken(name=f"workflow run {self.run_id}")
+        self._started = False
+        self._finished = Event()
+        self._rerun_lock = Lock()
+
+    @property
+    def run_id(self) -> str:
+        return self.state.run_id
+
+    @property
+    def tracer(self):
+        """沿用工作流的执行追踪器"""
+        return self.workflow.tracer
+
+    @property
+    def vertices(self):
+        return self.workflow.vertices
+
+    def _mark_started(self):
+        if self._started:
+            raise RuntimeError(f"Workflow run {self.run_id} running duplicated.")
+        self._started = True
+
+    def _start_deadline(self, timeout: Optional[float]):
+        if timeout is not None:
+            self.cancellation = self.cancellation.child(timeout)
+
+    def cancel(self, reason: Optional[BaseException] = None):
+        """取消本次运行，未开始的顶点不再执行，正在执行的顶点在下一个取消检查点退出"""
+        self.cancellation.cancel(reason)
+
+    def execute(
+        self,
+        source_inputs: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> "WorkflowRun[T]":
+        """同步执行本次运行，每个运行只能执行一次
+
+        Args:
+            source_inputs: 源顶点输入
+            timeout: 运行截止时间（秒），超过后抛出 DeadlineExceededError
+            executor: 执行顶点的线程池，由调用方负责关闭；默认本次运行新建
+        """
+        self._mark_started()
+        self._start_deadline(timeout)
+        self.source_inputs = dict(source_inputs or {})
+        try:
+            with self.state.activate():
+                self._execute(self.source_inputs, executor)
+        except BaseException as e:
+            self.error = e
+            raise
+        finally:
+            self._finished.set()
+        return self
+
+    @around_workflow
+    def _execute(self, source_inputs: Dict[str, Any], executor: Optional[ThreadPoolExecutor] = None):
+        self.workflow._execute_with_ready_queue(
+            source_inputs,
+            set(),
+            vertex_ids=list(self.plan.topological_order),
+            dependencies=self.plan.dependencies,
+            context=self.context,
+            run_state=self.state,
+            checkpoint=self.workflow._open_checkpoint(self.run_id, self.context),
+            cancellation=self.cancellation,
+            executor=executor,
+        )
+        logger.info(f"workflow run {self.run_id} finished.")
+        return True
+
+    async def execute_async(
+        self, source_inputs: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None
+    ) -> "WorkflowRun[T]":
+        """在当前事件循环中执行本次运行，同步顶点在共享的顶点线程池中执行"""
+        self._mark_started()
+        self._start_deadline(timeout)
+        self.source_inputs = dict(source_inputs or {})
+        try:
+            with self.state.activate():
+                await self._execute_async(self.source_inputs)
+        except BaseException as e:
+            self.error = e
+            raise
+        finally:
+            self._finished.set()
+        return self
+
+    @around_workflow
+    async def _execute_async(self, source_inputs: Dict[str, Any]):
+        checkpoint = await run_sync(self.workflow._open_checkpoint, self.run_id, self.context)
+        await self.workflow._execute_async(
+            source_inputs,
+            set(),
+            vertex_ids=list(self.plan.topological_order),
+            dependencies=self.plan.dependencies,
+            context=self.context,
+            checkpoint=checkpoint,
+            cancellation=self.cancellation,
+        )
+        logger.info(f"workflow run {self.run_id} finished.")
+        return True
+
+    def rerun(self, changed_inputs: Optional[Dict[str, Any]] = None, dirty_vertices: Iterable[str] = ()) -> List[str]:
+        """在本次已成功完成的运行上增量重新执行，参数与返回值同 Workflow.rerun"""
+        if not self.is_finished() or self.error is not None:
+            raise RuntimeError(f"Workflow run {self.run_id} has not completed successfully, can not rerun.")
+        if not self._rerun_lock.acquire(blocking=False):
+            raise RuntimeError(f"Workflow run {self.run_id} rerunning duplicated.")
+        try:
+            with self.state.activate():
+                return self._rerun(changed_inputs, dirty_vertices)
+        finally:
+            self._rerun_lock.release()
+
+    @around_workflow
+    def _rerun(self, changed_inputs: Optional[Dict[str, Any]], dirty_vertices: Iterable[str]) -> List[str]:
+        self.source_inputs, rerun_ids = self.workflow._rerun(
+            self.source_inputs,
+            changed_inputs,
+            dirty_vertices,
+            self.context,
+            run_state=self.state,
+            cancellation=CancellationToken(name=f"workflow run {self.run_id} rerun"),
+        )
+        return rerun_ids
+
+    def start(
+        self, source_inputs: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None
+    ) -> "WorkflowRun[T]":
+        """在后台线程中执行本次运行"""
+        thread = Thread(
+            target=self._execute_in_background,
+            args=(source_inputs, timeout),
+            name=f"workflow-run-{self.run_id}",
+            daemon=True,
+        )
+        thread.start()
+        return self
+
+    def _execute_in_background(self, source_inputs: Optional[Dict[str, Any]], timeout: Optional[float] = None):
+        try:
+            self.execute(source_inputs, timeout=timeout)
+        except BaseException as e:
+            logger.error(f"Workflow run {self.run_id} failed: {e}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待运行结束，返回是否已结束"""
+        return self._finished.wait(timeout)
+
+    def is_finished(self) -> bool:
+        return self._finished.is_set()
+
+    def emit_event(self, event_type: str, event_data: dict):
+        logger.debug(f"emit event {event_type} {event_data}")
+        self.event_channel.emit_event(event_type, event_data)
+
+    def subscribe(self, event_type: str, callback):
+        self.event_channel.subscribe(event_type, callback)
+
+    async def astream(self, event_types):
+        """流式获取本次运行的事件，收到工作流结束事件后退出
+
+        Args:
+            event_types: 可以是单个事件类型字符串，或者事件类型列表
+        """
+        if isinstance(event_types, str):
+            event_types = [event_types]
+
+        async for event_data in self.event_channel.astream(event_types):
+            yield event_data
+            if event_data.get("status") in WORKFLOW_END_STATES:
+                break
+
+    async def astream_batches(self, event_types):
+        """按批获取本次运行的事件，收到工作流结束事件后退出"""
+        async for batch in self.event_channel.astream_batches(event_types):
+            yield batch
+
+    async def areplay(self, event_types, last_event_id: Optional[int] = None):
+        """从本次运行的事件日志中读取 (事件 ID, 事件数据)，可从 last_event_id 之后断线续读"""
+        async for event in self.event_channel.areplay(event_types, last_event_id):
+            yield event
+
+    def get_output(self, vertex_id: str) -> T:
+        """获取本次运行中指定顶点的输出"""
+        with self.state.activate():
+            return self.workflow.get_vertice_by_id(vertex_id).output
+
+    def result(self) -> Dict[str, T]:
+        """获取本次运行所有 SINK 类型顶点的输出结果"""
+        with self.state.activate():
+            return self.workflow.result()
+
+    def status(self) -> Dict[str, T]:
+        """获取本次运行各顶点的执行状态"""
+        with self.state.activate():
+            return self.workflow.status()
+
+
+class BatchResult(Generic[T]):
+    """WorkflowPlan.execute_batch 中一条记录的执行结果
+
+    Attributes:
+        index: 记录在输入中的序号
+        inputs: 记录本身（源顶点输入）
+        run: 执行该记录的 WorkflowRun，可继续查询各顶点输出与状态
+        output: 运行成功时所有 SINK 顶点的输出（同 WorkflowRun.result）
+        error: 运行失败时的异常
+    """
+
+    def __init__(self, index: int, inputs: Dict[str, Any], run: WorkflowRun[T]):
+        self.index = index
+        self.inputs = inputs
+        self.run = run
+        self.output: Optional[Dict[str, T]] = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"BatchResult(index={self.index}, run_id={self.run.run_id}, {status})"